@@ -3,7 +3,8 @@ import { z } from "zod";
 import { readFile, writeFile, mkdir, unlink } from "fs/promises";
 import path from "path";
 import { fileURLToPath } from "url";
-import { exec } from "child_process";
+import { exec, spawn } from "child_process";
+import { createInterface } from "readline";
 import { promisify } from "util";
 
 const execAsync = promisify(exec);
@@ -95,6 +96,96 @@ const DOMAIN_CONFIGS = {
 
 };
 
+// Keep only the tail of stderr for error messages; planner logs can be huge
+const MAX_STDERR_CHARS = 64 * 1024;
+
+/**
+ * Run visualizer_api.py in --stream mode and collect its NDJSON records.
+ * stdout is consumed line by line as the states are rendered, so the
+ * output size is not limited by a child process buffer.
+ */
+function runVisualizerStream(
+  args: string[],
+  timeoutMs: number
+): Promise<{ header: any; states: any[]; trailer: any }> {
+  const pythonScript = path.join(PLANNER_DIR, "visualizer_api.py");
+
+  return new Promise((resolve, reject) => {
+    const child = spawn(PYTHON_CMD, [pythonScript, ...args, "--stream"], {
+      env: {
+        ...process.env,
+        PYTHONPATH: '', // Clear PYTHONPATH to prevent Python 3.13 imports
+        PYTHONHOME: '', // Clear PYTHONHOME as well
+      },
+    });
+
+    let header: any = null;
+    let trailer: any = null;
+    let failure: string | null = null;
+    const states: any[] = [];
+    let stderr = "";
+
+    const timer = setTimeout(() => {
+      failure = `Python script timed out after ${timeoutMs / 1000}s`;
+      child.kill("SIGKILL");
+    }, timeoutMs);
+
+    child.stderr.setEncoding("utf-8");
+    child.stderr.on("data", (chunk: string) => {
+      stderr = (stderr + chunk).slice(-MAX_STDERR_CHARS);
+    });
+
+    const lines = createInterface({ input: child.stdout, crlfDelay: Infinity });
+    lines.on("line", (line) => {
+      if (!line.trim()) {
+        return;
+      }
+      let record: any;
+      try {
+        record = JSON.parse(line);
+      } catch {
+        console.warn('[runVisualizerStream] Ignoring non-JSON output line:', line.slice(0, 200));
+        return;
+      }
+      switch (record.type) {
+        case "header":
+          // Anytime planning streams a header per improved plan; the newest
+          // revision replaces the states of the previous one
+          header = record;
+          states.length = 0;
+          break;
+        case "state":
+          states.push(record.state);
+          break;
+        case "trailer":
+          trailer = record;
+          break;
+        case "error":
+          failure = record.error || "Failed to solve problem";
+          break;
+      }
+    });
+
+    child.on("error", (error) => {
+      clearTimeout(timer);
+      reject(error);
+    });
+
+    // "close" fires after stdout has ended, so every line has been handled
+    child.on("close", (code) => {
+      clearTimeout(timer);
+      if (failure) {
+        reject(new Error(failure));
+      } else if (!header || !trailer) {
+        reject(new Error(`Python error (exit code ${code}): ${stderr || "incomplete output"}`));
+      } else if (!trailer.success) {
+        reject(new Error(trailer.error || "Failed to solve problem"));
+      } else {
+        resolve({ header, states, trailer });
+      }
+    });
+  });
+}
 
 export const visualizerRouter = router({
   /**
@@ -182,39 +273,16 @@ export const visualizerRouter = router({
         problemPath = path.join(uploadsDir, `problem_${timestamp}.pddl`);
         await writeFile(problemPath, input.problemContent, "utf-8");
 
-        // Run Python pipeline with planner
-        const pythonScript = path.join(PLANNER_DIR, "visualizer_api.py");
-
+        // Run Python pipeline with planner, streaming one state per line
         console.log('[uploadAndGenerate] Running Python script...');
         console.log('[uploadAndGenerate] Using Python command:', PYTHON_CMD);
-        const { stdout, stderr } = await execAsync(
-          `"${PYTHON_CMD}" "${pythonScript}" "${domainPath}" "${problemPath}" "${input.domainName}"`,
-          {
-            maxBuffer: 10 * 1024 * 1024,
-            timeout: 2400000, // 40 minute timeout for planner (Python default is 1800s/30min + buffer)
-            env: {
-              ...process.env,
-              PYTHONPATH: '', // Clear PYTHONPATH to prevent Python 3.13 imports
-              PYTHONHOME: '', // Clear PYTHONHOME as well
-            },
-          }
+        const { header, states, trailer } = await runVisualizerStream(
+          [domainPath, problemPath, input.domainName],
+          2400000 // 40 minute timeout for planner (Python default is 1800s/30min + buffer)
         );
         console.log('[uploadAndGenerate] Python script completed');
-        console.log('[uploadAndGenerate] stdout length:', stdout.length);
-        console.log('[uploadAndGenerate] stderr:', stderr || 'none');
-
-        if (stderr && !stdout) {
-          throw new Error(`Python error: ${stderr}`);
-        }
-
-        // Parse JSON output
-        console.log('[uploadAndGenerate] Parsing JSON output...');
-        const data = JSON.parse(stdout);
-        console.log('[uploadAndGenerate] JSON parsed successfully, success:', data.success);
-
-        if (!data.success) {
-          throw new Error(data.error || "Failed to solve problem");
-        }
+        console.log('[uploadAndGenerate] States received:', states.length);
+        console.log('[uploadAndGenerate] Stats:', trailer.stats);
 
         // Clean up uploaded files after successful processing
         try {
@@ -234,13 +302,14 @@ export const visualizerRouter = router({
 
         return {
           success: true,
-          domain: data.domain,
-          problem: data.problem,
-          plan: data.plan,
-          num_states: data.num_states,
-          states: data.states,
-          used_planner: data.used_planner,
-          planner_info: data.planner_info,
+          domain: header.domain,
+          problem: header.problem,
+          plan: trailer.plan,
+          num_states: trailer.num_states,
+          states,
+          used_planner: header.used_planner,
+          planner_info: header.planner_info,
+          stats: trailer.stats,
         };
       } catch (error) {
         // Clean up files even on error
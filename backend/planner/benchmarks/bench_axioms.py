@@ -0,0 +1,75 @@
+"""
+Benchmark: derived predicates along long plans.
+
+Replays plans over many towers of blocks in a domain whose ``clear`` and
+``above`` predicates are derived, and reports the time per step of the
+incremental update in StateGenerator next to re-deriving every derived
+fact of each state from scratch.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_axioms.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, Problem, StateGenerator
+from state_generator.axioms import AxiomEvaluator
+from state_generator.facts import iter_bits
+from benchmarks.synthetic import DERIVED_BLOCKS_DOMAIN, towers_problem
+
+HEIGHT = 5
+SIZES = [10, 100, 1_000, 5_000]
+STEPS = 2_000
+FULL_STEPS = 50  # re-deriving from scratch is sampled on the first steps
+
+
+def towers_plan(num_towers: int, steps: int):
+    """Take the top block of each tower down and put it back, round-robin."""
+    plan = []
+    i = 0
+    while len(plan) < steps:
+        top, below = f"b{i}_{HEIGHT - 1}", f"b{i}_{HEIGHT - 2}"
+        plan += [f"(move-to-table {top} {below})", f"(move {top} table {below})"]
+        i = (i + 1) % num_towers
+    return plan[:steps]
+
+
+def main():
+    domain = Domain.from_text(DERIVED_BLOCKS_DOMAIN)
+
+    print(f"Derived predicates (towers of {HEIGHT} blocks, {STEPS} steps)")
+    print(f"{'blocks':>8} {'facts':>8} {'closure ms':>11} {'us/step':>10} {'full us/step':>13}")
+
+    for num_towers in SIZES:
+        problem = Problem.from_text(towers_problem(num_towers, HEIGHT))
+        start = time.perf_counter()
+        sg = StateGenerator(domain, problem)
+        closure = time.perf_counter() - start
+        plan = towers_plan(num_towers, STEPS)
+
+        start = time.perf_counter()
+        for action in plan:
+            assert sg.apply_action(action), action
+        incremental = (time.perf_counter() - start) / len(plan)
+
+        # Re-deriving every state: what apply_action would cost without deltas
+        evaluator = AxiomEvaluator(sg.parser.axioms, sg.parser.objects_by_type())
+        sg.reset()
+        start = time.perf_counter()
+        for action in plan[:FULL_STEPS]:
+            sg.apply_action(action)
+            evaluator.closure(sg.facts.fact(fact_id) for fact_id in iter_bits(sg.current_mask))
+        full = (time.perf_counter() - start) / FULL_STEPS
+
+        print(f"{num_towers * HEIGHT:>8} {bin(sg.current_mask).count('1'):>8} {closure * 1e3:>11.1f} "
+              f"{incremental * 1e6:>10.1f} {full * 1e6:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: grounding and successor generation for the built-in planner.
+
+Grounds scaled gripper and rovers problems and reports the number of
+actions a plain type-product grounding would create next to the actions
+left after static preconditions are joined against the initial facts,
+and the grounding time. It then samples states on random walks and
+compares the time to find their applicable actions by testing every
+ground action against the successor generator's decision tree.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_grounding.py
+"""
+
+import random
+import sys
+import tempfile
+import time
+from math import prod
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import PDDLParser
+from state_generator.facts import ids_mask
+from planner_runner.grounding import SuccessorGenerator, ground_task
+from benchmarks.synthetic import DOMAINS_DIR, gripper_problem, rovers_problem, write_problem
+
+PROBLEMS = [
+    ("gripper", "10 balls", lambda: gripper_problem(10, 4)),
+    ("gripper", "100 balls", lambda: gripper_problem(100, 10)),
+    ("gripper", "400 balls", lambda: gripper_problem(400, 20)),
+    ("rovers", "3x20x6", lambda: rovers_problem(3, 20, 6)),
+    ("rovers", "10x100x50", lambda: rovers_problem(10, 100, 50)),
+    ("rovers", "20x300x200", lambda: rovers_problem(20, 300, 200)),
+]
+
+SAMPLED_STATES = 300
+WALK_LENGTH = 30
+
+
+def type_product(parser: PDDLParser) -> int:
+    """Ground actions of a grounding that only respects parameter types."""
+    objects_of = parser.objects_by_type()
+    return sum(prod(len(objects_of.get(param_type, ())) for _, param_type in action.parameters)
+               for action in parser.actions.values())
+
+
+def sample_states(task, successors: SuccessorGenerator, count: int, rng: random.Random):
+    """States visited by random walks from the initial state."""
+    operators = [(~ids_mask(action.delete), ids_mask(action.add)) for action in task.actions]
+    states = []
+    while len(states) < count:
+        state = task.init
+        for _ in range(WALK_LENGTH):
+            applicable = successors.applicable(state)
+            if not applicable:
+                break
+            keep, add = operators[rng.choice(applicable)]
+            state = (state & keep) | add
+            states.append(state)
+    return states[:count]
+
+
+def per_state(fn, states) -> float:
+    """Microseconds per state spent in fn."""
+    start = time.perf_counter()
+    for state in states:
+        fn(state)
+    return (time.perf_counter() - start) / len(states) * 1e6
+
+
+def main():
+    print("Grounding and successor generation (synthetic problems)")
+    print(f"{'domain':>8} {'size':>11} {'typed':>10} {'grounded':>9} {'ground ms':>10} "
+          f"{'tree ms':>8} {'scan us':>9} {'tree us':>8} {'speedup':>8}")
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for domain, label, make in PROBLEMS:
+            problem_path = write_problem(make(), tmp, "problem")
+            parser = PDDLParser(str(DOMAINS_DIR / domain / "domain.pddl"), str(problem_path))
+
+            start = time.perf_counter()
+            task = ground_task(parser, max_actions=None)
+            ground_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            successors = SuccessorGenerator(task.actions)
+            tree_ms = (time.perf_counter() - start) * 1000
+
+            checks = [(ids_mask(action.pre_pos), ids_mask(action.pre_neg)) for action in task.actions]
+
+            def scan(state):
+                return [index for index, (pre, forbidden) in enumerate(checks)
+                        if state & pre == pre and not state & forbidden]
+
+            states = sample_states(task, successors, SAMPLED_STATES, rng)
+            assert all(sorted(successors.applicable(s)) == scan(s) for s in states[:20])
+            scan_us = per_state(scan, states)
+            tree_us = per_state(successors.applicable, states)
+            print(f"{domain:>8} {label:>11} {type_product(parser):>10,} {len(task.actions):>9,} "
+                  f"{ground_ms:>10.1f} {tree_ms:>8.1f} {scan_us:>9.1f} {tree_us:>8.1f} "
+                  f"{scan_us / tree_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: lifted successor generation against full grounding.
+
+For scaled depot and logistics problems, reports the memory and time of
+grounding the whole task and building its successor generator, next to
+the memory a LiftedTask holds after finding the successors of the same
+sampled states (only the instances actually applicable get interned).
+The bound column is the admission control estimate of ground actions.
+It then compares the time per state to find the applicable actions.
+States are sampled on random walks from the initial state. Problems whose
+grounding would take more than GROUND_LIMIT actions are only run lifted.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_lifted.py
+"""
+
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import PDDLParser
+from state_generator.facts import ids_mask
+from planner_runner.admission import estimate_size
+from planner_runner.grounding import SuccessorGenerator, ground_task
+from planner_runner.lifted import LiftedTask
+from benchmarks.synthetic import DOMAINS_DIR, depot_problem, logistics_problem, write_problem
+
+PROBLEMS = [
+    ("depot", "20x5x10", lambda: depot_problem(20, 5, 10)),
+    ("depot", "200x10x40", lambda: depot_problem(200, 10, 40)),
+    ("depot", "1000x20x100", lambda: depot_problem(1000, 20, 100)),
+    ("logistics", "20x4x10", lambda: logistics_problem(20, 4, 10, 2, 4)),
+    ("logistics", "300x10x40", lambda: logistics_problem(300, 10, 40, 5, 20)),
+    ("logistics", "1000x30x100", lambda: logistics_problem(1000, 30, 100, 10, 50)),
+]
+
+GROUND_LIMIT = 1_000_000
+SAMPLED_STATES = 200
+WALK_LENGTH = 20
+
+
+def measure(fn):
+    """
+    Run fn and return (result, seconds, peak bytes allocated).
+
+    Tracing allocations slows Python down several times, so fn runs twice:
+    once timed, once traced.
+    """
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def sample_states(task, successors, rng: random.Random):
+    """States visited by random walks from the initial state."""
+    states = []
+    while len(states) < SAMPLED_STATES:
+        state = task.init
+        for _ in range(WALK_LENGTH):
+            applicable = successors.applicable(state)
+            if not applicable:
+                break
+            action = task.actions[rng.choice(applicable)]
+            state = (state & ~ids_mask(action.delete)) | ids_mask(action.add)
+            states.append(state)
+    return states
+
+
+def per_state(successors, states) -> float:
+    """Microseconds per state to find the applicable actions."""
+    start = time.perf_counter()
+    for state in states:
+        successors.applicable(state)
+    return (time.perf_counter() - start) / len(states) * 1e6
+
+
+def main():
+    print("Lifted successor generation vs full grounding (synthetic problems)")
+    print(f"{'domain':>9} {'size':>12} {'bound':>10} {'ground s':>9} {'ground MB':>10} "
+          f"{'lifted MB':>10} {'instances':>10} {'ground us':>10} {'lifted us':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for domain, label, make in PROBLEMS:
+            parser = PDDLParser(str(DOMAINS_DIR / domain / "domain.pddl"),
+                                str(write_problem(make(), tmp, "problem")))
+            bound = estimate_size(parser).actions
+
+            def lifted_walk():
+                task = LiftedTask(parser)
+                successors = task.successor_generator()
+                return task, successors, sample_states(task, successors, random.Random(0))
+
+            (task, successors, states), _, lifted_peak = measure(lifted_walk)
+            lifted_us = per_state(successors, states)
+
+            ground_s = ground_mb = ground_us = "-"
+            if bound <= GROUND_LIMIT:
+                def ground():
+                    grounded = ground_task(parser, max_actions=None)
+                    return grounded, SuccessorGenerator(grounded.actions)
+
+                (grounded, tree), seconds, peak = measure(ground)
+                # Same states, re-encoded in the grounded task's fact ids
+                encode = [grounded.facts.mask(grounded.facts.intern(*task.facts.fact(fact))
+                                              for fact in range(len(task.facts)) if state >> fact & 1)
+                          for state in states]
+                ground_s, ground_mb = f"{seconds:.2f}", f"{peak / 1e6:.1f}"
+                ground_us = f"{per_state(tree, encode):.0f}"
+                del grounded, tree
+
+            print(f"{domain:>9} {label:>12} {bound:>10,} {ground_s:>9} {ground_mb:>10} "
+                  f"{lifted_peak / 1e6:>10.1f} {len(task.actions):>10,} {ground_us:>10} {lifted_us:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: PDDL parsing time versus problem size.
+
+Parses synthetic gripper problems with up to 100k :init facts and reports
+time per fact, which should stay flat (linear scaling).
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_parser.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import PDDLParser
+from benchmarks.synthetic import DOMAINS_DIR, gripper_problem, write_problem
+
+SIZES = [1_000, 10_000, 50_000, 100_000]
+REPEATS = 3
+
+
+def bench_parse(num_facts: int, tmp_dir: Path) -> float:
+    """Return the best-of-REPEATS parse time in seconds."""
+    problem = write_problem(gripper_problem(num_facts), tmp_dir, f"gripper_{num_facts}")
+    domain = DOMAINS_DIR / "gripper" / "domain.pddl"
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        parser = PDDLParser(str(domain), str(problem))
+        best = min(best, time.perf_counter() - start)
+    assert len(parser.init_state) >= num_facts
+    return best
+
+
+def main():
+    print("PDDL parser scaling (gripper, synthetic)")
+    print(f"{'facts':>10} {'seconds':>10} {'us/fact':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            elapsed = bench_parse(size, Path(tmp))
+            print(f"{size:>10} {elapsed:>10.4f} {elapsed / size * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: goal-relevance pruning on problems padded with irrelevant objects.
+
+Pads synthetic gripper, depot and rovers problems with objects the goal
+does not mention and reports the pruning time and the grounded size (the
+admission control estimate) before and after pruning. When Fast Downward
+is installed, also solves both versions with the satisficing search and
+reports the planner time.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_relevance.py
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import Domain, PDDLParser, Problem
+from planner_runner.admission import estimate_size
+from planner_runner.relevance import reduce_problem
+from benchmarks.synthetic import DOMAINS_DIR, depot_problem, gripper_problem, rovers_problem
+
+PADDING = [0, 100, 1_000, 5_000]
+
+PROBLEMS = [
+    ("gripper", lambda spare: gripper_problem(10, 4, num_spare=spare)),
+    ("depot", lambda spare: depot_problem(6, 3, 6, num_spare=spare)),
+    ("rovers", lambda spare: rovers_problem(3, 20, 6, num_spare=spare)),
+]
+
+
+def solve_time(domain_path: str, problem_text: str, directory: Path) -> str:
+    """Seconds Fast Downward takes on a problem, or '-' if it is not installed."""
+    if not run_planner.FD_PATH.exists():
+        return "-"
+    path = directory / "problem.pddl"
+    path.write_text(problem_text)
+    start = time.perf_counter()
+    try:
+        run_planner.run_fast_downward(domain_path, str(path), timeout=300,
+                                      search=run_planner.SATISFICING_SEARCH, use_cache=False)
+    except (RuntimeError, subprocess.TimeoutExpired):
+        return "fail"
+    return f"{time.perf_counter() - start:.2f}"
+
+
+def main():
+    print("Goal-relevance pruning (synthetic problems with spare objects)")
+    print(f"{'domain':>8} {'spare':>6} {'objects':>8} {'kept':>6} {'prune ms':>9} "
+          f"{'actions':>10} {'reduced':>10} {'FD s':>7} {'reduced s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for name, generate in PROBLEMS:
+            domain_path = str(DOMAINS_DIR / name / "domain.pddl")
+            domain = Domain.from_file(domain_path, use_cache=False)
+            for spare in PADDING:
+                text = generate(spare)
+                parser = PDDLParser(domain, Problem.from_text(text))
+
+                start = time.perf_counter()
+                reduction = reduce_problem(parser)
+                elapsed = time.perf_counter() - start
+
+                reduced_text = reduction.to_pddl() if reduction else text
+                reduced = PDDLParser(domain, Problem.from_text(reduced_text))
+                print(f"{name:>8} {spare:>6} {len(parser.objects):>8} {len(reduced.objects):>6} "
+                      f"{elapsed * 1000:>9.2f} {estimate_size(parser).actions:>10,} "
+                      f"{estimate_size(reduced).actions:>10,} "
+                      f"{solve_time(domain_path, text, tmp):>7} {solve_time(domain_path, reduced_text, tmp):>10}")
+
+
+if __name__ == "__main__":
+    main()
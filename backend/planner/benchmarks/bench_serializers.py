@@ -0,0 +1,78 @@
+"""
+Benchmark: size and encode/decode time of rendered sequence serializers.
+
+Runs every mode in state_renderer.serializers over the fixtures in
+``output/*_rendered.json`` and over rendered synthetic gripper plans of
+increasing length.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_serializers.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, Problem, StateGenerator
+from state_renderer import RendererFactory
+from state_renderer.serializers import (
+    SERIALIZATION_MODES, deserialize_sequence, sequence_to_dict, serialize_sequence
+)
+from benchmarks.synthetic import DOMAINS_DIR, gripper_problem, gripper_plan
+
+OUTPUT_DIR = PLANNER_DIR / "output"
+SYNTHETIC_SIZES = [10, 50, 100]
+
+
+def best_of(fn, repeat: int):
+    """Return (result, best seconds) over several runs."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def report(name: str, sequence: dict, repeat: int):
+    baseline = None
+    for mode in SERIALIZATION_MODES:
+        data, encode = best_of(lambda: serialize_sequence(sequence, mode), repeat)
+        decoded, decode = best_of(lambda: deserialize_sequence(data, mode), repeat)
+        assert decoded == sequence, (name, mode)
+        if baseline is None:
+            baseline = len(data)
+        print(f"{name:>28} {mode:>14} {len(data) / 1024:>10.1f} {len(data) / baseline:>7.1%} "
+              f"{encode * 1e3:>10.2f} {decode * 1e3:>10.2f}")
+
+
+def main():
+    header = f"{'sequence':>28} {'mode':>14} {'KB':>10} {'size':>7} {'encode ms':>10} {'decode ms':>10}"
+
+    print("Fixtures (output/*_rendered.json)")
+    print(header)
+    for path in sorted(OUTPUT_DIR.glob("*_rendered.json")):
+        with open(path) as f:
+            sequence = json.load(f)
+        report(path.name, sequence, repeat=20)
+
+    print("\nSynthetic gripper plans")
+    print(header)
+    domain = Domain.from_file(str(DOMAINS_DIR / "gripper" / "domain.pddl"), use_cache=False)
+    renderer = RendererFactory.get_renderer("gripper")
+    for num_balls in SYNTHETIC_SIZES:
+        plan = gripper_plan(num_balls)
+        sg = StateGenerator(domain, Problem.from_text(gripper_problem(num_balls)))
+        rendered = renderer.iter_render(sg.iter_states(plan), sg.parser.objects, plan)
+        sequence = sequence_to_dict(sg.parser.domain_name, rendered)
+        report(f"{num_balls} balls / {len(plan)} steps", sequence, repeat=3)
+
+
+if __name__ == "__main__":
+    main()
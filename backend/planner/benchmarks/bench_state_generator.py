@@ -0,0 +1,97 @@
+"""
+Benchmark: StateGenerator per-step cost and state history memory.
+
+Replays long synthetic gripper plans and reports time per applied action,
+the memory held by the delta-encoded state history (next to the memory
+the same history takes once decoded to sets of Predicate objects), and
+the cost of random access through state_at(). A second table replays a
+plan made of a few repeated actions, where compiled actions are reused.
+
+Usage:
+    cd backend/planner
+    python benchmarks/bench_state_generator.py
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, Problem, StateGenerator
+from benchmarks.synthetic import DOMAINS_DIR, gripper_problem, gripper_plan
+
+SIZES = [100, 500, 2_000, 20_000]
+DECODE_LIMIT = 2_000  # decoding every state of larger plans takes gigabytes
+
+
+def measure(fn):
+    """Run fn and return (result, seconds, bytes still allocated by the result)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def main():
+    domain = Domain.from_file(str(DOMAINS_DIR / "gripper" / "domain.pddl"), use_cache=False)
+
+    print("StateGenerator replay (gripper, synthetic)")
+    print(f"{'balls':>8} {'steps':>8} {'us/step':>10} {'history KB':>12} "
+          f"{'as sets KB':>12} {'us/state_at':>12}")
+
+    for num_balls in SIZES:
+        problem = Problem.from_text(gripper_problem(num_balls))
+        plan = gripper_plan(num_balls)
+        sg = StateGenerator(domain, problem)
+
+        def replay():
+            sg.reset()
+            for action in plan:
+                assert sg.apply_action(action), action
+            return sg.state_history
+
+        _, elapsed, history_bytes = measure(replay)
+        if num_balls <= DECODE_LIMIT:
+            _, _, sets_bytes = measure(sg.get_state_history)
+            sets_kb = f"{sets_bytes / 1024:.0f}"
+        else:
+            sets_kb = "-"
+
+        indices = [random.randrange(len(plan) + 1) for _ in range(200)]
+        start = time.perf_counter()
+        for index in indices:
+            sg.state_history.state_at(index)
+        access = (time.perf_counter() - start) / len(indices)
+
+        print(f"{num_balls:>8} {len(plan):>8} {elapsed / len(plan) * 1e6:>10.1f} "
+              f"{history_bytes / 1024:>12.0f} {sets_kb:>12} {access * 1e6:>12.1f}")
+
+    print("\nRepeated actions (robot shuttling between two rooms)")
+    print(f"{'balls':>8} {'steps':>8} {'first us/step':>14} {'cached us/step':>15}")
+
+    for num_balls in SIZES:
+        problem = Problem.from_text(gripper_problem(num_balls))
+        plan = ["(move room0 room1)", "(move room1 room0)"] * 2_000
+        sg = StateGenerator(domain, problem)
+
+        timings = []
+        for _ in range(2):
+            sg.reset()
+            start = time.perf_counter()
+            for action in plan:
+                sg.apply_action(action)
+            timings.append((time.perf_counter() - start) / len(plan) * 1e6)
+
+        # The first replay compiles each distinct action once, the second none
+        print(f"{num_balls:>8} {len(plan):>8} {timings[0]:>14.1f} {timings[1]:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Synthetic PDDL problem generators for benchmarks.
+
+Problems are written against the domains in ``domains/`` so they can be
+fed through the real parser, state generator and renderers.
+"""
+
+from pathlib import Path
+from typing import List
+
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+DOMAINS_DIR = PLANNER_DIR / "domains"
+
+
+def gripper_problem(num_balls: int, num_rooms: int = 2, num_spare: int = 0) -> str:
+    """
+    Build a gripper problem with ``num_balls`` balls spread over ``num_rooms`` rooms.
+
+    The initial state has roughly ``num_balls + num_rooms`` facts; the goal
+    moves every ball to the last room. ``num_spare`` more balls
+    (``spare0``, ...) are placed in the rooms but left out of the goal.
+    """
+    rooms = [f"room{i}" for i in range(num_rooms)]
+    balls = [f"ball{i}" for i in range(num_balls)]
+    spares = [f"spare{i}" for i in range(num_spare)]
+
+    init = [f"(at-robby {rooms[0]})", "(free left)", "(free right)"]
+    init += [f"(at {ball} {rooms[i % num_rooms]})" for i, ball in enumerate(balls + spares)]
+    goal = [f"(at {ball} {rooms[-1]})" for ball in balls]
+
+    return _problem(
+        "gripper-synthetic", "gripper",
+        [(rooms, "room"), (balls + spares, "ball"), (["left", "right"], "gripper")],
+        init, goal,
+    )
+
+
+def gripper_plan(num_balls: int, num_rooms: int = 2) -> List[str]:
+    """
+    Build a valid plan for gripper_problem(num_balls, num_rooms).
+
+    Carries balls one at a time to the last room, giving a plan of about
+    four actions per ball that is not already there.
+    """
+    rooms = [f"room{i}" for i in range(num_rooms)]
+    target = rooms[-1]
+    robot = rooms[0]
+    plan = []
+    for i in range(num_balls):
+        room = rooms[i % num_rooms]
+        if room == target:
+            continue
+        if robot != room:
+            plan.append(f"(move {robot} {room})")
+        plan.append(f"(pick ball{i} {room} left)")
+        plan.append(f"(move {room} {target})")
+        plan.append(f"(drop ball{i} {target} left)")
+        robot = target
+    return plan
+
+
+def rovers_problem(num_rovers: int, num_waypoints: int, num_targets: int, num_spare: int = 0) -> str:
+    """
+    Build a rovers problem on a ring of ``num_waypoints`` waypoints.
+
+    Every target must be communicated, except ``num_spare`` more targets
+    (``spare0``, ...) placed on the ring but left out of the goal.
+    """
+    rovers = [f"r{i}" for i in range(num_rovers)]
+    waypoints = [f"w{i}" for i in range(num_waypoints)]
+    goal_targets = [f"t{i}" for i in range(num_targets)]
+    targets = goal_targets + [f"spare{i}" for i in range(num_spare)]
+
+    init = [f"(at-rover {r} {waypoints[i % num_waypoints]})" for i, r in enumerate(rovers)]
+    for i, w in enumerate(waypoints):
+        nxt = waypoints[(i + 1) % num_waypoints]
+        init.append(f"(connected {w} {nxt})")
+        init.append(f"(connected {nxt} {w})")
+    init += [f"(at-target {t} {waypoints[i % num_waypoints]})" for i, t in enumerate(targets)]
+    goal = [f"(communicated {t})" for t in goal_targets]
+
+    return _problem(
+        "rovers-synthetic", "rovers",
+        [(rovers, "rover"), (waypoints, "waypoint"), (targets, "target")],
+        init, goal,
+    )
+
+
+def depot_problem(num_packages: int, num_trucks: int, num_locations: int, num_spare: int = 0) -> str:
+    """
+    Build a depot problem shipping every package to the next location.
+
+    Locations alternate between depots and distributors; trucks start at
+    the first locations. ``num_spare`` more packages (``spare0``, ...) sit
+    at the locations but are left out of the goal.
+    """
+    locations = [f"l{i}" for i in range(num_locations)]
+    trucks = [f"t{i}" for i in range(num_trucks)]
+    packages = [f"p{i}" for i in range(num_packages)]
+    spares = [f"spare{i}" for i in range(num_spare)]
+
+    init = [f"(at-truck {t} {locations[i % num_locations]})" for i, t in enumerate(trucks)]
+    init += [f"(at {p} {locations[i % num_locations]})" for i, p in enumerate(packages + spares)]
+    goal = [f"(at {p} {locations[(i + 1) % num_locations]})" for i, p in enumerate(packages)]
+
+    return _problem(
+        "depot-synthetic", "depot",
+        [(locations[0::2], "depot"), (locations[1::2], "distributor"),
+         (trucks, "truck"), (packages + spares, "package")],
+        init, goal,
+    )
+
+
+def logistics_problem(num_packages: int, num_trucks: int, num_cities: int,
+                      num_airplanes: int, num_airports: int) -> str:
+    """
+    Build a logistics problem shipping every package to the next city.
+
+    Trucks start in the first cities and airplanes at the first airports;
+    packages start in the cities, spread round-robin.
+    """
+    cities = [f"c{i}" for i in range(num_cities)]
+    airports = [f"a{i}" for i in range(num_airports)]
+    trucks = [f"truck{i}" for i in range(num_trucks)]
+    planes = [f"plane{i}" for i in range(num_airplanes)]
+    packages = [f"pkg{i}" for i in range(num_packages)]
+
+    init = [f"(at-truck {t} {cities[i % num_cities]})" for i, t in enumerate(trucks)]
+    init += [f"(at-plane {p} {airports[i % num_airports]})" for i, p in enumerate(planes)]
+    init += [f"(at {p} {cities[i % num_cities]})" for i, p in enumerate(packages)]
+    goal = [f"(at {p} {cities[(i + 1) % num_cities]})" for i, p in enumerate(packages)]
+
+    return _problem(
+        "logistics-synthetic", "logistics",
+        [(cities, "city"), (airports, "airport"), (trucks, "truck"),
+         (planes, "airplane"), (packages, "package")],
+        init, goal,
+    )
+
+
+# Blocks world with derived predicates: clear depends negatively on
+# covered, and above is the transitive closure of on
+DERIVED_BLOCKS_DOMAIN = """
+(define (domain derived-blocks)
+  (:requirements :strips :typing :derived-predicates)
+  (:types block)
+  (:constants table - block)
+  (:predicates (on ?x ?y - block) (covered ?x - block) (clear ?x - block)
+               (above ?x ?y - block))
+  (:derived (covered ?x - block) (exists (?y - block) (on ?y ?x)))
+  (:derived (clear ?x - block) (and (not (covered ?x)) (not (= ?x table))))
+  (:derived (above ?x ?y - block)
+    (or (on ?x ?y) (exists (?z - block) (and (on ?x ?z) (above ?z ?y)))))
+  (:action move
+    :parameters (?b ?from ?to - block)
+    :precondition (and (on ?b ?from) (clear ?b) (not (above ?to ?b)) (not (covered ?to)))
+    :effect (and (on ?b ?to) (not (on ?b ?from))))
+  (:action move-to-table
+    :parameters (?b ?from - block)
+    :precondition (and (on ?b ?from) (clear ?b))
+    :effect (and (on ?b table) (not (on ?b ?from))))
+)
+"""
+
+
+def towers_problem(num_towers: int, height: int) -> str:
+    """
+    Build a DERIVED_BLOCKS_DOMAIN problem with ``num_towers`` towers of ``height`` blocks.
+
+    Tower ``i`` is ``b<i>_0`` (on the table) up to ``b<i>_<height-1>``.
+    The goal puts the bottom block of the first tower on the one above it.
+    """
+    blocks = []
+    init = []
+    for i in range(num_towers):
+        tower = [f"b{i}_{j}" for j in range(height)]
+        blocks += tower
+        init.append(f"(on {tower[0]} table)")
+        init += [f"(on {upper} {lower})" for lower, upper in zip(tower, tower[1:])]
+    return _problem("towers-synthetic", "derived-blocks", [(blocks, "block")],
+                    init, ["(on b0_0 b0_1)"])
+
+
+# Briefcase world: moving the briefcase moves everything in it (forall +
+# when), and emptying it takes everything out (forall without when)
+BRIEFCASE_DOMAIN = """
+(define (domain briefcase)
+  (:requirements :strips :typing :conditional-effects)
+  (:types location portable)
+  (:predicates (at-bc ?l - location) (at ?o - portable ?l - location)
+               (in ?o - portable) (moved ?o - portable))
+  (:action move
+    :parameters (?from ?to - location)
+    :precondition (at-bc ?from)
+    :effect (and (at-bc ?to) (not (at-bc ?from))
+                 (forall (?o - portable)
+                   (when (and (in ?o) (not (= ?from ?to)))
+                     (and (at ?o ?to) (not (at ?o ?from)) (moved ?o))))))
+  (:action put-in
+    :parameters (?o - portable ?l - location)
+    :precondition (and (at ?o ?l) (at-bc ?l) (not (in ?o)))
+    :effect (in ?o))
+  (:action empty
+    :parameters ()
+    :precondition ()
+    :effect (forall (?o - portable) (not (in ?o))))
+)
+"""
+
+
+def briefcase_problem(num_objects: int, num_locations: int = 2) -> str:
+    """
+    Build a BRIEFCASE_DOMAIN problem with objects spread over the locations.
+
+    The briefcase starts at the first location; the goal moves every
+    object to the last one.
+    """
+    locations = [f"l{i}" for i in range(num_locations)]
+    objects = [f"o{i}" for i in range(num_objects)]
+    init = [f"(at-bc {locations[0]})"]
+    init += [f"(at {o} {locations[i % num_locations]})" for i, o in enumerate(objects)]
+    goal = [f"(at {o} {locations[-1]})" for o in objects]
+    return _problem("briefcase-synthetic", "briefcase", [(locations, "location"), (objects, "portable")],
+                    init, goal)
+
+
+ROADS_DOMAIN = """
+(define (domain roads)
+  (:requirements :strips :typing :action-costs)
+  (:types place)
+  (:predicates (at ?p - place) (road ?from ?to - place) (visited ?p - place))
+  (:functions (total-cost) - number (road-length ?from ?to - place) - number)
+  (:action drive
+    :parameters (?from ?to - place)
+    :precondition (and (at ?from) (road ?from ?to))
+    :effect (and (not (at ?from)) (at ?to) (visited ?to)
+                 (increase (total-cost) (road-length ?from ?to))))
+)
+"""
+
+
+def roads_problem(num_places: int, num_spare: int = 0) -> str:
+    """
+    Build a ROADS_DOMAIN problem: a two-way road chain minimising total-cost.
+
+    The goal drives from the first place to the last; ``num_spare``
+    places have no roads at all.
+    """
+    places = [f"p{i}" for i in range(num_places)]
+    spare = [f"s{i}" for i in range(num_spare)]
+    init = ["(at p0)", "(= (total-cost) 0)"]
+    for i in range(num_places - 1):
+        for a, b in ((places[i], places[i + 1]), (places[i + 1], places[i])):
+            init += [f"(road {a} {b})", f"(= (road-length {a} {b}) {i + 1})"]
+    return _problem("roads-synthetic", "roads", [(places + spare, "place")], init, [f"(at {places[-1]})"],
+                    metric="(:metric minimize (total-cost))")
+
+
+def write_problem(text: str, directory: Path, name: str) -> Path:
+    """Write problem text to ``directory/name.pddl`` and return the path."""
+    path = Path(directory) / f"{name}.pddl"
+    path.write_text(text)
+    return path
+
+
+def _problem(name: str, domain: str, objects: List, init: List[str], goal: List[str], metric: str = "") -> str:
+    object_lines = "\n".join(f"    {' '.join(names)} - {type_name}"
+                             for names, type_name in objects if names)
+    init_lines = "\n".join(f"    {fact}" for fact in init)
+    goal_lines = "\n".join(f"      {fact}" for fact in goal)
+    return (
+        f"(define (problem {name})\n"
+        f"  (:domain {domain})\n"
+        f"  (:objects\n{object_lines}\n  )\n"
+        f"  (:init\n{init_lines}\n  )\n"
+        f"  (:goal\n    (and\n{goal_lines})\n  )\n"
+        + (f"  {metric}\n" if metric else "")
+        + f")\n"
+    )
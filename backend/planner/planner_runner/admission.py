@@ -0,0 +1,272 @@
+"""
+Admission control - estimate a problem's grounded size before solving it.
+
+Fast Downward's translator grounds every action schema over the objects of
+its parameter types. On a large upload this alone can run until the
+planner timeout while holding a core, so the size of the grounded task is
+bounded up front from the parsed domain and problem, without grounding
+anything:
+
+- facts: each predicate contributes the product of the number of objects
+  compatible with its parameter types; a static predicate (one no action
+  changes) contributes at most its initial facts
+- actions: each schema contributes the product of its parameter domain
+  sizes, tightened by static preconditions - an assignment to the
+  variables of a positive static precondition must match one of that
+  predicate's initial facts
+
+The bound then decides whether to solve as requested, switch to a cheaper
+search with a tighter timeout, or reject the problem. It only needs
+counting and products over the schema, so it runs in milliseconds even
+for problems whose grounding would not fit in memory.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from math import prod
+from typing import Dict, Optional
+
+from state_generator import PDDLParser
+
+ACCEPT = "accept"
+DEGRADE = "degrade"
+REJECT = "reject"
+
+# Size limits can be overridden via environment variables (see AdmissionPolicy)
+DEFAULT_DEGRADE_ACTIONS = 200_000
+DEFAULT_DEGRADE_FACTS = 50_000
+DEFAULT_MAX_ACTIONS = 20_000_000
+DEFAULT_MAX_FACTS = 2_000_000
+DEFAULT_DEGRADED_TIMEOUT = 300  # seconds
+
+
+class ProblemTooLarge(ValueError):
+    """
+    Problem rejected by admission control.
+
+    Attributes:
+        estimate: The SizeEstimate that exceeded the limits
+    """
+
+    def __init__(self, message: str, estimate: 'SizeEstimate'):
+        super().__init__(message)
+        self.estimate = estimate
+
+
+@dataclass
+class SizeEstimate:
+    """
+    Upper bounds on the size of a grounded task.
+
+    Attributes:
+        objects: Number of objects, including domain constants
+        actions: Upper bound on grounded actions
+        facts: Upper bound on grounded facts
+        actions_by_schema: Bound per action schema
+        elapsed: Seconds taken by the estimate
+    """
+    objects: int
+    actions: int
+    facts: int
+    actions_by_schema: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "objects": self.objects,
+            "actions": self.actions,
+            "facts": self.facts,
+            "actions_by_schema": dict(self.actions_by_schema),
+            "elapsed": round(self.elapsed, 6),
+        }
+
+
+def _schema_bound(parameters, static_preconditions, domain_size, static_counts) -> int:
+    """
+    Bound the groundings of one action schema.
+
+    Starts from the product of all parameter domains, then covers disjoint
+    groups of variables with static preconditions, each group contributing
+    at most the number of initial facts of that predicate.
+    """
+    variables = [name for name, _ in parameters]
+    sizes = {name: domain_size(param_type) for name, param_type in parameters}
+    best = prod(sizes.values())
+    if best == 0 or not static_preconditions:
+        return best
+
+    # Candidate covers: (facts, variables); prefer ones that save the most
+    covers = []
+    for predicate in static_preconditions:
+        bound_vars = frozenset(p for p in predicate.params if p in sizes)
+        if bound_vars:
+            covers.append((static_counts.get(predicate.name, 0), bound_vars))
+    covers.sort(key=lambda cover: cover[0] / prod(sizes[v] for v in cover[1]))
+
+    covered = set()
+    bound = 1
+    for facts, bound_vars in covers:
+        if bound_vars & covered:
+            continue
+        covered |= bound_vars
+        bound *= facts
+    bound *= prod(sizes[v] for v in variables if v not in covered)
+    return min(best, bound)
+
+
+def estimate_size(parser: PDDLParser) -> SizeEstimate:
+    """
+    Compute upper bounds on the grounded actions and facts of a problem.
+
+    Args:
+        parser: Parsed domain and problem
+
+    Returns:
+        SizeEstimate
+    """
+    start = time.perf_counter()
+    counts = {type_name: len(names) for type_name, names in parser.objects_by_type().items()}
+
+    def domain_size(type_name: str) -> int:
+        return counts.get(type_name, 0)
+
+    # Predicates no action adds or deletes keep their initial facts; derived ones follow the state
+    changed = {predicate.name for action in parser.actions.values() for _, predicate in action.all_effects()}
+    changed.update(axiom.name for axiom in parser.axioms)
+    static_counts: Dict[str, int] = {}
+    for fact in parser.init_state:
+        if fact.name not in changed:
+            static_counts[fact.name] = static_counts.get(fact.name, 0) + 1
+
+    facts = 0
+    for name, param_types in parser.predicates_schema:
+        if name in changed:
+            facts += prod(domain_size(t) for t in param_types)
+        else:
+            facts += static_counts.get(name, 0)
+
+    actions_by_schema = {}
+    for action in parser.actions.values():
+        static_preconditions = [predicate for positive, predicate in action.preconditions
+                                if positive and predicate.name not in changed]
+        actions_by_schema[action.name] = _schema_bound(action.parameters, static_preconditions,
+                                                       domain_size, static_counts)
+
+    return SizeEstimate(
+        objects=len(parser.objects),
+        actions=sum(actions_by_schema.values()),
+        facts=facts,
+        actions_by_schema=actions_by_schema,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """
+    Size limits for admission decisions.
+
+    Attributes:
+        degrade_actions: Above this many grounded actions, use a cheaper search
+        degrade_facts: Above this many grounded facts, use a cheaper search
+        max_actions: Above this many grounded actions, reject the problem
+        max_facts: Above this many grounded facts, reject the problem
+        degraded_timeout: Timeout cap in seconds for degraded solves
+        enabled: False admits every problem unchanged
+    """
+    degrade_actions: int = DEFAULT_DEGRADE_ACTIONS
+    degrade_facts: int = DEFAULT_DEGRADE_FACTS
+    max_actions: int = DEFAULT_MAX_ACTIONS
+    max_facts: int = DEFAULT_MAX_FACTS
+    degraded_timeout: int = DEFAULT_DEGRADED_TIMEOUT
+    enabled: bool = True
+
+    @classmethod
+    def from_environment(cls) -> 'AdmissionPolicy':
+        """
+        Build the policy from the environment.
+
+        PLANNER_ADMISSION=0 disables admission control; PLANNER_DEGRADE_ACTIONS,
+        PLANNER_DEGRADE_FACTS, PLANNER_MAX_ACTIONS, PLANNER_MAX_FACTS and
+        PLANNER_DEGRADED_TIMEOUT override the limits.
+        """
+        return cls(
+            degrade_actions=_env_int('PLANNER_DEGRADE_ACTIONS', DEFAULT_DEGRADE_ACTIONS),
+            degrade_facts=_env_int('PLANNER_DEGRADE_FACTS', DEFAULT_DEGRADE_FACTS),
+            max_actions=_env_int('PLANNER_MAX_ACTIONS', DEFAULT_MAX_ACTIONS),
+            max_facts=_env_int('PLANNER_MAX_FACTS', DEFAULT_MAX_FACTS),
+            degraded_timeout=_env_int('PLANNER_DEGRADED_TIMEOUT', DEFAULT_DEGRADED_TIMEOUT),
+            enabled=os.environ.get('PLANNER_ADMISSION', '1') != '0',
+        )
+
+
+@dataclass
+class AdmissionDecision:
+    """
+    Outcome of admission control.
+
+    Attributes:
+        verdict: ACCEPT, DEGRADE or REJECT
+        reason: Human-readable explanation
+        estimate: Size estimate the decision is based on (None if the
+            problem could not be estimated)
+    """
+    verdict: str
+    reason: str
+    estimate: Optional[SizeEstimate] = None
+
+
+def decide(estimate: SizeEstimate, policy: AdmissionPolicy) -> AdmissionDecision:
+    """
+    Turn a size estimate into an admission decision.
+
+    Args:
+        estimate: Upper bounds from estimate_size()
+        policy: Size limits
+
+    Returns:
+        AdmissionDecision
+    """
+    size = f"up to {estimate.actions:,} actions and {estimate.facts:,} facts"
+    if estimate.actions > policy.max_actions or estimate.facts > policy.max_facts:
+        return AdmissionDecision(
+            REJECT, f"Problem too large to solve: {size} "
+                    f"(limit {policy.max_actions:,} actions, {policy.max_facts:,} facts)", estimate)
+    if estimate.actions > policy.degrade_actions or estimate.facts > policy.degrade_facts:
+        return AdmissionDecision(DEGRADE, f"Large problem ({size}): using a cheaper search", estimate)
+    return AdmissionDecision(ACCEPT, f"Problem size: {size}", estimate)
+
+
+def admit(domain_path: str, problem_path: str, policy: Optional[AdmissionPolicy] = None) -> AdmissionDecision:
+    """
+    Estimate a problem's size and decide how to solve it.
+
+    Problems the parser cannot read are accepted: the planner reports its
+    own error for them.
+
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        policy: Size limits (default: from the environment)
+
+    Returns:
+        AdmissionDecision
+    """
+    if policy is None:
+        policy = AdmissionPolicy.from_environment()
+    if not policy.enabled:
+        return AdmissionDecision(ACCEPT, "Admission control disabled")
+    try:
+        parser = PDDLParser(domain_path, problem_path)
+    except Exception as e:
+        return AdmissionDecision(ACCEPT, f"Size not estimated ({e})")
+    return decide(estimate_size(parser), policy)
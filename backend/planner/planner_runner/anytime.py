@@ -0,0 +1,137 @@
+"""
+Anytime planning - streams improving plans from an iterated search.
+
+Fast Downward's iterated configurations (e.g. the ``seq-sat-lama-2011``
+alias) keep searching after the first plan and write every improvement
+to a numbered plan file: ``sas_plan.1``, ``sas_plan.2``, ... The
+generator below watches the job directory for these files and yields
+each plan as soon as it is complete, so a caller can show the first plan
+right away and replace it when a cheaper one arrives.
+"""
+
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+from .limits import ResourceLimits
+from .plan_cache import PlannerFailure
+from .portfolio import POLL_INTERVAL, read_plan_file
+from .workdir import job_workdir, start_job, kill_job
+
+# Iterated LAMA: greedy searches first, then weighted A* with decreasing weights
+ANYTIME_DRIVER_ARGS = ("--alias", "seq-sat-lama-2011")
+
+
+@dataclass
+class AnytimePlan:
+    """
+    One plan produced by an anytime search.
+
+    Attributes:
+        plan: List of action strings
+        cost: Plan cost reported by the planner (plan length if absent)
+        index: Number of the plan file it was read from (1 for sas_plan.1)
+        elapsed: Seconds from launch until the plan was read
+    """
+    plan: List[str]
+    cost: int
+    index: int
+    elapsed: float
+
+
+def _is_complete(plan_file: Path) -> bool:
+    """Check that a plan file has been fully written (FD writes the cost line last)."""
+    try:
+        text = plan_file.read_text()
+    except OSError:
+        return False
+    lines = text.rstrip().splitlines()
+    return bool(lines) and lines[-1].lstrip().startswith(";") and text.endswith("\n")
+
+
+def iter_anytime_plans(fd_path: Path, domain_path: str, problem_path: str,
+                       driver_args: Sequence[str] = ANYTIME_DRIVER_ARGS,
+                       search_args: Sequence[str] = (),
+                       timeout: Optional[float] = None,
+                       sas_file: Optional[Path] = None,
+                       limits: Optional[ResourceLimits] = None) -> Iterator[AnytimePlan]:
+    """
+    Run an iterated search and yield each improved plan as it appears.
+
+    The planner keeps running while the caller consumes plans; it is killed
+    when the generator is closed (e.g. the caller breaks out of the loop)
+    or the timeout expires.
+
+    Args:
+        fd_path: Path to fast-downward.py
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        driver_args: Driver options selecting the iterated configuration
+        search_args: Search options placed after the input files
+        timeout: Seconds after which the search is stopped
+        sas_file: Translator output; when given, only the search component
+            runs (see translation.translate)
+        limits: Memory and CPU limits for the planner (see limits.py)
+
+    Yields:
+        AnytimePlan objects with strictly decreasing cost
+
+    Raises:
+        PlannerFailure: If the planner exits without producing any plan
+        subprocess.TimeoutExpired: If no plan was found within the timeout
+    """
+    if sas_file is not None:
+        inputs = [str(Path(sas_file).resolve())]
+    else:
+        inputs = [str(Path(domain_path).resolve()), str(Path(problem_path).resolve())]
+    start = time.monotonic()
+    with job_workdir(prefix="anytime-") as workdir:
+        plan_base = workdir / "sas_plan"
+        cmd = [sys.executable, str(fd_path), *driver_args, "--plan-file", str(plan_base),
+               *inputs, *search_args]
+        process = start_job(cmd, workdir, limits=limits)
+        next_index = 1
+        best_cost = None
+        try:
+            while True:
+                exit_code = process.poll()
+
+                # Read every plan file completed since the last check
+                while True:
+                    plan_file = workdir / f"sas_plan.{next_index}"
+                    if not plan_file.exists():
+                        break
+                    following = workdir / f"sas_plan.{next_index + 1}"
+                    if not (exit_code is not None or following.exists() or _is_complete(plan_file)):
+                        break
+                    plan, cost = read_plan_file(plan_file)
+                    next_index += 1
+                    if plan and (best_cost is None or cost < best_cost):
+                        best_cost = cost
+                        yield AnytimePlan(plan, cost, next_index - 1, time.monotonic() - start)
+
+                if exit_code is not None:
+                    # A non-iterated configuration writes a single unnumbered file
+                    if best_cost is None and plan_base.exists():
+                        plan, cost = read_plan_file(plan_base)
+                        if plan:
+                            best_cost = cost
+                            yield AnytimePlan(plan, cost, 0, time.monotonic() - start)
+                    if best_cost is None:
+                        log = (workdir / "planner.log").read_text(errors='replace')[-2000:]
+                        raise PlannerFailure.from_exit_code(
+                            exit_code, f"Anytime search ended without a plan (exit code {exit_code}):\n{log}")
+                    return
+
+                if timeout is not None and time.monotonic() - start >= timeout:
+                    if best_cost is None:
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+                    return
+
+                time.sleep(POLL_INTERVAL)
+        finally:
+            if process.poll() is None:
+                kill_job(process)
@@ -0,0 +1,331 @@
+"""
+Canonical problem form - plan cache keys that ignore object names.
+
+Students upload the same exercise under different object names (``ball1``
+or ``b1``, ``rooma`` or ``r-a``) and with facts in a different order, and
+a key over the problem text misses every one of them. canonicalize()
+relabels the problem's objects so that any two problems that differ only
+by a renaming of objects get the same labels, and therefore the same
+canonical text and cache key.
+
+The labels come from canonical labeling of the object/fact graph, as in
+nauty: object colors (starting from the declared type) are refined by the
+init and goal facts each object appears in, position and the colors of its
+fellow arguments included, until they are stable. If some objects still
+share a color, each of them is individualized in turn and the refinement
+repeated; every branch ends in a labeling, and the one giving the smallest
+certificate (the relabeled facts) wins. Automorphisms found on the way
+(two labelings with equal certificates) prune branches that would only
+repeat a symmetric one, so interchangeable objects such as gripper's balls
+cost a polynomial number of branches instead of a factorial one.
+
+Cached plans are stored with canonical object names and mapped through the
+renaming on a hit. Problems the canonical form cannot describe (sections
+the parser ignores, such as :metric, or nested terms in :init) and
+problems above the size limits get no canonical form; the cache falls back
+to the normalized problem text for them.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from state_generator import PDDLParser, Predicate, Problem
+
+# Problems with more facts than this are keyed by their text: refinement
+# is quadratic in the worst case, and large problems rarely recur renamed
+MAX_CANONICAL_FACTS = 20_000
+
+# Search tree nodes explored before giving up on a labeling
+MAX_CANONICAL_NODES = 2_000
+
+# Problem sections the canonical form covers; any other section (:metric,
+# :constraints, ...) is dropped by the parser, so it cannot be keyed safely
+_CANONICAL_SECTIONS = {':domain', ':objects', ':init', ':goal', ':requirements'}
+
+_SECTION_RE = re.compile(r'\(\s*(:[^\s()]+)')
+
+# A fact over object indices (>= 0) and constants (< 0): (label, args)
+_Fact = Tuple[int, Tuple[int, ...]]
+
+
+class _SearchLimit(Exception):
+    """The labeling search explored MAX_CANONICAL_NODES nodes."""
+
+
+@dataclass
+class CanonicalProblem:
+    """
+    A problem in canonical form.
+
+    Attributes:
+        problem: The problem with objects renamed to their canonical labels,
+            goals in canonical order and no problem name
+        names: Canonical object name -> original object name
+    """
+    problem: Problem
+    names: Dict[str, str]
+
+    def to_pddl(self) -> str:
+        """PDDL text of the canonical problem."""
+        return self.problem.to_pddl()
+
+    def _map(self, plan: List[str], names: Dict[str, str]) -> List[str]:
+        mapped = []
+        for action in plan:
+            name, *args = action.strip().strip('()').split()
+            mapped.append(f"({' '.join([name] + [names.get(arg.lower(), arg) for arg in args])})")
+        return mapped
+
+    def encode_plan(self, plan: List[str]) -> List[str]:
+        """
+        Rename a plan of the original problem to canonical object names.
+
+        Args:
+            plan: Action strings such as "(pick ball1 rooma left)"
+
+        Returns:
+            Action strings over canonical names (constants are kept)
+        """
+        return self._map(plan, {original.lower(): canonical for canonical, original in self.names.items()})
+
+    def decode_plan(self, plan: List[str]) -> List[str]:
+        """
+        Rename a plan over canonical object names back to the original problem.
+
+        Objects get their original spelling, which the planner would have
+        lowercased.
+
+        Args:
+            plan: Action strings from encode_plan()
+
+        Returns:
+            Action strings for the original problem
+        """
+        return self._map(plan, self.names)
+
+
+def _refine(colors: List[int], facts: List[_Fact]) -> List[int]:
+    """
+    Refine object colors by the facts each object appears in until stable.
+
+    Colors are dense ranks. Each round sorts the objects by their old color
+    and the multiset of (fact label, position, argument colors) they occur
+    in, so the result refines the input and does not depend on object order.
+    """
+    count = len(set(colors))
+    while True:
+        occurrences: List[list] = [[] for _ in colors]
+        for label, args in facts:
+            tokens = tuple(colors[arg] if arg >= 0 else arg for arg in args)
+            for position, arg in enumerate(args):
+                if arg >= 0:
+                    occurrences[arg].append((label, position, tokens))
+        keys = [(color, tuple(sorted(occ))) for color, occ in zip(colors, occurrences)]
+        ranks = {key: rank for rank, key in enumerate(sorted(set(keys)))}
+        colors = [ranks[key] for key in keys]
+        if len(ranks) == count:
+            return colors
+        count = len(ranks)
+
+
+def _certificate(labels: List[int], types: List[int], facts: List[_Fact]) -> tuple:
+    """The problem relabeled: object types in label order and the sorted facts."""
+    by_label = [0] * len(labels)
+    for obj, label in enumerate(labels):
+        by_label[label] = types[obj]
+    relabeled = sorted((label, tuple(labels[arg] if arg >= 0 else arg for arg in args)) for label, args in facts)
+    return tuple(by_label), tuple(relabeled)
+
+
+def canonical_labels(types: List[int], facts: List[_Fact],
+                     max_nodes: int = MAX_CANONICAL_NODES) -> Optional[List[int]]:
+    """
+    Compute a canonical labeling of objects under their facts.
+
+    Args:
+        types: Initial color of each object (its type rank)
+        facts: Facts as (fact label, args); args >= 0 are object indices,
+            negative args stand for constants and are never relabeled
+        max_nodes: Give up after exploring this many search tree nodes
+
+    Returns:
+        Label (0..n-1) of each object, or None if the search gave up
+    """
+    best: list = [None, None]  # certificate, labels
+    first: list = [None, None, None]  # certificate, labels, path of the first leaf
+    automorphisms: List[List[int]] = []
+    nodes = [0]
+
+    def automorphism(labels: List[int], onto: List[int]) -> List[int]:
+        """The permutation taking each object to the object with its label in onto."""
+        owner = [0] * len(onto)
+        for obj, label in enumerate(onto):
+            owner[label] = obj
+        return [owner[label] for label in labels]
+
+    def search(colors: List[int], path: List[int]) -> Optional[int]:
+        """Explore a node; returns the depth to jump back to, if any."""
+        nodes[0] += 1
+        if nodes[0] > max_nodes:
+            raise _SearchLimit()
+        colors = _refine(colors, facts)
+
+        cells: Dict[int, List[int]] = {}
+        for obj, color in enumerate(colors):
+            cells.setdefault(color, []).append(obj)
+        target = next((cells[color] for color in sorted(cells) if len(cells[color]) > 1), None)
+        if target is None:
+            certificate = _certificate(colors, types, facts)
+            if first[0] is None:
+                first[:] = certificate, colors, path
+            elif certificate == first[0]:
+                # Equal to the first leaf: the branch where the two paths
+                # split maps onto the first path's branch, so abandon it
+                automorphisms.append(automorphism(colors, first[1]))
+                depth = 0
+                while path[depth] == first[2][depth]:
+                    depth += 1
+                return depth
+            if best[0] is None or certificate < best[0]:
+                best[0], best[1] = certificate, colors
+            elif certificate == best[0]:
+                automorphisms.append(automorphism(colors, best[1]))
+            return None
+
+        explored: List[int] = []
+        for obj in target:
+            # Automorphisms fixing the path map this node onto itself, so a
+            # child in the orbit of an explored one has the same leaves
+            if explored and _in_orbit(obj, explored, path, automorphisms):
+                continue
+            explored.append(obj)
+            individualized = [2 * color + (color == colors[obj] and other != obj)
+                              for other, color in enumerate(colors)]
+            ranks = {color: rank for rank, color in enumerate(sorted(set(individualized)))}
+            jump = search([ranks[color] for color in individualized], path + [obj])
+            if jump is not None and jump < len(path):
+                return jump
+        return None
+
+    try:
+        search(list(types), [])
+    except _SearchLimit:
+        return None
+    return best[1]
+
+
+def _in_orbit(obj: int, explored: List[int], path: List[int], automorphisms: List[List[int]]) -> bool:
+    """Check whether automorphisms fixing path map obj to an explored object."""
+    generators = [perm for perm in automorphisms if all(perm[p] == p for p in path)]
+    orbit = {obj}
+    frontier = [obj]
+    while frontier:
+        current = frontier.pop()
+        for perm in generators:
+            image = perm[current]
+            if image not in orbit:
+                orbit.add(image)
+                frontier.append(image)
+    return not orbit.isdisjoint(explored)
+
+
+def canonicalize(parser: PDDLParser, problem_text: Optional[str] = None,
+                 max_facts: int = MAX_CANONICAL_FACTS) -> Optional[CanonicalProblem]:
+    """
+    Put a problem in canonical form.
+
+    Args:
+        parser: Parsed domain and problem
+        problem_text: Problem source, checked for sections the parser drops
+        max_facts: Give up on problems with more init and goal facts
+
+    Returns:
+        CanonicalProblem, or None if the problem has no canonical form here
+    """
+    if problem_text is not None:
+        if not set(_SECTION_RE.findall(problem_text.lower())) <= _CANONICAL_SECTIONS:
+            return None
+    original = parser.problem
+    if len(original.init_state) + len(original.goal) > max_facts:
+        return None
+
+    constants = {name.lower() for name in parser.constants}
+    objects: Dict[str, str] = {}
+    spelling: Dict[str, str] = {}
+    for name, obj_type in original.objects.items():
+        if name.lower() not in constants:
+            objects.setdefault(name.lower(), obj_type.lower())
+            spelling.setdefault(name.lower(), name)
+    names = sorted(objects)
+    index = {name: i for i, name in enumerate(names)}
+
+    # Constants and undeclared names keep their identity; fact kinds get
+    # ranks from their sorted descriptions, so no ordering depends on objects
+    raw: List[Tuple[str, str, Tuple[str, ...]]] = []
+    for pred in original.init_state:
+        raw.append(("init", pred.name.lower(), tuple(pred.params)))
+    for is_positive, pred in original.goal:
+        raw.append(("goal" if is_positive else "goal-not", pred.name.lower(), tuple(pred.params)))
+    if any(not isinstance(arg, str) for _, _, args in raw for arg in args):
+        return None
+    literals = sorted({arg.lower() for _, _, args in raw for arg in args if arg.lower() not in index})
+    literal_id = {name: -1 - i for i, name in enumerate(literals)}
+    kinds = sorted({(section, pred) for section, pred, _ in raw})
+    kind_id = {kind: i for i, kind in enumerate(kinds)}
+    facts = sorted({(kind_id[(section, pred)],
+                     tuple(index.get(arg.lower(), literal_id.get(arg.lower())) for arg in args))
+                    for section, pred, args in raw})
+
+    type_names = sorted(set(objects.values()))
+    type_rank = {name: i for i, name in enumerate(type_names)}
+    types = [type_rank[objects[name]] for name in names]
+    labels = canonical_labels(types, facts)
+    if labels is None:
+        return None
+
+    prefix = "o"
+    while any(re.fullmatch(re.escape(prefix) + r"\d+", name) for name in literals):
+        prefix += "o"
+    canonical_names = [f"{prefix}{label}" for label in labels]
+    by_label = [0] * len(labels)
+    for obj, label in enumerate(labels):
+        by_label[label] = obj
+
+    def rename(arg: str) -> str:
+        i = index.get(arg.lower())
+        return canonical_names[i] if i is not None else arg.lower()
+
+    problem = Problem(original.path)
+    problem.name = "canonical"
+    problem.domain_name = original.domain_name.lower()
+    for obj in by_label:
+        problem.objects[canonical_names[obj]] = objects[names[obj]]
+    problem.init_state = {Predicate(pred.name.lower(), [rename(arg) for arg in pred.params])
+                          for pred in original.init_state}
+    problem.goal = sorted(((is_positive, Predicate(pred.name.lower(), [rename(arg) for arg in pred.params]))
+                           for is_positive, pred in original.goal), key=lambda literal: (not literal[0], str(literal[1])))
+    return CanonicalProblem(problem, {canonical_names[i]: spelling[name] for i, name in enumerate(names)})
+
+
+def canonicalize_files(domain_path: str, problem_path: str) -> Optional[CanonicalProblem]:
+    """
+    Put a problem file in canonical form.
+
+    Problems the parser cannot read get no canonical form: the planner
+    reports its own error for them.
+
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+
+    Returns:
+        CanonicalProblem, or None (see canonicalize)
+    """
+    try:
+        with open(problem_path, 'r') as f:
+            problem_text = f.read()
+        parser = PDDLParser(domain_path, problem_path)
+    except Exception:
+        return None
+    return canonicalize(parser, problem_text)
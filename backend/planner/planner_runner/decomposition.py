@@ -0,0 +1,239 @@
+"""
+Goal decomposition - solve groups of barely interacting goals separately.
+
+When a goal splits into groups that barely interact (balls in gripper,
+packages headed to different places in depot or logistics), one
+``astar(lmcut())`` search over the whole goal explores the product of the
+groups' state spaces, while a search per group stays small.
+partition_goals() splits the goal. Literals about the same object stay
+together; objects that only appear as later arguments (destinations such
+as rooms or cities) do not link goals. Literals also stay together when an
+action achieving one undoes the other or a precondition of its achievers.
+Each group becomes a subproblem restricted to its relevant objects (see
+relevance.py), and the subproblems are solved concurrently from the
+initial state.
+
+The subplans are merged in order on a running state. A subplan that does
+not apply there, or that does not reach its goals while keeping the
+earlier groups' goals true, is solved again from the current state with
+those goals added. The merged plan is finally replayed through
+StateGenerator against the full problem; any failure raises
+DecompositionError so the caller can solve the whole problem instead.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from state_generator import PDDLParser, Predicate, Problem, StateGenerator
+from .plan_cache import PlannerFailure
+from .relevance import Fact, ProblemReduction, Regression, ground_fact, reduce_problem
+
+# A goal literal: (is_positive, predicate)
+Literal = Tuple[bool, Predicate]
+
+
+class DecompositionError(RuntimeError):
+    """The goal does not split, or the merged subplans do not solve the problem."""
+
+
+def partition_goals(parser: PDDLParser) -> List[List[Literal]]:
+    """
+    Split the goal into groups of interacting literals.
+
+    Args:
+        parser: Parsed domain and problem
+
+    Returns:
+        Groups of goal literals, in goal order of their first literal
+    """
+    goals = list(parser.goal)
+    # Interactions through conditional effects or axioms are not analysed,
+    # and subproblems cannot carry numeric fluents or the metric
+    if (parser.axioms or parser.has_numeric_fluents()
+            or any(action.conditional_effects for action in parser.actions.values())):
+        return [goals]
+    parent = list(range(len(goals)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        parent[find(i)] = find(j)
+
+    # Literals about the same object belong together
+    subjects = {pred.params[0] for _, pred in goals if pred.params}
+    first_goal: Dict[str, int] = {}
+    for i, (_, pred) in enumerate(goals):
+        for obj in pred.params:
+            if obj in subjects:
+                union(i, first_goal.setdefault(obj, i))
+
+    # So do literals where an achiever of one undoes the other or what its
+    # achievers need
+    regression = Regression(parser)
+    needed_by: Dict[Tuple[bool, Fact], List[int]] = {}
+    threats: List[Set[Tuple[bool, Fact]]] = []
+    for i, (is_positive, pred) in enumerate(goals):
+        fact = ground_fact(pred, {})
+        needed_by.setdefault((is_positive, fact), []).append(i)
+        undone = set()
+        for action, binding in regression.achievers_of(is_positive, fact):
+            for pre_positive, pre in action.preconditions:
+                needed_by.setdefault((pre_positive, ground_fact(pre, binding)), []).append(i)
+            undone.update((not eff_positive, ground_fact(eff, binding)) for eff_positive, eff in action.effects)
+        threats.append(undone)
+    for i, undone in enumerate(threats):
+        for literal in undone:
+            for j in needed_by.get(literal, ()):
+                if j != i:
+                    union(i, j)
+
+    groups: Dict[int, List[Literal]] = {}
+    for i, literal in enumerate(goals):
+        groups.setdefault(find(i), []).append(literal)
+    return list(groups.values())
+
+
+@dataclass
+class Subproblem:
+    """
+    One goal group as a problem of its own.
+
+    Attributes:
+        goals: Goal literals the subproblem has to reach
+        problem: Problem to solve, restricted to the relevant objects
+        reduction: The restriction, used to map plans back (None if every
+            object is relevant)
+    """
+    goals: List[Literal]
+    problem: Problem
+    reduction: Optional[ProblemReduction] = None
+
+    def map_plan(self, plan: List[str]) -> List[str]:
+        """Map a plan of the subproblem back to the full problem's object names."""
+        return self.reduction.map_plan(plan) if self.reduction else plan
+
+
+def make_subproblem(parser: PDDLParser, goals: List[Literal], name: str,
+                    init_state: Optional[Iterable[Predicate]] = None) -> Subproblem:
+    """
+    Build the subproblem for a goal group.
+
+    Args:
+        parser: Parsed full problem
+        goals: Goal literals of the group
+        name: Name of the subproblem
+        init_state: Initial state (default: the full problem's)
+
+    Returns:
+        Subproblem
+    """
+    original = parser.problem
+    problem = Problem(original.path)
+    problem.name = name
+    problem.domain_name = original.domain_name
+    problem.objects = dict(original.objects)
+    problem.init_state = set(original.init_state if init_state is None else init_state)
+    problem.goal = list(goals)
+    reduction = reduce_problem(PDDLParser(parser.domain, problem))
+    return Subproblem(goals, reduction.problem if reduction else problem, reduction)
+
+
+@dataclass
+class DecomposedPlan:
+    """
+    Result of a decomposed solve.
+
+    Attributes:
+        plan: Merged plan for the full problem
+        groups: Number of goal groups solved separately
+        repaired: Number of groups solved again from the merged state
+    """
+    plan: List[str]
+    groups: int
+    repaired: int
+
+
+def _run(sg: StateGenerator, plan: List[str], mask: int) -> Optional[int]:
+    """Apply a plan to a state mask; None if some action does not apply."""
+    for action in plan:
+        try:
+            compiled = sg.compile_action(action)
+        except ValueError:
+            return None
+        if not compiled.is_applicable(mask):
+            return None
+        mask = compiled.apply(mask)
+    return mask
+
+
+def solve_decomposed(parser: PDDLParser, solve: Callable[[Problem], List[str]],
+                     max_workers: Optional[int] = None) -> DecomposedPlan:
+    """
+    Solve the goal groups separately and merge their plans.
+
+    Args:
+        parser: Parsed full problem
+        solve: Solves a Problem and returns its plan; raises PlannerFailure
+            if it finds none. Called from several threads at once.
+        max_workers: Subproblems solved concurrently (default: one per group,
+            at most the number of CPUs)
+
+    Returns:
+        DecomposedPlan
+
+    Raises:
+        DecompositionError: If the goal does not split, or no valid merged
+            plan was found
+    """
+    groups = partition_goals(parser)
+    if len(groups) < 2:
+        raise DecompositionError("the goal does not split into independent groups")
+
+    sg = StateGenerator(parser.domain, parser.problem)
+    # Groups that already hold come first, so later subplans have to keep them
+    groups.sort(key=lambda group: not sg.satisfies(group))
+    subproblems = [make_subproblem(parser, group, f"{parser.problem_name}-part{i}")
+                   for i, group in enumerate(groups)]
+
+    def attempt(subproblem: Subproblem) -> Optional[List[str]]:
+        try:
+            return subproblem.map_plan(solve(subproblem.problem))
+        except PlannerFailure:
+            return None
+
+    if max_workers is None:
+        max_workers = min(len(subproblems), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        subplans = list(pool.map(attempt, subproblems))
+
+    plan: List[str] = []
+    mask = sg.init_mask
+    reached: List[Literal] = []
+    repaired = 0
+    for i, (subproblem, subplan) in enumerate(zip(subproblems, subplans)):
+        goals = reached + subproblem.goals
+        end = _run(sg, subplan, mask) if subplan is not None else None
+        if end is None or not sg.satisfies(goals, end):
+            repaired += 1
+            repair = make_subproblem(parser, goals, f"{parser.problem_name}-repair{i}", sg.facts.decode(mask))
+            try:
+                subplan = repair.map_plan(solve(repair.problem))
+            except PlannerFailure as e:
+                raise DecompositionError(f"goal group {i} is unsolvable after the earlier groups") from e
+            end = _run(sg, subplan, mask)
+            if end is None or not sg.satisfies(goals, end):
+                raise DecompositionError(f"the plan for goal group {i} does not reach its goals")
+        plan.extend(subplan)
+        mask = end
+        reached = goals
+
+    validator = StateGenerator(parser.domain, parser.problem)
+    if not all(validator.apply_action(action) for action in plan) or not validator.satisfies(parser.goal):
+        raise DecompositionError("the merged plan does not solve the problem")
+    return DecomposedPlan(plan, len(groups), repaired)
@@ -0,0 +1,271 @@
+"""
+Grounding - instantiate a domain's action schemas for the built-in planner.
+
+Each schema is instantiated over the objects compatible with its parameter
+types (subtypes included, see PDDLParser.objects_by_type), so a gripper
+``pick`` never binds a room to its ball parameter. Preconditions over
+static predicates (those no action changes, such as rovers' ``connected``)
+are decided while grounding: positive ones are joined against the initial
+facts, so a ``navigate`` is only instantiated along existing edges, and
+both kinds are dropped from the ground actions. Equality preconditions
+are decided the same way. Atoms are interned in a FactTable, and states
+are the same integer bitmasks StateGenerator uses, so a plan found here
+replays unchanged in the visualizer.
+
+SuccessorGenerator finds the actions applicable in a state without testing
+every ground action: as in Fast Downward, the actions are arranged in a
+decision tree over their sorted precondition facts, and a query only
+descends into branches whose fact holds in the state.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from state_generator import PDDLParser
+from state_generator.facts import FactTable, GroundAction, ids_mask, iter_bits
+from .plan_cache import FAILED, PlannerFailure
+
+# Tasks with more ground actions than this are left to Fast Downward
+MAX_GROUND_ACTIONS = 200_000
+
+
+@dataclass
+class GroundTask:
+    """
+    A grounded planning task over fact ids.
+
+    Attributes:
+        facts: Interned ground atoms
+        init: Initial state mask
+        goal_pos: Facts the goal requires
+        goal_neg: Facts the goal forbids
+        actions: Ground actions; names are plan steps such as "(move rooma roomb)"
+    """
+    facts: FactTable
+    init: int
+    goal_pos: Tuple[int, ...]
+    goal_neg: Tuple[int, ...]
+    actions: List[GroundAction]
+
+    def is_goal(self, mask: int) -> bool:
+        """Check whether a state mask satisfies the goal."""
+        positive = ids_mask(self.goal_pos)
+        return mask & positive == positive and not mask & ids_mask(self.goal_neg)
+
+    def successor_generator(self) -> 'SuccessorGenerator':
+        """Successor generator over this task's actions."""
+        return SuccessorGenerator(self.actions)
+
+
+class _StaticFacts:
+    """Initial facts of the static predicates, indexed for joins."""
+
+    def __init__(self, parser: PDDLParser):
+        changed = {pred.name for action in parser.actions.values() for _, pred in action.all_effects()}
+        self.names = {name for name, _ in parser.predicates_schema if name not in changed}
+        self.init: Set[Tuple[str, Tuple[str, ...]]] = set()
+        # predicate -> args of its initial facts
+        self.facts: Dict[str, List[Tuple[str, ...]]] = {}
+        # (predicate, position, object) -> args of the initial facts with that object there
+        self.index: Dict[Tuple[str, int, str], List[Tuple[str, ...]]] = {}
+        for fact in parser.init_state:
+            if fact.name in self.names:
+                args = tuple(fact.params)
+                self.init.add((fact.name, args))
+                self.facts.setdefault(fact.name, []).append(args)
+                for position, obj in enumerate(args):
+                    self.index.setdefault((fact.name, position, obj), []).append(args)
+
+    def candidates(self, pred, binding: Dict[str, str]) -> List[Tuple[str, ...]]:
+        """Initial facts of pred's predicate that may match under a partial binding."""
+        for position, param in enumerate(pred.params):
+            value = binding.get(param, None if param.startswith('?') else param)
+            if value is not None:
+                return self.index.get((pred.name, position, value), [])
+        return self.facts.get(pred.name, [])
+
+
+def _bindings(parameters: List[Tuple[str, str]], objects_of: Dict[str, set],
+              statics: _StaticFacts, joins: list) -> Iterator[Dict[str, str]]:
+    """
+    Enumerate parameter bindings that satisfy the positive static preconditions.
+
+    The static preconditions in joins are matched against the initial facts
+    one at a time, each extending the partial binding; the parameters they
+    leave unbound range over the objects of their type.
+    """
+    types = dict(parameters)
+    domains = {var: set(objects_of.get(param_type, ())) for var, param_type in parameters}
+
+    def join(binding: Dict[str, str], remaining: list) -> Iterator[Dict[str, str]]:
+        if not remaining:
+            free = [var for var, _ in parameters if var not in binding]
+            for values in product(*(sorted(domains[var]) for var in free)):
+                yield {**binding, **dict(zip(free, values))}
+            return
+        pred, rest = remaining[0], remaining[1:]
+        for args in statics.candidates(pred, binding):
+            extended = dict(binding)
+            for param, arg in zip(pred.params, args):
+                if param in types:
+                    if extended.setdefault(param, arg) != arg or arg not in domains[param]:
+                        break
+                elif param != arg:
+                    break
+            else:
+                yield from join(extended, rest)
+
+    yield from join({}, joins)
+
+
+def check_supported(parser: PDDLParser):
+    """
+    Reject domains the built-in planner cannot simulate.
+
+    Ground actions here only carry unconditional add and delete effects,
+    derived predicates are not evaluated during search, and every action
+    costs 1.
+
+    Raises:
+        ValueError: If the task has conditional effects, derived predicates
+            or numeric fluents (including action costs and a metric)
+    """
+    conditional = [name for name, action in parser.actions.items() if action.conditional_effects]
+    if conditional:
+        raise ValueError(f"Conditional effects are not supported by the built-in planner "
+                         f"(actions: {', '.join(conditional)})")
+    if parser.axioms:
+        raise ValueError("Derived predicates are not supported by the built-in planner")
+    if parser.has_numeric_fluents():
+        raise ValueError("Numeric fluents and action costs are not supported by the built-in planner")
+
+
+def ground_task(parser: PDDLParser, max_actions: Optional[int] = MAX_GROUND_ACTIONS) -> GroundTask:
+    """
+    Ground a parsed problem.
+
+    Args:
+        parser: Parsed domain and problem
+        max_actions: Give up after this many ground actions (None for no limit)
+
+    Returns:
+        GroundTask
+
+    Raises:
+        PlannerFailure: If the task has more than max_actions ground actions
+        ValueError: If the domain is not supported (see check_supported)
+    """
+    check_supported(parser)
+    facts = FactTable()
+    intern = facts.intern
+    init = facts.encode(parser.init_state)
+    goal_pos = tuple(intern(pred.name, tuple(pred.params)) for positive, pred in parser.goal if positive)
+    goal_neg = tuple(intern(pred.name, tuple(pred.params)) for positive, pred in parser.goal if not positive)
+
+    objects_of = parser.objects_by_type()
+    statics = _StaticFacts(parser)
+    actions: List[GroundAction] = []
+    for schema in parser.actions.values():
+        equalities = [(positive, pred.params) for positive, pred in schema.preconditions if pred.name == '=']
+        joins = [pred for positive, pred in schema.preconditions if positive and pred.name in statics.names]
+        static_negative = [pred for positive, pred in schema.preconditions
+                           if not positive and pred.name in statics.names]
+        preconditions = [(positive, pred) for positive, pred in schema.preconditions
+                         if pred.name != '=' and pred.name not in statics.names]
+        # Joining the most selective static facts first keeps partial bindings few
+        joins.sort(key=lambda pred: len(statics.facts.get(pred.name, ())))
+        for binding in _bindings(schema.parameters, objects_of, statics, joins):
+            if any((binding.get(a, a) == binding.get(b, b)) != positive for positive, (a, b) in equalities):
+                continue
+            if any((pred.name, tuple(binding.get(p, p) for p in pred.params)) in statics.init
+                   for pred in static_negative):
+                continue
+
+            def ids(literals, want: bool) -> Tuple[int, ...]:
+                return tuple(dict.fromkeys(
+                    intern(pred.name, tuple(binding.get(p, p) for p in pred.params))
+                    for positive, pred in literals if positive == want))
+
+            args = [binding[var] for var, _ in schema.parameters]
+            actions.append(GroundAction(f"({' '.join([schema.name] + args)})",
+                                        ids(preconditions, True), ids(preconditions, False),
+                                        ids(schema.effects, True), ids(schema.effects, False)))
+            if max_actions is not None and len(actions) > max_actions:
+                raise PlannerFailure(f"Task has more than {max_actions:,} ground actions", FAILED)
+    return GroundTask(facts, init, goal_pos, goal_neg, actions)
+
+
+# Nodes with at most this many children test them one by one instead of
+# scanning the bits of the state
+_SMALL_NODE = 8
+
+
+class _Node:
+    """
+    Successor generator tree node.
+
+    Attributes:
+        actions: Indices of the actions whose preconditions are all tested
+            on the path to this node
+        mask: Bitmask of the facts with a child
+        children: Fact id -> child for the actions that also need that fact
+    """
+    __slots__ = ("actions", "mask", "children")
+
+    def __init__(self):
+        self.actions: List[int] = []
+        self.mask = 0
+        self.children: Dict[int, '_Node'] = {}
+
+
+class SuccessorGenerator:
+    """
+    Decision tree over precondition facts for finding applicable actions.
+
+    Each action's positive preconditions are sorted by fact id and inserted
+    along the path they spell; an action sits at the node where its path
+    ends. Every action on the path to a node needs the facts above it, so
+    a query visits only the children whose fact holds in the state,
+    selected at once with a mask, and tests the negative preconditions of
+    the actions it reaches.
+    """
+
+    def __init__(self, actions: List[GroundAction]):
+        self.root = _Node()
+        self.forbidden = [ids_mask(action.pre_neg) for action in actions]
+        for index, action in enumerate(actions):
+            node = self.root
+            for fact in sorted(action.pre_pos):
+                child = node.children.get(fact)
+                if child is None:
+                    child = node.children[fact] = _Node()
+                    node.mask |= 1 << fact
+                node = child
+            node.actions.append(index)
+
+    def applicable(self, mask: int) -> List[int]:
+        """
+        Find the actions applicable in a state.
+
+        Args:
+            mask: State bitmask
+
+        Returns:
+            Indices of the applicable actions
+        """
+        forbidden = self.forbidden
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.actions:
+                found.extend(index for index in node.actions if not mask & forbidden[index])
+            present = mask & node.mask
+            if present:
+                children = node.children
+                if len(children) <= _SMALL_NODE:
+                    stack.extend(child for fact, child in children.items() if present >> fact & 1)
+                else:
+                    stack.extend(children[fact] for fact in iter_bits(present))
+        return found
@@ -0,0 +1,228 @@
+"""
+Lifted successor generation - applicable actions without grounding the task.
+
+A depot problem with 500 packages, 20 trucks and 50 locations has half a
+million ground ``load`` actions, almost none of them ever applicable.
+LiftedTask keeps the action schemas instead and computes the instances
+applicable in a state on demand, from the state itself:
+
+- each schema's positive preconditions form a conjunctive query over the
+  state's facts, e.g. ``load(?p ?t ?l) :- at(?p ?l), at-truck(?t ?l)``
+- the state is indexed per predicate and per (predicate, position,
+  object), and the query is answered by index nested-loop joins; the next
+  atom to join is the one with the most bound arguments, ties broken by
+  the smaller relation, so ``at-truck`` (one fact per truck) is scanned
+  and each truck's location then selects the packages through the index
+- parameters no positive precondition mentions range over their type;
+  equality and negative preconditions are checked on the full binding
+
+Instances are interned as GroundActions the first time they are found, so
+a LiftedTask grows only with the part of the state space a search visits
+and has the same shape as a GroundTask: search() runs on either one, and
+plans are read from ``task.actions`` in both cases.
+"""
+
+from itertools import product
+from typing import Dict, Iterator, List, Tuple
+
+from state_generator import PDDLParser
+from state_generator.facts import FactTable, GroundAction, iter_bits
+from .grounding import GroundTask, check_supported
+
+# An atom of a schema: (predicate, params); params are variables or constants
+_Atom = Tuple[str, Tuple[str, ...]]
+
+
+class _Schema:
+    """An action schema prepared for lifted evaluation."""
+
+    def __init__(self, action, objects_of: Dict[str, set]):
+        self.name = action.name
+        self.variables = [var for var, _ in action.parameters]
+        self.domains = {var: objects_of.get(param_type, set()) for var, param_type in action.parameters}
+        self.sorted_domains = {var: sorted(objects) for var, objects in self.domains.items()}
+        self.query: List[_Atom] = [(pred.name, tuple(pred.params)) for positive, pred in action.preconditions
+                                   if positive and pred.name != '=']
+        self.negative: List[_Atom] = [(pred.name, tuple(pred.params)) for positive, pred in action.preconditions
+                                      if not positive and pred.name != '=']
+        self.equalities = [(positive, tuple(pred.params)) for positive, pred in action.preconditions
+                           if pred.name == '=']
+        self.effects = action.effects
+        self.preconditions = [(positive, pred) for positive, pred in action.preconditions if pred.name != '=']
+
+
+class _StateIndex:
+    """
+    A state's facts by predicate and by (predicate, position, object).
+
+    The position indexes are built on first use, so only the ones some
+    query looks up are paid for.
+    """
+
+    def __init__(self, facts: FactTable, mask: int):
+        self.relations: Dict[str, List[Tuple[str, ...]]] = {}
+        # (predicate, position) -> object -> facts with that object there
+        self.indexes: Dict[Tuple[str, int], Dict[str, List[Tuple[str, ...]]]] = {}
+        relations = self.relations
+        fact = facts.fact
+        for fact_id in iter_bits(mask):
+            name, args = fact(fact_id)
+            relations.setdefault(name, []).append(args)
+
+    def _index(self, name: str, position: int) -> Dict[str, List[Tuple[str, ...]]]:
+        index = self.indexes.get((name, position))
+        if index is None:
+            index = self.indexes[(name, position)] = {}
+            for args in self.relations.get(name, ()):
+                index.setdefault(args[position], []).append(args)
+        return index
+
+    def candidates(self, atom: _Atom, binding: Dict[str, str]) -> Tuple[int, List[Tuple[str, ...]]]:
+        """
+        Facts that may match an atom under a partial binding.
+
+        Returns:
+            Tuple of (number of bound arguments, candidate fact args); the
+            smallest index list over the bound arguments is used
+        """
+        name, params = atom
+        bound = 0
+        best = None
+        for position, param in enumerate(params):
+            value = binding.get(param, None if param.startswith('?') else param)
+            if value is not None:
+                bound += 1
+                matches = self._index(name, position).get(value, [])
+                if best is None or len(matches) < len(best):
+                    best = matches
+        return bound, best if best is not None else self.relations.get(name, [])
+
+
+class LiftedTask(GroundTask):
+    """
+    A planning task whose actions are instantiated on demand.
+
+    Same attributes as GroundTask, except that ``actions`` only holds the
+    instances found so far by a LiftedSuccessorGenerator.
+    """
+
+    def __init__(self, parser: PDDLParser):
+        check_supported(parser)
+        facts = FactTable()
+        intern = facts.intern
+        init = facts.encode(parser.init_state)
+        goal_pos = tuple(intern(pred.name, tuple(pred.params)) for positive, pred in parser.goal if positive)
+        goal_neg = tuple(intern(pred.name, tuple(pred.params)) for positive, pred in parser.goal if not positive)
+        super().__init__(facts, init, goal_pos, goal_neg, [])
+        objects_of = parser.objects_by_type()
+        self.schemas = [_Schema(action, objects_of) for action in parser.actions.values()]
+        # (schema name, args) -> index into actions
+        self.instances: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+
+    def successor_generator(self) -> 'LiftedSuccessorGenerator':
+        """Successor generator instantiating this task's actions on demand."""
+        return LiftedSuccessorGenerator(self)
+
+
+class LiftedSuccessorGenerator:
+    """
+    Finds applicable action instances by evaluating precondition queries.
+
+    Same interface as grounding.SuccessorGenerator: applicable() returns
+    indices into ``task.actions``, which it extends with new instances.
+    """
+
+    def __init__(self, task: LiftedTask):
+        self.task = task
+
+    def applicable(self, mask: int) -> List[int]:
+        """
+        Find the actions applicable in a state.
+
+        Args:
+            mask: State bitmask
+
+        Returns:
+            Indices into task.actions of the applicable instances
+        """
+        state = _StateIndex(self.task.facts, mask)
+        instances = self.task.instances
+        found = []
+        for schema in self.task.schemas:
+            checked = schema.equalities or schema.negative
+            for args in self._join(schema, state, {}, schema.query):
+                index = instances.get((schema.name, args))
+                if checked and not self._checks_hold(schema, dict(zip(schema.variables, args)), mask):
+                    continue
+                found.append(index if index is not None else self._instance(schema, args))
+        return found
+
+    def _join(self, schema: _Schema, state: _StateIndex, binding: Dict[str, str],
+              remaining: List[_Atom]) -> Iterator[Tuple[str, ...]]:
+        """
+        Extend a binding through the remaining query atoms, then bind the rest by type.
+
+        Yields:
+            Arguments of each instance, in parameter order
+        """
+        if not remaining:
+            args = [binding.get(var) for var in schema.variables]
+            free = [position for position, arg in enumerate(args) if arg is None]
+            if not free:
+                yield tuple(args)
+                return
+            for values in product(*(schema.sorted_domains[schema.variables[position]] for position in free)):
+                for position, value in zip(free, values):
+                    args[position] = value
+                yield tuple(args)
+            return
+
+        # Most bound arguments first, then the fewest candidate facts
+        choice = None
+        for position, atom in enumerate(remaining):
+            bound, candidates = state.candidates(atom, binding)
+            key = (-bound, len(candidates))
+            if choice is None or key < choice[0]:
+                choice = key, position, atom, candidates
+        _, position, (_, params), candidates = choice
+        rest = remaining[:position] + remaining[position + 1:]
+        domains = schema.domains
+        for args in candidates:
+            extended = dict(binding)
+            for param, arg in zip(params, args):
+                if param.startswith('?'):
+                    if extended.setdefault(param, arg) != arg or arg not in domains.get(param, ()):
+                        break
+                elif param != arg:
+                    break
+            else:
+                yield from self._join(schema, state, extended, rest)
+
+    def _checks_hold(self, schema: _Schema, binding: Dict[str, str], mask: int) -> bool:
+        """Check equality and negative preconditions under a full binding."""
+        for positive, (a, b) in schema.equalities:
+            if (binding.get(a, a) == binding.get(b, b)) != positive:
+                return False
+        lookup = self.task.facts.lookup
+        for name, params in schema.negative:
+            fact_id = lookup(name, tuple(binding.get(p, p) for p in params))
+            if fact_id is not None and mask >> fact_id & 1:
+                return False
+        return True
+
+    def _instance(self, schema: _Schema, args: Tuple[str, ...]) -> int:
+        """Intern the ground action for new instance arguments and return its index."""
+        binding = dict(zip(schema.variables, args))
+        intern = self.task.facts.intern
+
+        def ids(literals, want: bool) -> Tuple[int, ...]:
+            return tuple(dict.fromkeys(
+                intern(pred.name, tuple(binding.get(p, p) for p in pred.params))
+                for positive, pred in literals if positive == want))
+
+        actions = self.task.actions
+        index = self.task.instances[(schema.name, args)] = len(actions)
+        actions.append(GroundAction(f"({' '.join((schema.name,) + args)})",
+                                    ids(schema.preconditions, True), ids(schema.preconditions, False),
+                                    ids(schema.effects, True), ids(schema.effects, False)))
+        return index
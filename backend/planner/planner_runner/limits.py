@@ -0,0 +1,124 @@
+"""
+Resource limits for planner jobs.
+
+Every planner process gets an address-space limit and a CPU-time limit
+(``RLIMIT_AS`` / ``RLIMIT_CPU``), inherited by the translator and search
+processes Fast Downward's driver starts. A problem whose grounding blows
+up then fails with an out-of-memory exit code instead of pushing a shared
+machine into swap, and a job orphaned by a crashed server is still
+stopped by the kernel once its CPU budget is spent.
+
+On Linux the limits are set on the child right after it starts
+(``prlimit``), which is safe while other threads are launching jobs too;
+other POSIX systems fall back to setting them between fork and exec.
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+# Limits can be overridden via environment variables; 0 disables a limit
+DEFAULT_MEMORY_LIMIT_MB = 4096
+# Seconds between the soft CPU limit (SIGXCPU, which Fast Downward's search
+# turns into its out-of-time exit code) and the hard limit (SIGKILL)
+CPU_LIMIT_GRACE = 5
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """
+    Per-process limits for a planner job.
+
+    Attributes:
+        memory_bytes: Address-space limit in bytes (None for no limit)
+        cpu_seconds: CPU-time limit in seconds (None for no limit)
+    """
+    memory_bytes: Optional[int] = None
+    cpu_seconds: Optional[int] = None
+
+    def _rlimits(self):
+        limits = []
+        if self.memory_bytes:
+            limits.append((resource.RLIMIT_AS, self.memory_bytes, self.memory_bytes))
+        if self.cpu_seconds:
+            limits.append((resource.RLIMIT_CPU, self.cpu_seconds, self.cpu_seconds + CPU_LIMIT_GRACE))
+        # Never ask for more than the current hard limit allows
+        clamped = []
+        for kind, soft, hard in limits:
+            _, current_hard = resource.getrlimit(kind)
+            if current_hard != resource.RLIM_INFINITY:
+                soft, hard = min(soft, current_hard), min(hard, current_hard)
+            clamped.append((kind, (soft, hard)))
+        return clamped
+
+    def apply(self, pid: int):
+        """
+        Set the limits on a running process (Linux only, see prlimit(2)).
+
+        A process that has already exited is ignored.
+        """
+        for kind, values in self._rlimits():
+            try:
+                resource.prlimit(pid, kind, values)
+            except (ProcessLookupError, PermissionError):
+                return
+
+    def apply_to_current_process(self):
+        """Set the limits on the calling process (used between fork and exec)."""
+        for kind, values in self._rlimits():
+            resource.setrlimit(kind, values)
+
+
+def get_default_limits(timeout: Optional[float] = None) -> Optional[ResourceLimits]:
+    """
+    Get the resource limits configured from the environment.
+
+    PLANNER_MEMORY_LIMIT_MB sets the memory limit (default 4096 MB),
+    PLANNER_CPU_LIMIT the CPU limit in seconds (default: the job's wall-clock
+    timeout, since a single-threaded planner cannot use more CPU time than
+    that). 0 disables either limit.
+
+    Args:
+        timeout: Wall-clock timeout of the job, if any
+
+    Returns:
+        ResourceLimits, or None if rlimits are unavailable or both are disabled
+    """
+    if resource is None:
+        return None
+
+    try:
+        memory_mb = int(os.environ.get('PLANNER_MEMORY_LIMIT_MB', DEFAULT_MEMORY_LIMIT_MB))
+    except (ValueError, TypeError):
+        memory_mb = DEFAULT_MEMORY_LIMIT_MB
+    default_cpu = math.ceil(timeout) if timeout else 0
+    try:
+        cpu_seconds = int(os.environ.get('PLANNER_CPU_LIMIT', default_cpu))
+    except (ValueError, TypeError):
+        cpu_seconds = default_cpu
+
+    limits = ResourceLimits(memory_mb * 1024 * 1024 if memory_mb > 0 else None,
+                            cpu_seconds if cpu_seconds > 0 else None)
+    if limits.memory_bytes is None and limits.cpu_seconds is None:
+        return None
+    return limits
+
+
+def popen_limit_hooks(limits: Optional[ResourceLimits]):
+    """
+    Split limit handling into Popen's preexec_fn and a post-spawn step.
+
+    Returns:
+        Tuple of (preexec_fn or None, callable taking the started process)
+    """
+    if limits is None:
+        return None, lambda process: None
+    if hasattr(resource, 'prlimit'):
+        return None, lambda process: limits.apply(process.pid)
+    return limits.apply_to_current_process, lambda process: None
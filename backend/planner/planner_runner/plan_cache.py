@@ -0,0 +1,252 @@
+"""
+Plan Cache - on-disk cache of planner results.
+
+Entries are keyed by the SHA-256 of the normalized domain text, the
+problem in canonical form (see canonical.py) and the search
+configuration, so re-uploading a reformatted problem, or the same problem
+with its objects renamed, skips Fast Downward entirely. Plans are stored
+with canonical object names and renamed back on a hit. Problems without
+a canonical form are keyed by their normalized text. Unsolvable verdicts and deterministic failures are cached as
+well as plans; timeouts are cached together with the time limit that was
+hit and only reused for requests with the same or a shorter limit.
+
+Storage, size limit and LRU eviction are shared with the parse cache.
+"""
+
+import hashlib
+import os
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from state_generator.parse_cache import ParseCache
+from .canonical import CanonicalProblem, canonicalize_files
+
+# Bump when the layout of cached entries changes
+PLAN_CACHE_FORMAT_VERSION = 2
+
+# Cache location and size limit can be overridden via environment variables.
+# Setting PLAN_CACHE_DIR to an empty string disables the cache.
+DEFAULT_PLAN_CACHE_DIR = Path(tempfile.gettempdir()) / "planning-visualizer" / "plan-cache"
+DEFAULT_PLAN_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+# Entry statuses
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+# Fast Downward exit codes whose outcome depends only on the input
+_UNSOLVABLE_EXIT_CODES = {10, 11}  # TRANSLATE_UNSOLVABLE, SEARCH_UNSOLVABLE
+_INPUT_ERROR_EXIT_CODES = {31, 33, 34, 36, 37}  # *_INPUT_ERROR, *_UNSUPPORTED
+
+_COMMENT_RE = re.compile(r';[^\n]*')
+
+
+class PlannerFailure(RuntimeError):
+    """
+    Planner run that ended without a plan.
+
+    Attributes:
+        status: UNSOLVABLE or FAILED when the outcome is determined by the
+            input (and therefore cacheable), None for environment-dependent
+            failures such as running out of memory
+        exit_code: Planner exit code, if it ran
+    """
+
+    def __init__(self, message: str, status: Optional[str] = None, exit_code: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.exit_code = exit_code
+
+    @classmethod
+    def from_exit_code(cls, exit_code: int, message: str) -> 'PlannerFailure':
+        """Build a failure, marking it cacheable if the exit code is input-determined."""
+        if exit_code in _UNSOLVABLE_EXIT_CODES:
+            status = UNSOLVABLE
+        elif exit_code in _INPUT_ERROR_EXIT_CODES:
+            status = FAILED
+        else:
+            status = None
+        return cls(message, status, exit_code)
+
+
+def normalize_pddl(text: str) -> str:
+    """
+    Normalize PDDL text for cache keys.
+
+    Strips comments, lowercases (PDDL is case-insensitive) and collapses
+    whitespace, so formatting-only edits map to the same key.
+    """
+    text = _COMMENT_RE.sub('', text).lower().replace('(', ' ( ').replace(')', ' ) ')
+    return ' '.join(text.split())
+
+
+class PlanCache(ParseCache):
+    """Size-bounded LRU cache of planner results (see ParseCache for storage)."""
+
+    description = "plan cache"
+
+    @staticmethod
+    def plan_key(domain_text: str, problem_text: str, search: str) -> str:
+        """
+        Compute the cache key for a planner run.
+
+        Args:
+            domain_text: Domain PDDL text
+            problem_text: Problem PDDL text
+            search: Fast Downward --search string
+
+        Returns:
+            Hex digest identifying the run
+        """
+        digest = hashlib.sha256()
+        digest.update(f"plan-v{PLAN_CACHE_FORMAT_VERSION}\0".encode())
+        for part in (normalize_pddl(domain_text), normalize_pddl(problem_text), ' '.join(search.split())):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def key_for_files(cls, domain_path: str, problem_path: str, search: str) -> str:
+        """Compute the cache key for a domain and problem file."""
+        return cls.canonical_key_for_files(domain_path, problem_path, search)[0]
+
+    @classmethod
+    def canonical_key_for_files(cls, domain_path: str, problem_path: str,
+                                search: str) -> Tuple[str, Optional[CanonicalProblem]]:
+        """
+        Compute the rename-invariant cache key for a domain and problem file.
+
+        Args:
+            domain_path: Path to domain PDDL file
+            problem_path: Path to problem PDDL file
+            search: Fast Downward --search string
+
+        Returns:
+            Tuple of (cache key, canonical problem); the canonical problem
+            is None when the key falls back to the problem text, and
+            otherwise renames plans to and from the cached form
+        """
+        with open(domain_path, 'r') as f:
+            domain_text = f.read()
+        canonical = canonicalize_files(domain_path, problem_path)
+        if canonical is not None:
+            problem_text = "canonical " + canonical.to_pddl()
+        else:
+            with open(problem_path, 'r') as f:
+                problem_text = f.read()
+        return cls.plan_key(domain_text, problem_text, search), canonical
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove one entry.
+
+        Args:
+            key: Cache key from plan_key() or key_for_files()
+
+        Returns:
+            True if an entry was removed
+        """
+        path = self._entry_path(key)
+        existed = path.exists()
+        self._remove(path)
+        return existed
+
+    def invalidate_files(self, domain_path: str, problem_path: str, search: str) -> bool:
+        """Remove the entry for a domain and problem file, if any."""
+        return self.invalidate(self.key_for_files(domain_path, problem_path, search))
+
+
+def get_default_plan_cache() -> Optional[PlanCache]:
+    """
+    Get the plan cache configured from the environment.
+
+    PLAN_CACHE_DIR sets the cache directory (empty disables caching),
+    PLAN_CACHE_MAX_BYTES sets the size limit.
+
+    Returns:
+        PlanCache instance, or None if caching is disabled
+    """
+    cache_dir = os.environ.get('PLAN_CACHE_DIR', str(DEFAULT_PLAN_CACHE_DIR))
+    if not cache_dir:
+        return None
+
+    try:
+        max_bytes = int(os.environ.get('PLAN_CACHE_MAX_BYTES', DEFAULT_PLAN_CACHE_MAX_BYTES))
+    except (ValueError, TypeError):
+        max_bytes = DEFAULT_PLAN_CACHE_MAX_BYTES
+
+    return PlanCache(Path(cache_dir), max_bytes)
+
+
+def _replay(entry: Dict, timeout: Optional[float], cmd) -> Optional[List[str]]:
+    """
+    Turn a cache entry back into the original outcome.
+
+    Returns:
+        The cached plan, or None if the entry does not apply (a timeout
+        recorded with a shorter limit than the one requested)
+
+    Raises:
+        PlannerFailure: For cached unsolvable verdicts and failures
+        subprocess.TimeoutExpired: For cached timeouts that apply
+    """
+    status = entry.get("status")
+    if status == SOLVED:
+        return list(entry["plan"])
+    if status in (UNSOLVABLE, FAILED):
+        raise PlannerFailure(entry.get("message", "Planner failed"), status, entry.get("exit_code"))
+    if status == TIMEOUT:
+        if timeout is not None and timeout <= entry["timeout"]:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return None
+    return None
+
+
+def solve_cached(domain_path: str, problem_path: str, search: str,
+                 solve: Callable[[], List[str]], timeout: Optional[float] = None,
+                 cache: Optional[PlanCache] = None, use_cache: bool = True) -> List[str]:
+    """
+    Run a planner through the plan cache.
+
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        search: Search configuration, part of the cache key
+        solve: Runs the planner and returns the plan; raises PlannerFailure
+            or subprocess.TimeoutExpired when it ends without one
+        timeout: Time limit passed to the planner, if any
+        cache: Cache to use (default: from the environment)
+        use_cache: Set to False to always run the planner
+
+    Returns:
+        List of action strings
+    """
+    if use_cache and cache is None:
+        cache = get_default_plan_cache()
+    if not use_cache or cache is None:
+        return solve()
+
+    key, canonical = cache.canonical_key_for_files(domain_path, problem_path, search)
+    entry = cache.get(key)
+    if entry is not None:
+        plan = _replay(entry, timeout, ["plan-cache", key])
+        if plan is not None:
+            return canonical.decode_plan(plan) if canonical else plan
+
+    try:
+        plan = solve()
+    except PlannerFailure as e:
+        if e.status is not None:
+            cache.put(key, {"status": e.status, "message": str(e), "exit_code": e.exit_code})
+        raise
+    except subprocess.TimeoutExpired:
+        if timeout is not None:
+            cache.put(key, {"status": TIMEOUT, "timeout": timeout})
+        raise
+
+    cache.put(key, {"status": SOLVED, "plan": canonical.encode_plan(plan) if canonical else list(plan)})
+    return plan
@@ -0,0 +1,219 @@
+"""
+Search portfolio - runs several Fast Downward configurations at once.
+
+Satisficing configurations such as greedy search with FF or LAMA usually
+find some plan orders of magnitude faster than ``astar(lmcut())`` on the
+larger problems, while A* is the only one that guarantees an optimal
+plan. The portfolio starts every configuration in its own process and
+job directory and either
+
+- ``first``: returns the first plan any configuration finds, or
+- ``best``: keeps collecting plans until the deadline (or until an optimal
+  configuration finishes) and returns the cheapest,
+
+then kills the remaining runs.
+"""
+
+import re
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .limits import ResourceLimits
+from .plan_cache import PlannerFailure, UNSOLVABLE
+from .workdir import job_workdir, start_job, kill_job
+
+FIRST = "first"
+BEST = "best"
+PORTFOLIO_MODES = (FIRST, BEST)
+
+POLL_INTERVAL = 0.05  # seconds between checks on the running configurations
+LOG_TAIL_CHARS = 64 * 1024  # enough for the statistics printed at the end of a search
+
+_COST_RE = re.compile(r';\s*cost\s*=\s*(\d+)')
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    """
+    One Fast Downward configuration in a portfolio.
+
+    Attributes:
+        name: Short identifier
+        driver_args: Driver options placed before the input files (e.g. --alias)
+        search_args: Search options placed after the input files
+        optimal: True if a plan from this configuration is guaranteed optimal
+    """
+    name: str
+    driver_args: Sequence[str] = ()
+    search_args: Sequence[str] = ()
+    optimal: bool = False
+
+    def describe(self) -> str:
+        """Stable textual form, used in plan cache keys."""
+        return ' '.join([self.name, *self.driver_args, *self.search_args])
+
+
+DEFAULT_PORTFOLIO = (
+    SearchConfig(
+        "lazy-greedy-ff",
+        search_args=("--evaluator", "hff=ff()", "--search", "lazy_greedy([hff], preferred=[hff])"),
+    ),
+    SearchConfig("lama-first", driver_args=("--alias", "lama-first")),
+    SearchConfig("astar-lmcut", search_args=("--search", "astar(lmcut())"), optimal=True),
+)
+
+
+@dataclass
+class PortfolioResult:
+    """
+    Outcome of a portfolio run.
+
+    Attributes:
+        plan: List of action strings
+        cost: Plan cost reported by the planner (plan length if absent)
+        config: Name of the configuration that found the plan
+        optimal: True if that configuration guarantees optimality
+        elapsed: Seconds from launch until the plan was collected
+        finished: Names of configurations that ended before the portfolio stopped
+        log: Output of the configuration that found the plan
+    """
+    plan: List[str]
+    cost: int
+    config: str
+    optimal: bool
+    elapsed: float
+    finished: List[str] = field(default_factory=list)
+    log: str = ""
+
+
+def read_plan_file(plan_file: Path):
+    """
+    Read a Fast Downward plan file.
+
+    Returns:
+        Tuple of (actions, cost); cost falls back to the plan length
+    """
+    actions = []
+    cost = None
+    for line in plan_file.read_text().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(";"):
+            match = _COST_RE.match(line)
+            if match:
+                cost = int(match.group(1))
+            continue
+        actions.append(line)
+    return actions, len(actions) if cost is None else cost
+
+
+def _log_tail(workdir: Path, limit: int = 2000) -> str:
+    try:
+        return (workdir / "planner.log").read_text(errors='replace')[-limit:]
+    except OSError:
+        return ""
+
+
+def run_portfolio(fd_path: Path, domain_path: str, problem_path: str,
+                  configs: Sequence[SearchConfig] = DEFAULT_PORTFOLIO, mode: str = FIRST,
+                  deadline: Optional[float] = None, timeout: Optional[float] = None,
+                  sas_file: Optional[Path] = None,
+                  limits: Optional[ResourceLimits] = None) -> PortfolioResult:
+    """
+    Run several planner configurations concurrently and pick a plan.
+
+    Args:
+        fd_path: Path to fast-downward.py
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        configs: Configurations to launch, one process each
+        mode: FIRST to return the first plan, BEST to return the cheapest
+            plan found by the deadline
+        deadline: In BEST mode, seconds after which the best plan so far is
+            returned (None waits for every configuration)
+        timeout: Seconds after which everything is killed if no plan was found
+        sas_file: Translator output shared by all configurations; when given,
+            only the search component runs (see translation.translate)
+        limits: Memory and CPU limits for each configuration (see limits.py)
+
+    Returns:
+        PortfolioResult
+
+    Raises:
+        PlannerFailure: If every configuration fails, or one proves the
+            problem unsolvable
+        subprocess.TimeoutExpired: If no plan is found within the timeout
+    """
+    if mode not in PORTFOLIO_MODES:
+        raise ValueError(f"Unknown portfolio mode: {mode!r} (expected one of {PORTFOLIO_MODES})")
+    if not configs:
+        raise ValueError("Portfolio needs at least one configuration")
+
+    if sas_file is not None:
+        inputs = [str(Path(sas_file).resolve())]
+    else:
+        inputs = [str(Path(domain_path).resolve()), str(Path(problem_path).resolve())]
+    start = time.monotonic()
+
+    with ExitStack() as stack:
+        running = {}
+        for config in configs:
+            workdir = stack.enter_context(job_workdir(prefix=f"portfolio-{config.name}-"))
+            plan_file = workdir / "sas_plan"
+            cmd = [sys.executable, str(fd_path), *config.driver_args, "--plan-file", str(plan_file),
+                   *inputs, *config.search_args]
+            running[config.name] = (config, start_job(cmd, workdir, limits=limits), workdir, plan_file)
+
+        best: Optional[PortfolioResult] = None
+        finished: List[str] = []
+        failures: List[str] = []
+        try:
+            while running:
+                for name, (config, process, workdir, plan_file) in list(running.items()):
+                    exit_code = process.poll()
+                    if exit_code is None:
+                        continue
+                    del running[name]
+                    finished.append(name)
+
+                    if exit_code == 0 and plan_file.exists():
+                        plan, cost = read_plan_file(plan_file)
+                        if best is None or cost < best.cost:
+                            best = PortfolioResult(plan, cost, name, config.optimal,
+                                                   time.monotonic() - start,
+                                                   log=_log_tail(workdir, LOG_TAIL_CHARS))
+                        continue
+
+                    failure = PlannerFailure.from_exit_code(
+                        exit_code, f"{name} failed with exit code {exit_code}:\n{_log_tail(workdir)}")
+                    if failure.status == UNSOLVABLE:
+                        # Every configuration searches the same task
+                        raise failure
+                    failures.append(str(failure))
+
+                elapsed = time.monotonic() - start
+                if best is not None and (mode == FIRST or best.optimal
+                                         or (deadline is not None and elapsed >= deadline)):
+                    break
+                if timeout is not None and elapsed >= timeout:
+                    if best is not None:
+                        break
+                    raise subprocess.TimeoutExpired([str(fd_path), "portfolio"], timeout)
+
+                if running:
+                    time.sleep(POLL_INTERVAL)
+        finally:
+            # Kill the losers before their job directories are removed
+            for _, process, _, _ in running.values():
+                kill_job(process)
+
+    if best is None:
+        raise PlannerFailure("All portfolio configurations failed:\n" + "\n".join(failures))
+    best.finished = finished
+    return best
@@ -0,0 +1,310 @@
+"""
+Goal-relevance pruning - drop objects the goal cannot depend on before planning.
+
+Uploaded problems often declare objects no plan for the goal needs (extra
+balls in gripper, packages nobody asked to move in depot), and Fast
+Downward grounds and searches over all of them. This pass regresses from
+the goal through the action schemas: a goal or precondition that does not
+hold initially needs an achiever (an action adding it, or deleting it for
+a negative literal), and the achiever's own unmet preconditions are needed
+in turn. Every object such an achiever mentions is relevant. Static
+preconditions (predicates no action changes) restrict achievers to
+bindings that match initial facts, as in planner_runner.admission.
+
+The reduced problem keeps the relevant objects and the init facts that
+only mention them. It is a restriction of the original problem, so each of
+its plans is a plan of the original one; mapping a plan back only restores
+the object names the planner lowercased. The converse can fail: conditions
+true initially are not regressed, but a plan may have to re-achieve one
+through an object this pass dropped. The runner therefore solves the full
+problem when the reduced one is unsolvable.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from state_generator import Action, PDDLParser, Problem
+
+# Analyses that ground more achievers than this give up and keep the
+# problem whole: regressing that far costs more than the search it saves
+MAX_RELEVANT_ACTIONS = 500_000
+
+# A ground fact: (predicate, arg, ...)
+Fact = Tuple[str, ...]
+
+
+def ground_fact(pred, binding: Dict[str, str]) -> Fact:
+    """Ground a predicate of an action schema under a parameter binding."""
+    return (pred.name, *(binding.get(p, p) for p in pred.params))
+
+
+class Regression:
+    """Achiever lookup and binding enumeration for one problem."""
+
+    def __init__(self, parser: PDDLParser):
+        self.objects_of = parser.objects_by_type()
+        self.init: Set[Fact] = {(fact.name, *fact.params) for fact in parser.init_state}
+
+        changed = {pred.name for action in parser.actions.values() for _, pred in action.all_effects()}
+        changed.update(axiom.name for axiom in parser.axioms)
+        self.static_names = {name for name, _ in parser.predicates_schema if name not in changed}
+        # (predicate, position, object) -> args of the static init facts with that object there
+        self.static_index: Dict[Tuple[str, int, str], List[Tuple[str, ...]]] = {}
+        self.static_facts: Dict[str, List[Tuple[str, ...]]] = {}
+        for fact in self.init:
+            if fact[0] in self.static_names:
+                args = fact[1:]
+                self.static_facts.setdefault(fact[0], []).append(args)
+                for position, obj in enumerate(args):
+                    self.static_index.setdefault((fact[0], position, obj), []).append(args)
+
+        # is_positive -> predicate -> [(action, effect params), ...]
+        self.achievers: Dict[bool, Dict[str, List[Tuple[Action, List[str]]]]] = {True: {}, False: {}}
+        for action in parser.actions.values():
+            for is_positive, pred in action.effects:
+                self.achievers[is_positive].setdefault(pred.name, []).append((action, pred.params))
+
+    def achievers_of(self, is_positive: bool, fact: Fact) -> Iterator[Tuple[Action, Dict[str, str]]]:
+        """
+        Enumerate the ground actions that make a literal true.
+
+        Args:
+            is_positive: True for the fact itself, False for its negation
+            fact: Ground fact
+
+        Yields:
+            Tuples of (action schema, parameter binding)
+        """
+        for action, effect_params in self.achievers[is_positive].get(fact[0], ()):
+            for binding in self.bindings(action, effect_params, fact[1:]):
+                yield action, binding
+
+    def bindings(self, action: Action, effect_params: List[str], args: Tuple[str, ...]) -> Iterator[Dict[str, str]]:
+        """Enumerate the parameter bindings under which an effect produces args."""
+        binding: Dict[str, str] = {}
+        for param, arg in zip(effect_params, args):
+            if param.startswith('?'):
+                if binding.setdefault(param, arg) != arg:
+                    return
+            elif param != arg:
+                return
+        types = dict(action.parameters)
+        if any(obj not in self.objects_of.get(types.get(var, 'object'), ()) for var, obj in binding.items()):
+            return
+
+        statics = [pred for is_positive, pred in action.preconditions
+                   if is_positive and pred.name in self.static_names]
+        for full in self._extend(binding, statics, [var for var, _ in action.parameters], types):
+            if self._static_checks_hold(action, full):
+                yield full
+
+    def _extend(self, binding: Dict[str, str], statics, variables: List[str],
+                types: Dict[str, str]) -> Iterator[Dict[str, str]]:
+        """Join positive static preconditions against init, then bind the rest by type."""
+        if statics:
+            pred, rest = statics[0], statics[1:]
+            candidates = self.static_facts.get(pred.name, ())
+            for position, param in enumerate(pred.params):
+                value = binding.get(param, None if param.startswith('?') else param)
+                if value is not None:
+                    candidates = self.static_index.get((pred.name, position, value), ())
+                    break
+            for args in candidates:
+                extended = dict(binding)
+                for param, arg in zip(pred.params, args):
+                    if param.startswith('?'):
+                        if extended.setdefault(param, arg) != arg or arg not in self.objects_of.get(
+                                types.get(param, 'object'), ()):
+                            break
+                    elif param != arg:
+                        break
+                else:
+                    yield from self._extend(extended, rest, variables, types)
+            return
+
+        for var in variables:
+            if var not in binding:
+                for obj in self.objects_of.get(types[var], ()):
+                    yield from self._extend({**binding, var: obj}, statics, variables, types)
+                return
+        yield binding
+
+    def _static_checks_hold(self, action: Action, binding: Dict[str, str]) -> bool:
+        """Check equality and negative static preconditions under a full binding."""
+        for is_positive, pred in action.preconditions:
+            fact = ground_fact(pred, binding)
+            if pred.name == '=':
+                if (fact[1] == fact[2]) != is_positive:
+                    return False
+            elif not is_positive and pred.name in self.static_names:
+                if fact in self.init:
+                    return False
+        return True
+
+
+def relevant_objects(parser: PDDLParser, max_actions: int = MAX_RELEVANT_ACTIONS) -> Optional[Set[str]]:
+    """
+    Find the objects a plan for the goal may need.
+
+    Args:
+        parser: Parsed domain and problem
+        max_actions: Give up after grounding this many achievers
+
+    Returns:
+        Set of object names (goal objects, domain constants and the objects
+        of every achiever found), or None if the analysis gave up
+    """
+    # Achievers are looked up among unconditional effects only, and the
+    # objects an axiom body quantifies over are not followed
+    if parser.axioms or any(action.conditional_effects for action in parser.actions.values()):
+        return None
+    regression = Regression(parser)
+    init = regression.init
+    relevant = set(parser.constants)
+    needed: Set[Tuple[bool, Fact]] = set()
+    agenda: List[Tuple[bool, Fact]] = []
+
+    def need(is_positive: bool, fact: Fact):
+        # Literals true in the initial state are not regressed
+        if (fact in init) != is_positive and (is_positive, fact) not in needed:
+            needed.add((is_positive, fact))
+            agenda.append((is_positive, fact))
+
+    for is_positive, pred in parser.goal:
+        relevant.update(pred.params)
+        need(is_positive, (pred.name, *pred.params))
+
+    grounded: Set[Tuple[str, ...]] = set()
+    while agenda:
+        is_positive, fact = agenda.pop()
+        for action, binding in regression.achievers_of(is_positive, fact):
+            key = (action.name, *(binding[var] for var, _ in action.parameters))
+            if key in grounded:
+                continue
+            grounded.add(key)
+            if len(grounded) > max_actions:
+                return None
+            relevant.update(key[1:])
+            for pre_positive, pre in action.preconditions:
+                if pre.name != '=':
+                    need(pre_positive, ground_fact(pre, binding))
+    return relevant
+
+
+@dataclass
+class ProblemReduction:
+    """
+    A problem restricted to its goal-relevant objects.
+
+    Attributes:
+        problem: The reduced problem
+        removed_objects: Names of the objects dropped from the original
+        removed_facts: Number of init facts dropped with them
+        elapsed: Seconds taken by the analysis
+    """
+    problem: Problem
+    removed_objects: List[str]
+    removed_facts: int
+    elapsed: float = 0.0
+    _names: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    def to_pddl(self) -> str:
+        """PDDL text of the reduced problem."""
+        return self.problem.to_pddl()
+
+    def map_plan(self, plan: List[str]) -> List[str]:
+        """
+        Map a plan of the reduced problem back to the original problem.
+
+        Actions are kept as they are; object names the planner lowercased
+        get their original spelling back.
+
+        Args:
+            plan: Action strings such as "(pick ball1 rooma left)"
+
+        Returns:
+            Action strings for the original problem
+
+        Raises:
+            ValueError: If an action mentions an object the reduced problem
+                does not declare
+        """
+        mapped = []
+        for action in plan:
+            name, *args = action.strip().strip('()').split()
+            original = []
+            for arg in args:
+                obj = self._names.get(arg.lower())
+                if obj is None:
+                    raise ValueError(f"Plan action {action} uses '{arg}', which is not in the reduced problem")
+                original.append(obj)
+            mapped.append(f"({' '.join([name] + original)})")
+        return mapped
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "removed_objects": len(self.removed_objects),
+            "removed_facts": self.removed_facts,
+            "elapsed": round(self.elapsed, 6),
+        }
+
+
+def reduce_problem(parser: PDDLParser, max_actions: int = MAX_RELEVANT_ACTIONS) -> Optional[ProblemReduction]:
+    """
+    Restrict a problem to the objects its goal may need.
+
+    Args:
+        parser: Parsed domain and problem
+        max_actions: Give up after grounding this many achievers
+
+    Returns:
+        ProblemReduction, or None if every object is relevant (or the
+        analysis gave up)
+    """
+    # Problem.to_pddl drops numeric init values and the metric, so the
+    # reduced problem would be a different task
+    if parser.has_numeric_fluents():
+        return None
+    start = time.perf_counter()
+    relevant = relevant_objects(parser, max_actions)
+    if relevant is None:
+        return None
+    original = parser.problem
+    removed = [name for name in original.objects if name not in relevant]
+    if not removed:
+        return None
+
+    removed_set = set(removed)
+    problem = Problem(original.path)
+    problem.name = original.name
+    problem.domain_name = original.domain_name
+    problem.objects = {name: obj_type for name, obj_type in original.objects.items() if name not in removed_set}
+    problem.init_state = {fact for fact in original.init_state if removed_set.isdisjoint(fact.params)}
+    problem.goal = list(original.goal)
+
+    names = {name.lower(): name for name in list(problem.objects) + list(parser.constants)}
+    return ProblemReduction(problem, removed, len(original.init_state) - len(problem.init_state),
+                            time.perf_counter() - start, names)
+
+
+def reduce_files(domain_path: str, problem_path: str) -> Optional[ProblemReduction]:
+    """
+    Restrict a problem file to the objects its goal may need.
+
+    Problems the parser cannot read are left alone: the planner reports
+    its own error for them.
+
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+
+    Returns:
+        ProblemReduction, or None if nothing can be pruned
+    """
+    try:
+        parser = PDDLParser(domain_path, problem_path)
+    except Exception:
+        return None
+    return reduce_problem(parser)
@@ -1,8 +1,11 @@
 from pathlib import Path
-import subprocess
-import tempfile
 import sys
 
+from .limits import get_default_limits
+from .plan_cache import PlannerFailure, solve_cached
+from .translation import translate
+from .workdir import job_workdir, run_job
+
 
 # =========================
 # Project paths
@@ -14,18 +17,26 @@ PROJECT_ROOT = Path(__file__).resolve().parents[3]
 FD_ROOT = PROJECT_ROOT / "planning-tools" / "downward"
 FD_PY = FD_ROOT / "fast-downward.py"
 
+# Search configuration: A* with the LM-cut heuristic
+SEARCH = "astar(lmcut())"
+
 
 # =========================
 # Main planner function
 # =========================
 
-def run_planner(domain_rel: str, problem_rel: str):
+
+def run_planner(domain_rel: str, problem_rel: str, use_cache: bool = True):
     """
     Run Fast Downward on given domain & problem files.
 
+    Results go through the plan cache (see plan_cache.py), and the
+    translator output through the translation cache (see translation.py).
+
     Args:
         domain_rel: relative path to domain.pddl (from project root)
         problem_rel: relative path to problem.pddl (from project root)
+        use_cache: set to False to bypass the plan and translation caches
 
     Returns:
         List of grounded action strings
@@ -38,48 +49,47 @@ def run_planner(domain_rel: str, problem_rel: str):
     print(domain)
     print(problem)
 
-    if not FD_PY.exists():
-        raise FileNotFoundError(f"Fast Downward script not found: {FD_PY}")
-
     if not domain.exists():
         raise FileNotFoundError(f"Domain file not found: {domain}")
 
     if not problem.exists():
         raise FileNotFoundError(f"Problem file not found: {problem}")
 
-    # Temporary plan file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".plan") as tmp:
-        plan_file = Path(tmp.name)
-
-    cmd = [
-        sys.executable,
-        str(FD_PY),
-        "--plan-file", str(plan_file),
-        str(domain),
-        str(problem),
-        "--search", "astar(lmcut())",
-    ]
-
-    result = subprocess.run(
-        cmd,
-        cwd=FD_ROOT,
-        capture_output=True,
-        text=True,
-    )
-
-    if result.returncode != 0:
-        print("=== Fast Downward FAILED ===", file=sys.stderr)
-        print("STDOUT:\n", result.stdout, file=sys.stderr)
-        print("STDERR:\n", result.stderr, file=sys.stderr)
-        raise RuntimeError("Planner failed")
-
-    if not plan_file.exists():
-        return []
-
-    actions = [
-        line.strip()
-        for line in plan_file.read_text().splitlines()
-        if line.strip() and not line.startswith(";")
-    ]
-
-    return actions
+    def solve():
+        if not FD_PY.exists():
+            raise FileNotFoundError(f"Fast Downward script not found: {FD_PY}")
+
+        # Private working directory instead of FD_ROOT, so concurrent
+        # runs do not share output.sas
+        limits = get_default_limits()
+        with job_workdir() as workdir:
+            translation = translate(FD_PY, str(domain), str(problem), workdir, use_cache=use_cache,
+                                    limits=limits)
+            plan_file = workdir / "sas_plan"
+
+            cmd = [
+                sys.executable,
+                str(FD_PY),
+                "--plan-file", str(plan_file),
+                str(translation.sas_file),
+                "--search", SEARCH,
+            ]
+
+            result = run_job(cmd, workdir, limits=limits)
+
+            if result.returncode != 0:
+                print("=== Fast Downward FAILED ===", file=sys.stderr)
+                print("STDOUT:\n", result.stdout, file=sys.stderr)
+                print("STDERR:\n", result.stderr, file=sys.stderr)
+                raise PlannerFailure.from_exit_code(result.returncode, "Planner failed")
+
+            if not plan_file.exists():
+                return []
+
+            return [
+                line.strip()
+                for line in plan_file.read_text().splitlines()
+                if line.strip() and not line.startswith(";")
+            ]
+
+    return solve_cached(str(domain), str(problem), SEARCH, solve, use_cache=use_cache)
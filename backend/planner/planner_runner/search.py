@@ -0,0 +1,271 @@
+"""
+Built-in search - GBFS and A* over a grounded task, in process.
+
+For classroom-sized problems, starting Fast Downward (interpreter start,
+translator, search process) costs far more than the search itself. This
+module searches a GroundTask (see grounding.py) directly:
+
+- states are fact bitmasks; applicable actions come from the task's
+  successor generator; the closed list is a dict keyed by the mask,
+  holding each state's parent for plan extraction
+- ``gbfs`` expands the state with the lowest heuristic value and stops at
+  the first goal state generated; ``astar`` orders by g + h and stops when
+  a goal state is expanded, so with an admissible heuristic its plans are
+  optimal
+- heuristics are delete relaxations: ``add`` (sum of the relaxed costs of
+  the goals), ``hmax`` (their maximum, admissible) and ``ff`` (length of
+  a relaxed plan extracted from the h_add supporters), or ``goalcount``
+  (unsatisfied goals), the only one that needs no ground actions and so
+  the one for a LiftedTask (see lifted.py)
+
+Negative preconditions and goals are ignored by the heuristics (as in
+Fast Downward's relaxation) but always checked by the search. Actions
+have unit cost.
+"""
+
+import heapq
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from state_generator.facts import ids_mask, iter_bits
+from .grounding import GroundTask
+from .lifted import LiftedTask
+from .plan_cache import PlannerFailure, UNSOLVABLE
+
+ALGORITHMS = ("gbfs", "astar")
+RELAXED_HEURISTICS = ("ff", "add", "hmax")
+HEURISTICS = RELAXED_HEURISTICS + ("goalcount",)
+
+INFINITY = float('inf')
+
+# Expansions between deadline checks
+_CLOCK_INTERVAL = 256
+
+
+def describe(algorithm: str, heuristic: str) -> str:
+    """Configuration string in Fast Downward's notation, e.g. "astar(hmax())"."""
+    return f"{algorithm}({heuristic}())"
+
+
+def goal_count(task: GroundTask):
+    """Heuristic counting the goal literals a state does not satisfy."""
+    goal_pos, goal_neg = ids_mask(task.goal_pos), ids_mask(task.goal_neg)
+
+    def evaluate(mask: int) -> int:
+        return bin(goal_pos & ~mask).count('1') + bin(goal_neg & mask).count('1')
+    return evaluate
+
+
+class RelaxedHeuristic:
+    """
+    Delete-relaxation heuristic over a GroundTask.
+
+    Relaxed fact costs are computed by a Dijkstra-style exploration from
+    the state: an action becomes reachable once its last precondition is
+    settled, and its cost is one plus the sum (``add``, ``ff``) or the
+    maximum (``hmax``) of its precondition costs.
+    """
+
+    def __init__(self, task: GroundTask, kind: str = "ff"):
+        if kind not in RELAXED_HEURISTICS:
+            raise ValueError(f"Unknown heuristic '{kind}' (expected one of {', '.join(RELAXED_HEURISTICS)})")
+        self.kind = kind
+        self.goal = task.goal_pos
+        self.pre = [action.pre_pos for action in task.actions]
+        self.add = [action.add for action in task.actions]
+        # fact id -> actions with that fact as a precondition
+        self.watchers: List[List[int]] = [[] for _ in range(len(task.facts))]
+        for index, pre in enumerate(self.pre):
+            for fact in pre:
+                self.watchers[fact].append(index)
+        self.unconditional = [index for index, pre in enumerate(self.pre) if not pre]
+
+    def __call__(self, mask: int) -> float:
+        """
+        Evaluate a state.
+
+        Args:
+            mask: State bitmask
+
+        Returns:
+            Heuristic value, INFINITY if the goal is relaxed-unreachable
+        """
+        use_max = self.kind == "hmax"
+        cost = [INFINITY] * len(self.watchers)
+        supporter: List[Optional[int]] = [None] * len(self.watchers)
+        waiting = [len(pre) for pre in self.pre]
+        accumulated = [0] * len(self.pre)
+        heap: List[Tuple[float, int]] = []
+
+        for fact in iter_bits(mask):
+            cost[fact] = 0
+            heap.append((0, fact))
+
+        def reach(index: int, action_cost: float):
+            for fact in self.add[index]:
+                if action_cost < cost[fact]:
+                    cost[fact] = action_cost
+                    supporter[fact] = index
+                    heapq.heappush(heap, (action_cost, fact))
+
+        for index in self.unconditional:
+            reach(index, 1)
+
+        goals_left = len(set(self.goal))
+        pending_goals = set(self.goal)
+        while heap and goals_left:
+            fact_cost, fact = heapq.heappop(heap)
+            if fact_cost > cost[fact]:
+                continue
+            if fact in pending_goals:
+                pending_goals.discard(fact)
+                goals_left -= 1
+            for index in self.watchers[fact]:
+                if use_max:
+                    accumulated[index] = max(accumulated[index], fact_cost)
+                else:
+                    accumulated[index] += fact_cost
+                waiting[index] -= 1
+                if not waiting[index]:
+                    reach(index, accumulated[index] + 1)
+
+        if goals_left:
+            return INFINITY
+        if self.kind == "add":
+            return sum(cost[fact] for fact in set(self.goal))
+        if self.kind == "hmax":
+            return max((cost[fact] for fact in self.goal), default=0)
+
+        # h_FF: actions of the relaxed plan traced back through the supporters
+        relaxed_plan = set()
+        stack = list(self.goal)
+        seen = set()
+        while stack:
+            fact = stack.pop()
+            if fact in seen:
+                continue
+            seen.add(fact)
+            index = supporter[fact]
+            if index is not None and cost[fact] > 0 and index not in relaxed_plan:
+                relaxed_plan.add(index)
+                stack.extend(self.pre[index])
+        return len(relaxed_plan)
+
+
+@dataclass
+class SearchResult:
+    """
+    Result of a built-in search.
+
+    Attributes:
+        plan: Action strings from the initial state to a goal state
+        expanded: Number of expanded states
+        generated: Number of generated states
+        evaluated: Number of heuristic evaluations
+        elapsed: Seconds spent searching
+    """
+    plan: List[str]
+    expanded: int
+    generated: int
+    evaluated: int
+    elapsed: float
+
+    @property
+    def cost(self) -> int:
+        """Plan cost (actions have unit cost)."""
+        return len(self.plan)
+
+
+def search(task: GroundTask, algorithm: str = "gbfs", heuristic: str = "ff",
+           timeout: Optional[float] = None) -> SearchResult:
+    """
+    Search a grounded task for a plan.
+
+    Args:
+        task: GroundTask, or LiftedTask to search without grounding
+        algorithm: "gbfs" or "astar"
+        heuristic: "ff", "add", "hmax" or "goalcount"
+        timeout: Seconds before giving up (None for no limit)
+
+    Returns:
+        SearchResult
+
+    Raises:
+        ValueError: For an unknown algorithm or heuristic, or a relaxation
+            heuristic on a LiftedTask
+        PlannerFailure: If the reachable state space holds no goal state
+            (status UNSOLVABLE)
+        subprocess.TimeoutExpired: If the timeout expires first
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown search algorithm '{algorithm}' (expected one of {', '.join(ALGORITHMS)})")
+    if isinstance(task, LiftedTask) and heuristic != "goalcount":
+        raise ValueError(f"Heuristic '{heuristic}' needs a grounded task; use 'goalcount' on a lifted one")
+    start = time.perf_counter()
+    deadline = start + timeout if timeout is not None else None
+    evaluate = goal_count(task) if heuristic == "goalcount" else RelaxedHeuristic(task, heuristic)
+    astar = algorithm == "astar"
+
+    successors = task.successor_generator()
+    # (kept mask, add mask) per action, extended as a lifted task finds actions
+    operators: List[Tuple[int, int]] = []
+
+    def result(state: int) -> SearchResult:
+        plan = []
+        while parents[state] is not None:
+            state, index = parents[state]
+            plan.append(task.actions[index].name)
+        plan.reverse()
+        return SearchResult(plan, expanded, generated, evaluated, time.perf_counter() - start)
+
+    init = task.init
+    parents = {init: None}
+    g = {init: 0}
+    expanded = generated = 0
+    evaluated = 1
+    h = evaluate(init)
+    if h == INFINITY:
+        raise PlannerFailure("Goal is unreachable even with delete effects ignored", UNSOLVABLE)
+    if not astar and task.is_goal(init):
+        return result(init)
+
+    counter = 0
+    heap = [((h, h) if astar else (h,), counter, init)]
+    closed = set()
+    while heap:
+        _, _, state = heapq.heappop(heap)
+        if state in closed:
+            continue
+        if astar and task.is_goal(state):
+            return result(state)
+        closed.add(state)
+        expanded += 1
+        if deadline is not None and expanded % _CLOCK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise subprocess.TimeoutExpired(["builtin-planner", describe(algorithm, heuristic)], timeout)
+
+        successor_g = g[state] + 1
+        applicable = successors.applicable(state)
+        for action in task.actions[len(operators):]:
+            operators.append((~ids_mask(action.delete), ids_mask(action.add)))
+        for index in applicable:
+            keep, add = operators[index]
+            successor = (state & keep) | add
+            generated += 1
+            known = g.get(successor)
+            if known is not None and (not astar or known <= successor_g):
+                continue
+            g[successor] = successor_g
+            parents[successor] = (state, index)
+            if not astar and task.is_goal(successor):
+                return result(successor)
+            closed.discard(successor)
+            h = evaluate(successor)
+            evaluated += 1
+            if h == INFINITY:
+                continue
+            counter += 1
+            heapq.heappush(heap, ((successor_g + h, h) if astar else (h,), counter, successor))
+
+    raise PlannerFailure("Search space exhausted without reaching the goal", UNSOLVABLE)
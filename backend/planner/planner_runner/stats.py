@@ -0,0 +1,221 @@
+"""
+Planner statistics - what a Fast Downward run did and how it ended.
+
+Fast Downward reports its search effort on stdout (``Expanded 12
+state(s).``, ``Peak memory: 9004 KB``, ...), possibly with a
+``[t=..., ... KB]`` prefix on every line, and encodes how it ended in its
+exit code. PlannerStats collects both, together with the stage timings
+measured by the runner, so API responses can show why a problem was slow
+or failed.
+"""
+
+import re
+import signal
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .plan_cache import FAILED, SOLVED, TIMEOUT, UNSOLVABLE
+
+# Outcome of a run that hit the memory limit (the other outcomes are the
+# plan cache statuses)
+OUT_OF_MEMORY = "out_of_memory"
+
+# Fast Downward driver exit codes
+_SOLVED_EXIT_CODES = {0, 1, 2, 3}  # 1-3: plan found, then out of memory/time
+_UNSOLVABLE_EXIT_CODES = {10, 11}  # TRANSLATE_UNSOLVABLE, SEARCH_UNSOLVABLE
+_OUT_OF_MEMORY_EXIT_CODES = {20, 22, 24}  # *_OUT_OF_MEMORY, SEARCH_OUT_OF_MEMORY_AND_TIME
+_OUT_OF_TIME_EXIT_CODES = {21, 23}  # *_OUT_OF_TIME
+
+# Last occurrence of each value wins (iterated searches print several blocks)
+_SEARCH_PATTERNS = {
+    "expanded": re.compile(r'\bExpanded (\d+) state\(s\)\.'),
+    "generated": re.compile(r'\bGenerated (\d+) state\(s\)\.'),
+    "evaluated": re.compile(r'\bEvaluated (\d+) state\(s\)\.'),
+    "search_time": re.compile(r'\bSearch time: ([\d.]+)s'),
+    "plan_cost": re.compile(r'\bPlan cost: (\d+)'),
+    "plan_length": re.compile(r'\bPlan length: (\d+) step'),
+}
+_PEAK_MEMORY_RE = re.compile(r'\b(?:Peak memory|Translator peak memory): (\d+) KB')
+
+
+def classify_exit_code(exit_code: Optional[int]) -> str:
+    """
+    Map a planner exit code to an outcome.
+
+    Negative codes are signals: SIGXCPU means the CPU limit was hit.
+
+    Returns:
+        SOLVED, UNSOLVABLE, OUT_OF_MEMORY, TIMEOUT or FAILED
+    """
+    if exit_code in _SOLVED_EXIT_CODES:
+        return SOLVED
+    if exit_code in _UNSOLVABLE_EXIT_CODES:
+        return UNSOLVABLE
+    if exit_code in _OUT_OF_MEMORY_EXIT_CODES:
+        return OUT_OF_MEMORY
+    if exit_code in _OUT_OF_TIME_EXIT_CODES or exit_code == -getattr(signal, 'SIGXCPU', 0):
+        return TIMEOUT
+    return FAILED
+
+
+@dataclass
+class PlannerStats:
+    """
+    Statistics of one planner run; fields the run did not report stay None.
+
+    Attributes:
+        outcome: SOLVED, UNSOLVABLE, OUT_OF_MEMORY, TIMEOUT or FAILED
+        exit_code: Exit code of the last planner process, if one ran
+        cached: True if the result came from the plan cache
+        translate_time: Seconds spent in the translate stage
+        translate_cached: True if the translator output came from its cache
+        search_time: Seconds of search reported by the planner (the stage
+            time when the planner does not report it)
+        search_wall_time: Wall-clock seconds of the search stage, including
+            planner startup and reading the translator output
+        expanded: Number of expanded states
+        generated: Number of generated states
+        evaluated: Number of evaluated states
+        peak_memory_kb: Highest peak memory of the translator and search
+        plan_cost: Cost of the returned plan
+        plan_length: Number of actions in the returned plan
+        config: Portfolio or built-in search configuration that found the plan
+        mode: Planner mode the problem was solved with
+        planner: Planner that ran, "fast-downward" or "builtin" (the
+            in-process search)
+        admission: Admission control verdict (accept, degrade or reject)
+        estimated_actions: Upper bound on grounded actions used for admission
+        estimated_facts: Upper bound on grounded facts used for admission
+        pruned_objects: Goal-irrelevant objects removed before planning
+        pruned_facts: Init facts removed with them
+        subproblems: Goal groups solved separately in decompose mode
+        repaired_subproblems: Goal groups solved again while merging
+    """
+    outcome: Optional[str] = None
+    exit_code: Optional[int] = None
+    cached: bool = False
+    translate_time: Optional[float] = None
+    translate_cached: Optional[bool] = None
+    search_time: Optional[float] = None
+    search_wall_time: Optional[float] = None
+    expanded: Optional[int] = None
+    generated: Optional[int] = None
+    evaluated: Optional[int] = None
+    peak_memory_kb: Optional[int] = None
+    plan_cost: Optional[int] = None
+    plan_length: Optional[int] = None
+    config: Optional[str] = None
+    mode: Optional[str] = None
+    planner: Optional[str] = None
+    admission: Optional[str] = None
+    estimated_actions: Optional[int] = None
+    estimated_facts: Optional[int] = None
+    pruned_objects: Optional[int] = None
+    pruned_facts: Optional[int] = None
+    subproblems: Optional[int] = None
+    repaired_subproblems: Optional[int] = None
+
+    def record_translation(self, translation):
+        """Record the translate stage (a translation.Translation)."""
+        self.translate_time = round(translation.time, 6)
+        self.translate_cached = translation.cached
+        self.parse_log(translation.log)
+
+    def record_search(self, elapsed: float, exit_code: Optional[int] = None, log: str = ""):
+        """
+        Record the search stage.
+
+        Args:
+            elapsed: Wall-clock seconds of the stage
+            exit_code: Exit code of the search run, if it ended
+            log: Planner output to parse for search statistics
+        """
+        self.search_wall_time = round(elapsed, 6)
+        self.parse_log(log)
+        if self.search_time is None:
+            self.search_time = round(elapsed, 6)
+        if exit_code is not None:
+            self.exit_code = exit_code
+            self.outcome = classify_exit_code(exit_code)
+
+    def parse_log(self, text: str):
+        """Take the statistics Fast Downward printed from its output."""
+        if not text:
+            return
+        for name, pattern in _SEARCH_PATTERNS.items():
+            matches = pattern.findall(text)
+            if matches:
+                value = float(matches[-1]) if name == "search_time" else int(matches[-1])
+                setattr(self, name, value)
+        peaks = [int(kb) for kb in _PEAK_MEMORY_RE.findall(text)]
+        if peaks:
+            self.peak_memory_kb = max(peaks + [self.peak_memory_kb or 0])
+
+    def record_failure(self, error: BaseException):
+        """Classify a run that ended without a plan (PlannerFailure or TimeoutExpired)."""
+        exit_code = getattr(error, 'exit_code', None)
+        if exit_code is not None:
+            self.exit_code = exit_code
+            self.outcome = classify_exit_code(exit_code)
+        elif getattr(error, 'status', None) == UNSOLVABLE:
+            self.outcome = UNSOLVABLE
+        elif hasattr(error, 'timeout'):
+            self.outcome = TIMEOUT
+        else:
+            self.outcome = FAILED
+
+    def record_admission(self, decision):
+        """Record an admission decision (an admission.AdmissionDecision)."""
+        self.admission = decision.verdict
+        if decision.estimate is not None:
+            self.estimated_actions = decision.estimate.actions
+            self.estimated_facts = decision.estimate.facts
+
+    def record_reduction(self, reduction):
+        """Record goal-relevance pruning (a relevance.ProblemReduction, or None)."""
+        self.pruned_objects = len(reduction.removed_objects) if reduction else 0
+        self.pruned_facts = reduction.removed_facts if reduction else 0
+
+    def record_builtin(self, result, grounding_time: float):
+        """
+        Record a built-in planner run (a search.SearchResult).
+
+        Grounding stands in for the translate stage.
+        """
+        self.translate_time = round(grounding_time, 6)
+        self.translate_cached = False
+        self.search_time = self.search_wall_time = round(result.elapsed, 6)
+        self.expanded = result.expanded
+        self.generated = result.generated
+        self.evaluated = result.evaluated
+        self.plan_cost = result.cost
+
+    def add_subproblem(self, other: 'PlannerStats'):
+        """Add the stage times and search effort of a subproblem's run."""
+        for name in ("translate_time", "search_time", "expanded", "generated", "evaluated"):
+            value = getattr(other, name)
+            if value is not None:
+                total = (getattr(self, name) or 0) + value
+                setattr(self, name, round(total, 6) if isinstance(total, float) else total)
+        if other.peak_memory_kb is not None:
+            self.peak_memory_kb = max(self.peak_memory_kb or 0, other.peak_memory_kb)
+
+    def record_plan(self, plan):
+        """Record the returned plan (after a fresh run or a plan cache hit)."""
+        self.outcome = SOLVED
+        self.plan_length = len(plan)
+
+    def stages(self) -> dict:
+        """Per-stage summary: {"translate": {time, cached}, "search": {time}}."""
+        stages = {}
+        if self.translate_time is not None:
+            stages["translate"] = {"time": self.translate_time, "cached": self.translate_cached}
+        if self.search_wall_time is not None:
+            stages["search"] = {"time": self.search_wall_time}
+            if self.config is not None:
+                stages["search"]["config"] = self.config
+        return stages
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
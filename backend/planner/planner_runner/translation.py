@@ -0,0 +1,197 @@
+"""
+Translation stage - runs Fast Downward's translator once per problem.
+
+A Fast Downward run has two stages: the translator grounds the PDDL task
+into a finite-domain ``output.sas`` file, and the search component plans
+on that file. On large problems translation alone can take many seconds,
+and it is the same for every search configuration, so its output is
+cached on disk keyed by the normalized domain and problem text. A later
+run with another ``--search`` string (or the portfolio and anytime modes,
+which start several searches) loads the cached file and only runs the
+search component.
+
+Storage, size limit and LRU eviction are shared with the parse cache.
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from state_generator.parse_cache import ParseCache
+from .limits import ResourceLimits
+from .plan_cache import PlannerFailure, normalize_pddl
+from .workdir import run_job
+
+# Bump when the layout of cached entries changes
+TRANSLATION_CACHE_FORMAT_VERSION = 1
+
+# Cache location and size limit can be overridden via environment variables.
+# Setting TRANSLATION_CACHE_DIR to an empty string disables the cache.
+DEFAULT_TRANSLATION_CACHE_DIR = Path(tempfile.gettempdir()) / "planning-visualizer" / "translation-cache"
+DEFAULT_TRANSLATION_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Name of the translator output inside a job directory
+SAS_FILE_NAME = "output.sas"
+
+
+class TranslationCache(ParseCache):
+    """Size-bounded LRU cache of translator output (see ParseCache for storage)."""
+
+    description = "translation cache"
+
+    @staticmethod
+    def translation_key(domain_text: str, problem_text: str) -> str:
+        """
+        Compute the cache key for a translation.
+
+        Args:
+            domain_text: Domain PDDL text
+            problem_text: Problem PDDL text
+
+        Returns:
+            Hex digest identifying the translator input
+        """
+        digest = hashlib.sha256()
+        digest.update(f"translate-v{TRANSLATION_CACHE_FORMAT_VERSION}\0".encode())
+        for part in (normalize_pddl(domain_text), normalize_pddl(problem_text)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def key_for_files(cls, domain_path: str, problem_path: str) -> str:
+        """Compute the cache key for a domain and problem file."""
+        with open(domain_path, 'r') as f:
+            domain_text = f.read()
+        with open(problem_path, 'r') as f:
+            problem_text = f.read()
+        return cls.translation_key(domain_text, problem_text)
+
+
+def get_default_translation_cache() -> Optional[TranslationCache]:
+    """
+    Get the translation cache configured from the environment.
+
+    TRANSLATION_CACHE_DIR sets the cache directory (empty disables caching),
+    TRANSLATION_CACHE_MAX_BYTES sets the size limit.
+
+    Returns:
+        TranslationCache instance, or None if caching is disabled
+    """
+    cache_dir = os.environ.get('TRANSLATION_CACHE_DIR', str(DEFAULT_TRANSLATION_CACHE_DIR))
+    if not cache_dir:
+        return None
+
+    try:
+        max_bytes = int(os.environ.get('TRANSLATION_CACHE_MAX_BYTES', DEFAULT_TRANSLATION_CACHE_MAX_BYTES))
+    except (ValueError, TypeError):
+        max_bytes = DEFAULT_TRANSLATION_CACHE_MAX_BYTES
+
+    return TranslationCache(Path(cache_dir), max_bytes)
+
+
+@dataclass
+class Translation:
+    """
+    Result of the translate stage.
+
+    Attributes:
+        sas_file: Path to the translator output, valid while its job
+            directory exists
+        time: Seconds spent in the stage (running the translator, or
+            loading the cached output)
+        cached: True if the output came from the translation cache
+        log: Translator output (empty on a cache hit)
+    """
+    sas_file: Path
+    time: float
+    cached: bool
+    log: str = ""
+
+
+def translate(fd_path: Path, domain_path: str, problem_path: str, workdir: Path,
+              timeout: Optional[float] = None, cache: Optional[TranslationCache] = None,
+              use_cache: bool = True, limits: Optional[ResourceLimits] = None) -> Translation:
+    """
+    Produce the translator output for a problem inside a job directory.
+
+    On a cache hit the cached output is written to the job directory;
+    otherwise only the translator component is run and its output is
+    stored in the cache.
+
+    Args:
+        fd_path: Path to fast-downward.py
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        workdir: Job directory that receives output.sas
+        timeout: Timeout in seconds for the translator
+        cache: Cache to use (default: from the environment)
+        use_cache: Set to False to always run the translator
+        limits: Memory and CPU limits for the translator (see limits.py)
+
+    Returns:
+        Translation pointing at workdir/output.sas
+
+    Raises:
+        PlannerFailure: If the translator fails (UNSOLVABLE when it proves
+            the task unsolvable)
+        subprocess.TimeoutExpired: If the translator times out
+    """
+    start = time.perf_counter()
+    sas_file = workdir / SAS_FILE_NAME
+    if use_cache and cache is None:
+        cache = get_default_translation_cache()
+    if not use_cache:
+        cache = None
+
+    key = None
+    if cache is not None:
+        key = cache.key_for_files(domain_path, problem_path)
+        sas = cache.get(key)
+        if isinstance(sas, bytes):
+            sas_file.write_bytes(sas)
+            return Translation(sas_file, time.perf_counter() - start, True)
+
+    cmd = [sys.executable, str(fd_path), "--translate",
+           str(Path(domain_path).resolve()), str(Path(problem_path).resolve())]
+    result = run_job(cmd, workdir, timeout=timeout, limits=limits)
+    if result.returncode != 0:
+        raise PlannerFailure.from_exit_code(
+            result.returncode,
+            f"Translator failed:\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}"
+        )
+    if not sas_file.exists():
+        raise PlannerFailure(f"Translator did not write {SAS_FILE_NAME}:\nSTDOUT: {result.stdout}")
+
+    if cache is not None:
+        cache.put(key, sas_file.read_bytes())
+    return Translation(sas_file, time.perf_counter() - start, False, result.stdout)
+
+
+def remaining_time(timeout: Optional[float], start: float, cmd) -> Optional[float]:
+    """
+    Time left of a budget shared by the translate and search stages.
+
+    Args:
+        timeout: Overall timeout in seconds (None for no limit)
+        start: time.perf_counter() value when the budget started
+        cmd: Command reported if the budget is used up
+
+    Returns:
+        Seconds left, or None for no limit
+
+    Raises:
+        subprocess.TimeoutExpired: If no time is left
+    """
+    if timeout is None:
+        return None
+    left = timeout - (time.perf_counter() - start)
+    if left <= 0:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return left
@@ -0,0 +1,142 @@
+"""
+Per-job scratch directories for planner runs.
+
+Fast Downward writes its intermediate files (``output.sas``, ``sas_plan``
+and friends) into the current working directory, so two runs sharing a
+directory overwrite each other's files. Every solve therefore gets its own
+directory, created on tmpfs when one is available (the translator output
+is written once and read once, so it never needs to reach a disk) and
+removed when the job ends, however it ends.
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .limits import ResourceLimits, popen_limit_hooks
+
+# Memory-backed directory used when present and writable
+TMPFS_DIR = Path("/dev/shm")
+
+
+def scratch_root() -> Path:
+    """
+    Choose the parent directory for job directories.
+
+    PLANNER_SCRATCH_DIR overrides the choice; otherwise tmpfs is preferred
+    over the system temporary directory.
+
+    Returns:
+        Directory under which job directories are created
+    """
+    override = os.environ.get('PLANNER_SCRATCH_DIR')
+    if override:
+        return Path(override)
+    if TMPFS_DIR.is_dir() and os.access(TMPFS_DIR, os.W_OK | os.X_OK):
+        return TMPFS_DIR
+    return Path(tempfile.gettempdir())
+
+
+@contextmanager
+def job_workdir(prefix: str = "planner-job-") -> Iterator[Path]:
+    """
+    Create a private working directory for one planner run.
+
+    The directory and everything in it are removed on exit, including
+    when the job fails or times out.
+
+    Args:
+        prefix: Name prefix for the directory
+
+    Yields:
+        Path to the empty directory
+    """
+    root = scratch_root()
+    root.mkdir(parents=True, exist_ok=True)
+    workdir = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+    try:
+        yield workdir
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def start_job(cmd: List[str], workdir: Path, log_name: str = "planner.log",
+              limits: Optional[ResourceLimits] = None) -> subprocess.Popen:
+    """
+    Start a planner command inside its job directory without waiting for it.
+
+    stdout and stderr go to a log file in the job directory rather than a
+    pipe, so a chatty planner cannot block on a full pipe while the caller
+    is busy watching other jobs.
+
+    Args:
+        cmd: Command line
+        workdir: Job directory used as the working directory
+        log_name: Name of the log file inside workdir
+        limits: Memory and CPU limits for the job (see limits.py)
+
+    Returns:
+        The running process (stop it with kill_job)
+    """
+    preexec_fn, after_start = popen_limit_hooks(limits)
+    with open(workdir / log_name, 'w') as log:
+        process = subprocess.Popen(cmd, cwd=workdir, stdout=log, stderr=subprocess.STDOUT,
+                                   start_new_session=os.name == 'posix', preexec_fn=preexec_fn)
+    after_start(process)
+    return process
+
+
+def kill_job(process: subprocess.Popen):
+    """
+    Kill a job started with start_job or run_job, including its children.
+
+    Fast Downward's driver starts the translator and search as child
+    processes, so the whole process group is killed; otherwise they could
+    keep running and writing into a directory that is about to be removed.
+    """
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    else:
+        process.kill()
+    process.wait()
+
+
+def run_job(cmd: List[str], workdir: Path, timeout: Optional[float] = None,
+            limits: Optional[ResourceLimits] = None) -> subprocess.CompletedProcess:
+    """
+    Run a planner command inside its job directory.
+
+    The command runs in a new process group, which is killed as a whole on
+    timeout (see kill_job).
+
+    Args:
+        cmd: Command line
+        workdir: Job directory used as the working directory
+        timeout: Timeout in seconds (None for no limit)
+        limits: Memory and CPU limits for the job (see limits.py)
+
+    Returns:
+        CompletedProcess with text stdout and stderr
+
+    Raises:
+        subprocess.TimeoutExpired: If the command times out
+    """
+    preexec_fn, after_start = popen_limit_hooks(limits)
+    with subprocess.Popen(cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          text=True, start_new_session=os.name == 'posix', preexec_fn=preexec_fn) as process:
+        after_start(process)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_job(process)
+            process.communicate()
+            raise
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
@@ -1,14 +1,141 @@
 #!/usr/bin/env python3
 """
-Planner integration script - runs Fast Downward if available, otherwise uses predefined plans.
+Planner integration script - solves small problems in process, runs Fast Downward on the
+rest, and falls back to the built-in planner (then predefined plans) without it.
 """
 
+import copy
 import sys
 import subprocess
-import tempfile
 import os
+import time
 from pathlib import Path
 
+from typing import Callable, Iterator, Optional
+
+from planner_runner.plan_cache import PlannerFailure, SOLVED, UNSOLVABLE, get_default_plan_cache, solve_cached
+from planner_runner.workdir import job_workdir, run_job
+from planner_runner.portfolio import DEFAULT_PORTFOLIO, PORTFOLIO_MODES, run_portfolio
+from planner_runner.anytime import ANYTIME_DRIVER_ARGS, AnytimePlan, iter_anytime_plans
+from planner_runner.translation import Translation, remaining_time, translate
+from planner_runner.limits import ResourceLimits, get_default_limits
+from planner_runner.stats import PlannerStats
+from planner_runner.admission import ACCEPT, DEGRADE, REJECT, AdmissionPolicy, ProblemTooLarge, admit, estimate_size
+from planner_runner.relevance import reduce_files
+from planner_runner.decomposition import DecompositionError, solve_decomposed
+from planner_runner.grounding import MAX_GROUND_ACTIONS, ground_task
+from planner_runner.lifted import LiftedTask
+from planner_runner.search import describe as describe_search, search as builtin_search
+from state_generator import PDDLParser, Problem
+
+# Default Fast Downward search configuration (A* with the LM-cut heuristic)
+DEFAULT_SEARCH = "astar(lmcut())"
+
+# Cheap satisficing search used for problems admission control finds too
+# large for the requested mode (greedy search with FF, preferred operators)
+SATISFICING_SEARCH = "lazy_greedy([ff()], preferred=[ff()])"
+
+# Planner modes: a single optimal A* run, a single greedy run, the search
+# portfolio returning the first plan found / the best plan found by the
+# deadline, an anytime search streaming improving plans, or A* runs on
+# independent goal groups whose plans are merged.
+# Can be overridden via environment variable PLANNER_MODE
+OPTIMAL_MODE = "optimal"
+SATISFICING_MODE = "satisficing"
+ANYTIME_MODE = "anytime"
+DECOMPOSE_MODE = "decompose"
+PLANNER_MODES = (OPTIMAL_MODE, SATISFICING_MODE) + PORTFOLIO_MODES + (ANYTIME_MODE, DECOMPOSE_MODE)
+PLANNER_DESCRIPTIONS = {
+    "optimal": "Fast Downward (A* + LM-cut)",
+    "satisficing": "Fast Downward (lazy greedy + FF)",
+    "first": "Fast Downward portfolio (first plan)",
+    "best": "Fast Downward portfolio (best plan by deadline)",
+    "anytime": "Fast Downward anytime (iterated LAMA)",
+    "decompose": "Fast Downward on goal groups (A* + LM-cut, merged)",
+}
+
+# Planners recorded in PlannerStats.planner
+FAST_DOWNWARD_PLANNER = "fast-downward"
+BUILTIN_PLANNER = "builtin"
+
+# Problems admission control estimates at no more than this many ground
+# actions are solved in-process by the built-in planner, without starting
+# Fast Downward. Override with PLANNER_BUILTIN_MAX_ACTIONS (0 disables).
+DEFAULT_BUILTIN_MAX_ACTIONS = 1000
+
+# Seconds the built-in planner gets on such a problem before Fast Downward
+# takes over. Override with PLANNER_BUILTIN_TIMEOUT.
+DEFAULT_BUILTIN_TIMEOUT = 10
+
+
+def get_planner_mode() -> str:
+    """Get the planner mode from environment or use the optimal A* run."""
+    mode = os.environ.get('PLANNER_MODE', OPTIMAL_MODE)
+    return mode if mode in PLANNER_MODES else OPTIMAL_MODE
+
+
+def get_portfolio_deadline():
+    """Get the portfolio deadline in seconds from PLANNER_PORTFOLIO_DEADLINE (None if unset)."""
+    try:
+        return float(os.environ['PLANNER_PORTFOLIO_DEADLINE'])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_decomposition_workers():
+    """Get the number of concurrent subproblem solves from PLANNER_DECOMPOSITION_WORKERS (None if unset)."""
+    try:
+        return max(1, int(os.environ['PLANNER_DECOMPOSITION_WORKERS']))
+    except (KeyError, ValueError):
+        return None
+
+
+def get_builtin_max_actions() -> int:
+    """Get the size limit for the built-in planner from PLANNER_BUILTIN_MAX_ACTIONS."""
+    try:
+        return int(os.environ.get('PLANNER_BUILTIN_MAX_ACTIONS', DEFAULT_BUILTIN_MAX_ACTIONS))
+    except (ValueError, TypeError):
+        return DEFAULT_BUILTIN_MAX_ACTIONS
+
+
+def get_builtin_timeout() -> float:
+    """Get the built-in planner's time budget from PLANNER_BUILTIN_TIMEOUT."""
+    try:
+        return float(os.environ.get('PLANNER_BUILTIN_TIMEOUT', DEFAULT_BUILTIN_TIMEOUT))
+    except (ValueError, TypeError):
+        return DEFAULT_BUILTIN_TIMEOUT
+
+
+def builtin_config(mode: str) -> tuple[str, str]:
+    """
+    Built-in search for a planner mode, as (algorithm, heuristic).
+    
+    Optimal mode keeps its guarantee with A* and the admissible h_max;
+    every other mode takes the first plan of greedy search with h_FF.
+    """
+    return ("astar", "hmax") if mode == OPTIMAL_MODE else ("gbfs", "ff")
+
+
+def describe_planner(stats: PlannerStats) -> str:
+    """Human-readable description of the planner that produced a result."""
+    if stats.planner == BUILTIN_PLANNER:
+        return f"Built-in planner ({stats.config})"
+    return PLANNER_DESCRIPTIONS[stats.mode or get_planner_mode()]
+
+
+def use_relevance_pruning(mode: str) -> bool:
+    """
+    Whether to drop goal-irrelevant objects before solving in a mode.
+    
+    PLANNER_RELEVANCE_PRUNING=1 prunes in every mode and 0 in none. By
+    default every mode but optimal prunes: the reduced problem's plans are
+    valid, but not guaranteed to be as cheap as the full problem's.
+    """
+    setting = os.environ.get('PLANNER_RELEVANCE_PRUNING', '')
+    if setting in ('0', '1'):
+        return setting == '1'
+    return mode != OPTIMAL_MODE
+
 # Configurable timeout for Fast Downward (in seconds)
 # Can be overridden via environment variable PLANNER_TIMEOUT
 DEFAULT_PLANNER_TIMEOUT = 1800  # 30 minutes default
@@ -47,71 +174,344 @@ if FD_PATH is None:
     FD_PATH = POSSIBLE_FD_PATHS[0]
 
 
-def run_fast_downward(domain_path: str, problem_path: str, timeout: int = None) -> list[str]:
+def translate_problem(domain_path: str, problem_path: str, workdir: Path, timeout: int = None,
+                      use_cache: bool = True, limits: Optional[ResourceLimits] = None) -> Translation:
     """
-    Run Fast Downward planner to solve the problem.
+    Run the translate stage: ground the problem into workdir/output.sas.
+    
+    The translator output is cached by the normalized domain and problem
+    text (see planner_runner.translation), so every search configuration
+    run on the same problem after the first skips translation.
     
     Args:
         domain_path: Path to domain PDDL file
         problem_path: Path to problem PDDL file
-        timeout: Timeout in seconds (default: from environment or 300s)
+        workdir: Job directory that receives output.sas
+        timeout: Timeout in seconds for the translator
+        use_cache: Set to False to bypass the translation cache
+        limits: Memory and CPU limits (default: from environment)
         
     Returns:
-        List of action strings
+        Translation with the output path, stage time and cache status
         
     Raises:
-        RuntimeError: If planner fails
-        subprocess.TimeoutExpired: If planner times out
+        FileNotFoundError: If Fast Downward is not installed
+        RuntimeError: If the translator fails (PlannerFailure)
+        subprocess.TimeoutExpired: If the translator times out
     """
     if not FD_PATH.exists():
         raise FileNotFoundError(f"Fast Downward not found at {FD_PATH}")
+    if limits is None:
+        limits = get_default_limits(timeout)
+    return translate(FD_PATH, domain_path, problem_path, workdir, timeout, use_cache=use_cache, limits=limits)
+
+
+def _solve_tracked(domain_path: str, problem_path: str, search: str, solve: Callable[[], list[str]],
+                   timeout: int, use_cache: bool, stats: PlannerStats) -> list[str]:
+    """Run solve() through the plan cache, recording the outcome in stats."""
+    ran = []
+    
+    def tracked_solve() -> list[str]:
+        ran.append(True)
+        return solve()
+    
+    try:
+        plan = solve_cached(domain_path, problem_path, search, tracked_solve, timeout=timeout, use_cache=use_cache)
+    except (PlannerFailure, subprocess.TimeoutExpired) as e:
+        stats.cached = not ran
+        stats.record_failure(e)
+        raise
+    stats.cached = not ran
+    stats.record_plan(plan)
+    return plan
+
+
+def run_fast_downward(domain_path: str, problem_path: str, timeout: int = None,
+                      search: str = DEFAULT_SEARCH, use_cache: bool = True,
+                      stats: Optional[PlannerStats] = None) -> list[str]:
+    """
+    Run Fast Downward planner to solve the problem.
+    
+    Results are looked up in and stored to the plan cache (see
+    planner_runner.plan_cache), keyed by the normalized domain text, the
+    problem in canonical form (object names do not matter) and the search
+    string. On a miss the translate stage runs first
+    (or loads cached translator output) and then only the search component,
+    each under the memory and CPU limits from planner_runner.limits.
     
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        timeout: Timeout in seconds for both stages together
+            (default: from environment or 300s)
+        search: Fast Downward --search configuration
+        use_cache: Set to False to bypass the plan and translation caches
+        stats: Filled with the stage timings, search statistics and outcome
+            (see planner_runner.stats), also when the planner fails
+        
+    Returns:
+        List of action strings
+        
+    Raises:
+        RuntimeError: If planner fails (PlannerFailure for planner exit codes)
+        subprocess.TimeoutExpired: If planner times out
+    """
     # Use provided timeout or get from environment/default
     if timeout is None:
         timeout = get_planner_timeout()
+    if stats is None:
+        stats = PlannerStats()
+    limits = get_default_limits(timeout)
     
-    # Create temporary file for plan output
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.plan') as tmp:
-        plan_file = Path(tmp.name)
+    def solve() -> list[str]:
+        start = time.perf_counter()
+        
+        # Each run gets a private working directory for output.sas and the
+        # plan file, so concurrent runs cannot clobber each other
+        with job_workdir() as workdir:
+            translation = translate_problem(domain_path, problem_path, workdir, timeout, use_cache, limits)
+            stats.record_translation(translation)
+            plan_file = workdir / "sas_plan"
+            
+            # Run the search component on the translator output
+            # Use the same Python interpreter that's running this script
+            cmd = [
+                sys.executable,
+                str(FD_PATH),
+                "--plan-file", str(plan_file),
+                str(translation.sas_file),
+                "--search", search
+            ]
+            
+            search_start = time.perf_counter()
+            result = run_job(cmd, workdir, timeout=remaining_time(timeout, start, cmd), limits=limits)
+            stats.record_search(time.perf_counter() - search_start, result.returncode, result.stdout)
+            
+            if result.returncode != 0:
+                raise PlannerFailure.from_exit_code(
+                    result.returncode,
+                    f"Planner failed:\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}"
+                )
+            
+            # Read plan from file
+            if not plan_file.exists():
+                return []
+            
+            actions = []
+            for line in plan_file.read_text().splitlines():
+                line = line.strip()
+                if line and not line.startswith(";"):
+                    actions.append(line)
+            
+            return actions
     
-    try:
-        # Run Fast Downward with A* and LM-cut heuristic
-        # Use the same Python interpreter that's running this script
-        cmd = [
-            sys.executable,
-            str(FD_PATH),
-            "--plan-file", str(plan_file),
-            domain_path,
-            problem_path,
-            "--search", "astar(lmcut())"
-        ]
+    return _solve_tracked(domain_path, problem_path, search, solve, timeout, use_cache, stats)
+
+
+def run_portfolio_planner(domain_path: str, problem_path: str, mode: str = "first",
+                          deadline: float = None, timeout: int = None,
+                          configs=DEFAULT_PORTFOLIO, use_cache: bool = True,
+                          stats: Optional[PlannerStats] = None) -> list[str]:
+    """
+    Run the Fast Downward search portfolio (see planner_runner.portfolio).
+    
+    The problem is translated once and every configuration searches the
+    same translator output.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        mode: "first" for the first plan found, "best" for the cheapest plan
+            found by the deadline
+        deadline: Seconds to keep collecting plans in "best" mode
+            (default: from environment, or until every configuration ends)
+        timeout: Timeout in seconds (default: from environment)
+        configs: Search configurations to run concurrently
+        use_cache: Set to False to bypass the plan and translation caches
+        stats: Filled with the stage timings, the winning configuration's
+            search statistics and the outcome
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+    Returns:
+        List of action strings
         
-        if result.returncode != 0:
-            raise RuntimeError(f"Planner failed:\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}")
+    Raises:
+        RuntimeError: If every configuration fails (PlannerFailure)
+        subprocess.TimeoutExpired: If no plan is found in time
+    """
+    if timeout is None:
+        timeout = get_planner_timeout()
+    if deadline is None:
+        deadline = get_portfolio_deadline()
+    if stats is None:
+        stats = PlannerStats()
+    limits = get_default_limits(timeout)
+    
+    def solve() -> list[str]:
+        start = time.perf_counter()
+        with job_workdir(prefix="translate-") as workdir:
+            translation = translate_problem(domain_path, problem_path, workdir, timeout, use_cache, limits)
+            stats.record_translation(translation)
+            search_timeout = remaining_time(timeout, start, [str(FD_PATH), "portfolio"])
+            result = run_portfolio(FD_PATH, domain_path, problem_path, configs, mode, deadline,
+                                   search_timeout, sas_file=translation.sas_file, limits=limits)
+        stats.record_search(result.elapsed, 0, result.log)
+        stats.config = result.config
+        stats.plan_cost = result.cost
+        print(f"Portfolio: plan of cost {result.cost} from {result.config} "
+              f"after {result.elapsed:.2f}s", file=sys.stderr)
+        return result.plan
+    
+    # The portfolio description stands in for the search string in the cache key
+    search = f"portfolio {mode} {deadline} | " + " | ".join(config.describe() for config in configs)
+    return _solve_tracked(domain_path, problem_path, search, solve, timeout, use_cache, stats)
+
+
+def iter_anytime_solutions(domain_path: str, problem_path: str, timeout: int = None,
+                           use_cache: bool = True, stats: Optional[PlannerStats] = None) -> Iterator[AnytimePlan]:
+    """
+    Run an anytime search, yielding each improved plan as soon as it is found.
+    
+    The translate stage runs (or is loaded from the translation cache)
+    before the iterated search starts. A search that runs to completion
+    stores its final plan in the plan cache; a cache hit yields that plan
+    once without running the planner.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        timeout: Timeout in seconds (default: from environment); the search
+            stops at the timeout and the last plan yielded is the best one
+        use_cache: Set to False to bypass the plan and translation caches
+        stats: Filled with the stage timings (search time up to the latest
+            plan), the latest plan's cost and the outcome
         
-        # Read plan from file
-        if not plan_file.exists():
-            return []
+    Yields:
+        AnytimePlan objects with strictly decreasing cost
         
-        actions = []
-        for line in plan_file.read_text().splitlines():
-            line = line.strip()
-            if line and not line.startswith(";"):
-                actions.append(line)
+    Raises:
+        RuntimeError: If the search ends without a plan (PlannerFailure)
+        subprocess.TimeoutExpired: If no plan is found in time
+    """
+    if timeout is None:
+        timeout = get_planner_timeout()
+    if stats is None:
+        stats = PlannerStats()
+    limits = get_default_limits(timeout)
+    
+    cache = get_default_plan_cache() if use_cache else None
+    key, canonical = None, None
+    if cache is not None:
+        key, canonical = cache.canonical_key_for_files(domain_path, problem_path,
+                                                       "anytime " + " ".join(ANYTIME_DRIVER_ARGS))
+        entry = cache.get(key)
+        if entry is not None and entry.get("status") == SOLVED:
+            cached_plan = canonical.decode_plan(entry["plan"]) if canonical else list(entry["plan"])
+            plan = AnytimePlan(cached_plan, entry.get("cost", len(entry["plan"])), 0, 0.0)
+            stats.cached = True
+            stats.record_plan(plan.plan)
+            stats.plan_cost = plan.cost
+            yield plan
+            return
+    
+    start = time.perf_counter()
+    best = None
+    try:
+        with job_workdir(prefix="translate-") as workdir:
+            translation = translate_problem(domain_path, problem_path, workdir, timeout, use_cache, limits)
+            stats.record_translation(translation)
+            search_timeout = remaining_time(timeout, start, [str(FD_PATH), "anytime"])
+            for plan in iter_anytime_plans(FD_PATH, domain_path, problem_path, timeout=search_timeout,
+                                           sas_file=translation.sas_file, limits=limits):
+                best = plan
+                stats.record_search(plan.elapsed)
+                stats.record_plan(plan.plan)
+                stats.plan_cost = plan.cost
+                yield plan
+    except (PlannerFailure, subprocess.TimeoutExpired) as e:
+        stats.record_failure(e)
+        raise
+    
+    # Only a search that ended on its own has proven no better plan exists
+    # within the configuration; a timed-out one depends on the time limit
+    if cache is not None and best is not None and time.perf_counter() - start < timeout:
+        cached_plan = canonical.encode_plan(best.plan) if canonical else best.plan
+        cache.put(key, {"status": SOLVED, "plan": cached_plan, "cost": best.cost})
+
+
+def run_anytime_planner(domain_path: str, problem_path: str, timeout: int = None,
+                        on_plan: Optional[Callable[[AnytimePlan], None]] = None,
+                        stats: Optional[PlannerStats] = None) -> list[str]:
+    """
+    Run an anytime search to the end (or the timeout) and return the best plan.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        timeout: Timeout in seconds (default: from environment)
+        on_plan: Called with every improved plan as it is found
+        stats: Filled with statistics (see iter_anytime_solutions)
         
-        return actions
+    Returns:
+        List of action strings of the cheapest plan found
+    """
+    best = None
+    for plan in iter_anytime_solutions(domain_path, problem_path, timeout, stats=stats):
+        best = plan
+        if on_plan is not None:
+            on_plan(plan)
+    return best.plan
+
+
+def run_builtin_planner(domain_path: str, problem_path: str, timeout: float = None,
+                        mode: str = OPTIMAL_MODE, stats: Optional[PlannerStats] = None) -> list[str]:
+    """
+    Solve a problem in process with the built-in planner.
+    
+    The problem is grounded and searched without starting Fast Downward
+    (see planner_runner.grounding and planner_runner.search), using the
+    search builtin_config() picks for the mode. Problems too large to
+    ground are searched lifted instead (planner_runner.lifted), with GBFS
+    and the goal count heuristic whatever the mode. The plan cache is not
+    used: for the problems this planner gets, solving costs about as much
+    as a lookup.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        timeout: Timeout in seconds (default: from environment)
+        mode: Planner mode the search is chosen for
+        stats: Filled with the grounding time (as the translate stage),
+            the search effort and the outcome
         
-    finally:
-        # Clean up temporary file
-        if plan_file.exists():
-            plan_file.unlink()
+    Returns:
+        List of action strings
+        
+    Raises:
+        RuntimeError: If the task is unsolvable (PlannerFailure)
+        subprocess.TimeoutExpired: If no plan is found in time
+        ValueError: If the domain uses conditional effects or derived predicates
+    """
+    if timeout is None:
+        timeout = get_planner_timeout()
+    if stats is None:
+        stats = PlannerStats()
+    start = time.perf_counter()
+    parser = PDDLParser(domain_path, problem_path)
+    lifted = estimate_size(parser).actions > MAX_GROUND_ACTIONS
+    algorithm, heuristic = ("gbfs", "goalcount") if lifted else builtin_config(mode)
+    stats.planner = BUILTIN_PLANNER
+    stats.config = describe_search(algorithm, heuristic)
+    
+    try:
+        task = LiftedTask(parser) if lifted else ground_task(parser)
+        grounding_time = time.perf_counter() - start
+        result = builtin_search(task, algorithm, heuristic, timeout=max(0.0, timeout - grounding_time))
+    except (PlannerFailure, subprocess.TimeoutExpired) as e:
+        stats.record_failure(e)
+        raise
+    stats.record_builtin(result, grounding_time)
+    stats.record_plan(result.plan)
+    return result.plan
 
 
 def get_fallback_plan(domain_name: str) -> list[str]:
@@ -143,25 +543,186 @@ def get_fallback_plan(domain_name: str) -> list[str]:
     return fallback_plans.get(domain_name, [])
 
 
-def solve_problem(domain_path: str, problem_path: str, domain_name: str = None, timeout: int = None) -> tuple[list[str], bool]:
+def run_decomposed_planner(domain_path: str, problem_path: str, timeout: int = None,
+                           use_cache: bool = True, stats: Optional[PlannerStats] = None) -> list[str]:
     """
-    Solve a planning problem using Fast Downward or fallback to predefined plan.
+    Solve independent goal groups separately and merge their plans.
+    
+    The goal is split into groups that barely interact, each group is
+    solved as its own subproblem with A* + LM-cut (concurrently, up to
+    PLANNER_DECOMPOSITION_WORKERS at a time) and the subplans are merged
+    and validated (see planner_runner.decomposition). If the goal does not
+    split or merging fails, the whole problem is solved with the
+    satisficing search instead, since A* is what it was too hard for.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        timeout: Timeout in seconds shared by all runs (default: from environment)
+        use_cache: Set to False to bypass the plan and translation caches
+        stats: Filled with the summed stage times and search effort of the
+            subproblems and the number of groups, or with the statistics of
+            the whole-problem run
+        
+    Returns:
+        List of action strings
+        
+    Raises:
+        RuntimeError: If the whole-problem run fails (PlannerFailure)
+        subprocess.TimeoutExpired: If the runs do not finish in time
+    """
+    if timeout is None:
+        timeout = get_planner_timeout()
+    if stats is None:
+        stats = PlannerStats()
+    if not FD_PATH.exists():
+        raise FileNotFoundError(f"Fast Downward not found at {FD_PATH}")
+    start = time.perf_counter()
+    parser = PDDLParser(domain_path, problem_path)
+    runs: list[PlannerStats] = []
+    
+    def solve(problem: Problem) -> list[str]:
+        run_stats = PlannerStats()
+        runs.append(run_stats)
+        with job_workdir(prefix="subproblem-") as workdir:
+            path = workdir / f"{problem.name}.pddl"
+            path.write_text(problem.to_pddl())
+            return run_fast_downward(domain_path, str(path), remaining_time(timeout, start, [str(FD_PATH)]),
+                                     DEFAULT_SEARCH, use_cache, run_stats)
+    
+    try:
+        result = solve_decomposed(parser, solve, get_decomposition_workers())
+    except DecompositionError as e:
+        print(f"Decomposition: {e}; solving the whole problem", file=sys.stderr)
+        return run_fast_downward(domain_path, problem_path, remaining_time(timeout, start, [str(FD_PATH)]),
+                                 SATISFICING_SEARCH, use_cache, stats)
+    
+    for run_stats in runs:
+        stats.add_subproblem(run_stats)
+    stats.cached = all(run_stats.cached for run_stats in runs)
+    stats.subproblems = result.groups
+    stats.repaired_subproblems = result.repaired
+    stats.search_wall_time = round(time.perf_counter() - start, 6)
+    stats.record_plan(result.plan)
+    print(f"Decomposition: {result.groups} goal groups, {result.repaired} solved again while merging",
+          file=sys.stderr)
+    return result.plan
+
+
+def _iter_mode_solutions(domain_path: str, problem_path: str, mode: str, timeout: int,
+                         stats: PlannerStats) -> Iterator[list[str]]:
+    """Run Fast Downward in a planner mode, yielding each plan it finds."""
+    if mode == ANYTIME_MODE:
+        for plan in iter_anytime_solutions(domain_path, problem_path, timeout, stats=stats):
+            yield plan.plan
+    elif mode == OPTIMAL_MODE:
+        yield run_fast_downward(domain_path, problem_path, timeout, stats=stats)
+    elif mode == SATISFICING_MODE:
+        yield run_fast_downward(domain_path, problem_path, timeout, SATISFICING_SEARCH, stats=stats)
+    elif mode == DECOMPOSE_MODE:
+        yield run_decomposed_planner(domain_path, problem_path, timeout, stats=stats)
+    else:
+        yield run_portfolio_planner(domain_path, problem_path, mode, timeout=timeout, stats=stats)
+
+
+def iter_solutions(domain_path: str, problem_path: str, domain_name: str = None, timeout: int = None,
+                   mode: str = None, stats: Optional[PlannerStats] = None) -> Iterator[tuple[list[str], bool]]:
+    """
+    Solve a planning problem, yielding every improved plan as it is found.
+    
+    Anytime mode yields each cheaper plan from the iterated search; the other
+    modes (and the fallback) yield exactly one plan.
+    
+    The problem's grounded size is estimated first (see
+    planner_runner.admission): large problems are solved with the cheap
+    satisficing search under a tighter timeout, and problems beyond the
+    limits are rejected before any planner starts. Problems estimated at
+    no more than PLANNER_BUILTIN_MAX_ACTIONS ground actions are solved in
+    process by the built-in planner (see run_builtin_planner), with Fast
+    Downward taking over if it runs out of its PLANNER_BUILTIN_TIMEOUT
+    budget. For Fast Downward, objects the goal cannot depend on are dropped (see planner_runner.relevance and
+    use_relevance_pruning); if the reduced problem turns out unsolvable,
+    the full problem is solved instead. Without Fast Downward (or when it
+    fails) the built-in planner solves the problem, and a predefined plan
+    for domain_name is the last resort.
     
     Args:
         domain_path: Path to domain PDDL file
         problem_path: Path to problem PDDL file
         domain_name: Optional domain name for fallback
         timeout: Optional timeout in seconds (default: from environment or 300s)
+        mode: One of PLANNER_MODES (default: from environment, "optimal")
+        stats: Filled with statistics of the planner run (see
+            planner_runner.stats), including when it fails
         
-    Returns:
-        Tuple of (plan actions, used_planner)
-        - plan actions: List of action strings
-        - used_planner: True if Fast Downward was used, False if fallback
+    Yields:
+        Tuples of (plan actions, used_planner), as returned by solve_problem
+        
+    Raises:
+        ProblemTooLarge: If admission control rejects the problem
     """
+    if stats is None:
+        stats = PlannerStats()
+    if mode is None:
+        mode = get_planner_mode()
+    
+    policy = AdmissionPolicy.from_environment()
+    decision = admit(domain_path, problem_path, policy)
+    stats.record_admission(decision)
+    if decision.verdict == REJECT:
+        raise ProblemTooLarge(decision.reason, decision.estimate)
+    if decision.verdict == DEGRADE:
+        print(f"Admission: {decision.reason}", file=sys.stderr)
+        mode = SATISFICING_MODE
+        timeout = min(timeout or get_planner_timeout(), policy.degraded_timeout)
+    stats.mode = mode
+    
+    found = False
+    if (decision.verdict == ACCEPT and decision.estimate is not None
+            and decision.estimate.actions <= get_builtin_max_actions()):
+        # Small enough to solve in process; Fast Downward takes over if
+        # the built-in search runs out of its time budget
+        start = time.perf_counter()
+        budget = min(timeout or get_planner_timeout(), get_builtin_timeout())
+        builtin_stats = copy.copy(stats)
+        try:
+            plan = run_builtin_planner(domain_path, problem_path, budget, mode, builtin_stats)
+        except subprocess.TimeoutExpired:
+            print(f"Built-in planner found no plan in {budget:g}s; running Fast Downward", file=sys.stderr)
+            timeout = remaining_time(timeout or get_planner_timeout(), start, ["builtin-planner"])
+        except ValueError as e:
+            print(f"Built-in planner cannot solve this problem ({e}); running Fast Downward", file=sys.stderr)
+        else:
+            vars(stats).update(vars(builtin_stats))
+            yield plan, True
+            return
+    
+    stats.planner = FAST_DOWNWARD_PLANNER
+    reduction = reduce_files(domain_path, problem_path) if use_relevance_pruning(mode) else None
+    stats.record_reduction(reduction)
+    
     try:
         # Try to run Fast Downward
-        actions = run_fast_downward(domain_path, problem_path, timeout)
-        return actions, True
+        if reduction is not None:
+            start = time.perf_counter()
+            try:
+                with job_workdir(prefix="reduced-") as workdir:
+                    reduced_path = workdir / Path(problem_path).name
+                    reduced_path.write_text(reduction.to_pddl())
+                    for plan in _iter_mode_solutions(domain_path, str(reduced_path), mode, timeout, stats):
+                        found = True
+                        yield reduction.map_plan(plan), True
+                return
+            except PlannerFailure as e:
+                if found or e.status != UNSOLVABLE:
+                    raise
+            print(f"Reduced problem (without {len(reduction.removed_objects)} objects) is unsolvable; "
+                  f"solving the full problem", file=sys.stderr)
+            stats.record_reduction(None)
+            timeout = remaining_time(timeout or get_planner_timeout(), start, [str(FD_PATH)])
+        for plan in _iter_mode_solutions(domain_path, problem_path, mode, timeout, stats):
+            found = True
+            yield plan, True
     except subprocess.TimeoutExpired as e:
         # Re-raise timeout errors with more context
         timeout_used = timeout if timeout else get_planner_timeout()
@@ -172,15 +733,53 @@ def solve_problem(domain_path: str, problem_path: str, domain_name: str = None,
                    f"For large problems, try increasing PLANNER_TIMEOUT environment variable."
         )
     except (FileNotFoundError, RuntimeError) as e:
-        # Fall back to predefined plan
-        print(f"Warning: Could not run Fast Downward ({e}). Using fallback plan.", file=sys.stderr)
+        if found:
+            raise
+        # Fall back to the built-in planner, then to a predefined plan
+        print(f"Warning: Could not run Fast Downward ({e}). Using the built-in planner.", file=sys.stderr)
+        try:
+            plan = run_builtin_planner(domain_path, problem_path, timeout, mode, stats)
+        except (PlannerFailure, subprocess.TimeoutExpired, ValueError) as builtin_error:
+            if getattr(builtin_error, 'status', None) == UNSOLVABLE:
+                raise
+            print(f"Warning: Built-in planner failed ({builtin_error}). Using fallback plan.", file=sys.stderr)
+        else:
+            yield plan, True
+            return
         if domain_name:
             actions = get_fallback_plan(domain_name)
-            return actions, False
+            yield actions, False
         else:
             raise RuntimeError("Fast Downward not available and no domain name provided for fallback")
 
 
+def solve_problem(domain_path: str, problem_path: str, domain_name: str = None, timeout: int = None,
+                  mode: str = None, stats: Optional[PlannerStats] = None) -> tuple[list[str], bool]:
+    """
+    Solve a planning problem with the built-in planner or Fast Downward, or fall back to a predefined plan.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        domain_name: Optional domain name for fallback
+        timeout: Optional timeout in seconds (default: from environment or 300s)
+        mode: One of PLANNER_MODES (default: from environment, "optimal");
+            in anytime mode the best plan found by the end of the search
+        stats: Filled with statistics of the Fast Downward run (see
+            planner_runner.stats), including when it fails
+        
+    Returns:
+        Tuple of (plan actions, used_planner)
+        - plan actions: List of action strings
+        - used_planner: True if a planner found the plan, False if it is
+          the predefined fallback
+    """
+    result = None
+    for result in iter_solutions(domain_path, problem_path, domain_name, timeout, mode, stats):
+        pass
+    return result
+
+
 def main():
     """CLI interface for testing."""
     if len(sys.argv) < 3:
@@ -195,10 +794,17 @@ def main():
     timeout = int(sys.argv[4]) if len(sys.argv) > 4 else None
     
     try:
-        actions, used_planner = solve_problem(domain_path, problem_path, domain_name, timeout)
+        stats = PlannerStats()
+        actions, used_planner = solve_problem(domain_path, problem_path, domain_name, timeout, stats=stats)
         
-        print(f"Planner: {'Fast Downward' if used_planner else 'Fallback'}")
+        print(f"Planner: {describe_planner(stats) if used_planner else 'Fallback'}")
         print(f"Timeout: {timeout if timeout else get_planner_timeout()} seconds")
+        for stage, summary in stats.stages().items():
+            print(f"{stage.capitalize()} stage: {summary['time']:.3f}s"
+                  + (" (cached)" if summary.get("cached") else ""))
+        if stats.expanded is not None:
+            print(f"Expanded: {stats.expanded}, generated: {stats.generated}, "
+                  f"peak memory: {stats.peak_memory_kb} KB")
         print(f"Plan length: {len(actions)}")
         print("Actions:")
         for i, action in enumerate(actions, 1):
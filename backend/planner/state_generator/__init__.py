@@ -2,7 +2,8 @@
 State Generator module for PDDL planning visualization.
 """
 
-from .pddl_parser import PDDLParser, Predicate, Action
+from .pddl_parser import PDDLParser, Domain, Problem, Predicate, Action
 from .state_generator import StateGenerator
+from .parse_cache import ParseCache
 
-__all__ = ['PDDLParser', 'Predicate', 'Action', 'StateGenerator']
+__all__ = ['PDDLParser', 'Domain', 'Problem', 'Predicate', 'Action', 'StateGenerator', 'ParseCache']
@@ -0,0 +1,432 @@
+"""
+Axiom Evaluator - derived predicates as stratified Datalog.
+
+Each Axiom is a rule ``head :- body`` whose body is a conjunction of
+literals. Derived predicates are split into strata so that a predicate
+only depends negatively on predicates of lower strata (a domain where
+that is impossible is rejected); the strata are then evaluated in order,
+each to a fixpoint.
+
+The evaluator keeps its own indexed copy of the current state and
+maintains it across steps instead of re-deriving everything:
+
+- the first state is evaluated semi-naively: every rule once against
+  the state, then only the rules touching a fact new in the last round,
+  with that fact bound to the touching atom
+- after an action, update() takes the action's added and removed facts
+  and repairs each stratum with delete-and-rederive: derived facts with
+  a derivation through a removed fact (or through the absence of an
+  added one) are over-deleted, those still derivable another way are
+  put back, and the insertions are then propagated semi-naively
+
+The work per step therefore follows the derivations the change touches,
+not the size of the state, so replaying a long plan stays linear.
+"""
+
+from itertools import product
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .pddl_parser import Axiom
+from .facts import Fact
+
+# An atom of a rule: (predicate, params); params are variables or constants
+_Atom = Tuple[str, Tuple[str, ...]]
+
+
+class _Rule:
+    """An axiom prepared for evaluation."""
+
+    def __init__(self, axiom: Axiom, objects_of: Dict[str, set]):
+        typed = axiom.parameters + axiom.variables
+        self.name = axiom.name
+        self.head = tuple(var for var, _ in axiom.parameters)
+        self.variables = [var for var, _ in typed]
+        self.domains = {var: objects_of.get(var_type, set()) for var, var_type in typed}
+        self.sorted_domains = {var: sorted(objects) for var, objects in self.domains.items()}
+        self.positive: List[_Atom] = [(pred.name, tuple(pred.params)) for positive, pred in axiom.condition
+                                      if positive and pred.name != '=']
+        self.negative: List[_Atom] = [(pred.name, tuple(pred.params)) for positive, pred in axiom.condition
+                                      if not positive and pred.name != '=']
+        self.equalities = [(positive, tuple(pred.params)) for positive, pred in axiom.condition
+                           if pred.name == '=']
+        for _, pred in axiom.condition:
+            for param in pred.params:
+                if param.startswith('?') and param not in self.domains:
+                    raise ValueError(f"Undeclared variable {param} in derived predicate {axiom.name}")
+
+
+class _Stratum:
+    """The rules of one stratum, indexed by the predicates their bodies use."""
+
+    def __init__(self, rules: List[_Rule]):
+        self.rules = rules
+        self.by_head: Dict[str, List[_Rule]] = {}
+        # predicate -> [(rule, atom position)] over positive / negative atoms
+        self.positive_uses: Dict[str, List[Tuple[_Rule, int]]] = {}
+        self.negative_uses: Dict[str, List[Tuple[_Rule, int]]] = {}
+        for rule in rules:
+            self.by_head.setdefault(rule.name, []).append(rule)
+            for position, (name, _) in enumerate(rule.positive):
+                self.positive_uses.setdefault(name, []).append((rule, position))
+            for position, (name, _) in enumerate(rule.negative):
+                self.negative_uses.setdefault(name, []).append((rule, position))
+
+
+class _Relations:
+    """
+    A set of facts indexed by predicate and by (predicate, position, object).
+
+    Position indexes are built on first use and then kept up to date by
+    add() and remove().
+    """
+
+    def __init__(self, facts: Iterable[Fact] = ()):
+        self.relations: Dict[str, Set[Tuple[str, ...]]] = {}
+        self.indexes: Dict[Tuple[str, int], Dict[str, Set[Tuple[str, ...]]]] = {}
+        for fact in facts:
+            self.add(fact)
+
+    def __contains__(self, fact: Fact) -> bool:
+        name, args = fact
+        return args in self.relations.get(name, ())
+
+    def add(self, fact: Fact) -> bool:
+        """Add a fact; returns False if it was already present."""
+        name, args = fact
+        relation = self.relations.setdefault(name, set())
+        if args in relation:
+            return False
+        relation.add(args)
+        for position, arg in enumerate(args):
+            index = self.indexes.get((name, position))
+            if index is not None:
+                index.setdefault(arg, set()).add(args)
+        return True
+
+    def remove(self, fact: Fact) -> bool:
+        """Remove a fact; returns False if it was not present."""
+        name, args = fact
+        relation = self.relations.get(name)
+        if not relation or args not in relation:
+            return False
+        relation.discard(args)
+        for position, arg in enumerate(args):
+            index = self.indexes.get((name, position))
+            if index is not None:
+                index[arg].discard(args)
+        return True
+
+    def _index(self, name: str, position: int) -> Dict[str, Set[Tuple[str, ...]]]:
+        index = self.indexes.get((name, position))
+        if index is None:
+            index = self.indexes[(name, position)] = {}
+            for args in self.relations.get(name, ()):
+                index.setdefault(args[position], set()).add(args)
+        return index
+
+    def candidates(self, atom: _Atom, binding: Dict[str, str]) -> Tuple[int, Set[Tuple[str, ...]]]:
+        """
+        Facts that may match an atom under a partial binding.
+
+        Returns:
+            Tuple of (number of bound arguments, candidate fact args); the
+            smallest index set over the bound arguments is used
+        """
+        name, params = atom
+        bound = 0
+        best = None
+        for position, param in enumerate(params):
+            value = binding.get(param, None if param.startswith('?') else param)
+            if value is not None:
+                bound += 1
+                matches = self._index(name, position).get(value, ())
+                if best is None or len(matches) < len(best):
+                    best = matches
+        return bound, best if best is not None else self.relations.get(name, ())
+
+
+def _bind(rule: _Rule, params: Tuple[str, ...], args: Tuple[str, ...],
+          binding: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Extend a binding so that params match args, or None if they cannot."""
+    if len(params) != len(args):
+        return None
+    extended = dict(binding)
+    domains = rule.domains
+    for param, arg in zip(params, args):
+        if param.startswith('?'):
+            if extended.setdefault(param, arg) != arg or arg not in domains[param]:
+                return None
+        elif param != arg:
+            return None
+    return extended
+
+
+def _join(rule: _Rule, atoms: List[_Atom], binding: Dict[str, str],
+          sources: Tuple[_Relations, ...]) -> Iterator[Dict[str, str]]:
+    """
+    Extend a binding through positive atoms matched against the union of sources.
+
+    The next atom joined is the one with the most bound arguments, ties
+    broken by the fewest candidate facts.
+    """
+    if not atoms:
+        yield binding
+        return
+    choice = None
+    for position, atom in enumerate(atoms):
+        bound = 0
+        found = []
+        for source in sources:
+            bound, candidates = source.candidates(atom, binding)
+            found.append(candidates)
+        key = (-bound, sum(len(candidates) for candidates in found))
+        if choice is None or key < choice[0]:
+            choice = key, position, atom, found
+    _, position, (_, params), found = choice
+    rest = atoms[:position] + atoms[position + 1:]
+    for candidates in found:
+        for args in candidates:
+            extended = _bind(rule, params, args, binding)
+            if extended is not None:
+                yield from _join(rule, rest, extended, sources)
+
+
+class AxiomEvaluator:
+    """
+    Computes and maintains the derived facts of a state.
+
+    Facts are (name, args) tuples; StateGenerator converts to and from
+    fact ids. Call closure() for the first state and update() with the
+    effect delta of every action applied after it.
+    """
+
+    def __init__(self, axioms: List[Axiom], objects_of: Dict[str, set]):
+        """
+        Prepare the axioms and stratify them.
+
+        Args:
+            axioms: Rules of the derived predicates
+            objects_of: Objects by type (PDDLParser.objects_by_type())
+
+        Raises:
+            ValueError: If a derived predicate depends negatively on itself
+        """
+        rules = [_Rule(axiom, objects_of) for axiom in axioms]
+        self.derived: Set[str] = {rule.name for rule in rules}
+        levels = self._stratify(rules)
+        self.strata = [_Stratum([rule for rule in rules if levels[rule.name] == level])
+                       for level in sorted(set(levels.values()))]
+        self.store = _Relations()
+
+    def _stratify(self, rules: List[_Rule]) -> Dict[str, int]:
+        """Assign each derived predicate the lowest stratum its dependencies allow."""
+        levels = {name: 0 for name in self.derived}
+        changed = True
+        while changed:
+            changed = False
+            for rule in rules:
+                level = levels[rule.name]
+                for name, _ in rule.positive:
+                    level = max(level, levels.get(name, 0))
+                for name, _ in rule.negative:
+                    if name in levels:
+                        level = max(level, levels[name] + 1)
+                if level > len(levels):
+                    raise ValueError(f"Derived predicate {rule.name} is not stratifiable: "
+                                     "it depends negatively on itself")
+                if level != levels[rule.name]:
+                    levels[rule.name] = level
+                    changed = True
+        return levels
+
+    def closure(self, facts: Iterable[Fact]) -> List[Fact]:
+        """
+        Start from a state and derive all of its derived facts.
+
+        Facts of derived predicates in the input are ignored.
+
+        Args:
+            facts: Facts of the state
+
+        Returns:
+            The derived facts that hold in it
+        """
+        derived = self.derived
+        self.store = store = _Relations(fact for fact in facts if fact[0] not in derived)
+        result: List[Fact] = []
+        for stratum in self.strata:
+            new = []
+            for rule in stratum.rules:
+                new.extend(self._heads(rule, (store,), True))
+            delta = [fact for fact in new if store.add(fact)]
+            result.extend(delta)
+            result.extend(self._propagate(stratum, delta, (), ()))
+        return result
+
+    def load(self, facts: Iterable[Fact]):
+        """Start from a state whose derived facts are already known, without deriving."""
+        self.store = _Relations(facts)
+
+    def update(self, added: Iterable[Fact], removed: Iterable[Fact]) -> Tuple[List[Fact], List[Fact]]:
+        """
+        Apply an action's effect delta and repair the derived facts.
+
+        Args:
+            added: Facts the action made true (none of them derived)
+            removed: Facts the action made false
+
+        Returns:
+            Tuple of (derived facts now true, derived facts now false)
+        """
+        store = self.store
+        inserted = [fact for fact in added if store.add(fact)]
+        deleted = [fact for fact in removed if store.remove(fact)]
+        # Facts no longer true, indexed: over-deletion matches old derivations against them
+        gone = _Relations(deleted)
+        derived_added: List[Fact] = []
+        derived_removed: List[Fact] = []
+        for stratum in self.strata:
+            over = self._overdelete(stratum, inserted, deleted, gone)
+            for fact in over:
+                store.remove(fact)
+            rederived = [fact for fact in over if self._derivable(stratum, fact)]
+            for fact in rederived:
+                store.add(fact)
+            new = self._propagate(stratum, rederived, inserted, deleted)
+            removed_here = [fact for fact in over if fact not in store]
+            added_here = [fact for fact in new if fact not in over]
+            for fact in removed_here:
+                gone.add(fact)
+            inserted.extend(added_here)
+            deleted.extend(removed_here)
+            derived_added.extend(added_here)
+            derived_removed.extend(removed_here)
+        return derived_added, derived_removed
+
+    def _overdelete(self, stratum: _Stratum, inserted: List[Fact], deleted: List[Fact],
+                    gone: _Relations) -> Set[Fact]:
+        """
+        Find the stratum's facts with a derivation that may no longer hold.
+
+        Bodies are matched against the current facts plus the removed
+        ones and negative literals are not checked, which over-approximates
+        the derivations of the previous state.
+        """
+        store = self.store
+        sources = (store, gone)
+        over: Set[Fact] = set()
+        frontier: List[Fact] = []
+
+        def collect(heads: List[Fact]):
+            for head in heads:
+                if head not in over and head in store:
+                    over.add(head)
+                    frontier.append(head)
+
+        for fact in deleted:
+            for rule, position in stratum.positive_uses.get(fact[0], ()):
+                collect(list(self._heads(rule, sources, False, (position, False, fact))))
+        for fact in inserted:
+            for rule, position in stratum.negative_uses.get(fact[0], ()):
+                collect(list(self._heads(rule, sources, False, (position, True, fact))))
+        while frontier:
+            fact = frontier.pop()
+            for rule, position in stratum.positive_uses.get(fact[0], ()):
+                collect(list(self._heads(rule, sources, False, (position, False, fact))))
+        return over
+
+    def _derivable(self, stratum: _Stratum, fact: Fact) -> bool:
+        """Check whether some rule of the stratum derives a fact from the current facts."""
+        name, args = fact
+        for rule in stratum.by_head.get(name, ()):
+            binding = _bind(rule, rule.head, args, {})
+            if binding is None:
+                continue
+            for _ in self._complete(rule, _join(rule, rule.positive, binding, (self.store,)), True):
+                return True
+        return False
+
+    def _propagate(self, stratum: _Stratum, delta: List[Fact], inserted: Iterable[Fact],
+                   deleted: Iterable[Fact]) -> List[Fact]:
+        """
+        Derive the stratum's facts that follow from changes, to a fixpoint.
+
+        Rules are only fired with a changed fact bound to one of their
+        atoms: an inserted or new fact to a positive atom, a deleted fact
+        to a negative one. New facts are added to the store.
+
+        Args:
+            stratum: Stratum to evaluate
+            delta: Facts of this stratum just added to the store
+            inserted: Facts of lower strata (or the state) that became true
+            deleted: Facts of lower strata (or the state) that became false
+
+        Returns:
+            The facts added to the store
+        """
+        store = self.store
+        sources = (store,)
+        new: List[Fact] = []
+        heads: List[Fact] = []
+        for fact in inserted:
+            for rule, position in stratum.positive_uses.get(fact[0], ()):
+                heads.extend(self._heads(rule, sources, True, (position, False, fact)))
+        for fact in deleted:
+            for rule, position in stratum.negative_uses.get(fact[0], ()):
+                heads.extend(self._heads(rule, sources, True, (position, True, fact)))
+        frontier = list(delta)
+        while True:
+            for head in heads:
+                if store.add(head):
+                    new.append(head)
+                    frontier.append(head)
+            if not frontier:
+                return new
+            heads = []
+            fact = frontier.pop()
+            for rule, position in stratum.positive_uses.get(fact[0], ()):
+                heads.extend(self._heads(rule, sources, True, (position, False, fact)))
+
+    def _heads(self, rule: _Rule, sources: Tuple[_Relations, ...], check: bool,
+               seed: Optional[Tuple[int, bool, Fact]] = None) -> Iterator[Fact]:
+        """
+        Derive heads of a rule.
+
+        Args:
+            rule: Rule to fire
+            sources: Fact sets the positive atoms are matched against
+            check: Whether negative literals are checked against the store
+            seed: Optional (atom position, negative, fact) binding one atom
+                to a fact before the join
+        """
+        atoms = rule.positive
+        binding: Optional[Dict[str, str]] = {}
+        if seed is not None:
+            position, negative, (_, args) = seed
+            binding = _bind(rule, (rule.negative if negative else rule.positive)[position][1], args, {})
+            if binding is None:
+                return
+            if not negative:
+                atoms = atoms[:position] + atoms[position + 1:]
+        name = rule.name
+        head = rule.head
+        for full in self._complete(rule, _join(rule, atoms, binding, sources), check):
+            yield name, tuple([full[var] for var in head])
+
+    def _complete(self, rule: _Rule, bindings: Iterator[Dict[str, str]], check: bool) -> Iterator[Dict[str, str]]:
+        """Bind the variables no positive atom bound by type, then filter by the remaining literals."""
+        store = self.store
+        for binding in bindings:
+            free = [var for var in rule.variables if var not in binding]
+            if free:
+                completions = (dict(binding, **dict(zip(free, values)))
+                               for values in product(*(rule.sorted_domains[var] for var in free)))
+            else:
+                completions = (binding,)
+            for full in completions:
+                if any((full.get(a, a) == full.get(b, b)) != positive for positive, (a, b) in rule.equalities):
+                    continue
+                if check and any((name, tuple([full.get(p, p) for p in params])) in store
+                                 for name, params in rule.negative):
+                    continue
+                yield full
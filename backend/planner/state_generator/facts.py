@@ -0,0 +1,230 @@
+"""
+Fact Table - interns ground atoms as integer ids and encodes states as bitmasks.
+
+A state is a Python int whose bit ``i`` is set when fact ``i`` holds.
+Precondition checks and effect application then become a handful of
+integer mask operations instead of hashing Predicate objects.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .pddl_parser import Predicate
+
+# A ground atom in interned form: (predicate_name, (param, ...))
+Fact = Tuple[str, Tuple[str, ...]]
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Iterate over the indices of set bits in a mask, lowest first.
+
+    Scans the binary string representation with str.find, which is much
+    faster than shifting a large int one bit at a time.
+
+    Args:
+        mask: Non-negative integer bitmask
+
+    Yields:
+        Indices of set bits
+    """
+    bits = bin(mask)[:1:-1]  # reversed, without the '0b' prefix
+    i = bits.find('1')
+    while i != -1:
+        yield i
+        i = bits.find('1', i + 1)
+
+
+def ids_mask(fact_ids: Iterable[int]) -> int:
+    """Build a bitmask with the given fact ids set."""
+    mask = 0
+    for fact_id in fact_ids:
+        mask |= 1 << fact_id
+    return mask
+
+
+class FactTable:
+    """
+    Maps ground atoms to consecutive integer ids and back.
+
+    Ids are assigned on first use and never change, so masks built at
+    any point stay valid as the table grows.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Fact, int] = {}
+        self._facts: List[Fact] = []
+        self._predicates: List[Optional[Predicate]] = []
+
+    def __len__(self) -> int:
+        return len(self._facts)
+
+    def intern(self, name: str, params: Tuple[str, ...]) -> int:
+        """
+        Get the id of a ground atom, assigning a new id if it is unseen.
+
+        Args:
+            name: Predicate name
+            params: Tuple of object names
+
+        Returns:
+            Fact id
+        """
+        key = (name, params)
+        fact_id = self._ids.get(key)
+        if fact_id is None:
+            fact_id = len(self._facts)
+            self._ids[key] = fact_id
+            self._facts.append(key)
+            self._predicates.append(None)
+        return fact_id
+
+    def lookup(self, name: str, params: Tuple[str, ...]) -> Optional[int]:
+        """Get the id of a ground atom without interning it (None if unseen)."""
+        return self._ids.get((name, params))
+
+    def fact(self, fact_id: int) -> Fact:
+        """Get the (name, params) atom for a fact id."""
+        return self._facts[fact_id]
+
+    def predicate(self, fact_id: int) -> Predicate:
+        """
+        Get the Predicate for a fact id.
+
+        Predicate objects are created once per fact and shared by every
+        decoded state; callers must not mutate them.
+        """
+        pred = self._predicates[fact_id]
+        if pred is None:
+            name, params = self._facts[fact_id]
+            pred = Predicate(name, list(params))
+            self._predicates[fact_id] = pred
+        return pred
+
+    def mask(self, fact_ids: Iterable[int]) -> int:
+        """Build a bitmask with the given fact ids set."""
+        return ids_mask(fact_ids)
+
+    def encode(self, predicates: Iterable[Predicate]) -> int:
+        """
+        Encode a set of predicates as a bitmask, interning unseen atoms.
+
+        Args:
+            predicates: Ground predicates
+
+        Returns:
+            State bitmask
+        """
+        return self.mask(self.intern(pred.name, tuple(pred.params)) for pred in predicates)
+
+    def decode(self, mask: int) -> Set[Predicate]:
+        """
+        Decode a bitmask into a set of predicates.
+
+        Args:
+            mask: State bitmask
+
+        Returns:
+            Set of Predicate objects
+        """
+        predicate = self.predicate
+        return {predicate(fact_id) for fact_id in iter_bits(mask)}
+
+
+@dataclass(frozen=True)
+class GroundAction:
+    """
+    An action instance compiled to fact ids.
+
+    Ids are kept as tuples rather than masks: a mask is as wide as the
+    largest fact id, so caching masks for thousands of distinct actions
+    over a large fact table would cost far more memory than the states.
+    Masks are built on demand from the few ids involved.
+
+    Conditional effects are already expanded over their forall variables:
+    each entry is one ground instance, whose condition is tested against
+    the state the action is applied in.
+
+    Attributes:
+        name: Grounded action string, e.g. "(move rooma roomb)"
+        pre_pos: Facts that must hold
+        pre_neg: Facts that must not hold
+        add: Facts made true
+        delete: Facts made false
+        conditional: (cond_pos, cond_neg, add, delete) per conditional effect
+    """
+    name: str
+    pre_pos: Tuple[int, ...]
+    pre_neg: Tuple[int, ...]
+    add: Tuple[int, ...]
+    delete: Tuple[int, ...]
+    conditional: Tuple[Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]], ...] = ()
+
+    def is_applicable(self, mask: int) -> bool:
+        """Check the preconditions against a state mask."""
+        positive = ids_mask(self.pre_pos)
+        return mask & positive == positive and not mask & ids_mask(self.pre_neg)
+
+    def effects(self, mask: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Get the facts the action adds and deletes in a state.
+
+        Returns:
+            Tuple of (add ids, delete ids), including the conditional
+            effects whose condition holds in the state
+        """
+        if not self.conditional:
+            return self.add, self.delete
+        return self._fired(bin(mask)[:1:-1])
+
+    def _fired(self, bits: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Collect the effects under a state given as a reversed binary string.
+
+        Testing a bit of a wide int costs a shift of the whole int; the
+        string is built once per state and then indexed in constant time.
+        """
+        width = len(bits)
+        add = list(self.add)
+        delete = list(self.delete)
+        for cond_pos, cond_neg, cond_add, cond_delete in self.conditional:
+            for i in cond_pos:
+                if i >= width or bits[i] == '0':
+                    break
+            else:
+                for i in cond_neg:
+                    if i < width and bits[i] == '1':
+                        break
+                else:
+                    add.extend(cond_add)
+                    delete.extend(cond_delete)
+        return tuple(add), tuple(delete)
+
+    def apply(self, mask: int) -> int:
+        """Apply the effects (deletes first, then adds) to a state mask."""
+        add, delete = self.effects(mask)
+        return (mask & ~ids_mask(delete)) | ids_mask(add)
+
+    def changes(self, mask: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Get the facts that apply() would actually add and remove in a state.
+
+        Only the action's own ids are tested, which is much cheaper than
+        diffing two wide state masks. The state after the action is
+        ``(mask | ids_mask(added)) & ~ids_mask(removed)``.
+
+        Returns:
+            Tuple of (added fact ids, removed fact ids)
+        """
+        if not self.conditional:
+            added = tuple(i for i in self.add if not mask >> i & 1)
+            removed = tuple(i for i in self.delete if mask >> i & 1 and i not in self.add)
+            return added, removed
+        bits = bin(mask)[:1:-1]
+        width = len(bits)
+        add, delete = self._fired(bits)
+        add_set = set(add)
+        # Effects that fired together may repeat a fact
+        added = tuple(dict.fromkeys(i for i in add if i >= width or bits[i] == '0'))
+        removed = tuple(dict.fromkeys(i for i in delete if i < width and bits[i] == '1' and i not in add_set))
+        return added, removed
@@ -0,0 +1,179 @@
+"""
+Parse Cache - on-disk cache of parsed PDDL domains and problems.
+
+Entries are keyed by the SHA-256 of the file contents, so a cache hit
+never depends on file paths or modification times. Each entry is a
+single marshal file holding plain tuples, lists and dicts (loading it
+cannot execute code, and it is much faster to load than pickled
+dataclasses); the directory is kept under a size limit by evicting the
+least recently used entries.
+"""
+
+import hashlib
+import os
+import marshal
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# Bump when the layout of cached parse results changes
+CACHE_FORMAT_VERSION = 6
+
+# Cache location and size limit can be overridden via environment variables.
+# Setting PDDL_PARSE_CACHE_DIR to an empty string disables the cache.
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "planning-visualizer" / "parse-cache"
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+_ENTRY_SUFFIX = ".marshal"
+
+
+class ParseCache:
+    """
+    Size-bounded LRU cache of parse results stored as marshal files.
+
+    Recency is tracked through file modification times: a hit touches the
+    entry, and eviction removes the oldest entries first.
+    """
+
+    # Used in warning messages
+    description = "parse cache"
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries (created on demand)
+            max_bytes: Total size limit for all entries
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def content_key(kind: str, text: str) -> str:
+        """
+        Compute the cache key for a PDDL file.
+
+        Args:
+            kind: Kind of parse result ('domain' or 'problem')
+            text: File contents
+
+        Returns:
+            Hex digest identifying the parse result
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_FORMAT_VERSION}:{kind}:".encode())
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Load a cached value.
+
+        Args:
+            key: Cache key from content_key()
+
+        Returns:
+            The cached value, or None on a miss or unreadable entry
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Corrupt or incompatible entry - drop it and re-parse
+            print(f"Warning: Discarding unreadable {self.description} entry {path.name} ({e})", file=sys.stderr)
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any):
+        """
+        Store a value and evict old entries if the size limit is exceeded.
+
+        Failures to write are reported on stderr and otherwise ignored, so a
+        read-only or full disk never breaks the caller.
+
+        Args:
+            key: Cache key from content_key()
+            value: Parse result made of builtin types (tuples, lists, dicts, str, ...)
+        """
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial entries
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(marshal.dumps(value))
+            os.replace(tmp_name, self._entry_path(key))
+        except Exception as e:
+            print(f"Warning: Could not write {self.description} entry ({e})", file=sys.stderr)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all cache entries."""
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def get_default_cache() -> Optional[ParseCache]:
+    """
+    Get the process-wide parse cache configured from the environment.
+
+    PDDL_PARSE_CACHE_DIR sets the cache directory (empty disables caching),
+    PDDL_PARSE_CACHE_MAX_BYTES sets the size limit.
+
+    Returns:
+        ParseCache instance, or None if caching is disabled
+    """
+    cache_dir = os.environ.get('PDDL_PARSE_CACHE_DIR', str(DEFAULT_CACHE_DIR))
+    if not cache_dir:
+        return None
+
+    try:
+        max_bytes = int(os.environ.get('PDDL_PARSE_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES))
+    except (ValueError, TypeError):
+        max_bytes = DEFAULT_CACHE_MAX_BYTES
+
+    return ParseCache(Path(cache_dir), max_bytes)
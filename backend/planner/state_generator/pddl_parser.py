@@ -1,11 +1,136 @@
 """
 PDDL Parser for Domain and Problem files.
-Extracts objects, initial state, actions with preconditions and effects.
+Extracts objects, initial state, actions with preconditions and effects
+(including conditional and universally quantified ones), and the rules of
+derived predicates (axioms).
+
+Files are read in a single pass into a nested S-expression tree
+(lists of tokens and sub-lists); the domain and problem section
+handlers then walk the subtrees they own instead of re-scanning a
+flat token list.
+
+Domains and problems are parsed independently into Domain and Problem
+objects, so one parsed domain can be bound to any number of problems.
+PDDLParser binds one of each and exposes their combined attributes.
 """
 
+import gc
 import re
-from dataclasses import dataclass
-from typing import List, Set, Dict, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Set, Dict, Tuple, Union, Optional
+
+from .parse_cache import ParseCache, get_default_cache
+
+
+# A parsed S-expression: either an atom (token) or a list of S-expressions
+SExpr = Union[str, list]
+
+_COMMENT_RE = re.compile(r';[^\n]*')
+
+# Effects on numeric fluents, such as (increase (total-cost) 1)
+NUMERIC_EFFECTS = frozenset({'increase', 'decrease', 'assign', 'scale-up', 'scale-down'})
+
+
+def read_sexpr(text: str) -> List[SExpr]:
+    """
+    Read PDDL text into a nested list tree in a single pass.
+
+    Comments (``;`` to end of line) are dropped. The reader uses an
+    explicit stack, so deeply nested expressions cannot hit Python's
+    recursion limit.
+
+    Example: "(define (domain d))" -> [['define', ['domain', 'd']]]
+
+    Args:
+        text: PDDL source text
+
+    Returns:
+        List of top-level expressions
+
+    Raises:
+        ValueError: If parentheses are unbalanced
+    """
+    text = _COMMENT_RE.sub('', text).replace('(', ' ( ').replace(')', ' ) ')
+
+    stack: List[list] = []
+    current: list = []
+    push = stack.append
+    pop = stack.pop
+    for token in text.split():
+        if token == '(':
+            push(current)
+            current = []
+        elif token == ')':
+            if not stack:
+                raise ValueError("Unbalanced ')' in PDDL input")
+            parent = pop()
+            parent.append(current)
+            current = parent
+        else:
+            current.append(token)
+
+    if stack:
+        raise ValueError("Unbalanced '(' in PDDL input: missing ')'")
+    return current
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector while building parse results.
+
+    Parsing allocates hundreds of thousands of small acyclic lists and
+    predicates; letting the collector repeatedly scan them makes large
+    problems scale super-linearly.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def parse_typed_list(items: List[SExpr], default_type: str = 'object') -> List[Tuple[str, str]]:
+    """
+    Parse a PDDL typed list such as ``a b - block c - ball d``.
+
+    Names without an explicit type get ``default_type``.
+    ``(either t1 t2)`` types are reduced to their first alternative.
+
+    Args:
+        items: Tokens of the typed list
+        default_type: Type for names that are not followed by '- type'
+
+    Returns:
+        List of (name, type) pairs in source order
+    """
+    result: List[Tuple[str, str]] = []
+    pending: List[str] = []
+    i = 0
+    n = len(items)
+    while i < n:
+        item = items[i]
+        if item == '-':
+            if i + 1 >= n:
+                raise ValueError("Typed list ends with '-' but no type")
+            type_expr = items[i + 1]
+            if isinstance(type_expr, list):
+                # (either t1 t2 ...) - keep the first alternative
+                type_name = type_expr[1] if len(type_expr) > 1 else default_type
+            else:
+                type_name = type_expr
+            result.extend((name, type_name) for name in pending)
+            pending = []
+            i += 2
+        else:
+            if isinstance(item, str):
+                pending.append(item)
+            i += 1
+    result.extend((name, default_type) for name in pending)
+    return result
 
 
 @dataclass
@@ -13,415 +138,659 @@ class Predicate:
     """Represents a predicate with name and parameters."""
     name: str
     params: List[str]
-    
+
     def __str__(self):
         if self.params:
             return f"({self.name} {' '.join(self.params)})"
         return f"({self.name})"
-    
+
     def __hash__(self):
         return hash((self.name, tuple(self.params)))
-    
+
     def __eq__(self, other):
         return self.name == other.name and self.params == other.params
 
 
+@dataclass
+class ConditionalEffect:
+    """
+    Effects under ``forall`` and/or ``when`` in an action's effect.
+
+    ``(forall (?x - t) (when cond eff))`` becomes one ConditionalEffect
+    with the forall variables, the condition and the effect literals; a
+    forall without when has an empty condition, a when outside any
+    forall has no variables.
+    """
+    variables: List[Tuple[str, str]]  # [(var_name, type), ...] bound by forall
+    condition: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...]
+    effects: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...]
+
+
 @dataclass
 class Action:
     """Represents a PDDL action with parameters, preconditions, and effects."""
     name: str
     parameters: List[Tuple[str, str]]  # [(var_name, type), ...]
     preconditions: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...]
-    effects: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...]
-    
+    effects: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...] applied unconditionally
+    conditional_effects: List[ConditionalEffect] = field(default_factory=list)
+    numeric_effects: List[SExpr] = field(default_factory=list)  # unparsed, e.g. (increase (total-cost) 1)
+
+    def all_effects(self) -> List[Tuple[bool, Predicate]]:
+        """Every effect literal, unconditional or not (variables left unbound)."""
+        return self.effects + [literal for effect in self.conditional_effects for literal in effect.effects]
+
     def __str__(self):
         return f"Action({self.name})"
 
 
-class PDDLParser:
-    """Parser for PDDL domain and problem files."""
-    
-    def __init__(self, domain_path: str, problem_path: str):
-        self.domain_path = domain_path
-        self.problem_path = problem_path
-        
-        # Domain data
-        self.domain_name = ""
-        self.types: Dict[str, str] = {}  # object -> type
+@dataclass
+class Axiom:
+    """
+    A rule of a derived predicate, from a (:derived ...) block.
+
+    A block whose condition has disjunctions becomes one Axiom per
+    disjunct, so every rule body is a conjunction.
+    """
+    name: str  # derived predicate
+    parameters: List[Tuple[str, str]]  # [(var_name, type), ...] of the head
+    variables: List[Tuple[str, str]]  # [(var_name, type), ...] bound by exists in the body
+    condition: List[Tuple[bool, Predicate]]  # [(is_positive, predicate), ...]
+
+    def __str__(self):
+        return f"Axiom({self.name})"
+
+
+def _encode_literals(literals: List[Tuple[bool, Predicate]]) -> list:
+    return [(is_positive, pred.name, tuple(pred.params)) for is_positive, pred in literals]
+
+
+def _decode_literals(data: list) -> List[Tuple[bool, Predicate]]:
+    return [(is_positive, Predicate(name, list(params))) for is_positive, name, params in data]
+
+
+def _read_define(path: str, text: str, kind: str) -> List[SExpr]:
+    """
+    Read PDDL text and return the body of its (define ...) block.
+
+    Args:
+        path: Path to the PDDL file (for error messages)
+        text: PDDL source text
+        kind: Expected header keyword ('domain' or 'problem')
+
+    Returns:
+        Items of the define block, starting with the (kind name) header
+    """
+    tree = read_sexpr(text)
+
+    for expr in tree:
+        if isinstance(expr, list) and expr and expr[0] == 'define':
+            body = expr[1:]
+            if not body or not isinstance(body[0], list) or body[0][:1] != [kind]:
+                raise ValueError(f"{path}: expected ({kind} <name>) after define")
+            return body
+    raise ValueError(f"{path}: no (define ...) block found")
+
+
+def _parse_literal(expr: SExpr, is_positive: bool = True) -> Tuple[bool, Predicate]:
+    """Parse an atom or (not atom) into (is_positive, predicate)."""
+    if not isinstance(expr, list) or not expr:
+        raise ValueError(f"Expected a predicate, got {expr!r}")
+    if expr[0] == 'not':
+        if len(expr) != 2:
+            raise ValueError(f"Malformed negation: {expr!r}")
+        return _parse_literal(expr[1], not is_positive)
+    params = [p for p in expr[1:] if p != '-']
+    return is_positive, Predicate(expr[0], params)
+
+
+def parse_condition(expr: SExpr) -> List[Tuple[bool, Predicate]]:
+    """
+    Parse precondition or goal condition.
+
+    Supports conjunctions (nested ``and`` is flattened) of positive and
+    negative literals. An empty condition ``()`` yields no literals.
+
+    Args:
+        expr: Condition expression from the S-expression tree
+
+    Returns:
+        List of (is_positive, predicate) literals
+    """
+    if isinstance(expr, list) and not expr:
+        return []
+    if isinstance(expr, list) and expr[0] == 'and':
+        conditions = []
+        for sub in expr[1:]:
+            conditions.extend(parse_condition(sub))
+        return conditions
+    if isinstance(expr, list) and expr[0] in ('or', 'imply', 'exists', 'forall', 'when'):
+        raise ValueError(f"Unsupported PDDL construct '{expr[0]}' in condition")
+    return [_parse_literal(expr)]
+
+
+def parse_disjuncts(expr: SExpr) -> List[Tuple[List[Tuple[str, str]], List[Tuple[bool, Predicate]]]]:
+    """
+    Parse an axiom body into disjunctive normal form.
+
+    Supports ``and``, ``or`` and ``exists`` over literals; negation is
+    only allowed on atoms.
+
+    Args:
+        expr: Condition expression from the S-expression tree
+
+    Returns:
+        List of (exists variables, literals), one per disjunct
+    """
+    if isinstance(expr, list) and not expr:
+        return [([], [])]
+    if isinstance(expr, list) and expr[0] == 'and':
+        disjuncts = [([], [])]
+        for sub in expr[1:]:
+            disjuncts = [(variables + sub_variables, literals + sub_literals)
+                         for variables, literals in disjuncts
+                         for sub_variables, sub_literals in parse_disjuncts(sub)]
+        return disjuncts
+    if isinstance(expr, list) and expr[0] == 'or':
+        return [disjunct for sub in expr[1:] for disjunct in parse_disjuncts(sub)]
+    if isinstance(expr, list) and expr[0] == 'exists':
+        if len(expr) != 3 or not isinstance(expr[1], list):
+            raise ValueError(f"Malformed exists: {expr!r}")
+        variables = parse_typed_list(expr[1])
+        return [(variables + sub_variables, literals) for sub_variables, literals in parse_disjuncts(expr[2])]
+    if isinstance(expr, list) and expr[0] in ('imply', 'forall', 'when'):
+        raise ValueError(f"Unsupported PDDL construct '{expr[0]}' in derived predicate")
+    if (isinstance(expr, list) and expr[0] == 'not' and len(expr) == 2 and isinstance(expr[1], list)
+            and expr[1][:1] and expr[1][0] in ('and', 'or', 'exists', 'forall', 'imply')):
+        raise ValueError(f"Negated '{expr[1][0]}' in derived predicate: "
+                         "define it as its own derived predicate and negate that")
+    return [([], [_parse_literal(expr)])]
+
+
+def parse_effect(expr: SExpr) -> List[Tuple[bool, Predicate]]:
+    """Parse effect section (similar to condition)."""
+    return parse_condition(expr)
+
+
+def parse_effects(expr: SExpr) -> Tuple[List[Tuple[bool, Predicate]], List[ConditionalEffect], List[SExpr]]:
+    """
+    Parse an action effect with ``forall`` and ``when``.
+
+    Nested foralls accumulate their variables. The effect of a ``when``
+    must be a conjunction of literals. Numeric effects (``increase`` and
+    friends) are not literals; they are returned unparsed.
+
+    Args:
+        expr: Effect expression from the S-expression tree
+
+    Returns:
+        Tuple of (unconditional literals, conditional effects, numeric effects)
+    """
+    conditional: List[ConditionalEffect] = []
+    numeric: List[SExpr] = []
+
+    def is_numeric(expr: SExpr) -> bool:
+        return isinstance(expr, list) and bool(expr) and expr[0] in NUMERIC_EFFECTS
+
+    def walk(expr: SExpr, variables: List[Tuple[str, str]], literals: List[Tuple[bool, Predicate]]):
+        if isinstance(expr, list) and not expr:
+            return
+        head = expr[0] if isinstance(expr, list) else None
+        if head == 'and':
+            for sub in expr[1:]:
+                walk(sub, variables, literals)
+        elif head == 'forall':
+            if len(expr) != 3 or not isinstance(expr[1], list):
+                raise ValueError(f"Malformed forall: {expr!r}")
+            scoped = variables + parse_typed_list(expr[1])
+            scoped_literals: List[Tuple[bool, Predicate]] = []
+            walk(expr[2], scoped, scoped_literals)
+            if scoped_literals:
+                conditional.append(ConditionalEffect(scoped, [], scoped_literals))
+        elif head == 'when':
+            if len(expr) != 3:
+                raise ValueError(f"Malformed when: {expr!r}")
+            effect = expr[2]
+            parts = effect[1:] if isinstance(effect, list) and effect[:1] == ['and'] else [effect]
+            numeric.extend(part for part in parts if is_numeric(part))
+            conditional.append(ConditionalEffect(
+                variables, parse_condition(expr[1]),
+                parse_effect(['and'] + [part for part in parts if not is_numeric(part)])))
+        elif is_numeric(expr):
+            numeric.append(expr)
+        else:
+            literals.append(_parse_literal(expr))
+
+    effects: List[Tuple[bool, Predicate]] = []
+    walk(expr, [], effects)
+    return effects, conditional, numeric
+
+
+def _load_cached(cls, kind: str, path: str, cache: Optional[ParseCache], use_cache: bool):
+    """
+    Load a Domain or Problem from the parse cache, or parse the file and cache it.
+
+    Args:
+        cls: Domain or Problem
+        kind: 'domain' or 'problem' (part of the cache key)
+        path: Path to the PDDL file
+        cache: Parse cache to use (default: configured from environment)
+        use_cache: Set to False to always parse from scratch
+
+    Returns:
+        Parsed Domain or Problem
+    """
+    with open(path, 'r') as f:
+        text = f.read()
+
+    if use_cache and cache is None:
+        cache = get_default_cache()
+    if not use_cache or cache is None:
+        return cls.from_text(text, path)
+
+    key = cache.content_key(kind, text)
+    cached = cache.get(key)
+    if cached is not None:
+        with _gc_paused():
+            return cls._from_cache_data(cached, path)
+
+    parsed = cls.from_text(text, path)
+    cache.put(key, parsed._to_cache_data())
+    return parsed
+
+
+class Domain:
+    """
+    Parsed PDDL domain: types, constants, predicate schemas and action schemas.
+
+    A Domain does not depend on any problem and can be shared by many
+    PDDLParser / StateGenerator instances.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.name = ""
+        self.types: Dict[str, str] = {}  # type -> parent type
+        self.constants: Dict[str, str] = {}  # constant_name -> type
         self.predicates_schema: List[Tuple[str, List[str]]] = []  # [(name, [types]), ...]
+        self.functions: List[Tuple[str, List[str]]] = []  # [(name, [types]), ...] of numeric fluents
         self.actions: Dict[str, Action] = {}  # action_name -> Action
-        
-        # Problem data
-        self.problem_name = ""
+        self.axioms: List[Axiom] = []  # rules of the derived predicates
+
+    @classmethod
+    def from_file(cls, path: str, cache: Optional[ParseCache] = None,
+                  use_cache: bool = True) -> 'Domain':
+        """
+        Parse a domain file, going through the parse cache.
+
+        Args:
+            path: Path to domain PDDL file
+            cache: Parse cache to use (default: configured from environment)
+            use_cache: Set to False to always parse from scratch
+
+        Returns:
+            Parsed Domain
+        """
+        return _load_cached(cls, 'domain', str(path), cache, use_cache)
+
+    @classmethod
+    def from_text(cls, text: str, path: str = "<string>") -> 'Domain':
+        """
+        Parse domain PDDL text.
+
+        Args:
+            text: Domain PDDL source
+            path: Path used in error messages
+
+        Returns:
+            Parsed Domain
+        """
+        domain = cls(path)
+        with _gc_paused():
+            domain._parse(text)
+        return domain
+
+    def _parse(self, text: str):
+        """Parse the domain PDDL text."""
+        body = _read_define(self.path, text, 'domain')
+        self.name = body[0][1] if len(body[0]) > 1 else ""
+
+        for section in body[1:]:
+            if not isinstance(section, list) or not section:
+                continue
+            keyword = section[0]
+            if keyword == ':types':
+                self._parse_types(section[1:])
+            elif keyword == ':constants':
+                self.constants.update(parse_typed_list(section[1:]))
+            elif keyword == ':predicates':
+                self._parse_predicates(section[1:])
+            elif keyword == ':functions':
+                self._parse_functions(section[1:])
+            elif keyword == ':action':
+                self._parse_action(section[1:])
+            elif keyword == ':derived':
+                self._parse_derived(section[1:])
+            # :requirements and unknown sections are ignored
+
+    def _parse_types(self, items: List[SExpr]):
+        """Parse (:types ...) section into a type -> parent mapping."""
+        for type_name, parent in parse_typed_list(items):
+            # "location depot - location" declares location itself as a root type
+            self.types[type_name] = parent if parent != type_name else 'object'
+
+    def _parse_predicates(self, items: List[SExpr]):
+        """Parse (:predicates ...) section."""
+        for pred in items:
+            if not isinstance(pred, list) or not pred:
+                continue
+            param_types = [t for _, t in parse_typed_list(pred[1:])]
+            self.predicates_schema.append((pred[0], param_types))
+
+    def _parse_functions(self, items: List[SExpr]):
+        """Parse (:functions ...) section; the '- number' result types are dropped."""
+        for function in items:
+            if isinstance(function, list) and function:
+                param_types = [t for _, t in parse_typed_list(function[1:])]
+                self.functions.append((function[0], param_types))
+
+    def _parse_action(self, items: List[SExpr]):
+        """Parse the body of an (:action name ...) block."""
+        action_name = items[0]
+        parameters: List[Tuple[str, str]] = []
+        preconditions: List[Tuple[bool, Predicate]] = []
+        effects: List[Tuple[bool, Predicate]] = []
+        conditional: List[ConditionalEffect] = []
+        numeric: List[SExpr] = []
+
+        i = 1
+        while i + 1 < len(items):
+            key, value = items[i], items[i + 1]
+            if key == ':parameters':
+                parameters = parse_typed_list(value)
+            elif key == ':precondition':
+                preconditions = parse_condition(value)
+            elif key == ':effect':
+                effects, conditional, numeric = parse_effects(value)
+            i += 2
+
+        self.actions[action_name] = Action(action_name, parameters, preconditions, effects, conditional, numeric)
+
+    def _parse_derived(self, items: List[SExpr]):
+        """Parse the body of a (:derived (name ?params) condition) block."""
+        if len(items) != 2 or not isinstance(items[0], list) or not items[0]:
+            raise ValueError(f"{self.path}: malformed :derived block {items!r}")
+        head, condition = items
+        parameters = parse_typed_list(head[1:])
+        for variables, literals in parse_disjuncts(condition):
+            self.axioms.append(Axiom(head[0], parameters, variables, literals))
+
+    def _to_cache_data(self) -> dict:
+        """Convert to builtin types for the parse cache."""
+        return {
+            'name': self.name,
+            'types': self.types,
+            'constants': self.constants,
+            'predicates_schema': self.predicates_schema,
+            'functions': self.functions,
+            'actions': {
+                name: (tuple(action.parameters),
+                       _encode_literals(action.preconditions),
+                       _encode_literals(action.effects),
+                       [(tuple(effect.variables), _encode_literals(effect.condition),
+                         _encode_literals(effect.effects)) for effect in action.conditional_effects],
+                       action.numeric_effects)
+                for name, action in self.actions.items()
+            },
+            'axioms': [(axiom.name, tuple(axiom.parameters), tuple(axiom.variables),
+                        _encode_literals(axiom.condition)) for axiom in self.axioms],
+        }
+
+    @classmethod
+    def _from_cache_data(cls, data: dict, path: str) -> 'Domain':
+        """Rebuild a Domain from its parse cache representation."""
+        domain = cls(path)
+        domain.name = data['name']
+        domain.types = data['types']
+        domain.constants = data['constants']
+        domain.predicates_schema = data['predicates_schema']
+        domain.functions = data['functions']
+        domain.actions = {
+            name: Action(name, list(params), _decode_literals(pre), _decode_literals(eff),
+                         [ConditionalEffect(list(variables), _decode_literals(condition), _decode_literals(effects))
+                          for variables, condition, effects in conditional],
+                         numeric)
+            for name, (params, pre, eff, conditional, numeric) in data['actions'].items()
+        }
+        domain.axioms = [Axiom(name, list(params), list(variables), _decode_literals(condition))
+                         for name, params, variables, condition in data['axioms']]
+        return domain
+
+    def get_action_by_name(self, action_name: str) -> Action:
+        """Get action schema by name (without parameters)."""
+        action = self.actions.get(action_name)
+        if action is None:
+            raise ValueError(f"Action {action_name} not found in domain")
+        return action
+
+
+class Problem:
+    """
+    Parsed PDDL problem: objects, initial state and goal.
+
+    ``objects`` holds only the objects declared by the problem; domain
+    constants are added when the problem is bound to a Domain.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.name = ""
+        self.domain_name = ""  # value of (:domain ...), not checked against the Domain
         self.objects: Dict[str, str] = {}  # object_name -> type
         self.init_state: Set[Predicate] = set()
         self.goal: List[Tuple[bool, Predicate]] = []  # [(is_positive, predicate), ...]
-        
-        self._parse_domain()
-        self._parse_problem()
-    
-    def _remove_comments(self, text: str) -> str:
-        """Remove PDDL comments (lines starting with ;)."""
-        lines = [line for line in text.split('\n') if not line.strip().startswith(';')]
-        return '\n'.join(lines)
-    
-    def _tokenize(self, text: str) -> List[str]:
-        """Tokenize PDDL text into a list of tokens."""
-        text = self._remove_comments(text)
-        # Replace parentheses with spaces around them
-        text = text.replace('(', ' ( ').replace(')', ' ) ')
-        # Split and filter empty tokens
-        tokens = [t for t in text.split() if t]
-        return tokens
-    
-    def _parse_domain(self):
-        """Parse the domain PDDL file."""
-        with open(self.domain_path, 'r') as f:
-            content = f.read()
-        
-        tokens = self._tokenize(content)
-        self._parse_domain_tokens(tokens)
-    
-    def _parse_domain_tokens(self, tokens: List[str]):
-        """Parse domain tokens."""
-        i = 0
-        while i < len(tokens):
-            if tokens[i] == '(' and i + 1 < len(tokens):
-                if tokens[i + 1] == 'define':
-                    i = self._parse_define_domain(tokens, i)
-                else:
-                    i += 1
-            else:
-                i += 1
-    
-    def _parse_define_domain(self, tokens: List[str], start: int) -> int:
-        """Parse (define (domain ...) ...) block."""
-        i = start + 2  # Skip '(' and 'define'
-        
-        # Parse domain name
-        if tokens[i] == '(' and tokens[i + 1] == 'domain':
-            self.domain_name = tokens[i + 2]
-            i += 4  # Skip '(', 'domain', name, ')'
-        
-        # Parse sections
-        while i < len(tokens):
-            if tokens[i] == '(' and i + 1 < len(tokens):
-                keyword = tokens[i + 1]
-                if keyword == ':requirements':
-                    i = self._skip_section(tokens, i)
-                elif keyword == ':types':
-                    i = self._skip_section(tokens, i)
-                elif keyword == ':predicates':
-                    i = self._parse_predicates(tokens, i)
-                elif keyword == ':action':
-                    i = self._parse_action(tokens, i)
-                else:
-                    i += 1
-            elif tokens[i] == ')':
-                return i + 1
-            else:
-                i += 1
-        return i
-    
-    def _skip_section(self, tokens: List[str], start: int) -> int:
-        """Skip a section by counting parentheses."""
-        depth = 0
-        i = start
-        while i < len(tokens):
-            if tokens[i] == '(':
-                depth += 1
-            elif tokens[i] == ')':
-                depth -= 1
-                if depth == 0:
-                    return i + 1
-            i += 1
-        return i
-    
-    def _parse_predicates(self, tokens: List[str], start: int) -> int:
-        """Parse (:predicates ...) section."""
-        i = start + 2  # Skip '(' and ':predicates'
-        
-        while i < len(tokens):
-            if tokens[i] == '(':
-                # Parse single predicate schema
-                pred_tokens = []
-                depth = 0
-                j = i
-                while j < len(tokens):
-                    if tokens[j] == '(':
-                        depth += 1
-                    elif tokens[j] == ')':
-                        depth -= 1
-                        if depth == 0:
-                            pred_tokens = tokens[i + 1:j]
-                            i = j + 1
-                            break
-                    j += 1
-                
-                if pred_tokens:
-                    pred_name = pred_tokens[0]
-                    # Extract types (simplified - just count parameters)
-                    param_types = []
-                    for token in pred_tokens[1:]:
-                        if token.startswith('?'):
-                            param_types.append('object')
-                    self.predicates_schema.append((pred_name, param_types))
-            elif tokens[i] == ')':
-                return i + 1
-            else:
-                i += 1
-        return i
-    
-    def _parse_action(self, tokens: List[str], start: int) -> int:
-        """Parse (:action ...) block."""
-        i = start + 2  # Skip '(' and ':action'
-        action_name = tokens[i]
-        i += 1
-        
-        parameters = []
-        preconditions = []
-        effects = []
-        
-        while i < len(tokens):
-            if tokens[i] == ':parameters':
-                i, parameters = self._parse_parameters(tokens, i + 1)
-            elif tokens[i] == ':precondition':
-                i, preconditions = self._parse_condition(tokens, i + 1)
-            elif tokens[i] == ':effect':
-                i, effects = self._parse_effect(tokens, i + 1)
-            elif tokens[i] == ')':
-                # End of action
-                action = Action(action_name, parameters, preconditions, effects)
-                self.actions[action_name] = action
-                return i + 1
-            else:
-                i += 1
-        
-        return i
-    
-    def _parse_parameters(self, tokens: List[str], start: int) -> Tuple[int, List[Tuple[str, str]]]:
-        """Parse :parameters (?x - type ...) section."""
-        params = []
-        i = start
-        
-        if tokens[i] == '(':
-            i += 1
-            while i < len(tokens) and tokens[i] != ')':
-                if tokens[i].startswith('?'):
-                    var_name = tokens[i]
-                    var_type = 'object'  # default
-                    if i + 1 < len(tokens) and tokens[i + 1] == '-':
-                        var_type = tokens[i + 2]
-                        i += 3
-                    else:
-                        i += 1
-                    params.append((var_name, var_type))
-                else:
-                    i += 1
-            i += 1  # Skip closing ')'
-        
-        return i, params
-    
-    def _parse_condition(self, tokens: List[str], start: int) -> Tuple[int, List[Tuple[bool, Predicate]]]:
-        """Parse precondition or goal condition."""
-        conditions = []
-        i = start
-        
-        if tokens[i] == '(':
-            i += 1
-            if tokens[i] == 'and':
-                i += 1
-                while i < len(tokens):
-                    if tokens[i] == '(':
-                        is_positive = True
-                        j = i + 1
-                        if tokens[j] == 'not':
-                            is_positive = False
-                            j += 2  # Skip 'not' and '('
-                        
-                        # Parse predicate
-                        pred_tokens = []
-                        depth = 0
-                        k = j - 1
-                        while k < len(tokens):
-                            if tokens[k] == '(':
-                                depth += 1
-                            elif tokens[k] == ')':
-                                depth -= 1
-                                if depth == 0:
-                                    if is_positive:
-                                        pred_tokens = tokens[j:k]
-                                    else:
-                                        pred_tokens = tokens[j:k]
-                                        k += 1  # Extra ')' for not
-                                    i = k + 1
-                                    break
-                            k += 1
-                        
-                        if pred_tokens:
-                            pred_name = pred_tokens[0]
-                            pred_params = [p for p in pred_tokens[1:] if p != '-' and not p.startswith('?') or p.startswith('?')]
-                            predicate = Predicate(pred_name, pred_params)
-                            conditions.append((is_positive, predicate))
-                    elif tokens[i] == ')':
-                        i += 1
-                        break
-                    else:
-                        i += 1
-            else:
-                # Single condition (no 'and')
-                is_positive = True
-                if tokens[i] == 'not':
-                    is_positive = False
-                    i += 2  # Skip 'not' and '('
-                
-                pred_tokens = []
-                depth = 0
-                j = i
-                while j < len(tokens):
-                    if tokens[j] == '(':
-                        depth += 1
-                    elif tokens[j] == ')':
-                        depth -= 1
-                        if depth == -1:
-                            pred_tokens = tokens[i:j]
-                            i = j + 1
-                            if not is_positive:
-                                i += 1  # Extra ')' for not
-                            break
-                    j += 1
-                
-                if pred_tokens:
-                    pred_name = pred_tokens[0]
-                    pred_params = [p for p in pred_tokens[1:]]
-                    predicate = Predicate(pred_name, pred_params)
-                    conditions.append((is_positive, predicate))
-        
-        return i, conditions
-    
-    def _parse_effect(self, tokens: List[str], start: int) -> Tuple[int, List[Tuple[bool, Predicate]]]:
-        """Parse effect section (similar to condition)."""
-        return self._parse_condition(tokens, start)
-    
-    def _parse_problem(self):
-        """Parse the problem PDDL file."""
-        with open(self.problem_path, 'r') as f:
-            content = f.read()
-        
-        tokens = self._tokenize(content)
-        self._parse_problem_tokens(tokens)
-    
-    def _parse_problem_tokens(self, tokens: List[str]):
-        """Parse problem tokens."""
-        i = 0
-        while i < len(tokens):
-            if tokens[i] == '(' and i + 1 < len(tokens):
-                if tokens[i + 1] == 'define':
-                    i = self._parse_define_problem(tokens, i)
-                else:
-                    i += 1
-            else:
-                i += 1
-    
-    def _parse_define_problem(self, tokens: List[str], start: int) -> int:
-        """Parse (define (problem ...) ...) block."""
-        i = start + 2  # Skip '(' and 'define'
-        
-        # Parse problem name
-        if tokens[i] == '(' and tokens[i + 1] == 'problem':
-            self.problem_name = tokens[i + 2]
-            i += 4  # Skip '(', 'problem', name, ')'
-        
-        # Parse sections
-        while i < len(tokens):
-            if tokens[i] == '(' and i + 1 < len(tokens):
-                keyword = tokens[i + 1]
-                if keyword == ':domain':
-                    i = self._skip_section(tokens, i)
-                elif keyword == ':objects':
-                    i = self._parse_objects(tokens, i)
-                elif keyword == ':init':
-                    i = self._parse_init(tokens, i)
-                elif keyword == ':goal':
-                    i = self._parse_goal(tokens, i)
-                else:
-                    i += 1
-            elif tokens[i] == ')':
-                return i + 1
-            else:
-                i += 1
-        return i
-    
-    def _parse_objects(self, tokens: List[str], start: int) -> int:
+        self.numeric_init: List[SExpr] = []  # unparsed (= (function args) value) facts
+        self.metric: Optional[SExpr] = None  # unparsed body of (:metric ...)
+
+    @classmethod
+    def from_file(cls, path: str, cache: Optional[ParseCache] = None,
+                  use_cache: bool = True) -> 'Problem':
+        """
+        Parse a problem file, going through the parse cache.
+
+        Args:
+            path: Path to problem PDDL file
+            cache: Parse cache to use (default: configured from environment)
+            use_cache: Set to False to always parse from scratch
+
+        Returns:
+            Parsed Problem
+        """
+        return _load_cached(cls, 'problem', str(path), cache, use_cache)
+
+    @classmethod
+    def from_text(cls, text: str, path: str = "<string>") -> 'Problem':
+        """
+        Parse problem PDDL text.
+
+        Args:
+            text: Problem PDDL source
+            path: Path used in error messages
+
+        Returns:
+            Parsed Problem
+        """
+        problem = cls(path)
+        with _gc_paused():
+            problem._parse(text)
+        return problem
+
+    def _parse(self, text: str):
+        """Parse the problem PDDL text."""
+        body = _read_define(self.path, text, 'problem')
+        self.name = body[0][1] if len(body[0]) > 1 else ""
+
+        for section in body[1:]:
+            if not isinstance(section, list) or not section:
+                continue
+            keyword = section[0]
+            if keyword == ':domain':
+                self.domain_name = section[1] if len(section) > 1 else ""
+            elif keyword == ':objects':
+                self._parse_objects(section[1:])
+            elif keyword == ':init':
+                self._parse_init(section[1:])
+            elif keyword == ':goal':
+                self._parse_goal(section[1:])
+            elif keyword == ':metric':
+                self.metric = section[1:]
+            # :requirements and unknown sections are ignored
+
+    def _parse_objects(self, items: List[SExpr]):
         """Parse (:objects ...) section."""
-        i = start + 2  # Skip '(' and ':objects'
-        
-        while i < len(tokens):
-            if tokens[i].startswith('?'):
-                i += 1
-            elif tokens[i] == '-':
-                # Type specification
-                obj_type = tokens[i + 1]
-                # Go back and assign type to previous objects
-                j = i - 1
-                while j >= start + 2 and tokens[j] not in ['(', ')', '-']:
-                    if not tokens[j].startswith(':'):
-                        self.objects[tokens[j]] = obj_type
-                    j -= 1
-                i += 2
-            elif tokens[i] == ')':
-                # Assign default type to remaining objects
-                j = i - 1
-                while j >= start + 2 and tokens[j] not in ['(', ')', '-']:
-                    if tokens[j] not in self.objects and not tokens[j].startswith(':'):
-                        self.objects[tokens[j]] = 'object'
-                    j -= 1
-                return i + 1
-            else:
-                i += 1
-        return i
-    
-    def _parse_init(self, tokens: List[str], start: int) -> int:
+        self.objects.update(parse_typed_list(items))
+
+    def _parse_init(self, items: List[SExpr]):
         """Parse (:init ...) section."""
-        i = start + 2  # Skip '(' and ':init'
-        
-        while i < len(tokens):
-            if tokens[i] == '(':
-                # Parse predicate
-                pred_tokens = []
-                depth = 0
-                j = i
-                while j < len(tokens):
-                    if tokens[j] == '(':
-                        depth += 1
-                    elif tokens[j] == ')':
-                        depth -= 1
-                        if depth == 0:
-                            pred_tokens = tokens[i + 1:j]
-                            i = j + 1
-                            break
-                    j += 1
-                
-                if pred_tokens:
-                    pred_name = pred_tokens[0]
-                    pred_params = [p for p in pred_tokens[1:] if p != '-']
-                    predicate = Predicate(pred_name, pred_params)
-                    self.init_state.add(predicate)
-            elif tokens[i] == ')':
-                return i + 1
-            else:
-                i += 1
-        return i
-    
-    def _parse_goal(self, tokens: List[str], start: int) -> int:
+        init_state = self.init_state
+        for fact in items:
+            if not isinstance(fact, list) or not fact:
+                continue
+            # Numeric fluents such as (= (total-cost) 0) are kept apart from the facts
+            if fact[0] == '=' or not all(isinstance(p, str) for p in fact):
+                self.numeric_init.append(fact)
+                continue
+            init_state.add(Predicate(fact[0], [p for p in fact[1:] if p != '-']))
+
+    def _parse_goal(self, items: List[SExpr]):
         """Parse (:goal ...) section."""
-        i = start + 2  # Skip '(' and ':goal'
-        i, self.goal = self._parse_condition(tokens, i)
-        return i
-    
+        self.goal = parse_condition(items[0]) if items else []
+
+    def to_pddl(self) -> str:
+        """
+        Write the problem back out as PDDL text.
+
+        Objects are grouped by type and init facts sorted, so equal problems
+        produce equal text; comments and formatting of the source are lost.
+
+        Returns:
+            Problem PDDL source
+        """
+        by_type: Dict[str, List[str]] = {}
+        for name, obj_type in self.objects.items():
+            by_type.setdefault(obj_type, []).append(name)
+        object_lines = "".join(f"    {' '.join(names)} - {obj_type}\n" for obj_type, names in by_type.items())
+        init_lines = "".join(f"    {fact}\n" for fact in sorted(self.init_state, key=str))
+        goal_lines = "".join(f"      {pred}\n" if positive else f"      (not {pred})\n"
+                             for positive, pred in self.goal)
+        return (
+            f"(define (problem {self.name})\n"
+            f"  (:domain {self.domain_name})\n"
+            f"  (:objects\n{object_lines}  )\n"
+            f"  (:init\n{init_lines}  )\n"
+            f"  (:goal\n    (and\n{goal_lines}    )\n  )\n"
+            f")\n"
+        )
+
+    def _to_cache_data(self) -> dict:
+        """Convert to builtin types for the parse cache."""
+        return {
+            'name': self.name,
+            'domain_name': self.domain_name,
+            'objects': self.objects,
+            'init_state': [(pred.name, tuple(pred.params)) for pred in self.init_state],
+            'goal': _encode_literals(self.goal),
+            'numeric_init': self.numeric_init,
+            'metric': self.metric,
+        }
+
+    @classmethod
+    def _from_cache_data(cls, data: dict, path: str) -> 'Problem':
+        """Rebuild a Problem from its parse cache representation."""
+        problem = cls(path)
+        problem.name = data['name']
+        problem.domain_name = data['domain_name']
+        problem.objects = data['objects']
+        problem.init_state = {Predicate(name, list(params)) for name, params in data['init_state']}
+        problem.goal = _decode_literals(data['goal'])
+        problem.numeric_init = data['numeric_init']
+        problem.metric = data['metric']
+        return problem
+
+
+class PDDLParser:
+    """
+    A domain and a problem bound together.
+
+    Accepts file paths (parsed through the parse cache) or already parsed
+    Domain / Problem objects, and exposes the attributes of both. Domain
+    data is shared with the Domain object, not copied.
+    """
+
+    def __init__(self, domain: Union[str, Domain], problem: Union[str, Problem],
+                 cache: Optional[ParseCache] = None, use_cache: bool = True):
+        """
+        Bind a domain and a problem.
+
+        Args:
+            domain: Path to domain PDDL file, or a parsed Domain
+            problem: Path to problem PDDL file, or a parsed Problem
+            cache: Parse cache to use for paths (default: configured from environment)
+            use_cache: Set to False to always parse paths from scratch
+        """
+        if not isinstance(domain, Domain):
+            domain = Domain.from_file(domain, cache, use_cache)
+        if not isinstance(problem, Problem):
+            problem = Problem.from_file(problem, cache, use_cache)
+
+        self.domain = domain
+        self.problem = problem
+        self.domain_path = domain.path
+        self.problem_path = problem.path
+
+        # Domain data
+        self.domain_name = domain.name
+        self.types = domain.types
+        self.constants = domain.constants
+        self.predicates_schema = domain.predicates_schema
+        self.functions = domain.functions
+        self.actions = domain.actions
+        self.axioms = domain.axioms
+
+        # Problem data - domain constants are objects of every problem
+        self.problem_name = problem.name
+        self.objects: Dict[str, str] = {**domain.constants, **problem.objects}
+        self.init_state = problem.init_state
+        self.goal = problem.goal
+        self.numeric_init = problem.numeric_init
+        self.metric = problem.metric
+
     def get_action_by_name(self, action_name: str) -> Action:
         """Get action schema by name (without parameters)."""
-        for name, action in self.actions.items():
-            if name == action_name:
-                return action
-        raise ValueError(f"Action {action_name} not found in domain")
+        return self.domain.get_action_by_name(action_name)
+
+    def has_numeric_fluents(self) -> bool:
+        """Whether the task declares, sets, changes or optimises numeric fluents (action costs included)."""
+        return bool(self.functions or self.numeric_init or self.metric is not None
+                    or any(action.numeric_effects for action in self.actions.values()))
+
+    def objects_by_type(self) -> Dict[str, Set[str]]:
+        """
+        Group objects (including domain constants) by type.
+
+        An object belongs to its declared type and every ancestor of it,
+        up to ``object``.
+
+        Returns:
+            Mapping of type name -> set of object names
+        """
+        by_type: Dict[str, Set[str]] = {'object': set()}
+        for name, obj_type in self.objects.items():
+            seen = set()
+            current = obj_type
+            # Walk up the hierarchy; guard against cyclic type declarations
+            while current and current not in seen:
+                seen.add(current)
+                by_type.setdefault(current, set()).add(name)
+                current = self.types.get(current, 'object' if current != 'object' else None)
+        return by_type
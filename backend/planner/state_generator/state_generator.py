@@ -1,9 +1,23 @@
 """
 State Generator - generates intermediate states by applying actions.
+
+States are stored as integer bitmasks over a FactTable of interned ground
+atoms; they are decoded to sets of Predicate objects only at the API
+boundary (get_current_state, get_state_history, state_at, apply_plan).
+The history keeps per-step deltas plus periodic checkpoints, see
+state_history.StateHistory.
+
+Derived predicates are part of the state: an AxiomEvaluator derives them
+for the initial state and repairs them from each action's effect delta,
+see axioms.AxiomEvaluator.
 """
 
-from typing import List, Set, Dict, Tuple
-from .pddl_parser import PDDLParser, Predicate, Action
+from itertools import product
+from typing import List, Set, Dict, Tuple, Union, Iterable, Iterator, Optional
+from .pddl_parser import PDDLParser, Domain, Problem, Predicate, Action
+from .facts import FactTable, GroundAction, ids_mask, iter_bits
+from .axioms import AxiomEvaluator
+from .state_history import StateHistory, HistoryCursor, DEFAULT_CHECKPOINT_INTERVAL
 import re
 import sys
 
@@ -13,30 +27,93 @@ class StateGenerator:
     Generates intermediate states from initial state and action sequence.
     """
     
-    def __init__(self, domain_path: str, problem_path: str):
+    def __init__(self, domain: Union[str, Domain], problem: Union[str, Problem],
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
         """
-        Initialize the state generator with PDDL domain and problem files.
+        Initialize the state generator with PDDL domain and problem.
+        
+        Pass an already parsed Domain to reuse it across many problems
+        without re-parsing:
+        
+            domain = Domain.from_file("domains/gripper/domain.pddl")
+            generators = [StateGenerator(domain, path) for path in problem_paths]
         
         Args:
-            domain_path: Path to domain PDDL file
-            problem_path: Path to problem PDDL file
+            domain: Path to domain PDDL file, or a parsed Domain
+            problem: Path to problem PDDL file, or a parsed Problem
+            checkpoint_interval: Steps between full states in the history
         """
-        self.parser = PDDLParser(domain_path, problem_path)
-        self.current_state: Set[Predicate] = set(self.parser.init_state)
-        self.state_history: List[Set[Predicate]] = [set(self.current_state)]
+        self.parser = PDDLParser(domain, problem)
+        self.facts = FactTable()
+        self.checkpoint_interval = checkpoint_interval
+        # Evaluator of the derived predicates, if the domain has any
+        self.axioms: Optional[AxiomEvaluator] = None
+        init_state = self.parser.init_state
+        derived = []
+        if self.parser.axioms:
+            self.axioms = AxiomEvaluator(self.parser.axioms, self.parser.objects_by_type())
+            # Derived atoms listed in :init are dropped and derived instead
+            init_state = [pred for pred in init_state if pred.name not in self.axioms.derived]
+            derived = self.axioms.closure((pred.name, tuple(pred.params)) for pred in init_state)
+        self.init_mask: int = self.facts.encode(init_state) | ids_mask(
+            self.facts.intern(name, args) for name, args in derived)
+        self.current_mask: int = self.init_mask
+        self.state_history = self._new_history()
+        # Grounded action string -> compiled action (fact ids never change, so
+        # entries stay valid across reset())
+        self._compiled_actions: Dict[str, GroundAction] = {}
+        # Type -> sorted objects, built on the first quantified effect
+        self._objects_of: Optional[Dict[str, List[str]]] = None
+    
+    def _new_history(self) -> StateHistory:
+        return StateHistory(self.init_mask, self.checkpoint_interval, decode=self.facts.decode)
+    
+    @property
+    def current_state(self) -> Set[Predicate]:
+        """The current state decoded to a set of predicates."""
+        return self.facts.decode(self.current_mask)
     
     def reset(self):
         """Reset to initial state."""
-        self.current_state = set(self.parser.init_state)
-        self.state_history = [set(self.current_state)]
+        if self.axioms is not None and self.current_mask != self.init_mask:
+            self.axioms.load(self.facts.fact(fact_id) for fact_id in iter_bits(self.init_mask))
+        self.current_mask = self.init_mask
+        self.state_history = self._new_history()
     
     def get_current_state(self) -> Set[Predicate]:
         """Get the current state as a set of predicates."""
-        return set(self.current_state)
+        return self.facts.decode(self.current_mask)
     
     def get_state_history(self) -> List[Set[Predicate]]:
         """Get the history of all states."""
-        return [set(s) for s in self.state_history]
+        return [self.facts.decode(mask) for mask in self.state_history]
+    
+    def state_at(self, index: int) -> Set[Predicate]:
+        """
+        Get the state at a history index without decoding the whole history.
+        
+        Args:
+            index: State index (0 is the initial state; negative counts from the end)
+            
+        Returns:
+            Set of predicates
+        """
+        return self.facts.decode(self.state_history.state_at(index))
+    
+    def history_cursor(self, index: int = 0) -> HistoryCursor:
+        """
+        Get a bidirectional cursor over the state history.
+        
+        Use cursor.forward() / cursor.backward() to step and cursor.state
+        for the decoded state.
+        
+        Args:
+            index: Starting state index
+            
+        Returns:
+            HistoryCursor positioned at index
+        """
+        return self.state_history.cursor(index)
     
     def parse_grounded_action(self, grounded_action: str) -> Tuple[str, List[str]]:
         """
@@ -87,6 +164,62 @@ class StateGenerator:
         
         return Predicate(predicate.name, grounded_params)
     
+    def ground_ids(self, literals: List[Tuple[bool, Predicate]],
+                   binding: Dict[str, str]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Ground a list of literals straight to fact ids.
+        
+        Unlike ground_predicate, no Predicate objects are created: each
+        atom is interned as a (name, params) tuple.
+        
+        Args:
+            literals: List of (is_positive, predicate) with variables
+            binding: Variable to object mapping
+            
+        Returns:
+            Tuple of (positive_ids, negative_ids)
+        """
+        positive = []
+        negative = []
+        intern = self.facts.intern
+        for is_positive, pred in literals:
+            try:
+                params = tuple([binding[p] if p.startswith('?') else p for p in pred.params])
+            except KeyError as e:
+                raise ValueError(f"Variable {e.args[0]} not found in binding")
+            (positive if is_positive else negative).append(intern(pred.name, params))
+        return tuple(positive), tuple(negative)
+    
+    def ground_mask(self, literals: List[Tuple[bool, Predicate]], binding: Dict[str, str]) -> Tuple[int, int]:
+        """
+        Ground a list of literals to fact masks.
+        
+        Args:
+            literals: List of (is_positive, predicate) with variables
+            binding: Variable to object mapping
+            
+        Returns:
+            Tuple of (positive_mask, negative_mask)
+        """
+        positive, negative = self.ground_ids(literals, binding)
+        return ids_mask(positive), ids_mask(negative)
+    
+    def satisfies(self, literals: List[Tuple[bool, Predicate]], mask: Optional[int] = None) -> bool:
+        """
+        Check ground literals, such as the problem goal, against a state.
+        
+        Args:
+            literals: List of (is_positive, predicate) without variables
+            mask: State as a fact mask (default: the current state)
+            
+        Returns:
+            True if every positive literal holds and no negative one does
+        """
+        if mask is None:
+            mask = self.current_mask
+        positive, negative = self.ground_mask(literals, {})
+        return mask & positive == positive and not mask & negative
+    
     def check_preconditions(self, action: Action, binding: Dict[str, str]) -> bool:
         """
         Check if action preconditions are satisfied in current state.
@@ -98,77 +231,161 @@ class StateGenerator:
         Returns:
             True if preconditions are satisfied
         """
-        for is_positive, pred in action.preconditions:
-            grounded_pred = self.ground_predicate(pred, binding)
-            
-            if is_positive:
-                # Positive precondition: must be in state
-                if grounded_pred not in self.current_state:
-                    return False
-            else:
-                # Negative precondition: must NOT be in state
-                if grounded_pred in self.current_state:
-                    return False
-        
-        return True
+        positive, negative = self.ground_mask(action.preconditions, binding)
+        # Every positive precondition must hold and no negative one may
+        return self.current_mask & positive == positive and not self.current_mask & negative
     
     def apply_effects(self, action: Action, binding: Dict[str, str]):
         """
         Apply action effects to current state.
         
+        Delete effects are applied before add effects, so an atom that is
+        both added and deleted ends up true (standard PDDL semantics).
+        Conditions of conditional effects are tested against the state
+        before any effect is applied.
+        
         Args:
             action: Action schema
             binding: Variable to object mapping
         """
-        for is_positive, pred in action.effects:
-            grounded_pred = self.ground_predicate(pred, binding)
+        add, delete, conditional = self.ground_effects(action, binding)
+        effects = GroundAction(action.name, (), (), add, delete, conditional)
+        self.current_mask = effects.apply(self.current_mask)
+    
+    def ground_effects(self, action: Action, binding: Dict[str, str]) -> Tuple[Tuple[int, ...], Tuple[int, ...], tuple]:
+        """
+        Ground an action's effects to fact ids, expanding forall and when.
+        
+        Each quantified effect is expanded over the objects of its
+        variables' types. Equality conditions are decided here, since
+        every variable is bound; an instance with no condition left is
+        merged into the unconditional effects.
+        
+        Args:
+            action: Action schema
+            binding: Variable to object mapping
             
-            if is_positive:
-                # Add predicate to state
-                self.current_state.add(grounded_pred)
-            else:
-                # Remove predicate from state
-                self.current_state.discard(grounded_pred)
+        Returns:
+            Tuple of (add ids, delete ids, conditional effects) in
+            GroundAction form
+        """
+        add, delete = self.ground_ids(action.effects, binding)
+        add, delete = list(add), list(delete)
+        conditional = []
+        for effect in action.conditional_effects:
+            equalities = [(positive, pred.params) for positive, pred in effect.condition if pred.name == '=']
+            condition = [(positive, pred) for positive, pred in effect.condition if pred.name != '=']
+            variables = [var for var, _ in effect.variables]
+            objects = [self._objects_of_type(var_type) for _, var_type in effect.variables]
+            for values in product(*objects):
+                scoped = dict(binding, **dict(zip(variables, values))) if variables else binding
+                if any((scoped.get(a, a) == scoped.get(b, b)) != positive for positive, (a, b) in equalities):
+                    continue
+                effect_add, effect_delete = self.ground_ids(effect.effects, scoped)
+                if condition:
+                    conditional.append(self.ground_ids(condition, scoped) + (effect_add, effect_delete))
+                else:
+                    add.extend(effect_add)
+                    delete.extend(effect_delete)
+        # Drop duplicate ids (an atom listed twice in an effect)
+        return tuple(dict.fromkeys(add)), tuple(dict.fromkeys(delete)), tuple(conditional)
     
-    def apply_action(self, grounded_action: str) -> bool:
+    def _objects_of_type(self, type_name: str) -> List[str]:
+        """Objects of a type (and its subtypes), indexed once per problem."""
+        if self._objects_of is None:
+            self._objects_of = {name: sorted(objects) for name, objects in self.parser.objects_by_type().items()}
+        return self._objects_of.get(type_name, [])
+    
+    def compile_action(self, grounded_action: str) -> GroundAction:
         """
-        Apply a grounded action to the current state.
+        Compile a grounded action string to fact ids, memoized per string.
+        
+        The first call parses the string, looks up the schema and grounds
+        every precondition and effect, expanding quantified effects; later
+        calls with the same string are a single dict lookup, so replaying
+        a plan only tests effect conditions against each state.
         
         Args:
             grounded_action: Grounded action string (e.g., "(pick-up a)")
             
         Returns:
-            True if action was successfully applied
+            Compiled GroundAction
+            
+        Raises:
+            ValueError: If the action is unknown or has the wrong number of parameters
         """
+        compiled = self._compiled_actions.get(grounded_action)
+        if compiled is not None:
+            return compiled
+        
         # Parse grounded action
         action_name, params = self.parse_grounded_action(grounded_action)
         
         # Get action schema
-        try:
-            action = self.parser.get_action_by_name(action_name)
-        except ValueError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return False
+        action = self.parser.get_action_by_name(action_name)
         
         # Create variable binding
         if len(params) != len(action.parameters):
-            print(f"Error: Parameter count mismatch for action {action_name}", file=sys.stderr)
-            return False
+            raise ValueError(f"Parameter count mismatch for action {action_name}")
         
         binding = {}
         for (var_name, var_type), obj in zip(action.parameters, params):
             binding[var_name] = obj
         
+        pre_pos, pre_neg = self.ground_ids(action.preconditions, binding)
+        add, delete, conditional = self.ground_effects(action, binding)
+        compiled = GroundAction(grounded_action, pre_pos, pre_neg, add, delete, conditional)
+        self._compiled_actions[grounded_action] = compiled
+        return compiled
+    
+    def _update_derived(self, delta: Tuple[Tuple[int, ...], Tuple[int, ...]]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Repair the derived facts of the current state after an action.
+        
+        Args:
+            delta: (added ids, removed ids) of the action's effects
+            
+        Returns:
+            The step's delta including the derived facts that changed
+        """
+        fact = self.facts.fact
+        intern = self.facts.intern
+        added, removed = self.axioms.update([fact(i) for i in delta[0]], [fact(i) for i in delta[1]])
+        derived_added = tuple(intern(name, args) for name, args in added)
+        derived_removed = tuple(intern(name, args) for name, args in removed)
+        self.current_mask = (self.current_mask & ~ids_mask(derived_removed)) | ids_mask(derived_added)
+        return delta[0] + derived_added, delta[1] + derived_removed
+    
+    def apply_action(self, grounded_action: str) -> bool:
+        """
+        Apply a grounded action to the current state.
+        
+        Args:
+            grounded_action: Grounded action string (e.g., "(pick-up a)")
+            
+        Returns:
+            True if action was successfully applied
+        """
+        try:
+            action = self.compile_action(grounded_action)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+        
         # Check preconditions
-        if not self.check_preconditions(action, binding):
+        if not action.is_applicable(self.current_mask):
             print(f"Warning: Preconditions not satisfied for action {grounded_action}", file=sys.stderr)
             return False
         
         # Apply effects
-        self.apply_effects(action, binding)
-        
+        delta = action.changes(self.current_mask)
+        added, removed = delta
+        self.current_mask = (self.current_mask & ~ids_mask(removed)) | ids_mask(added)
+        if self.axioms is not None:
+            delta = self._update_derived(delta)
+
         # Save state to history
-        self.state_history.append(set(self.current_state))
+        self.state_history.append(self.current_mask, delta)
         
         return True
     
@@ -192,6 +409,30 @@ class StateGenerator:
         
         return self.get_state_history()
     
+    def iter_states(self, plan: Iterable[str]) -> Iterator[Set[Predicate]]:
+        """
+        Apply a plan lazily, yielding each state as soon as it is computed.
+        
+        Yields the initial state first, then the state after each action.
+        Stops early (like apply_plan) if an action cannot be applied. Only
+        one decoded state is alive at a time, so memory stays flat
+        regardless of plan length; the delta history is still recorded.
+        
+        Args:
+            plan: Iterable of grounded action strings
+            
+        Yields:
+            States as sets of predicates
+        """
+        self.reset()
+        yield self.get_current_state()
+        
+        for i, action in enumerate(plan):
+            if not self.apply_action(action):
+                print(f"Failed to apply action {i}: {action}", file=sys.stderr)
+                return
+            yield self.get_current_state()
+    
     def state_to_dict(self, state: Set[Predicate]) -> Dict:
         """
         Convert a state to a dictionary representation for JSON serialization.
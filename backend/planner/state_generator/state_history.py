@@ -0,0 +1,185 @@
+"""
+State History - delta-encoded sequence of bitmask states.
+
+Each step is stored as the fact ids it added and removed; a full state
+mask is kept every ``checkpoint_interval`` steps. Memory therefore grows
+with the total amount of change along the plan rather than with the
+state size times the plan length, while any state can be rebuilt from
+the nearest checkpoint in at most ``checkpoint_interval`` delta steps.
+"""
+
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+from .facts import iter_bits, ids_mask
+
+DEFAULT_CHECKPOINT_INTERVAL = 64
+
+# (added fact ids, removed fact ids) turning state k into state k + 1
+Delta = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+
+class StateHistory:
+    """
+    Append-only sequence of states stored as deltas with periodic checkpoints.
+
+    Supports len(), indexing (``history[k]`` returns the state mask),
+    sequential iteration and bidirectional cursors.
+    """
+
+    def __init__(self, initial_mask: int, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 decode: Optional[Callable[[int], Set]] = None):
+        """
+        Start a history at the initial state.
+
+        Args:
+            initial_mask: Bitmask of the initial state (state 0)
+            checkpoint_interval: Steps between full state checkpoints
+            decode: Optional function turning a mask into a predicate set,
+                used by HistoryCursor.state
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+        self.checkpoint_interval = checkpoint_interval
+        self.decode = decode
+        self._deltas: List[Delta] = []
+        self._checkpoints: List[int] = [initial_mask]
+        self._last = initial_mask
+
+    def __len__(self) -> int:
+        return len(self._deltas) + 1
+
+    def append(self, mask: int, delta: Optional[Delta] = None):
+        """
+        Record the next state.
+
+        Args:
+            mask: Bitmask of the new state
+            delta: (added ids, removed ids) relative to the previous state,
+                if already known; computed by diffing the masks otherwise
+        """
+        if delta is None:
+            prev = self._last
+            delta = (tuple(iter_bits(mask & ~prev)), tuple(iter_bits(prev & ~mask)))
+        self._deltas.append(delta)
+        self._last = mask
+        if len(self._deltas) % self.checkpoint_interval == 0:
+            self._checkpoints.append(mask)
+
+    def delta(self, step: int) -> Delta:
+        """
+        Get the change made by one step.
+
+        Args:
+            step: Step index; delta(k) turns state k into state k + 1
+
+        Returns:
+            Tuple of (added fact ids, removed fact ids)
+        """
+        return self._deltas[step]
+
+    def state_at(self, index: int) -> int:
+        """
+        Rebuild the state mask at an index.
+
+        Runs in O(checkpoint_interval) delta applications.
+
+        Args:
+            index: State index (0 is the initial state; negative counts from the end)
+
+        Returns:
+            State bitmask
+        """
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"State index {index} out of range (history has {length} states)")
+        if index == length - 1:
+            return self._last
+
+        checkpoint = index // self.checkpoint_interval
+        mask = self._checkpoints[checkpoint]
+        for step in range(checkpoint * self.checkpoint_interval, index):
+            added, removed = self._deltas[step]
+            mask = (mask & ~ids_mask(removed)) | ids_mask(added)
+        return mask
+
+    def __getitem__(self, index: int) -> int:
+        return self.state_at(index)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over all state masks in order (O(total change))."""
+        mask = self._checkpoints[0]
+        yield mask
+        for added, removed in self._deltas:
+            mask = (mask & ~ids_mask(removed)) | ids_mask(added)
+            yield mask
+
+    def cursor(self, index: int = 0) -> 'HistoryCursor':
+        """
+        Create a cursor positioned at a state.
+
+        Args:
+            index: Starting state index
+
+        Returns:
+            HistoryCursor
+        """
+        return HistoryCursor(self, index)
+
+
+class HistoryCursor:
+    """
+    Bidirectional cursor over a StateHistory.
+
+    Stepping forward or back applies a single delta, so scrubbing through
+    a plan one step at a time costs O(change per step).
+    """
+
+    def __init__(self, history: StateHistory, index: int = 0):
+        self.history = history
+        self.index = 0
+        self.mask = 0
+        self.seek(index)
+
+    def seek(self, index: int):
+        """Jump to a state index (O(checkpoint_interval))."""
+        if index < 0:
+            index += len(self.history)
+        self.mask = self.history.state_at(index)
+        self.index = index
+
+    def forward(self) -> bool:
+        """
+        Move to the next state.
+
+        Returns:
+            False if already at the last state
+        """
+        if self.index + 1 >= len(self.history):
+            return False
+        added, removed = self.history.delta(self.index)
+        self.mask = (self.mask & ~ids_mask(removed)) | ids_mask(added)
+        self.index += 1
+        return True
+
+    def backward(self) -> bool:
+        """
+        Move to the previous state.
+
+        Returns:
+            False if already at the initial state
+        """
+        if self.index == 0:
+            return False
+        added, removed = self.history.delta(self.index - 1)
+        self.mask = (self.mask & ~ids_mask(added)) | ids_mask(removed)
+        self.index -= 1
+        return True
+
+    @property
+    def state(self) -> Set:
+        """The current state decoded with the history's decode function."""
+        if self.history.decode is None:
+            raise ValueError("StateHistory was created without a decode function")
+        return self.history.decode(self.mask)
@@ -11,6 +11,18 @@ from .base_renderer import (
     VisualObject,
     VisualRelation
 )
+from .serializers import (
+    SERIALIZATION_MODES,
+    serialize_sequence,
+    deserialize_sequence,
+    sequence_to_dict
+)
+from .delta_encoding import (
+    DeltaEncoder,
+    DeltaDecoder,
+    encode_delta_sequence,
+    decode_delta_sequence
+)
 from .blocks_world_renderer import BlocksWorldRenderer
 from .gripper_renderer import GripperRenderer
 
@@ -91,5 +103,13 @@ __all__ = [
     'RendererFactory',
     'RenderedState',
     'VisualObject',
-    'VisualRelation'
+    'VisualRelation',
+    'SERIALIZATION_MODES',
+    'serialize_sequence',
+    'deserialize_sequence',
+    'sequence_to_dict',
+    'DeltaEncoder',
+    'DeltaDecoder',
+    'encode_delta_sequence',
+    'decode_delta_sequence'
 ]
@@ -5,7 +5,7 @@ RenderedState is a JSON structure that describes how to visually represent a sta
 It includes objects, their positions, properties, and relationships.
 """
 
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Set, Any, Optional, Iterable, Iterator
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 import json
@@ -135,31 +135,45 @@ class BaseStateRenderer(ABC):
         """
         pass
     
-    def render_sequence(self, states: List[Set], objects: Dict[str, str], 
-                       actions: Optional[List[str]] = None) -> List[RenderedState]:
+    def iter_render(self, states: Iterable[Set], objects: Dict[str, str],
+                    actions: Optional[List[str]] = None) -> Iterator[RenderedState]:
         """
-        Render a sequence of states.
+        Render states one at a time as they are produced.
+        
+        Accepts any iterable, e.g. StateGenerator.iter_states(plan), so a
+        long plan can be rendered and serialized without holding every
+        state in memory.
         
         Args:
-            states: List of states (sets of predicates)
+            states: Iterable of states (sets of predicates)
             objects: Dictionary mapping object names to types
             actions: Optional list of actions applied between states
             
-        Returns:
-            List of RenderedState objects
+        Yields:
+            RenderedState objects
         """
-        rendered_states = []
-        
         for i, state in enumerate(states):
             metadata = {"step": i}
             
             if actions and i > 0:
                 metadata["action"] = actions[i - 1]
             
-            rendered = self.render(state, objects, metadata)
-            rendered_states.append(rendered)
+            yield self.render(state, objects, metadata)
+    
+    def render_sequence(self, states: List[Set], objects: Dict[str, str], 
+                       actions: Optional[List[str]] = None) -> List[RenderedState]:
+        """
+        Render a sequence of states.
         
-        return rendered_states
+        Args:
+            states: List of states (sets of predicates)
+            objects: Dictionary mapping object names to types
+            actions: Optional list of actions applied between states
+            
+        Returns:
+            List of RenderedState objects
+        """
+        return list(self.iter_render(states, objects, actions))
     
     def render_sequence_to_json(self, states: List[Set], objects: Dict[str, str],
                                actions: Optional[List[str]] = None, indent: int = 2) -> str:
@@ -0,0 +1,281 @@
+"""
+Keyframe-plus-patch encoding of rendered state sequences.
+
+Consecutive rendered states usually differ in one or two objects, so
+instead of repeating every object and relation, each state is sent as a
+patch against the previous one, with a full keyframe every
+``keyframe_interval`` states so a client can seek without replaying the
+whole plan. Payload size then grows with the number of changes rather
+than with the state size times the plan length.
+
+Frames are dictionaries. A keyframe is ``{"keyframe": state}``; a patch
+may contain:
+
+- ``metadata``: the new state's metadata (omitted when it has none)
+- ``objects_removed`` / ``relations_removed``: indices in the previous list
+- ``objects_added`` / ``relations_added``: ``[index, item]`` pairs, indices in
+  the new list
+- ``objects_changed``: ``[index, field_patch]`` pairs, indices in the new list
+- ``objects`` / ``relations``: the full new list, used instead of the
+  removed/added lists when items were reordered
+
+A field patch holds ``set`` (changed top-level fields), ``properties``
+(changed or added property values), ``properties_removed`` and ``removed``
+(top-level fields that disappeared).
+"""
+
+import json
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DELTA_FORMAT = "keyframe-delta-v1"
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+
+def _relation_key(relation: Dict) -> str:
+    return json.dumps(relation, sort_keys=True, separators=(',', ':'))
+
+
+def _diff_order(prev_keys: List, cur_keys: List) -> Optional[Tuple[List[int], List[int]]]:
+    """
+    Match two key lists that differ by removals and insertions.
+
+    Returns:
+        (indices removed from prev, indices added in cur), or None if the
+        surviving items were reordered
+    """
+    remaining = Counter(cur_keys)
+    removed = []
+    kept = []
+    for i, key in enumerate(prev_keys):
+        if remaining[key] > 0:
+            remaining[key] -= 1
+            kept.append(key)
+        else:
+            removed.append(i)
+
+    added = []
+    j = 0
+    for i, key in enumerate(cur_keys):
+        if j < len(kept) and kept[j] == key:
+            j += 1
+        else:
+            added.append(i)
+    if j != len(kept):
+        return None
+    return removed, added
+
+
+def _diff_object(prev: Dict, cur: Dict) -> Dict:
+    """Compute the field patch turning one object dict into another."""
+    patch = {}
+    changed = {field: value for field, value in cur.items()
+               if field != "properties" and prev.get(field, patch) != value}
+    if changed:
+        patch["set"] = changed
+    removed = [field for field in prev if field not in cur]
+    if removed:
+        patch["removed"] = removed
+
+    cur_props = cur.get("properties")
+    if cur_props is not None:
+        prev_props = prev.get("properties") or {}
+        props = {key: value for key, value in cur_props.items()
+                 if prev_props.get(key, patch) != value}
+        if props:
+            patch["properties"] = props
+        props_removed = [key for key in prev_props if key not in cur_props]
+        if props_removed:
+            patch["properties_removed"] = props_removed
+    return patch
+
+
+def _apply_object_patch(obj: Dict, patch: Dict) -> Dict:
+    obj = dict(obj)
+    for field in patch.get("removed", ()):
+        obj.pop(field, None)
+    obj.update(patch.get("set", {}))
+    if "properties" in patch or "properties_removed" in patch:
+        props = dict(obj.get("properties") or {})
+        for key in patch.get("properties_removed", ()):
+            props.pop(key, None)
+        props.update(patch.get("properties", {}))
+        obj["properties"] = props
+    return obj
+
+
+def _apply_order(prev: List, removed: List[int], added: List) -> List:
+    removed_set = set(removed)
+    result = [item for i, item in enumerate(prev) if i not in removed_set]
+    for index, item in added:
+        result.insert(index, item)
+    return result
+
+
+class DeltaEncoder:
+    """
+    Turns rendered state dicts into keyframes and patches, one at a time.
+
+    Usable as a streaming stage, e.g. over BaseStateRenderer.iter_render.
+    """
+
+    def __init__(self, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Args:
+            keyframe_interval: Emit a full keyframe every this many states
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self._prev: Optional[Dict] = None
+        self._prev_relation_keys: List[str] = []
+        self._count = 0
+
+    def encode(self, state: Dict) -> Dict:
+        """
+        Encode the next state of the sequence.
+
+        Args:
+            state: RenderedState.to_dict() output
+
+        Returns:
+            Keyframe or patch frame
+        """
+        prev = self._prev
+        relation_keys = [_relation_key(rel) for rel in state["relations"]]
+        index = self._count
+        self._count += 1
+        self._prev = state
+        prev_relation_keys, self._prev_relation_keys = self._prev_relation_keys, relation_keys
+
+        if (prev is None or index % self.keyframe_interval == 0
+                or prev.get("domain") != state.get("domain")):
+            return {"keyframe": state}
+
+        frame = {}
+        if "metadata" in state:
+            frame["metadata"] = state["metadata"]
+
+        prev_objects = prev["objects"]
+        objects = state["objects"]
+        order = _diff_order([obj["id"] for obj in prev_objects], [obj["id"] for obj in objects])
+        if order is None:
+            frame["objects"] = objects
+        else:
+            removed, added = order
+            if removed:
+                frame["objects_removed"] = removed
+            if added:
+                frame["objects_added"] = [[i, objects[i]] for i in added]
+            # Pair up surviving objects in order and diff their fields
+            survivors = _apply_order(prev_objects, removed, [[i, None] for i in added])
+            changed = []
+            for i, (old, new) in enumerate(zip(survivors, objects)):
+                if old is not None and old != new:
+                    changed.append([i, _diff_object(old, new)])
+            if changed:
+                frame["objects_changed"] = changed
+
+        order = _diff_order(prev_relation_keys, relation_keys)
+        if order is None:
+            frame["relations"] = state["relations"]
+        else:
+            removed, added = order
+            if removed:
+                frame["relations_removed"] = removed
+            if added:
+                frame["relations_added"] = [[i, state["relations"][i]] for i in added]
+        return frame
+
+
+class DeltaDecoder:
+    """Rebuilds full state dicts from frames produced by DeltaEncoder."""
+
+    def __init__(self):
+        self._prev: Optional[Dict] = None
+
+    def decode(self, frame: Dict) -> Dict:
+        """
+        Decode the next frame of the sequence.
+
+        Args:
+            frame: Keyframe or patch frame
+
+        Returns:
+            Full state dict
+
+        Raises:
+            ValueError: If the sequence does not start with a keyframe
+        """
+        if "keyframe" in frame:
+            self._prev = frame["keyframe"]
+            return self._prev
+        prev = self._prev
+        if prev is None:
+            raise ValueError("Delta sequence must start with a keyframe")
+
+        if "objects" in frame:
+            objects = frame["objects"]
+        else:
+            objects = _apply_order(prev["objects"], frame.get("objects_removed", ()),
+                                   frame.get("objects_added", ()))
+            for index, patch in frame.get("objects_changed", ()):
+                objects[index] = _apply_object_patch(objects[index], patch)
+
+        if "relations" in frame:
+            relations = frame["relations"]
+        else:
+            relations = _apply_order(prev["relations"], frame.get("relations_removed", ()),
+                                     frame.get("relations_added", ()))
+
+        state = {"domain": prev["domain"], "objects": objects, "relations": relations}
+        if "metadata" in frame:
+            state["metadata"] = frame["metadata"]
+        self._prev = state
+        return state
+
+
+def iter_delta_frames(states: Iterable[Dict],
+                      keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> Iterator[Dict]:
+    """Encode an iterable of state dicts lazily, yielding one frame per state."""
+    encoder = DeltaEncoder(keyframe_interval)
+    for state in states:
+        yield encoder.encode(state)
+
+
+def encode_delta_sequence(sequence: Dict,
+                          keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> Dict:
+    """
+    Delta-encode a sequence dictionary.
+
+    Args:
+        sequence: ``{"domain", "num_states", "states"}`` dictionary
+        keyframe_interval: Emit a full keyframe every this many states
+
+    Returns:
+        Dictionary with format, domain, num_states, keyframe_interval and frames
+    """
+    return {
+        "format": DELTA_FORMAT,
+        "domain": sequence["domain"],
+        "num_states": len(sequence["states"]),
+        "keyframe_interval": keyframe_interval,
+        "frames": list(iter_delta_frames(sequence["states"], keyframe_interval)),
+    }
+
+
+def decode_delta_sequence(data: Dict) -> Dict:
+    """
+    Rebuild the sequence dictionary from encode_delta_sequence output.
+
+    Args:
+        data: Delta-encoded sequence
+
+    Returns:
+        Sequence dictionary equal to the one that was encoded
+    """
+    if data.get("format") != DELTA_FORMAT:
+        raise ValueError(f"Unknown delta format: {data.get('format')!r}")
+    decoder = DeltaDecoder()
+    states = [decoder.decode(frame) for frame in data["frames"]]
+    return {"domain": data["domain"], "num_states": len(states), "states": states}
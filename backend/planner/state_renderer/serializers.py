@@ -0,0 +1,427 @@
+"""
+Serializers for rendered state sequences.
+
+A sequence is the dictionary built by BaseStateRenderer.render_sequence_to_json:
+``{"domain": str, "num_states": int, "states": [RenderedState.to_dict(), ...]}``.
+It can be written in several modes:
+
+- ``json``: indented JSON (the historical format)
+- ``compact``: JSON without whitespace
+- ``msgpack``: MessagePack binary encoding
+- ``table``: compact JSON with a per-sequence string table
+- ``table-msgpack``: string table encoded as MessagePack
+- ``delta``: compact JSON of keyframes plus per-step patches (see delta_encoding)
+
+The string table stores every object id, type, label, relation endpoint,
+property key and string property value (colors, statuses, ...) once per
+sequence; states then refer to them by index and use positional arrays
+instead of repeating dictionary keys.
+
+MessagePack is implemented here for the subset of types JSON can express,
+so no third-party package is needed.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .base_renderer import RenderedState
+from .delta_encoding import encode_delta_sequence, decode_delta_sequence
+
+SERIALIZATION_MODES = ('json', 'compact', 'msgpack', 'table', 'table-msgpack', 'delta')
+
+TABLE_FORMAT = "string-table-v1"
+
+
+def sequence_to_dict(domain: str, rendered_states: Iterable[RenderedState]) -> Dict:
+    """
+    Build the sequence dictionary for a list of rendered states.
+
+    Args:
+        domain: Domain name
+        rendered_states: RenderedState objects in plan order
+
+    Returns:
+        Dictionary with domain, num_states and states
+    """
+    states = [rs.to_dict() for rs in rendered_states]
+    return {"domain": domain, "num_states": len(states), "states": states}
+
+
+def to_compact_json(data: Any) -> str:
+    """Serialize to JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(',', ':'))
+
+
+# ---------------------------------------------------------------------------
+# MessagePack
+# ---------------------------------------------------------------------------
+
+_pack_uint16 = struct.Struct('>H').pack
+_pack_uint32 = struct.Struct('>I').pack
+_pack_float64 = struct.Struct('>d').pack
+
+
+def _pack_int(value: int) -> bytes:
+    if 0 <= value < 0x80:
+        return bytes((value,))
+    if -32 <= value < 0:
+        return bytes((value & 0xff,))
+    if value >= 0:
+        for code, fmt, limit in ((0xcc, '>B', 1 << 8), (0xcd, '>H', 1 << 16),
+                                 (0xce, '>I', 1 << 32), (0xcf, '>Q', 1 << 64)):
+            if value < limit:
+                return bytes((code,)) + struct.pack(fmt, value)
+    else:
+        for code, fmt, limit in ((0xd0, '>b', 1 << 7), (0xd1, '>h', 1 << 15),
+                                 (0xd2, '>i', 1 << 31), (0xd3, '>q', 1 << 63)):
+            if value >= -limit:
+                return bytes((code,)) + struct.pack(fmt, value)
+    raise OverflowError(f"Integer {value} does not fit in 64 bits")
+
+
+def _pack_length(length: int, fix_code: int, fix_limit: int, code16: int, code32: int) -> bytes:
+    if length < fix_limit:
+        return bytes((fix_code | length,))
+    if length < 1 << 16:
+        return bytes((code16,)) + _pack_uint16(length)
+    return bytes((code32,)) + _pack_uint32(length)
+
+
+def msgpack_dumps(data: Any) -> bytes:
+    """
+    Encode a JSON-compatible value as MessagePack.
+
+    Supports None, bool, int, float, str, bytes, list/tuple and dict.
+
+    Args:
+        data: Value to encode
+
+    Returns:
+        MessagePack bytes
+    """
+    chunks: List[bytes] = []
+    append = chunks.append
+
+    def pack(value):
+        # Exact type checks first: bool is a subclass of int
+        kind = type(value)
+        if kind is str:
+            encoded = value.encode('utf-8')
+            length = len(encoded)
+            if length < 32:
+                append(bytes((0xa0 | length,)))
+            elif length < 1 << 8:
+                append(bytes((0xd9, length)))
+            else:
+                append(_pack_length(length, 0, 0, 0xda, 0xdb))
+            append(encoded)
+        elif kind is int:
+            append(_pack_int(value))
+        elif kind is float:
+            append(b'\xcb' + _pack_float64(value))
+        elif value is None:
+            append(b'\xc0')
+        elif kind is bool:
+            append(b'\xc3' if value else b'\xc2')
+        elif kind is list or kind is tuple:
+            append(_pack_length(len(value), 0x90, 16, 0xdc, 0xdd))
+            for item in value:
+                pack(item)
+        elif kind is dict:
+            append(_pack_length(len(value), 0x80, 16, 0xde, 0xdf))
+            for key, item in value.items():
+                pack(key)
+                pack(item)
+        elif kind is bytes:
+            length = len(value)
+            if length < 1 << 8:
+                append(bytes((0xc4, length)))
+            elif length < 1 << 16:
+                append(b'\xc5' + _pack_uint16(length))
+            else:
+                append(b'\xc6' + _pack_uint32(length))
+            append(value)
+        else:
+            raise TypeError(f"Cannot encode {kind.__name__} as MessagePack")
+
+    pack(data)
+    return b''.join(chunks)
+
+
+# (struct format, size) of fixed-width MessagePack scalars, by type code
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+
+# Width of the length field for variable-size types, by type code
+_LENGTHS = {
+    0xd9: ('str', '>B', 1), 0xda: ('str', '>H', 2), 0xdb: ('str', '>I', 4),
+    0xc4: ('bin', '>B', 1), 0xc5: ('bin', '>H', 2), 0xc6: ('bin', '>I', 4),
+    0xdc: ('array', '>H', 2), 0xdd: ('array', '>I', 4),
+    0xde: ('map', '>H', 2), 0xdf: ('map', '>I', 4),
+}
+
+
+def msgpack_loads(data: bytes) -> Any:
+    """
+    Decode MessagePack bytes produced by msgpack_dumps.
+
+    Args:
+        data: MessagePack bytes
+
+    Returns:
+        Decoded value (arrays become lists)
+
+    Raises:
+        ValueError: If the data is truncated, malformed or has trailing bytes
+    """
+    unpack_from = struct.unpack_from
+
+    def read(offset: int) -> Tuple[Any, int]:
+        code = data[offset]
+        offset += 1
+        if code < 0x80:
+            return code, offset
+        if code >= 0xe0:
+            return code - 0x100, offset
+        if 0xa0 <= code < 0xc0:
+            kind, length = 'str', code & 0x1f
+        elif 0x90 <= code < 0xa0:
+            kind, length = 'array', code & 0x0f
+        elif 0x80 <= code < 0x90:
+            kind, length = 'map', code & 0x0f
+        elif code == 0xc0:
+            return None, offset
+        elif code == 0xc2:
+            return False, offset
+        elif code == 0xc3:
+            return True, offset
+        elif code in _FIXED:
+            fmt, size = _FIXED[code]
+            return unpack_from(fmt, data, offset)[0], offset + size
+        elif code in _LENGTHS:
+            kind, fmt, size = _LENGTHS[code]
+            length = unpack_from(fmt, data, offset)[0]
+            offset += size
+        else:
+            raise ValueError(f"Unsupported MessagePack type code 0x{code:02x}")
+
+        if kind == 'str':
+            end = offset + length
+            if end > len(data):
+                raise ValueError("Truncated MessagePack string")
+            return data[offset:end].decode('utf-8'), end
+        if kind == 'bin':
+            end = offset + length
+            if end > len(data):
+                raise ValueError("Truncated MessagePack binary")
+            return bytes(data[offset:end]), end
+        if kind == 'array':
+            items = []
+            for _ in range(length):
+                item, offset = read(offset)
+                items.append(item)
+            return items, offset
+        result = {}
+        for _ in range(length):
+            key, offset = read(offset)
+            result[key], offset = read(offset)
+        return result, offset
+
+    try:
+        value, end = read(0)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated MessagePack data ({e})")
+    if end != len(data):
+        raise ValueError(f"Trailing bytes after MessagePack value ({len(data) - end})")
+    return value
+
+
+# ---------------------------------------------------------------------------
+# String table
+# ---------------------------------------------------------------------------
+
+class _StringTable:
+    """Assigns consecutive indices to strings in order of first use."""
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = strings if strings is not None else []
+        self._index: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self._index[value] = index
+            self.strings.append(value)
+        return index
+
+    def intern_optional(self, value: Optional[str]) -> Optional[int]:
+        return None if value is None else self.intern(value)
+
+
+def _pack_props(props: Optional[Dict], table: _StringTable) -> List:
+    """
+    Flatten a property dict to [key, value, key, value, ...].
+
+    Keys are string table indices. A string value is interned as well; to
+    tell it apart from a numeric value its key is stored as ``-(index + 1)``.
+    """
+    flat = []
+    if not props:
+        return flat
+    for key, value in props.items():
+        key_index = table.intern(key)
+        if type(value) is str:
+            flat.append(-key_index - 1)
+            flat.append(table.intern(value))
+        else:
+            flat.append(key_index)
+            flat.append(value)
+    return flat
+
+
+def _unpack_props(flat: List, strings: List[str]) -> Dict:
+    props = {}
+    for i in range(0, len(flat), 2):
+        key_index, value = flat[i], flat[i + 1]
+        if key_index < 0:
+            props[strings[-key_index - 1]] = strings[value]
+        else:
+            props[strings[key_index]] = value
+    return props
+
+
+def build_string_table(sequence: Dict) -> Dict:
+    """
+    Convert a sequence dictionary to its string-table form.
+
+    Objects become ``[id, type, label, position, props]`` and relations
+    ``[type, source, target, props]``, with strings replaced by indices into
+    ``strings``; the state's metadata uses the same flat property encoding.
+
+    Args:
+        sequence: Sequence dictionary (see sequence_to_dict)
+
+    Returns:
+        Dictionary with format, domain, num_states, strings and states
+    """
+    table = _StringTable()
+    intern = table.intern
+    states = []
+    for state in sequence["states"]:
+        objects = [
+            [intern(obj["id"]), intern(obj["type"]), intern(obj["label"]),
+             obj.get("position"), _pack_props(obj.get("properties"), table)]
+            for obj in state["objects"]
+        ]
+        relations = [
+            [intern(rel["type"]), intern(rel["source"]),
+             table.intern_optional(rel.get("target")), _pack_props(rel.get("properties"), table)]
+            for rel in state["relations"]
+        ]
+        states.append([objects, relations, _pack_props(state.get("metadata"), table)])
+
+    return {
+        "format": TABLE_FORMAT,
+        "domain": sequence["domain"],
+        "num_states": len(states),
+        "strings": table.strings,
+        "states": states,
+    }
+
+
+def expand_string_table(data: Dict) -> Dict:
+    """
+    Rebuild the sequence dictionary from its string-table form.
+
+    Args:
+        data: Output of build_string_table
+
+    Returns:
+        Sequence dictionary equal to the one that was encoded
+    """
+    if data.get("format") != TABLE_FORMAT:
+        raise ValueError(f"Unknown string table format: {data.get('format')!r}")
+
+    strings = data["strings"]
+    domain = data["domain"]
+    states = []
+    for objects, relations, metadata in data["states"]:
+        state = {"domain": domain, "objects": [], "relations": []}
+        for id_index, type_index, label_index, position, props in objects:
+            obj = {"id": strings[id_index], "type": strings[type_index], "label": strings[label_index]}
+            if position is not None:
+                obj["position"] = position
+            if props:
+                obj["properties"] = _unpack_props(props, strings)
+            state["objects"].append(obj)
+        for type_index, source_index, target_index, props in relations:
+            rel = {"type": strings[type_index], "source": strings[source_index]}
+            if target_index is not None:
+                rel["target"] = strings[target_index]
+            if props:
+                rel["properties"] = _unpack_props(props, strings)
+            state["relations"].append(rel)
+        if metadata:
+            state["metadata"] = _unpack_props(metadata, strings)
+        states.append(state)
+
+    return {"domain": domain, "num_states": len(states), "states": states}
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+def serialize_sequence(sequence: Dict, mode: str = 'json') -> bytes:
+    """
+    Serialize a sequence dictionary.
+
+    Args:
+        sequence: Sequence dictionary (see sequence_to_dict)
+        mode: One of SERIALIZATION_MODES
+
+    Returns:
+        Encoded bytes (UTF-8 for the JSON based modes)
+    """
+    if mode == 'json':
+        return json.dumps(sequence, indent=2).encode('utf-8')
+    if mode == 'compact':
+        return to_compact_json(sequence).encode('utf-8')
+    if mode == 'msgpack':
+        return msgpack_dumps(sequence)
+    if mode == 'table':
+        return to_compact_json(build_string_table(sequence)).encode('utf-8')
+    if mode == 'table-msgpack':
+        return msgpack_dumps(build_string_table(sequence))
+    if mode == 'delta':
+        return to_compact_json(encode_delta_sequence(sequence)).encode('utf-8')
+    raise ValueError(f"Unknown serialization mode: {mode!r} (expected one of {SERIALIZATION_MODES})")
+
+
+def deserialize_sequence(data: bytes, mode: str = 'json') -> Dict:
+    """
+    Decode bytes produced by serialize_sequence with the same mode.
+
+    Args:
+        data: Encoded sequence
+        mode: One of SERIALIZATION_MODES
+
+    Returns:
+        Sequence dictionary
+    """
+    if mode in ('json', 'compact'):
+        return json.loads(data)
+    if mode == 'msgpack':
+        return msgpack_loads(data)
+    if mode == 'table':
+        return expand_string_table(json.loads(data))
+    if mode == 'table-msgpack':
+        return expand_string_table(msgpack_loads(data))
+    if mode == 'delta':
+        return decode_delta_sequence(json.loads(data))
+    raise ValueError(f"Unknown serialization mode: {mode!r} (expected one of {SERIALIZATION_MODES})")
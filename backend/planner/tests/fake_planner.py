@@ -0,0 +1,65 @@
+"""
+Harness for tests that run against a stand-in for fast-downward.py.
+
+Each test module supplies the stand-in script; with_fake_planner writes
+it to a private temporary directory, points run_planner at it and
+isolates the scratch root and caches. Files the script reads or writes
+live next to it and are found through ``os.path.dirname(__file__)``.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, TypeVar
+
+import run_planner
+from benchmarks.synthetic import gripper_problem
+
+T = TypeVar('T')
+
+
+def with_fake_planner(script: str, test: Callable[[Path], T], **env: str) -> T:
+    """
+    Run a test against a stand-in planner in a private temporary directory.
+
+    The script is written to ``<tmp>/fast-downward.py`` and the scratch
+    root is ``<tmp>/scratch``. Both caches are disabled unless ``env``
+    sets them; every variable set here (and run_planner.FD_PATH) is
+    restored afterwards, even if the test changes it.
+
+    Args:
+        script: Source of the stand-in fast-downward.py
+        test: Called with the temporary directory
+        **env: Extra environment variables for the test
+
+    Returns:
+        Result of the test
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        fake = tmp / "fast-downward.py"
+        fake.write_text(script)
+
+        settings = {'PLANNER_SCRATCH_DIR': str(tmp / "scratch"), 'PLAN_CACHE_DIR': "",
+                    'TRANSLATION_CACHE_DIR': "", **env}
+        saved_fd_path = run_planner.FD_PATH
+        saved_env = {name: os.environ.get(name) for name in settings}
+        run_planner.FD_PATH = fake
+        os.environ.update(settings)
+        try:
+            return test(tmp)
+        finally:
+            run_planner.FD_PATH = saved_fd_path
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def write_gripper_problem(directory: Path, name: str, text: str = None) -> str:
+    """Write a two-ball gripper problem named ``name`` (or ``text``) to ``directory/name.pddl``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.pddl"
+    path.write_text(text or gripper_problem(2).replace("gripper-synthetic", name))
+    return str(path)
@@ -0,0 +1,185 @@
+"""
+Test script for the grounded size estimate and admission control.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import Domain, PDDLParser, Problem
+from planner_runner.admission import (
+    ACCEPT, DEGRADE, REJECT, AdmissionPolicy, ProblemTooLarge, admit, decide, estimate_size
+)
+from planner_runner.stats import PlannerStats
+from benchmarks.synthetic import (
+    DERIVED_BLOCKS_DOMAIN, DOMAINS_DIR, gripper_problem, rovers_problem, towers_problem, write_problem
+)
+
+
+def test_gripper_estimate():
+    """Test the estimate on a problem small enough to count by hand."""
+    print("=" * 60)
+    print("Testing gripper estimate")
+    print("=" * 60)
+
+    parser = PDDLParser(str(DOMAINS_DIR / "gripper" / "domain.pddl"),
+                        str(DOMAINS_DIR / "gripper" / "p1.pddl"))
+    estimate = estimate_size(parser)
+    # move: 2 rooms^2, pick/drop: 2 balls * 2 rooms * 2 grippers
+    assert estimate.actions_by_schema == {"move": 4, "pick": 8, "drop": 8}
+    # at-robby 2, at 4, free 2, carry 4
+    assert estimate.facts == 12
+    print(f"✓ {estimate.actions} actions, {estimate.facts} facts")
+    return True
+
+
+def test_static_preconditions():
+    """Test that static preconditions bound a schema by their initial facts."""
+    print("\n" + "=" * 60)
+    print("Testing static precondition bounds")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        problem = write_problem(rovers_problem(2, 50, 5), Path(tmp), "rovers")
+        estimate = estimate_size(PDDLParser(str(DOMAINS_DIR / "rovers" / "domain.pddl"), str(problem)))
+
+    # 2 rovers * 100 connected facts instead of 2 * 50 * 50 assignments
+    assert estimate.actions_by_schema["navigate"] == 200
+    print(f"✓ navigate bounded to {estimate.actions_by_schema['navigate']} by the ring's connected facts")
+
+    # Derived predicates have no initial facts but are not static
+    parser = PDDLParser(Domain.from_text(DERIVED_BLOCKS_DOMAIN), Problem.from_text(towers_problem(2, 3)))
+    estimate = estimate_size(parser)
+    # 6 blocks and the table
+    assert estimate.actions_by_schema == {"move": 7 ** 3, "move-to-table": 7 ** 2}
+    print("✓ Derived preconditions do not bound a schema")
+    return True
+
+
+def test_estimate_speed():
+    """Test that the estimate does not depend on grounding the problem."""
+    print("\n" + "=" * 60)
+    print("Testing estimate speed")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        problem = write_problem(gripper_problem(200, 20), Path(tmp), "gripper-200")
+        parser = PDDLParser(str(DOMAINS_DIR / "gripper" / "domain.pddl"), str(problem))
+
+    start = time.perf_counter()
+    estimate = estimate_size(parser)
+    elapsed = time.perf_counter() - start
+    assert estimate.actions == 20 * 20 + 2 * 200 * 20 * 2
+    assert elapsed < 0.05
+    print(f"✓ {estimate.objects} objects estimated in {elapsed * 1000:.2f} ms")
+    return True
+
+
+def test_decide():
+    """Test accept, degrade and reject verdicts."""
+    print("\n" + "=" * 60)
+    print("Testing admission decisions")
+    print("=" * 60)
+
+    policy = AdmissionPolicy(degrade_actions=100, degrade_facts=100, max_actions=1000, max_facts=1000)
+    parser = PDDLParser(str(DOMAINS_DIR / "gripper" / "domain.pddl"),
+                        str(DOMAINS_DIR / "gripper" / "p1.pddl"))
+    estimate = estimate_size(parser)
+    assert decide(estimate, policy).verdict == ACCEPT
+
+    estimate.actions = 500
+    assert decide(estimate, policy).verdict == DEGRADE
+    estimate.facts = 5000
+    decision = decide(estimate, policy)
+    assert decision.verdict == REJECT and "too large" in decision.reason
+    print("✓ Verdicts follow the policy limits")
+
+    disabled = AdmissionPolicy(max_actions=0, enabled=False)
+    assert admit(str(DOMAINS_DIR / "gripper" / "domain.pddl"),
+                 str(DOMAINS_DIR / "gripper" / "p1.pddl"), disabled).verdict == ACCEPT
+    print("✓ Disabled policy admits everything")
+    return True
+
+
+def with_environment(test, **env):
+    """Run a test with environment variables set."""
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        return test()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_solve_admission():
+    """Test that solve_problem applies admission control."""
+    print("\n" + "=" * 60)
+    print("Testing admission in solve_problem")
+    print("=" * 60)
+
+    domain = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+    problem = str(DOMAINS_DIR / "gripper" / "p1.pddl")
+
+    def rejected():
+        stats = PlannerStats()
+        try:
+            run_planner.solve_problem(domain, problem, "gripper", stats=stats)
+            assert False, "expected ProblemTooLarge"
+        except ProblemTooLarge as e:
+            assert e.estimate.actions == 20
+        assert stats.admission == REJECT and stats.estimated_actions == 20
+        print("✓ Problem over the limit rejected before solving")
+        return True
+
+    def degraded():
+        stats = PlannerStats()
+        plan, _ = run_planner.solve_problem(domain, problem, "gripper", stats=stats)
+        assert plan
+        assert stats.admission == DEGRADE and stats.mode == run_planner.SATISFICING_MODE
+        print("✓ Large problem solved in satisficing mode")
+        return True
+
+    return (
+        with_environment(rejected, PLANNER_MAX_ACTIONS="10", PLAN_CACHE_DIR="")
+        and with_environment(degraded, PLANNER_DEGRADE_ACTIONS="10", PLAN_CACHE_DIR="")
+    )
+
+
+def main():
+    """Run all tests."""
+    print("Admission Control Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_gripper_estimate()
+            and test_static_preconditions()
+            and test_estimate_speed()
+            and test_decide()
+            and test_solve_admission()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,166 @@
+"""
+Test script for anytime planning.
+
+Uses a stand-in for fast-downward.py that writes numbered plan files
+(sas_plan.1, sas_plan.2, ...) over time like an iterated search, so Fast
+Downward is not required.
+"""
+
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from planner_runner.anytime import iter_anytime_plans
+from fake_planner import with_fake_planner
+
+DOMAIN_PATH = str(PLANNER_DIR / "domains/gripper/domain.pddl")
+PROBLEM_PATH = str(PLANNER_DIR / "domains/gripper/p1.pddl")
+
+SHORT_PLAN = [
+    "(pick ball1 rooma left)",
+    "(pick ball2 rooma right)",
+    "(move rooma roomb)",
+    "(drop ball1 roomb left)",
+    "(drop ball2 roomb right)"
+]
+LONG_PLAN = ["(move rooma roomb)", "(move roomb rooma)"] + SHORT_PLAN
+
+# (delay before writing, plan) - the third plan is no improvement
+SCRIPT = [(0.05, LONG_PLAN), (0.4, SHORT_PLAN), (0.2, LONG_PLAN[:1] + LONG_PLAN[2:])]
+
+FAKE_FAST_DOWNWARD = '''
+import json, os, sys, time
+args = sys.argv[1:]
+if "--translate" in args:
+    open("output.sas", "w").close()
+    sys.exit(0)
+plan_base = args[args.index("--plan-file") + 1]
+script = json.load(open(os.path.join(os.path.dirname(__file__), "script.json")))
+for i, (delay, plan) in enumerate(script, 1):
+    time.sleep(delay)
+    with open("%s.%d" % (plan_base, i), "w") as f:
+        # Write the actions first and the cost line later, like a slow writer
+        f.write("\\n".join(plan) + "\\n")
+        f.flush()
+        time.sleep(0.1)
+        f.write("; cost = %d (unit cost)\\n" % len(plan))
+time.sleep(0.3)
+open(os.path.join(os.path.dirname(__file__), "finished"), "w").close()
+'''
+
+
+def with_anytime_planner(test):
+    """Run a test against the stand-in planner in anytime mode."""
+    def run(tmp):
+        (tmp / "script.json").write_text(json.dumps(SCRIPT))
+        return test(tmp, tmp / "fast-downward.py")
+
+    # Keep the small test problem away from the built-in planner
+    return with_fake_planner(FAKE_FAST_DOWNWARD, run, PLANNER_MODE="anytime", PLANNER_BUILTIN_MAX_ACTIONS="0")
+
+
+def test_improving_plans():
+    """Test that improved plans are yielded while the search is still running."""
+    print("=" * 60)
+    print("Testing anytime plan stream")
+    print("=" * 60)
+
+    def check(tmp, fake):
+        plans = []
+        for plan in iter_anytime_plans(fake, DOMAIN_PATH, PROBLEM_PATH, timeout=30):
+            # The search keeps going after each plan
+            assert not (tmp / "finished").exists() or plan.index == len(SCRIPT)
+            plans.append(plan)
+
+        assert [p.plan for p in plans] == [LONG_PLAN, SHORT_PLAN]
+        assert [p.cost for p in plans] == [7, 5]
+        assert [p.index for p in plans] == [1, 2]
+        assert plans[0].elapsed < plans[1].elapsed
+        print(f"✓ Plans of cost 7 then 5 after {plans[0].elapsed:.2f}s and {plans[1].elapsed:.2f}s")
+        print("✓ Non-improving plan skipped, partially written files not read early")
+        return True
+
+    return with_anytime_planner(check)
+
+
+def test_early_stop():
+    """Test that closing the generator kills the search."""
+    print("\n" + "=" * 60)
+    print("Testing early stop")
+    print("=" * 60)
+
+    def check(tmp, fake):
+        plans = iter_anytime_plans(fake, DOMAIN_PATH, PROBLEM_PATH, timeout=30)
+        assert next(plans).plan == LONG_PLAN
+        plans.close()
+        time.sleep(1.5)
+        assert not (tmp / "finished").exists()
+        assert list((tmp / "scratch").iterdir()) == []
+        print("✓ Search killed and job directory removed")
+        return True
+
+    return with_anytime_planner(check)
+
+
+def test_streamed_revisions():
+    """Test that the NDJSON stream renders each revision as it arrives."""
+    print("\n" + "=" * 60)
+    print("Testing streamed plan revisions")
+    print("=" * 60)
+
+    from visualizer_api import stream_plan
+
+    def check(tmp, fake):
+        assert run_planner.solve_problem(DOMAIN_PATH, PROBLEM_PATH, "gripper") == (SHORT_PLAN, True)
+        print("✓ solve_problem returns the best plan")
+
+        out = io.StringIO()
+        assert stream_plan(DOMAIN_PATH, PROBLEM_PATH, "gripper", out=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        headers = [r for r in records if r["type"] == "header"]
+        assert [h["revision"] for h in headers] == [0, 1]
+        states_per_revision = []
+        for record in records:
+            if record["type"] == "header":
+                states_per_revision.append(0)
+            elif record["type"] == "state":
+                states_per_revision[-1] += 1
+        assert states_per_revision == [len(LONG_PLAN) + 1, len(SHORT_PLAN) + 1]
+        trailer = records[-1]
+        assert trailer["type"] == "trailer" and trailer["plan"] == SHORT_PLAN
+        assert trailer["revisions"] == 2
+        assert trailer["stats"]["first_plan_time"] < trailer["stats"]["total_time"]
+        print("✓ Revision 0 rendered first, replaced by the shorter revision 1")
+        return True
+
+    return with_anytime_planner(check)
+
+
+def main():
+    """Run all tests."""
+    print("Anytime Planning Test Suite")
+    print("=" * 60)
+
+    try:
+        success = test_improving_plans() and test_early_stop() and test_streamed_revisions()
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,135 @@
+"""
+Test script for derived predicates (axioms).
+Fast Downward is not required.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, Problem, Predicate, StateGenerator
+from state_generator.axioms import AxiomEvaluator
+from benchmarks.synthetic import DERIVED_BLOCKS_DOMAIN as DOMAIN, towers_problem
+
+
+def recomputed(sg: StateGenerator):
+    """The current state with its derived facts re-derived from scratch."""
+    evaluator = AxiomEvaluator(sg.parser.axioms, sg.parser.objects_by_type())
+    base = {pred for pred in sg.get_current_state() if pred.name not in evaluator.derived}
+    return base | {Predicate(name, list(args)) for name, args in
+                   evaluator.closure((pred.name, tuple(pred.params)) for pred in base)}
+
+
+def test_parse_derived():
+    """Test parsing of :derived blocks into conjunctive rules."""
+    print("=" * 60)
+    print("Testing :derived parsing")
+    print("=" * 60)
+
+    domain = Domain.from_text(DOMAIN)
+    assert [axiom.name for axiom in domain.axioms] == ['covered', 'clear', 'above', 'above']
+    recursive = domain.axioms[3]
+    assert recursive.parameters == [('?x', 'block'), ('?y', 'block')]
+    assert recursive.variables == [('?z', 'block')]
+    assert recursive.condition == [(True, Predicate('on', ['?x', '?z'])),
+                                   (True, Predicate('above', ['?z', '?y']))]
+    print("✓ Disjunctions split into one rule each, exists variables kept")
+
+    try:
+        Domain.from_text(DOMAIN.replace("(not (covered ?x))", "(not (exists (?y) (on ?y ?x)))"))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    try:
+        StateGenerator(Domain.from_text(DOMAIN.replace("(not (covered ?x))", "(not (clear ?x))")),
+                       Problem.from_text(towers_problem(1, 3)))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Negated quantifiers and unstratifiable rules are rejected")
+    return True
+
+
+def test_derived_states():
+    """Test derived facts in the initial state and after each action."""
+    print("\n" + "=" * 60)
+    print("Testing derived facts along a plan")
+    print("=" * 60)
+
+    sg = StateGenerator(Domain.from_text(DOMAIN), Problem.from_text(towers_problem(1, 3)))
+    init = sg.get_current_state()
+    assert Predicate('clear', ['b0_2']) in init and Predicate('clear', ['b0_1']) not in init
+    assert Predicate('clear', ['table']) not in init
+    assert {pred for pred in init if pred.name == 'above'} == {
+        Predicate('above', [x, y]) for x, y in
+        [('b0_0', 'table'), ('b0_1', 'b0_0'), ('b0_1', 'table'), ('b0_2', 'b0_1'), ('b0_2', 'b0_0'),
+         ('b0_2', 'table')]}
+    print("✓ Initial state has its derived facts")
+
+    # Derived preconditions gate the actions
+    assert not sg.apply_action("(move-to-table b0_1 b0_0)")
+    states = sg.apply_plan(["(move-to-table b0_2 b0_1)", "(move-to-table b0_1 b0_0)",
+                            "(move b0_0 table b0_1)"])
+    assert len(states) == 4
+    last = states[-1]
+    assert Predicate('above', ['b0_0', 'b0_1']) in last and Predicate('above', ['b0_2', 'b0_1']) not in last
+    assert Predicate('clear', ['b0_2']) in last and Predicate('clear', ['b0_1']) not in last
+    assert sg.satisfies(sg.parser.goal)
+    assert sg.state_at(1) == states[1] and sg.history_cursor(3).state == last
+    print("✓ Derived facts follow the plan and are stored in the history")
+    return True
+
+
+def test_incremental_matches_recomputation():
+    """Test that incremental updates agree with re-deriving from scratch."""
+    print("\n" + "=" * 60)
+    print("Testing incremental evaluation on random walks")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    domain = Domain.from_text(DOMAIN)
+    sg = StateGenerator(domain, Problem.from_text(towers_problem(2, 4)))
+    blocks = sorted(sg.parser.objects)
+    for walk in range(3):
+        sg.reset()
+        assert sg.get_current_state() == recomputed(sg)
+        for _ in range(60):
+            moves = [f"(move-to-table {b} {f})" for b in blocks for f in blocks if f != 'table']
+            moves += [f"(move {b} {f} {t})" for b in blocks for f in blocks for t in blocks
+                      if len({b, f, t}) == 3]
+            applicable = [m for m in moves if sg.compile_action(m).is_applicable(sg.current_mask)]
+            sg.apply_action(rng.choice(applicable))
+            assert sg.get_current_state() == recomputed(sg)
+    print("✓ Same derived facts as a full re-derivation after every step")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Derived Predicate Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_parse_derived()
+            and test_derived_states()
+            and test_incremental_matches_recomputation()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,270 @@
+"""
+Test script for the built-in planner (grounding and in-process search).
+
+The routing tests point FD_PATH at a stand-in that records every call,
+so Fast Downward is not required.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import PDDLParser, StateGenerator
+from state_generator.facts import ids_mask
+from planner_runner.grounding import SuccessorGenerator, ground_task
+from planner_runner.lifted import LiftedTask
+from planner_runner.plan_cache import PlannerFailure, UNSOLVABLE
+from planner_runner.search import search
+from planner_runner.stats import PlannerStats
+from benchmarks.synthetic import (
+    DOMAINS_DIR, ROADS_DOMAIN, gripper_problem, roads_problem, rovers_problem, write_problem
+)
+from fake_planner import with_fake_planner
+
+DOMAINS = ["blocks_world", "depot", "gripper", "hanoi", "logistics", "rovers", "satellite"]
+
+FAKE_FAST_DOWNWARD = '''
+import os, shutil, sys
+args = sys.argv[1:]
+open(os.path.join(os.path.dirname(__file__), "calls.txt"), "a").write("run\\n")
+if "--translate" in args:
+    shutil.copy(args[-1], "output.sas")
+    sys.exit(0)
+with open(args[args.index("--plan-file") + 1], "w") as f:
+    f.write("(move room0 room1)\\n; cost = 1 (unit cost)\\n")
+'''
+
+
+def paths(domain: str):
+    return str(DOMAINS_DIR / domain / "domain.pddl"), str(DOMAINS_DIR / domain / "p1.pddl")
+
+
+def validate(parser: PDDLParser, plan) -> bool:
+    sg = StateGenerator(parser.domain, parser.problem)
+    return all(sg.apply_action(action) for action in plan) and sg.satisfies(parser.goal)
+
+
+def test_grounding():
+    """Test type-aware grounding."""
+    print("=" * 60)
+    print("Testing grounding")
+    print("=" * 60)
+
+    task = ground_task(PDDLParser(*paths("gripper")))
+    names = [action.name for action in task.actions]
+    # move: 2 rooms x 2 rooms; pick and drop: 2 balls x 2 rooms x 2 grippers
+    assert len(names) == 4 + 8 + 8
+    assert "(pick ball1 rooma left)" in names and not any(name.startswith("(pick rooma") for name in names)
+    print(f"✓ Gripper grounds to {len(names)} typed actions")
+
+    # hanoi's move forbids (= ?disc ?to) and friends
+    task = ground_task(PDDLParser(*paths("hanoi")))
+    for action in task.actions:
+        args = action.name.strip("()").split()[1:]
+        assert len(set(args)) == len(args), action.name
+    print("✓ Equality preconditions decided while grounding")
+
+    # navigate only along the ring's edges, take-image only where the target is
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = PDDLParser(paths("rovers")[0], str(write_problem(rovers_problem(2, 10, 4), Path(tmp), "ring")))
+    task = ground_task(parser)
+    counts = Counter(action.name.split()[0].lstrip("(") for action in task.actions)
+    assert counts == {"navigate": 2 * 20, "calibrate": 2 * 10, "take-image": 2 * 4, "communicate": 2 * 4}
+    assert not any(task.facts.fact(fact)[0] in ("connected", "at-target")
+                   for action in task.actions for fact in action.pre_pos)
+    print(f"✓ Static preconditions pruned: {len(task.actions)} rovers actions instead of 308")
+    return True
+
+
+def test_successor_generator():
+    """Test that the decision tree finds exactly the applicable actions."""
+    print("\n" + "=" * 60)
+    print("Testing successor generator")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    for domain in DOMAINS:
+        task = ground_task(PDDLParser(*paths(domain)))
+        successors = SuccessorGenerator(task.actions)
+        checks = [(ids_mask(a.pre_pos), ids_mask(a.pre_neg), ~ids_mask(a.delete), ids_mask(a.add))
+                     for a in task.actions]
+        state = task.init
+        for _ in range(50):
+            expected = [i for i, (pre, neg, _, _) in enumerate(checks) if state & pre == pre and not state & neg]
+            found = successors.applicable(state)
+            assert sorted(found) == expected, domain
+            if not found:
+                break
+            _, _, keep, add = checks[rng.choice(found)]
+            state = (state & keep) | add
+    print("✓ Same actions as testing every ground action, on random walks in every domain")
+    return True
+
+
+def test_search():
+    """Test GBFS and A* on every bundled domain."""
+    print("\n" + "=" * 60)
+    print("Testing search")
+    print("=" * 60)
+
+    for domain in DOMAINS:
+        parser = PDDLParser(*paths(domain))
+        task = ground_task(parser)
+        for algorithm, heuristic in [("gbfs", "ff"), ("gbfs", "add"), ("astar", "hmax")]:
+            result = search(task, algorithm, heuristic)
+            assert validate(parser, result.plan), (domain, algorithm, heuristic)
+        print(f"✓ {domain}: plans found and validated")
+
+    parser = PDDLParser(*paths("gripper"))
+    result = search(ground_task(parser), "astar", "hmax")
+    assert result.cost == 5
+    print("✓ A* with h_max finds the optimal gripper plan")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = PDDLParser(paths("gripper")[0], str(write_problem(gripper_problem(8, 3), Path(tmp), "big")))
+    result = search(ground_task(parser), "gbfs", "ff")
+    assert validate(parser, result.plan) and result.expanded < 100
+    print(f"✓ GBFS with h_FF solves 8 balls in {result.expanded} expansions")
+    return True
+
+
+def test_unsolvable():
+    """Test that unreachable goals are reported as unsolvable."""
+    print("\n" + "=" * 60)
+    print("Testing unsolvable problems")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A ball that is nowhere, and grippers that are never free
+        text = gripper_problem(1).replace("(at ball0 room0)", "")
+        parser = PDDLParser(paths("gripper")[0], str(write_problem(text, Path(tmp), "lost")))
+        blocked = gripper_problem(1).replace("(free left)", "").replace("(free right)", "")
+        blocked_parser = PDDLParser(paths("gripper")[0], str(write_problem(blocked, Path(tmp), "blocked")))
+    for p in (parser, blocked_parser):
+        try:
+            search(ground_task(p), "gbfs", "ff")
+            assert False, "expected PlannerFailure"
+        except PlannerFailure as e:
+            assert e.status == UNSOLVABLE
+    print("✓ Relaxed-unreachable goals rejected without search")
+    return True
+
+
+def with_call_count(test, **env):
+    """Run a test against the stand-in planner, counting its runs."""
+    def run(tmp):
+        calls = tmp / "calls.txt"
+        return test(tmp, lambda: len(calls.read_text().splitlines()) if calls.exists() else 0)
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, run, **env)
+
+
+def test_solve_problem_routing():
+    """Test that solve_problem keeps small problems in process."""
+    print("\n" + "=" * 60)
+    print("Testing solve_problem routing")
+    print("=" * 60)
+
+    domain, problem = paths("gripper")
+
+    def small(tmp, fd_calls):
+        stats = PlannerStats()
+        start = time.perf_counter()
+        plan, used_planner = run_planner.solve_problem(domain, problem, "gripper", stats=stats)
+        elapsed = time.perf_counter() - start
+        assert used_planner and fd_calls() == 0
+        assert validate(PDDLParser(domain, problem), plan) and len(plan) == 5
+        assert stats.planner == run_planner.BUILTIN_PLANNER and stats.config == "astar(hmax())"
+        assert stats.mode == run_planner.OPTIMAL_MODE and stats.expanded is not None
+        assert run_planner.describe_planner(stats) == "Built-in planner (astar(hmax()))"
+        print(f"✓ Solved in process in {elapsed * 1000:.1f} ms, Fast Downward not started")
+
+        stats = PlannerStats()
+        run_planner.solve_problem(domain, problem, stats=stats, mode=run_planner.SATISFICING_MODE)
+        assert stats.config == "gbfs(ff())"
+        print("✓ Satisficing mode uses GBFS with h_FF")
+
+        # A* needs well over 256 expansions here, so the budget is checked
+        hard = str(write_problem(gripper_problem(6, 3), tmp, "hard"))
+        os.environ['PLANNER_BUILTIN_TIMEOUT'] = "0.001"
+        try:
+            stats = PlannerStats()
+            plan, _ = run_planner.solve_problem(domain, hard, stats=stats)
+        finally:
+            del os.environ['PLANNER_BUILTIN_TIMEOUT']
+        assert plan == ["(move room0 room1)"] and fd_calls() == 2
+        assert stats.planner == run_planner.FAST_DOWNWARD_PLANNER and stats.config is None
+        print("✓ Fast Downward takes over when the built-in budget runs out")
+        return True
+
+    def missing_fd(tmp, fd_calls):
+        run_planner.FD_PATH = tmp / "missing" / "fast-downward.py"
+        problem = str(write_problem(gripper_problem(3), tmp, "three"))
+        stats = PlannerStats()
+        plan, used_planner = run_planner.solve_problem(domain, problem, "gripper", stats=stats)
+        assert used_planner and stats.planner == run_planner.BUILTIN_PLANNER
+        assert validate(PDDLParser(domain, problem), plan)
+        print("✓ Without Fast Downward the built-in planner replaces the predefined plan")
+        return True
+
+    def action_costs(tmp, fd_calls):
+        costs_domain = tmp / "roads-domain.pddl"
+        costs_domain.write_text(ROADS_DOMAIN)
+        problem = str(write_problem(roads_problem(3), tmp, "roads"))
+        parser = PDDLParser(str(costs_domain), problem)
+        for build in (ground_task, LiftedTask):
+            try:
+                build(parser)
+                assert False, "expected ValueError"
+            except ValueError:
+                pass
+        stats = PlannerStats()
+        plan, used_planner = run_planner.solve_problem(str(costs_domain), problem, stats=stats)
+        assert used_planner and fd_calls() == 2
+        assert stats.planner == run_planner.FAST_DOWNWARD_PLANNER
+        print("✓ Problems with action costs are left to Fast Downward")
+        return True
+
+    return (
+        with_call_count(small)
+        and with_call_count(missing_fd, PLANNER_BUILTIN_MAX_ACTIONS="0")
+        and with_call_count(action_costs)
+    )
+
+
+def main():
+    """Run all tests."""
+    print("Built-in Planner Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_grounding()
+            and test_successor_generator()
+            and test_search()
+            and test_unsolvable()
+            and test_solve_problem_routing()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
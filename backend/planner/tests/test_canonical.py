@@ -0,0 +1,162 @@
+"""
+Test script for the canonical problem form and rename-invariant plan cache keys.
+Uses stand-in planner functions, so Fast Downward is not required.
+"""
+
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, PDDLParser, Problem, StateGenerator
+from planner_runner.canonical import canonicalize
+from planner_runner.plan_cache import PlanCache, solve_cached
+from benchmarks.synthetic import DOMAINS_DIR, gripper_plan, gripper_problem, write_problem
+
+DOMAIN_PATH = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+SEARCH = "astar(lmcut())"
+
+ORIGINAL = """(define (problem gripper-p1)
+  (:domain gripper)
+  (:objects rooma roomb - room ball1 ball2 - ball left right - gripper)
+  (:init (at-robby rooma) (at ball1 rooma) (at ball2 rooma) (free left) (free right))
+  (:goal (and (at ball1 roomb) (at ball2 roomb))))
+"""
+
+# The same problem with every object renamed and the facts reordered
+RENAMED = """(define (problem homework-3)
+  (:domain gripper)
+  (:objects B - ball R-A r-b - room g1 g2 - gripper a - ball)
+  (:init (free g2) (at a R-A) (at B R-A) (free g1) (at-robby R-A))
+  (:goal (and (at B r-b) (at a r-b))))
+"""
+
+PLAN = ["(pick ball1 rooma left)", "(move rooma roomb)", "(drop ball1 roomb left)",
+        "(move roomb rooma)", "(pick ball2 rooma left)", "(move rooma roomb)", "(drop ball2 roomb left)"]
+
+
+def parse(problem_text: str) -> PDDLParser:
+    return PDDLParser(Domain.from_file(DOMAIN_PATH, use_cache=False), Problem.from_text(problem_text))
+
+
+class CountingPlanner:
+    """Stand-in planner that records how often it runs."""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.plan)
+
+
+def test_rename_invariance():
+    """Test that renamed and reordered problems share a canonical form."""
+    print("=" * 60)
+    print("Testing rename invariance")
+    print("=" * 60)
+
+    canonical = canonicalize(parse(ORIGINAL), ORIGINAL)
+    renamed = canonicalize(parse(RENAMED), RENAMED)
+    assert canonical is not None and renamed is not None
+    assert canonical.to_pddl() == renamed.to_pddl()
+    print("✓ Renamed problem has the same canonical form")
+
+    changed = canonicalize(parse(ORIGINAL.replace("(at ball2 roomb)", "(at ball2 rooma)")))
+    assert changed.to_pddl() != canonical.to_pddl()
+    print("✓ A different goal gives a different canonical form")
+
+    # Balls are interchangeable, so the search must prune symmetric branches
+    text = gripper_problem(40, 3)
+    shuffled = re.sub(r"ball(\d+)", lambda m: f"b{39 - int(m.group(1))}", text)
+    assert canonicalize(parse(text)).to_pddl() == canonicalize(parse(shuffled)).to_pddl()
+    print("✓ 40 interchangeable balls labeled canonically")
+
+    metric = ORIGINAL.replace(")))\n", "))\n  (:metric minimize (total-time)))\n")
+    assert canonicalize(parse(metric), metric) is None
+    print("✓ Problems with sections the parser drops have no canonical form")
+    return True
+
+
+def test_plan_mapping():
+    """Test that plans round-trip through canonical names."""
+    print("\n" + "=" * 60)
+    print("Testing plan mapping")
+    print("=" * 60)
+
+    canonical = canonicalize(parse(ORIGINAL))
+    renamed = canonicalize(parse(RENAMED))
+    encoded = canonical.encode_plan(PLAN)
+    assert "ball1" not in " ".join(encoded)
+    assert canonical.decode_plan(encoded) == PLAN
+
+    # The plan for the original problem, renamed for the other upload
+    plan = renamed.decode_plan(encoded)
+    sg = StateGenerator(parse(RENAMED).domain, parse(RENAMED).problem)
+    assert all(sg.apply_action(action) for action in plan)
+    assert sg.satisfies(parse(RENAMED).goal)
+    print(f"✓ Plan renamed to the other upload: {plan[0]} ...")
+    return True
+
+
+def test_cache_hit_across_names():
+    """Test that solve_cached answers a renamed problem from the cache."""
+    print("\n" + "=" * 60)
+    print("Testing plan cache hits across renamings")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = PlanCache(tmp / "cache")
+        original = str(write_problem(ORIGINAL, tmp, "original"))
+        renamed = str(write_problem(RENAMED, tmp, "renamed"))
+
+        planner = CountingPlanner(PLAN)
+        assert solve_cached(DOMAIN_PATH, original, SEARCH, planner, cache=cache) == PLAN
+        plan = solve_cached(DOMAIN_PATH, renamed, SEARCH, planner, cache=cache)
+        assert planner.calls == 1
+        assert cache.key_for_files(DOMAIN_PATH, original, SEARCH) == cache.key_for_files(DOMAIN_PATH, renamed, SEARCH)
+        assert plan[0] in ("(pick a R-A g1)", "(pick a R-A g2)", "(pick B R-A g1)", "(pick B R-A g2)")
+        print("✓ Renamed upload answered from the cache")
+
+        assert solve_cached(DOMAIN_PATH, original, SEARCH, planner, cache=cache) == PLAN
+        assert planner.calls == 1
+        print("✓ Original upload still gets its own names back")
+
+        other = str(write_problem(gripper_problem(3), tmp, "other"))
+        solve_cached(DOMAIN_PATH, other, SEARCH, CountingPlanner(gripper_plan(3)), cache=cache)
+        assert cache.key_for_files(DOMAIN_PATH, other, SEARCH) != cache.key_for_files(DOMAIN_PATH, original, SEARCH)
+        print("✓ Different problems keep separate entries")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Canonical Problem Form Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_rename_invariance()
+            and test_plan_mapping()
+            and test_cache_hit_across_names()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
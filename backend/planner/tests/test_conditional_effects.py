@@ -0,0 +1,143 @@
+"""
+Test script for conditional and universally quantified effects.
+Fast Downward is not required.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import Domain, PDDLParser, Predicate, Problem, StateGenerator, ParseCache
+from planner_runner.grounding import ground_task
+from planner_runner.lifted import LiftedTask
+from planner_runner.relevance import relevant_objects
+from benchmarks.synthetic import BRIEFCASE_DOMAIN, briefcase_problem
+
+
+def test_parse_effects():
+    """Test parsing of forall / when effects and their cache round trip."""
+    print("=" * 60)
+    print("Testing forall / when parsing")
+    print("=" * 60)
+
+    domain = Domain.from_text(BRIEFCASE_DOMAIN)
+    move = domain.actions['move']
+    assert move.effects == [(True, Predicate('at-bc', ['?to'])), (False, Predicate('at-bc', ['?from']))]
+    [effect] = move.conditional_effects
+    assert effect.variables == [('?o', 'portable')]
+    assert effect.condition == [(True, Predicate('in', ['?o'])), (False, Predicate('=', ['?from', '?to']))]
+    assert [pred.name for _, pred in effect.effects] == ['at', 'at', 'moved']
+    [empty] = domain.actions['empty'].conditional_effects
+    assert empty.condition == [] and empty.effects == [(False, Predicate('in', ['?o']))]
+    assert {pred.name for _, pred in move.all_effects()} == {'at-bc', 'at', 'moved'}
+    print("✓ Effects split into unconditional literals and conditional effects")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "domain.pddl"
+        path.write_text(BRIEFCASE_DOMAIN)
+        cache = ParseCache(Path(tmp) / "cache")
+        Domain.from_file(str(path), cache)
+        assert Domain.from_file(str(path), cache).actions == domain.actions
+    print("✓ Conditional effects survive the parse cache")
+    return True
+
+
+def test_replay():
+    """Test that conditional effects fire only where their condition holds."""
+    print("\n" + "=" * 60)
+    print("Testing replay with conditional effects")
+    print("=" * 60)
+
+    sg = StateGenerator(Domain.from_text(BRIEFCASE_DOMAIN), Problem.from_text(briefcase_problem(4)))
+    states = sg.apply_plan(["(put-in o0 l0)", "(put-in o2 l0)", "(move l0 l1)", "(empty)", "(move l1 l0)"])
+    assert len(states) == 6
+    after_move = states[3]
+    assert {Predicate('at', ['o0', 'l1']), Predicate('at', ['o2', 'l1']), Predicate('at', ['o1', 'l1']),
+            Predicate('moved', ['o0']), Predicate('moved', ['o2'])} <= after_move
+    assert Predicate('at', ['o0', 'l0']) not in after_move and Predicate('moved', ['o1']) not in after_move
+    assert not any(pred.name == 'in' for pred in states[4])
+    # Nothing is in the briefcase any more, so nothing moves back
+    assert {pred for pred in states[5] if pred.name == 'at'} == {pred for pred in states[4] if pred.name == 'at'}
+    assert sg.history_cursor(3).state == after_move
+    print("✓ Only objects in the briefcase move with it")
+
+    # A move to the same place: the equality condition is decided when compiling
+    sg.reset()
+    sg.apply_action("(put-in o0 l0)")
+    assert sg.compile_action("(move l0 l0)").conditional == ()
+    assert sg.apply_action("(move l0 l0)")
+    assert Predicate('moved', ['o0']) not in sg.get_current_state()
+    print("✓ Equality conditions are decided at compile time")
+    return True
+
+
+def test_expanded_once():
+    """Test that quantifiers are expanded once per grounded action."""
+    print("\n" + "=" * 60)
+    print("Testing one expansion per grounded action")
+    print("=" * 60)
+
+    sg = StateGenerator(Domain.from_text(BRIEFCASE_DOMAIN), Problem.from_text(briefcase_problem(50)))
+    expansions = []
+    ground_effects = sg.ground_effects
+    sg.ground_effects = lambda action, binding: expansions.append(action.name) or ground_effects(action, binding)
+
+    plan = ["(put-in o0 l0)", "(put-in o2 l0)"] + ["(move l0 l1)", "(move l1 l0)"] * 200
+    for _ in range(2):
+        states = sg.apply_plan(plan)
+        assert len(states) == len(plan) + 1
+    assert sorted(expansions) == ['move', 'move', 'put-in', 'put-in']
+    assert len(sg.compile_action("(move l0 l1)").conditional) == 50
+    assert Predicate('at', ['o2', 'l0']) in states[-1] and Predicate('at', ['o4', 'l0']) in states[-1]
+    print(f"✓ {2 * len(plan)} steps replayed with {len(expansions)} expansions")
+    return True
+
+
+def test_builtin_planner_rejects():
+    """Test that the built-in planner refuses conditional effects."""
+    print("\n" + "=" * 60)
+    print("Testing built-in planner support checks")
+    print("=" * 60)
+
+    parser = PDDLParser(Domain.from_text(BRIEFCASE_DOMAIN), Problem.from_text(briefcase_problem(3)))
+    for build in (ground_task, LiftedTask):
+        try:
+            build(parser)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    assert relevant_objects(parser) is None
+    print("✓ Grounding refuses and relevance pruning gives up")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Conditional Effects Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_parse_effects()
+            and test_replay()
+            and test_expanded_once()
+            and test_builtin_planner_rejects()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,181 @@
+"""
+Test script for goal decomposition.
+
+The solve tests use a stand-in for fast-downward.py that returns plans
+from a table keyed by problem name and logs each search, so Fast Downward
+is not required.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import Domain, PDDLParser, Problem
+from planner_runner.decomposition import partition_goals
+from planner_runner.stats import PlannerStats
+from benchmarks.synthetic import DERIVED_BLOCKS_DOMAIN, DOMAINS_DIR, depot_problem, towers_problem
+from fake_planner import with_fake_planner
+
+FAKE_FAST_DOWNWARD = '''
+import json, os, re, shutil, sys, time
+args = sys.argv[1:]
+if "--translate" in args:
+    shutil.copy(args[-1], "output.sas")
+    sys.exit(0)
+plan_file = args[args.index("--plan-file") + 1]
+name = re.search(r"\\(problem ([^)\\s]+)", open(args[args.index("--plan-file") + 2]).read()).group(1)
+here = os.path.dirname(__file__)
+plans = json.load(open(os.path.join(here, "plans.json")))
+start = time.time()
+if "-part" in name:
+    time.sleep(0.5)
+with open(os.path.join(here, "log.jsonl"), "a") as f:
+    f.write(json.dumps({"name": name, "search": args[-1], "start": start, "end": time.time()}) + "\\n")
+if name not in plans:
+    sys.exit(11)  # SEARCH_UNSOLVABLE
+with open(plan_file, "w") as f:
+    f.write("\\n".join(plans[name]) + "\\n; cost = 1 (unit cost)\\n")
+'''
+
+GRIPPER_PLANS = {
+    "gripper-p1-part0": ["(pick ball1 rooma left)", "(move rooma roomb)", "(drop ball1 roomb left)"],
+    "gripper-p1-part1": ["(pick ball2 rooma left)", "(move rooma roomb)", "(drop ball2 roomb left)"],
+    # ball2's plan from the initial state does not apply once the robot is in roomb
+    "gripper-p1-repair1": ["(move roomb rooma)", "(pick ball2 rooma left)", "(move rooma roomb)",
+                           "(drop ball2 roomb left)"],
+    "gripper-p1": ["(pick ball1 rooma left)", "(pick ball2 rooma right)", "(move rooma roomb)",
+                   "(drop ball1 roomb left)", "(drop ball2 roomb right)"],
+}
+
+GRIPPER_DOMAIN = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+GRIPPER_PROBLEM = str(DOMAINS_DIR / "gripper" / "p1.pddl")
+
+
+def test_partition():
+    """Test splitting goals into groups."""
+    print("=" * 60)
+    print("Testing goal partition")
+    print("=" * 60)
+
+    parser = PDDLParser(GRIPPER_DOMAIN, GRIPPER_PROBLEM)
+    groups = partition_goals(parser)
+    assert [[str(pred) for _, pred in group] for group in groups] == [["(at ball1 roomb)"], ["(at ball2 roomb)"]]
+    print("✓ Gripper: one group per ball (shared destination room does not link them)")
+
+    domain = Domain.from_file(str(DOMAINS_DIR / "depot" / "domain.pddl"), use_cache=False)
+    assert len(partition_goals(PDDLParser(domain, Problem.from_text(depot_problem(4, 2, 5))))) == 4
+    print("✓ Depot: one group per package")
+
+    parser = PDDLParser(str(DOMAINS_DIR / "blocks_world" / "domain.pddl"),
+                        str(DOMAINS_DIR / "blocks_world" / "p1.pddl"))
+    assert len(partition_goals(parser)) == 1
+    print("✓ Blocks world: stacked goals stay together")
+
+    # Derived clear / above link towers through the axioms, which are not analysed
+    text = towers_problem(2, 3).replace("(on b0_0 b0_1)", "(on b0_0 b0_1)\n      (on b1_0 b1_1)")
+    parser = PDDLParser(Domain.from_text(DERIVED_BLOCKS_DOMAIN), Problem.from_text(text))
+    assert len(parser.goal) == 2 and len(partition_goals(parser)) == 1
+    print("✓ Domains with derived predicates are not split")
+
+    # Subproblems are written without the metric and cost init
+    text = Path(GRIPPER_PROBLEM).read_text().replace("(:init", "(:init (= (total-cost) 0)")
+    text = text[:text.rindex(")")] + "(:metric minimize (total-cost)))\n"
+    parser = PDDLParser(Domain.from_file(GRIPPER_DOMAIN, use_cache=False), Problem.from_text(text))
+    assert parser.metric is not None and len(partition_goals(parser)) == 1
+    print("✓ Problems with a metric are not split")
+    return True
+
+
+def with_plans(test, plans):
+    """Run a test against the stand-in planner answering from ``plans``."""
+    def run(tmp):
+        (tmp / "plans.json").write_text(json.dumps(plans))
+        log = tmp / "log.jsonl"
+        return test(lambda: [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else [])
+
+    # Two workers even on a single-CPU machine, and no built-in planner
+    # for the small test problem
+    return with_fake_planner(FAKE_FAST_DOWNWARD, run, PLANNER_DECOMPOSITION_WORKERS="2",
+                             PLANNER_BUILTIN_MAX_ACTIONS="0")
+
+
+def test_merge_and_repair():
+    """Test concurrent subproblem solves, merging and repair."""
+    print("\n" + "=" * 60)
+    print("Testing decomposed solve")
+    print("=" * 60)
+
+    def check(runs):
+        stats = PlannerStats()
+        plan = run_planner.run_decomposed_planner(GRIPPER_DOMAIN, GRIPPER_PROBLEM, timeout=30, stats=stats)
+        assert plan == GRIPPER_PLANS["gripper-p1-part0"] + GRIPPER_PLANS["gripper-p1-repair1"]
+        assert stats.subproblems == 2 and stats.repaired_subproblems == 1
+        assert stats.plan_length == 7
+        print("✓ Subplans merged; the second group was solved again from the merged state")
+
+        part0, part1 = [run for run in runs() if "-part" in run["name"]]
+        assert part0["start"] < part1["end"] and part1["start"] < part0["end"]
+        assert all(run["search"] == run_planner.DEFAULT_SEARCH for run in runs())
+        print("✓ Subproblems searched concurrently with A* + LM-cut")
+        return True
+
+    return with_plans(check, GRIPPER_PLANS)
+
+
+def test_monolithic_fallback():
+    """Test that a failed merge falls back to solving the whole problem."""
+    print("\n" + "=" * 60)
+    print("Testing monolithic fallback")
+    print("=" * 60)
+
+    plans = {name: plan for name, plan in GRIPPER_PLANS.items() if name != "gripper-p1-repair1"}
+
+    def check(runs):
+        stats = PlannerStats()
+        plan = run_planner.run_decomposed_planner(GRIPPER_DOMAIN, GRIPPER_PROBLEM, timeout=30, stats=stats)
+        assert plan == GRIPPER_PLANS["gripper-p1"]
+        assert runs()[-1]["name"] == "gripper-p1"
+        assert runs()[-1]["search"] == run_planner.SATISFICING_SEARCH
+        assert stats.subproblems is None
+        print("✓ Whole problem solved with the satisficing search")
+
+        stats = PlannerStats()
+        plan, used_planner = run_planner.solve_problem(GRIPPER_DOMAIN, GRIPPER_PROBLEM, stats=stats,
+                                                       mode=run_planner.DECOMPOSE_MODE)
+        assert used_planner and plan == GRIPPER_PLANS["gripper-p1"] and stats.mode == "decompose"
+        print("✓ solve_problem runs decompose mode")
+        return True
+
+    return with_plans(check, plans)
+
+
+def main():
+    """Run all tests."""
+    print("Goal Decomposition Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_partition()
+            and test_merge_and_repair()
+            and test_monolithic_fallback()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,140 @@
+"""
+Test script for lifted successor generation.
+Fast Downward is not required.
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import PDDLParser, StateGenerator
+from state_generator.facts import ids_mask
+from planner_runner.admission import estimate_size
+from planner_runner.grounding import ground_task
+from planner_runner.lifted import LiftedTask
+from planner_runner.search import search
+from planner_runner.stats import PlannerStats
+from benchmarks.synthetic import DOMAINS_DIR, depot_problem, logistics_problem, write_problem
+
+DOMAINS = ["blocks_world", "depot", "gripper", "hanoi", "logistics", "rovers", "satellite"]
+
+
+def paths(domain: str):
+    return str(DOMAINS_DIR / domain / "domain.pddl"), str(DOMAINS_DIR / domain / "p1.pddl")
+
+
+def validate(parser: PDDLParser, plan) -> bool:
+    sg = StateGenerator(parser.domain, parser.problem)
+    return all(sg.apply_action(action) for action in plan) and sg.satisfies(parser.goal)
+
+
+def names(task, indices):
+    return sorted(task.actions[index].name for index in indices)
+
+
+def test_same_successors():
+    """Test that lifted and grounded successor generation agree."""
+    print("=" * 60)
+    print("Testing lifted successors against the grounded task")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    for domain in DOMAINS:
+        parser = PDDLParser(*paths(domain))
+        lifted, grounded = LiftedTask(parser), ground_task(parser)
+        lifted_successors, grounded_successors = lifted.successor_generator(), grounded.successor_generator()
+        state = lifted.init
+        for _ in range(30):
+            found = lifted_successors.applicable(state)
+            ground_state = grounded.facts.encode(lifted.facts.decode(state))
+            assert names(lifted, found) == names(grounded, grounded_successors.applicable(ground_state)), domain
+            if not found:
+                break
+            action = lifted.actions[rng.choice(found)]
+            state = (state & ~ids_mask(action.delete)) | ids_mask(action.add)
+        print(f"✓ {domain}: same applicable actions on a random walk")
+    return True
+
+
+def test_lifted_search():
+    """Test search over a lifted task."""
+    print("\n" + "=" * 60)
+    print("Testing search without grounding")
+    print("=" * 60)
+
+    for domain in DOMAINS:
+        parser = PDDLParser(*paths(domain))
+        result = search(LiftedTask(parser), "gbfs", "goalcount")
+        assert validate(parser, result.plan), domain
+    print("✓ GBFS with goal count solves every bundled problem lifted")
+
+    try:
+        search(LiftedTask(PDDLParser(*paths("gripper"))), "gbfs", "ff")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Relaxation heuristics refused on a lifted task")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = PDDLParser(paths("depot")[0], str(write_problem(depot_problem(200, 10, 40), Path(tmp), "big")))
+    task = LiftedTask(parser)
+    found = task.successor_generator().applicable(task.init)
+    # 10 trucks: 40 drives each (staying put included), plus a load per package at a truck's location
+    assert len(found) == 10 * 40 + 10 * 5 and len(task.actions) == len(found)
+    print(f"✓ {len(task.actions)} instances interned instead of {estimate_size(parser).actions:,} ground actions")
+    return True
+
+
+def test_builtin_planner_goes_lifted():
+    """Test that run_builtin_planner searches lifted when grounding is too large."""
+    print("\n" + "=" * 60)
+    print("Testing lifted fallback in run_builtin_planner")
+    print("=" * 60)
+
+    saved = run_planner.MAX_GROUND_ACTIONS
+    run_planner.MAX_GROUND_ACTIONS = 100
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            domain = paths("logistics")[0]
+            problem = str(write_problem(logistics_problem(4, 2, 4, 1, 2), Path(tmp), "small"))
+            stats = PlannerStats()
+            plan = run_planner.run_builtin_planner(domain, problem, timeout=60, stats=stats)
+            assert validate(PDDLParser(domain, problem), plan)
+            assert stats.config == "gbfs(goalcount())" and stats.planner == run_planner.BUILTIN_PLANNER
+    finally:
+        run_planner.MAX_GROUND_ACTIONS = saved
+    print(f"✓ Solved lifted with {stats.config}: {len(plan)} actions")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Lifted Successor Generation Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_same_successors()
+            and test_lifted_search()
+            and test_builtin_planner_goes_lifted()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,119 @@
+"""
+Stress test for concurrent planner runs.
+
+Runs many solves in parallel through run_fast_downward against a stand-in
+for fast-downward.py that, like the real translator, writes output.sas to
+its working directory, which the search component reads back later. If two
+jobs shared a directory, one would read the other's output.sas and return
+the wrong plan.
+"""
+
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from benchmarks.synthetic import DOMAINS_DIR
+from fake_planner import with_fake_planner, write_gripper_problem
+
+NUM_JOBS = 24
+
+FAKE_FAST_DOWNWARD = '''
+import random, re, sys, time
+args = sys.argv[1:]
+if "--translate" in args:
+    problem = open(args[-1]).read()
+    name = re.search(r"\\(problem ([^)\\s]+)", problem).group(1)
+    if name.startswith("slow"):
+        time.sleep(60)
+    with open("output.sas", "w") as f:
+        f.write(name)
+    sys.exit(0)
+plan_file = args[args.index("--plan-file") + 1]
+time.sleep(random.uniform(0.01, 0.1))
+with open(args[args.index("--plan-file") + 2]) as f:
+    translated = f.read()
+with open(plan_file, "w") as f:
+    f.write("(solve %s)\\n; cost = 1 (unit cost)\\n" % translated)
+'''
+
+
+def test_parallel_solves():
+    """Test that concurrent solves each get their own plan."""
+    print("=" * 60)
+    print(f"Testing {NUM_JOBS} parallel solves")
+    print("=" * 60)
+
+    domain_path = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+
+    def check(tmp):
+        scratch = tmp / "scratch"
+        names = [f"job-{i}" for i in range(NUM_JOBS)]
+        problems = [write_gripper_problem(tmp, name) for name in names]
+
+        def solve(problem_path):
+            return run_planner.run_fast_downward(domain_path, problem_path, timeout=30, use_cache=False)
+
+        with ThreadPoolExecutor(max_workers=NUM_JOBS) as pool:
+            plans = list(pool.map(solve, problems))
+
+        for name, plan in zip(names, plans):
+            assert plan == [f"(solve {name})"], (name, plan)
+        print(f"✓ All {NUM_JOBS} jobs returned their own plan")
+
+        assert list(scratch.iterdir()) == []
+        print("✓ Job directories removed")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def test_timeout_cleanup():
+    """Test that a timed-out job is killed and its directory removed."""
+    print("\n" + "=" * 60)
+    print("Testing timeout cleanup")
+    print("=" * 60)
+
+    domain_path = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+
+    def check(tmp):
+        scratch = tmp / "scratch"
+        problem_path = write_gripper_problem(tmp, "slow-job")
+        try:
+            run_planner.run_fast_downward(domain_path, problem_path, timeout=0.5, use_cache=False)
+            assert False, "expected TimeoutExpired"
+        except subprocess.TimeoutExpired:
+            pass
+        assert list(scratch.iterdir()) == []
+        print("✓ Timed-out job cleaned up")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def main():
+    """Run all tests."""
+    print("Parallel Solve Test Suite")
+    print("=" * 60)
+
+    try:
+        success = test_parallel_solves() and test_timeout_cleanup()
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
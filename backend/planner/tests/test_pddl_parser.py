@@ -0,0 +1,289 @@
+"""
+Test script for the PDDL parser.
+Tests the S-expression reader and domain/problem section handling.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from state_generator import PDDLParser, Domain, Problem, Predicate, ParseCache, StateGenerator
+from state_generator.pddl_parser import read_sexpr, parse_typed_list
+from benchmarks.synthetic import ROADS_DOMAIN, roads_problem
+
+
+def test_read_sexpr():
+    """Test nested tree construction, comments and error handling."""
+    print("=" * 60)
+    print("Testing S-expression reader")
+    print("=" * 60)
+
+    tree = read_sexpr("""
+        ; leading comment
+        (define (domain d) ; trailing comment
+          (:predicates (p ?x) (q)))
+    """)
+    assert tree == [['define', ['domain', 'd'], [':predicates', ['p', '?x'], ['q']]]]
+    print("✓ Nested tree built")
+
+    for bad in ["(a (b)", "(a))"]:
+        try:
+            read_sexpr(bad)
+        except ValueError:
+            print(f"✓ Rejected unbalanced input {bad!r}")
+        else:
+            raise AssertionError(f"Unbalanced input accepted: {bad!r}")
+
+    return True
+
+
+def test_typed_list():
+    """Test typed list parsing used by :objects, :parameters and :types."""
+    print("\n" + "=" * 60)
+    print("Testing typed lists")
+    print("=" * 60)
+
+    items = read_sexpr("(a b - block c - ball d)")[0]
+    assert parse_typed_list(items) == [
+        ('a', 'block'), ('b', 'block'), ('c', 'ball'), ('d', 'object')
+    ]
+    items = read_sexpr("(?x - (either truck plane))")[0]
+    assert parse_typed_list(items) == [('?x', 'truck')]
+    print("✓ Typed lists parsed")
+
+    return True
+
+
+def test_domain_problem_sections():
+    """Test that objects, types and conditions are parsed from every domain."""
+    print("\n" + "=" * 60)
+    print("Testing domain and problem sections")
+    print("=" * 60)
+
+    parser = PDDLParser(
+        str(PLANNER_DIR / "domains/gripper/domain.pddl"),
+        str(PLANNER_DIR / "domains/gripper/p1.pddl")
+    )
+    assert parser.domain_name == "gripper"
+    assert parser.problem_name == "gripper-p1"
+    # Type names must not leak into the object table
+    assert parser.objects == {
+        'rooma': 'room', 'roomb': 'room',
+        'ball1': 'ball', 'ball2': 'ball',
+        'left': 'gripper', 'right': 'gripper',
+    }
+    assert Predicate('at-robby', ['rooma']) in parser.init_state
+    assert parser.goal == [
+        (True, Predicate('at', ['ball1', 'roomb'])),
+        (True, Predicate('at', ['ball2', 'roomb'])),
+    ]
+    pick = parser.actions['pick']
+    assert pick.parameters == [('?b', 'ball'), ('?r', 'room'), ('?g', 'gripper')]
+    assert (False, Predicate('free', ['?g'])) in pick.effects
+    print("✓ Gripper parsed")
+
+    depot = PDDLParser(
+        str(PLANNER_DIR / "domains/depot/domain.pddl"),
+        str(PLANNER_DIR / "domains/depot/p1.pddl")
+    )
+    assert depot.types['depot'] == 'location'
+    assert depot.types['location'] == 'object'
+    print("✓ Type hierarchy parsed")
+
+    return True
+
+
+def test_nested_conditions_and_inline_comments():
+    """Test nested and/not, single-literal effects and inline comments."""
+    print("\n" + "=" * 60)
+    print("Testing nested conditions")
+    print("=" * 60)
+
+    domain = """
+    (define (domain toy)
+      (:requirements :strips)
+      (:constants home)
+      (:predicates (at ?x) (lit ?x))
+      (:action go
+        :parameters (?from ?to)
+        :precondition (and (at ?from) (and (not (at ?to)))) ; nested and
+        :effect (at ?to))
+    )
+    """
+    problem = """
+    (define (problem toy-1) (:domain toy)
+      (:objects a b) ; untyped
+      (:init (at a))
+      (:goal (at b)))
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        domain_path = Path(tmp) / "domain.pddl"
+        problem_path = Path(tmp) / "problem.pddl"
+        domain_path.write_text(domain)
+        problem_path.write_text(problem)
+        parser = PDDLParser(str(domain_path), str(problem_path))
+
+    go = parser.actions['go']
+    assert go.preconditions == [
+        (True, Predicate('at', ['?from'])),
+        (False, Predicate('at', ['?to'])),
+    ]
+    assert go.effects == [(True, Predicate('at', ['?to']))]
+    assert parser.objects == {'home': 'object', 'a': 'object', 'b': 'object'}
+    assert parser.goal == [(True, Predicate('at', ['b']))]
+    print("✓ Nested conditions parsed")
+
+    return True
+
+
+def test_numeric_init_facts():
+    """Test that numeric fluent assignments in :init are skipped."""
+    print("\n" + "=" * 60)
+    print("Testing numeric init facts")
+    print("=" * 60)
+
+    problem = Problem.from_text("""
+    (define (problem costs) (:domain toy)
+      (:objects a b)
+      (:init (at a) (= (total-cost) 0) (= (distance a b) 5))
+      (:goal (at b))
+      (:metric minimize (total-cost)))
+    """)
+    assert problem.init_state == {Predicate('at', ['a'])}
+    assert problem.numeric_init == [['=', ['total-cost'], '0'], ['=', ['distance', 'a', 'b'], '5']]
+    assert problem.metric == ['minimize', ['total-cost']]
+    print("✓ total-cost and other function values are not read as facts")
+    return True
+
+
+def test_numeric_effects():
+    """Test that increase / decrease effects are kept apart from literals."""
+    print("\n" + "=" * 60)
+    print("Testing numeric effects")
+    print("=" * 60)
+
+    domain = Domain.from_text(ROADS_DOMAIN)
+    assert domain.functions == [('total-cost', []), ('road-length', ['place', 'place'])]
+    drive = domain.actions['drive']
+    assert drive.effects == [(False, Predicate('at', ['?from'])), (True, Predicate('at', ['?to'])),
+                             (True, Predicate('visited', ['?to']))]
+    assert drive.numeric_effects == [['increase', ['total-cost'], ['road-length', '?from', '?to']]]
+
+    conditional = Domain.from_text(ROADS_DOMAIN.replace(
+        "(increase (total-cost) (road-length ?from ?to))",
+        "(when (visited ?to) (and (visited ?from) (decrease (total-cost) 1)))"))
+    [effect] = conditional.actions['drive'].conditional_effects
+    assert effect.effects == [(True, Predicate('visited', ['?from']))]
+    assert conditional.actions['drive'].numeric_effects == [['decrease', ['total-cost'], '1']]
+    print("✓ Numeric effects are not parsed as predicates")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "domain.pddl"
+        path.write_text(ROADS_DOMAIN)
+        cache = ParseCache(Path(tmp) / "cache")
+        Domain.from_file(str(path), cache)
+        assert Domain.from_file(str(path), cache).actions == domain.actions
+    print("✓ Numeric effects survive the parse cache")
+
+    sg = StateGenerator(domain, Problem.from_text(roads_problem(3)))
+    assert sg.apply_plan(["(drive p0 p1)", "(drive p1 p2)"])[-1] >= {Predicate('at', ['p2'])}
+    print("✓ Actions with numeric effects can be applied")
+    return True
+
+
+def test_parse_cache():
+    """Test that cached parses round-trip and the cache stays size-bounded."""
+    print("\n" + "=" * 60)
+    print("Testing parse cache")
+    print("=" * 60)
+
+    domain_path = str(PLANNER_DIR / "domains/depot/domain.pddl")
+    problem_path = str(PLANNER_DIR / "domains/depot/p1.pddl")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(Path(tmp))
+        fresh = PDDLParser(domain_path, problem_path, use_cache=False)
+        first = PDDLParser(domain_path, problem_path, cache=cache)
+        assert len(list(Path(tmp).iterdir())) == 2
+        cached = PDDLParser(domain_path, problem_path, cache=cache)
+
+        fields = ('domain_name', 'types', 'constants', 'predicates_schema', 'functions', 'actions',
+                  'problem_name', 'objects', 'init_state', 'goal', 'numeric_init', 'metric')
+        for field in fields:
+            assert getattr(cached, field) == getattr(fresh, field), field
+            assert getattr(first, field) == getattr(fresh, field), field
+        print("✓ Cached parse matches fresh parse")
+
+        # A tiny limit keeps only the most recently written entry
+        small = ParseCache(Path(tmp), max_bytes=1)
+        small.put("a", {"x": 1})
+        assert [p.stem for p in Path(tmp).iterdir()] == []
+        small.max_bytes = 10_000
+        small.put("b", {"x": 2})
+        assert small.get("b") == {"x": 2}
+        assert small.get("a") is None
+        print("✓ LRU eviction keeps the cache within its size limit")
+
+    return True
+
+
+def test_shared_domain():
+    """Test binding one parsed domain to many problems."""
+    print("\n" + "=" * 60)
+    print("Testing shared domain")
+    print("=" * 60)
+
+    domain = Domain.from_file(str(PLANNER_DIR / "domains/gripper/domain.pddl"), use_cache=False)
+    problem_text = (PLANNER_DIR / "domains/gripper/p1.pddl").read_text()
+
+    generators = []
+    for i in range(500):
+        problem = Problem.from_text(problem_text.replace("gripper-p1", f"gripper-{i}"))
+        generators.append(StateGenerator(domain, problem))
+
+    assert all(sg.parser.actions is domain.actions for sg in generators)
+    assert generators[-1].parser.problem_name == "gripper-499"
+    assert generators[0].apply_plan(["(move rooma roomb)"])[-1] == {
+        Predicate('at-robby', ['roomb']), Predicate('at', ['ball1', 'rooma']),
+        Predicate('at', ['ball2', 'rooma']), Predicate('free', ['left']),
+        Predicate('free', ['right']),
+    }
+    print(f"✓ {len(generators)} problems bound to one parsed domain")
+
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("PDDL Parser Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_read_sexpr()
+            and test_typed_list()
+            and test_domain_problem_sections()
+            and test_nested_conditions_and_inline_comments()
+            and test_numeric_init_facts()
+            and test_numeric_effects()
+            and test_parse_cache()
+            and test_shared_domain()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
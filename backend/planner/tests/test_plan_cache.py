@@ -0,0 +1,181 @@
+"""
+Test script for the plan cache.
+Uses stand-in planner functions, so Fast Downward is not required.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from planner_runner.plan_cache import (
+    PlanCache, PlannerFailure, normalize_pddl, solve_cached, SOLVED, UNSOLVABLE
+)
+
+DOMAIN_PATH = str(PLANNER_DIR / "domains/gripper/domain.pddl")
+PROBLEM_PATH = str(PLANNER_DIR / "domains/gripper/p1.pddl")
+SEARCH = "astar(lmcut())"
+PLAN = ["(pick ball1 rooma left)", "(move rooma roomb)", "(drop ball1 roomb left)"]
+
+
+class CountingPlanner:
+    """Stand-in planner that records how often it runs."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return list(self.outcome)
+
+
+def test_normalized_keys():
+    """Test that formatting-only edits share a key and real edits do not."""
+    print("=" * 60)
+    print("Testing plan cache keys")
+    print("=" * 60)
+
+    text = "(define (problem p)\n  (:init (at a)) ; start\n)"
+    assert normalize_pddl(text) == normalize_pddl("(DEFINE (problem p) (:init  (at a)))")
+    key = PlanCache.plan_key("(domain)", text, SEARCH)
+    assert key == PlanCache.plan_key("(DOMAIN)", "(define(problem p)(:init(at a)))", " astar(lmcut()) ")
+    assert key != PlanCache.plan_key("(domain)", text.replace("(at a)", "(at b)"), SEARCH)
+    assert key != PlanCache.plan_key("(domain)", text, "lazy_greedy([ff()])")
+    print("✓ Keys ignore comments, case and whitespace but not content or search")
+    return True
+
+
+def test_solved_and_failed_entries():
+    """Test that plans and input-determined failures are served from the cache."""
+    print("\n" + "=" * 60)
+    print("Testing cached outcomes")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PlanCache(Path(tmp))
+
+        planner = CountingPlanner(PLAN)
+        assert solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, planner, cache=cache) == PLAN
+        start = time.perf_counter()
+        assert solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, planner, cache=cache) == PLAN
+        elapsed = time.perf_counter() - start
+        assert planner.calls == 1
+        print(f"✓ Plan served from cache in {elapsed * 1000:.2f} ms")
+
+        assert cache.invalidate_files(DOMAIN_PATH, PROBLEM_PATH, SEARCH)
+        assert not cache.invalidate_files(DOMAIN_PATH, PROBLEM_PATH, SEARCH)
+        solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, planner, cache=cache)
+        assert planner.calls == 2
+        print("✓ Invalidation forces a fresh run")
+
+        cache.clear()
+        unsolvable = CountingPlanner(PlannerFailure.from_exit_code(11, "Search unsolvable"))
+        for _ in range(2):
+            try:
+                solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, unsolvable, cache=cache)
+                assert False, "expected PlannerFailure"
+            except PlannerFailure as e:
+                assert e.status == UNSOLVABLE and str(e) == "Search unsolvable"
+        assert unsolvable.calls == 1
+        print("✓ Unsolvable verdict cached")
+
+        cache.clear()
+        out_of_memory = CountingPlanner(PlannerFailure.from_exit_code(22, "Out of memory"))
+        for _ in range(2):
+            try:
+                solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, out_of_memory, cache=cache)
+            except PlannerFailure as e:
+                assert e.status is None
+        assert out_of_memory.calls == 2
+        print("✓ Resource failures are not cached")
+
+    return True
+
+
+def test_timeouts():
+    """Test that a timeout is only reused for equal or shorter limits."""
+    print("\n" + "=" * 60)
+    print("Testing cached timeouts")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PlanCache(Path(tmp))
+        slow = CountingPlanner(subprocess.TimeoutExpired(["fd"], 10))
+
+        for timeout in (10, 5):
+            try:
+                solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, slow, timeout=timeout, cache=cache)
+                assert False, "expected TimeoutExpired"
+            except subprocess.TimeoutExpired:
+                pass
+        assert slow.calls == 1
+        print("✓ Shorter limit answered from the cache")
+
+        slow.outcome = PLAN
+        assert solve_cached(DOMAIN_PATH, PROBLEM_PATH, SEARCH, slow, timeout=60, cache=cache) == PLAN
+        assert slow.calls == 2
+        assert cache.get(cache.key_for_files(DOMAIN_PATH, PROBLEM_PATH, SEARCH))["status"] == SOLVED
+        print("✓ Longer limit re-runs the planner and replaces the entry")
+
+    return True
+
+
+def test_run_fast_downward_cache_hit():
+    """Test that run_fast_downward answers from the cache without the planner."""
+    print("\n" + "=" * 60)
+    print("Testing run_fast_downward cache hit")
+    print("=" * 60)
+
+    import run_planner
+
+    with tempfile.TemporaryDirectory() as tmp:
+        previous = os.environ.get('PLAN_CACHE_DIR')
+        os.environ['PLAN_CACHE_DIR'] = tmp
+        try:
+            solve_cached(DOMAIN_PATH, PROBLEM_PATH, run_planner.DEFAULT_SEARCH, CountingPlanner(PLAN))
+            assert run_planner.run_fast_downward(DOMAIN_PATH, PROBLEM_PATH) == PLAN
+            print("✓ Cached plan returned")
+        finally:
+            if previous is None:
+                del os.environ['PLAN_CACHE_DIR']
+            else:
+                os.environ['PLAN_CACHE_DIR'] = previous
+
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Plan Cache Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_normalized_keys()
+            and test_solved_and_failed_entries()
+            and test_timeouts()
+            and test_run_fast_downward_cache_hit()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
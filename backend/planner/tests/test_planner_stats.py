@@ -0,0 +1,189 @@
+"""
+Test script for planner statistics and resource limits.
+
+Uses a stand-in for fast-downward.py that prints Fast Downward's statistics
+lines and, depending on the problem name, exceeds its memory or CPU limit,
+so Fast Downward is not required.
+"""
+
+import sys
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from planner_runner.plan_cache import PlannerFailure, SOLVED, TIMEOUT, UNSOLVABLE
+from planner_runner.stats import OUT_OF_MEMORY, PlannerStats, classify_exit_code
+from benchmarks.synthetic import DOMAINS_DIR
+from fake_planner import with_fake_planner, write_gripper_problem
+
+DOMAIN_PATH = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+
+SEARCH_OUTPUT = """\
+[t=0.001s, 9000 KB] Solution found!
+[t=0.001s, 9000 KB] Plan length: 2 step(s).
+[t=0.001s, 9000 KB] Plan cost: 2
+[t=0.001s, 9000 KB] Expanded 3 state(s).
+[t=0.001s, 9000 KB] Reopened 0 state(s).
+[t=0.001s, 9000 KB] Evaluated 7 state(s).
+[t=0.001s, 9000 KB] Evaluations: 7
+[t=0.001s, 9000 KB] Generated 12 state(s).
+[t=0.001s, 9000 KB] Dead ends: 0 state(s).
+[t=0.001s, 9000 KB] Expanded until last jump: 1 state(s).
+[t=0.001s, 9000 KB] Search time: 0.25s
+[t=0.001s, 9000 KB] Total time: 0.30s
+Solution found.
+Peak memory: 9404 KB
+"""
+
+FAKE_FAST_DOWNWARD = '''
+import re, sys
+args = sys.argv[1:]
+if "--translate" in args:
+    name = re.search(r"\\(problem ([^)\\s]+)", open(args[-1]).read()).group(1)
+    open("output.sas", "w").write(name)
+    print("Done! [0.01s CPU, 0.01s wall-clock]")
+    print("Translator peak memory: 20480 KB")
+    sys.exit(0)
+plan_file = args[args.index("--plan-file") + 1]
+name = open(args[args.index("--plan-file") + 2]).read()
+if name == "memory-hog":
+    try:
+        hog = bytearray(512 * 1024 * 1024)
+    except MemoryError:
+        sys.exit(22)  # SEARCH_OUT_OF_MEMORY
+if name == "cpu-hog":
+    while True:
+        pass
+if name == "unsolvable":
+    print("Completely explored state space -- no solution!")
+    sys.exit(11)
+with open(plan_file, "w") as f:
+    f.write("(move rooma roomb)\\n(move roomb rooma)\\n; cost = 2 (unit cost)\\n")
+print(%r, end="")
+''' % SEARCH_OUTPUT
+
+
+def test_parse_log():
+    """Test parsing of Fast Downward output and exit codes."""
+    print("=" * 60)
+    print("Testing statistics parsing")
+    print("=" * 60)
+
+    stats = PlannerStats()
+    stats.parse_log("Translator peak memory: 20480 KB\n")
+    stats.parse_log(SEARCH_OUTPUT)
+    assert (stats.expanded, stats.generated, stats.evaluated) == (3, 12, 7)
+    assert stats.search_time == 0.25
+    assert (stats.plan_cost, stats.plan_length) == (2, 2)
+    assert stats.peak_memory_kb == 20480
+    print("✓ Node counts, search time, plan cost and peak memory parsed")
+
+    assert classify_exit_code(0) == SOLVED
+    assert classify_exit_code(11) == UNSOLVABLE
+    assert classify_exit_code(22) == OUT_OF_MEMORY
+    assert classify_exit_code(23) == TIMEOUT
+    assert classify_exit_code(-24) == TIMEOUT  # SIGXCPU
+    assert classify_exit_code(35) == "failed"
+    print("✓ Exit codes classified")
+    return True
+
+
+def test_solve_stats():
+    """Test that a solve returns its statistics."""
+    print("\n" + "=" * 60)
+    print("Testing statistics of a solve")
+    print("=" * 60)
+
+    def check(tmp):
+        stats = PlannerStats()
+        plan = run_planner.run_fast_downward(DOMAIN_PATH, write_gripper_problem(tmp, "solved"), timeout=30, stats=stats)
+        assert plan == ["(move rooma roomb)", "(move roomb rooma)"]
+        assert stats.outcome == SOLVED and stats.exit_code == 0 and not stats.cached
+        assert stats.expanded == 3 and stats.plan_cost == 2
+        assert stats.translate_time > 0 and stats.search_wall_time > 0
+        assert stats.peak_memory_kb == 20480
+        print(f"✓ Translate {stats.translate_time:.3f}s, search {stats.search_time}s, "
+              f"{stats.expanded} expanded")
+
+        stats = PlannerStats()
+        try:
+            run_planner.run_fast_downward(DOMAIN_PATH, write_gripper_problem(tmp, "unsolvable"), timeout=30, stats=stats)
+            assert False, "expected PlannerFailure"
+        except PlannerFailure:
+            pass
+        assert stats.outcome == UNSOLVABLE and stats.exit_code == 11
+        print("✓ Unsolvable run classified")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def test_memory_limit():
+    """Test that the memory limit applies to the planner process."""
+    print("\n" + "=" * 60)
+    print("Testing memory limit")
+    print("=" * 60)
+
+    def check(tmp):
+        stats = PlannerStats()
+        try:
+            run_planner.run_fast_downward(DOMAIN_PATH, write_gripper_problem(tmp, "memory-hog"), timeout=30, stats=stats)
+            assert False, "expected PlannerFailure"
+        except PlannerFailure as e:
+            assert e.exit_code == 22
+        assert stats.outcome == OUT_OF_MEMORY
+        print("✓ 512 MB allocation refused under a 256 MB limit")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check, PLANNER_MEMORY_LIMIT_MB="256")
+
+
+def test_cpu_limit():
+    """Test that the CPU limit stops a runaway search."""
+    print("\n" + "=" * 60)
+    print("Testing CPU limit")
+    print("=" * 60)
+
+    def check(tmp):
+        stats = PlannerStats()
+        try:
+            run_planner.run_fast_downward(DOMAIN_PATH, write_gripper_problem(tmp, "cpu-hog"), timeout=30, stats=stats)
+            assert False, "expected PlannerFailure"
+        except PlannerFailure:
+            pass
+        assert stats.outcome == TIMEOUT and stats.search_wall_time < 10
+        print(f"✓ Busy loop stopped after {stats.search_wall_time:.1f}s by a 1s CPU limit")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check, PLANNER_CPU_LIMIT="1")
+
+
+def main():
+    """Run all tests."""
+    print("Planner Statistics Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_parse_log()
+            and test_solve_stats()
+            and test_memory_limit()
+            and test_cpu_limit()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,176 @@
+"""
+Test script for the search portfolio.
+
+Uses a stand-in for fast-downward.py whose configurations finish at
+different times with different plan costs, so Fast Downward is not
+required: the greedy configuration answers first with the most expensive
+plan, LAMA later with a cheaper one, and A* last with the optimal one.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+from planner_runner.plan_cache import PlannerFailure, UNSOLVABLE
+from planner_runner.portfolio import run_portfolio, read_plan_file, FIRST, BEST
+from benchmarks.synthetic import DOMAINS_DIR
+from fake_planner import with_fake_planner, write_gripper_problem
+
+FAKE_FAST_DOWNWARD = '''
+import os, sys, time
+args = sys.argv[1:]
+plan_file = args[args.index("--plan-file") + 1]
+problem = args[args.index("--plan-file") + 3]
+command = " ".join(args)
+if "lazy_greedy" in command:
+    name, delay, cost = "greedy", 0.1, 5
+elif "--alias" in command:
+    name, delay, cost = "lama", 0.6, 4
+else:
+    name, delay, cost = "astar", 1.2, 3
+if "unsolvable" in problem:
+    if name == "greedy":
+        sys.exit(11)
+    delay = 60
+if "hang" in problem:
+    delay = 60
+time.sleep(delay)
+with open(plan_file, "w") as f:
+    for i in range(cost):
+        f.write("(step-%d %s)\\n" % (i, name))
+    f.write("; cost = %d (unit cost)\\n" % cost)
+open(os.path.join(os.path.dirname(problem), name + ".done"), "w").close()
+'''
+
+
+DOMAIN_PATH = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+
+
+def test_first_plan():
+    """Test that first mode returns the fastest plan and kills the rest."""
+    print("=" * 60)
+    print("Testing portfolio first-plan mode")
+    print("=" * 60)
+
+    def check(tmp):
+        fake, scratch = tmp / "fast-downward.py", tmp / "scratch"
+        problem_path = write_gripper_problem(tmp / "first", "problem")
+        start = time.monotonic()
+        result = run_portfolio(fake, DOMAIN_PATH, problem_path, mode=FIRST, timeout=30)
+        elapsed = time.monotonic() - start
+        assert result.config == "lazy-greedy-ff" and result.cost == 5, result
+        assert len(result.plan) == 5 and not result.optimal
+        assert elapsed < 0.6, elapsed
+        print(f"✓ Greedy plan returned after {elapsed:.2f}s")
+
+        # The slower configurations were killed before writing their markers
+        time.sleep(1.5)
+        done = sorted(p.stem for p in Path(problem_path).parent.glob("*.done"))
+        assert done == ["greedy"], done
+        assert list(scratch.iterdir()) == []
+        print("✓ Losing configurations killed and job directories removed")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def test_best_plan():
+    """Test that best mode returns the cheapest plan by the deadline."""
+    print("\n" + "=" * 60)
+    print("Testing portfolio best-plan mode")
+    print("=" * 60)
+
+    def check(tmp):
+        fake = tmp / "fast-downward.py"
+        problem_path = write_gripper_problem(tmp / "best", "problem")
+        result = run_portfolio(fake, DOMAIN_PATH, problem_path, mode=BEST, deadline=0.9, timeout=30)
+        assert result.config == "lama-first" and result.cost == 4, result
+        print(f"✓ Deadline: cheapest plan so far from {result.config} (cost {result.cost})")
+
+        result = run_portfolio(fake, DOMAIN_PATH, problem_path, mode=BEST, timeout=30)
+        assert result.config == "astar-lmcut" and result.cost == 3 and result.optimal, result
+        print("✓ No deadline: optimal plan returned as soon as A* finishes")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def test_failures():
+    """Test unsolvable verdicts and timeouts."""
+    print("\n" + "=" * 60)
+    print("Testing portfolio failures")
+    print("=" * 60)
+
+    def check(tmp):
+        fake, scratch = tmp / "fast-downward.py", tmp / "scratch"
+        problem_path = write_gripper_problem(tmp / "unsolvable", "problem")
+        start = time.monotonic()
+        try:
+            run_portfolio(fake, DOMAIN_PATH, problem_path, mode=BEST, timeout=30)
+            assert False, "expected PlannerFailure"
+        except PlannerFailure as e:
+            assert e.status == UNSOLVABLE
+        assert time.monotonic() - start < 5
+        print("✓ One configuration proving unsolvability stops the portfolio")
+
+        problem_path = write_gripper_problem(tmp / "hang", "problem")
+        try:
+            run_portfolio(fake, DOMAIN_PATH, problem_path, mode=FIRST, timeout=0.5)
+            assert False, "expected TimeoutExpired"
+        except subprocess.TimeoutExpired:
+            pass
+        assert list(scratch.iterdir()) == []
+        print("✓ Timeout kills every configuration")
+        return True
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check)
+
+
+def test_read_plan_file():
+    """Test plan file parsing with and without a cost line."""
+    print("\n" + "=" * 60)
+    print("Testing plan file parsing")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plan_file = Path(tmp) / "sas_plan"
+        plan_file.write_text("(move a b)\n(move b c)\n; cost = 7 (general cost)\n")
+        assert read_plan_file(plan_file) == (["(move a b)", "(move b c)"], 7)
+        plan_file.write_text("(move a b)\n")
+        assert read_plan_file(plan_file) == (["(move a b)"], 1)
+    print("✓ Cost read from the plan file, plan length otherwise")
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Search Portfolio Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_first_plan()
+            and test_best_plan()
+            and test_failures()
+            and test_read_plan_file()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
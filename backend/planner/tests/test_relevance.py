@@ -0,0 +1,241 @@
+"""
+Test script for goal-relevance pruning.
+
+The solve tests use a stand-in for fast-downward.py that records the
+problem it was given, so Fast Downward is not required.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from state_generator import Domain, PDDLParser, Problem, StateGenerator
+from planner_runner.relevance import reduce_files, reduce_problem, relevant_objects
+from planner_runner.stats import PlannerStats
+from benchmarks.synthetic import (
+    DOMAINS_DIR, ROADS_DOMAIN, depot_problem, gripper_plan, gripper_problem, roads_problem, rovers_problem,
+    write_problem
+)
+from fake_planner import with_fake_planner
+
+FAKE_FAST_DOWNWARD = '''
+import os, shutil, sys
+args = sys.argv[1:]
+if "--translate" in args:
+    shutil.copy(args[-1], "output.sas")
+    sys.exit(0)
+plan_file = args[args.index("--plan-file") + 1]
+problem = open(args[args.index("--plan-file") + 2]).read()
+here = os.path.dirname(__file__)
+with open(os.path.join(here, "seen.txt"), "a") as f:
+    f.write(problem + "\\0")
+if "keep-all" in problem and "spare0" not in problem:
+    sys.exit(11)  # SEARCH_UNSOLVABLE
+with open(plan_file, "w") as f:
+    f.write(open(os.path.join(here, "plan.txt")).read())
+'''
+
+
+def parse(domain: str, problem_text: str) -> PDDLParser:
+    domain = Domain.from_file(str(DOMAINS_DIR / domain / "domain.pddl"), use_cache=False)
+    return PDDLParser(domain, Problem.from_text(problem_text))
+
+
+def test_gripper_spares():
+    """Test that balls outside the goal are pruned and the plan still applies."""
+    print("=" * 60)
+    print("Testing gripper with spare balls")
+    print("=" * 60)
+
+    parser = parse("gripper", gripper_problem(4, 3, num_spare=20))
+    reduction = reduce_problem(parser)
+    assert reduction is not None
+    assert sorted(reduction.removed_objects) == sorted(f"spare{i}" for i in range(20))
+    assert reduction.removed_facts == 20
+    assert {"left", "right", "room0", "room1", "room2"} <= set(reduction.problem.objects)
+    print(f"✓ {len(reduction.removed_objects)} spare balls and {reduction.removed_facts} facts removed")
+
+    # The reduced problem round-trips through the parser and keeps the plan valid
+    reduced = parse("gripper", reduction.to_pddl())
+    plan = gripper_plan(4, 3)
+    for sg in (StateGenerator(reduced.domain, reduced.problem), StateGenerator(parser.domain, parser.problem)):
+        assert all(sg.apply_action(action) for action in plan)
+        assert all(pred in sg.current_state for positive, pred in parser.goal)
+    print("✓ Plan for the reduced problem reaches the goal of the original")
+    return True
+
+
+def test_other_domains():
+    """Test pruning on depot, rovers and logistics."""
+    print("\n" + "=" * 60)
+    print("Testing depot, rovers and logistics")
+    print("=" * 60)
+
+    reduction = reduce_problem(parse("depot", depot_problem(3, 2, 4, num_spare=6)))
+    assert sorted(reduction.removed_objects) == sorted(f"spare{i}" for i in range(6))
+    assert {"t0", "t1"} <= set(reduction.problem.objects)
+    print("✓ Depot: spare packages removed, every truck kept")
+
+    reduction = reduce_problem(parse("rovers", rovers_problem(2, 8, 3, num_spare=5)))
+    assert sorted(reduction.removed_objects) == sorted(f"spare{i}" for i in range(5))
+    print("✓ Rovers: targets outside the goal removed")
+
+    # Planes only reach airports, and the goal city is not one
+    parser = PDDLParser(str(DOMAINS_DIR / "logistics" / "domain.pddl"), str(DOMAINS_DIR / "logistics" / "p1.pddl"))
+    assert relevant_objects(parser) == {"pkg1", "truck1", "cA", "cB"}
+    print("✓ Logistics: airplane and airports removed")
+
+    parser = PDDLParser(str(DOMAINS_DIR / "blocks_world" / "domain.pddl"), str(DOMAINS_DIR / "blocks_world" / "p1.pddl"))
+    assert reduce_problem(parser) is None
+    print("✓ Nothing to prune in blocks world")
+    return True
+
+
+def test_derived_predicates():
+    """Test that pruning gives up on domains with derived predicates."""
+    print("\n" + "=" * 60)
+    print("Testing derived predicates")
+    print("=" * 60)
+
+    domain = Domain.from_text("""
+    (define (domain rooms)
+      (:requirements :strips :derived-predicates)
+      (:predicates (at ?b ?r) (occupied ?r))
+      (:derived (occupied ?r) (exists (?b) (at ?b ?r)))
+      (:action move
+        :parameters (?b ?from ?to)
+        :precondition (and (at ?b ?from) (not (occupied ?to)))
+        :effect (and (at ?b ?to) (not (at ?b ?from)))))
+    """)
+    problem = Problem.from_text("""
+    (define (problem blocked) (:domain rooms)
+      (:objects b1 b2 r1 r2 r3)
+      (:init (at b1 r1) (at b2 r2))
+      (:goal (at b1 r2)))
+    """)
+    parser = PDDLParser(domain, problem)
+    # b2 only matters through the axiom body: dropping it would make
+    # (move b1 r1 r2) look applicable
+    assert relevant_objects(parser) is None
+    assert reduce_problem(parser) is None
+    assert not StateGenerator(domain, problem).apply_action("(move b1 r1 r2)")
+    print("✓ Problems with axioms are not pruned")
+    return True
+
+
+def test_numeric_fluents():
+    """Test that pruning leaves problems with action costs alone."""
+    print("\n" + "=" * 60)
+    print("Testing numeric fluents")
+    print("=" * 60)
+
+    text = roads_problem(3, num_spare=2)
+    domain = Domain.from_text(ROADS_DOMAIN)
+    # The reduced problem would be written without its metric or costs
+    for variant in (text, text.replace("(:metric minimize (total-cost))", "")):
+        assert reduce_problem(PDDLParser(domain, Problem.from_text(variant))) is None
+    with tempfile.TemporaryDirectory() as tmp:
+        domain_path = Path(tmp) / "domain.pddl"
+        domain_path.write_text(ROADS_DOMAIN)
+        assert reduce_files(str(domain_path), str(write_problem(text, Path(tmp), "roads"))) is None
+    print("✓ Problems with a metric or numeric init are not pruned")
+    return True
+
+
+def test_map_plan():
+    """Test mapping plans back to the original object names."""
+    print("\n" + "=" * 60)
+    print("Testing plan mapping")
+    print("=" * 60)
+
+    text = gripper_problem(1, num_spare=2).replace("ball0", "Ball0").replace("room1", "Room1")
+    reduction = reduce_problem(parse("gripper", text))
+    assert reduction.map_plan(["(pick ball0 room0 left)", "(move room0 room1)"]) == \
+        ["(pick Ball0 room0 left)", "(move room0 Room1)"]
+    print("✓ Lowercased planner output mapped to original names")
+
+    try:
+        reduction.map_plan(["(pick spare0 room0 left)"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Actions on removed objects rejected")
+    return True
+
+
+def test_solve_pruned():
+    """Test that solve_problem plans on the reduced problem and falls back."""
+    print("\n" + "=" * 60)
+    print("Testing pruning in solve_problem")
+    print("=" * 60)
+
+    domain = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+    plan = gripper_plan(2)
+
+    def check(tmp):
+        (tmp / "plan.txt").write_text("\n".join(plan) + "\n; cost = 1 (unit cost)\n")
+
+        def seen():
+            path = tmp / "seen.txt"
+            return path.read_text().split("\0")[:-1] if path.exists() else []
+
+        problem = write_problem(gripper_problem(2, num_spare=10), tmp, "padded")
+        stats = PlannerStats()
+        result, used_planner = run_planner.solve_problem(domain, str(problem), stats=stats,
+                                                         mode=run_planner.SATISFICING_MODE)
+        assert used_planner and result == plan
+        assert stats.pruned_objects == 10 and stats.pruned_facts == 10
+        assert len(seen()) == 1 and "spare" not in seen()[0]
+        print("✓ Planner saw the problem without spare balls")
+
+        stats = PlannerStats()
+        run_planner.solve_problem(domain, str(problem), stats=stats, mode=run_planner.OPTIMAL_MODE)
+        assert stats.pruned_objects == 0 and "spare" in seen()[-1]
+        print("✓ Optimal mode solves the full problem")
+
+        text = gripper_problem(2, num_spare=10).replace("gripper-synthetic", "keep-all")
+        problem = write_problem(text, tmp, "keep-all")
+        stats = PlannerStats()
+        result, _ = run_planner.solve_problem(domain, str(problem), stats=stats, mode=run_planner.SATISFICING_MODE)
+        assert result == plan and stats.pruned_objects == 0
+        assert "spare0" not in seen()[-2] and "spare0" in seen()[-1]
+        print("✓ Unsolvable reduced problem falls back to the full problem")
+        return True
+
+    # The test problems are small enough for the built-in planner
+    return with_fake_planner(FAKE_FAST_DOWNWARD, check, PLANNER_BUILTIN_MAX_ACTIONS="0")
+
+
+def main():
+    """Run all tests."""
+    print("Relevance Pruning Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_gripper_spares()
+            and test_other_domains()
+            and test_derived_predicates()
+            and test_numeric_fluents()
+            and test_map_plan()
+            and test_solve_pruned()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -244,6 +244,90 @@ def test_parser_only():
     return True
 
 
+def test_fact_table_and_masks():
+    """Test fact interning and bitmask state encoding."""
+    print("\n" + "=" * 60)
+    print("Testing Fact Table (Standalone)")
+    print("=" * 60)
+    
+    from state_generator import Predicate
+    from state_generator.facts import FactTable, iter_bits
+    
+    assert list(iter_bits(0)) == []
+    assert list(iter_bits(0b101001)) == [0, 3, 5]
+    assert list(iter_bits(1 << 5000)) == [5000]
+    
+    facts = FactTable()
+    state = {Predicate('on', ['a', 'b']), Predicate('clear', ['a']), Predicate('handempty', [])}
+    mask = facts.encode(state)
+    assert len(facts) == 3
+    assert facts.decode(mask) == state
+    assert facts.intern('clear', ('a',)) == facts.lookup('clear', ('a',))
+    assert facts.lookup('clear', ('b',)) is None
+    print("  ✓ Predicates round-trip through bitmasks")
+    
+    domain_path = PLANNER_DIR / "domains/blocks_world/domain.pddl"
+    problem_path = PLANNER_DIR / "domains/blocks_world/p1.pddl"
+    sg = StateGenerator(str(domain_path), str(problem_path))
+    
+    # stack requires holding the block first
+    assert not sg.apply_action("(stack a b)")
+    assert sg.get_current_state() == sg.parser.init_state
+    assert sg.apply_action("(pick-up a)")
+    assert Predicate('holding', ['a']) in sg.get_current_state()
+    assert Predicate('ontable', ['a']) not in sg.get_current_state()
+    assert len(sg.get_state_history()) == 2
+    print("  ✓ Preconditions and effects applied as mask operations")
+    
+    return True
+
+
+def test_delta_history():
+    """Test delta-encoded history random access and cursor stepping."""
+    print("\n" + "=" * 60)
+    print("Testing Delta History (Standalone)")
+    print("=" * 60)
+    
+    domain_path = PLANNER_DIR / "domains/gripper/domain.pddl"
+    problem_path = PLANNER_DIR / "domains/gripper/p1.pddl"
+    plan = [
+        "(pick ball1 rooma left)",
+        "(pick ball2 rooma right)",
+        "(move rooma roomb)",
+        "(drop ball1 roomb left)",
+        "(drop ball2 roomb right)"
+    ]
+    
+    # A small interval so both checkpoints and deltas are exercised
+    sg = StateGenerator(str(domain_path), str(problem_path), checkpoint_interval=2)
+    states = sg.apply_plan(plan)
+    assert len(states) == len(plan) + 1
+    
+    for k in range(len(states)):
+        assert sg.state_at(k) == states[k]
+    assert sg.state_at(-1) == sg.get_current_state()
+    print("  ✓ state_at matches the full history")
+    
+    cursor = sg.history_cursor()
+    for k in range(1, len(states)):
+        assert cursor.forward()
+        assert cursor.state == states[k]
+    assert not cursor.forward()
+    for k in range(len(states) - 2, -1, -1):
+        assert cursor.backward()
+        assert cursor.state == states[k]
+    assert not cursor.backward()
+    print("  ✓ Cursor steps forward and back")
+    
+    # Grounded actions are compiled once and reused across the plan
+    assert sg.compile_action("(move rooma roomb)") is sg.compile_action("(move rooma roomb)")
+    assert not sg.apply_action("(fly rooma roomb)")
+    assert not sg.apply_action("(move rooma)")
+    print("  ✓ Compiled actions are memoized")
+    
+    return True
+
+
 def main():
     """Run all tests."""
     print("State Generator Test Suite (Standalone)")
@@ -261,7 +345,13 @@ def main():
         # Test gripper (optional)
         success3 = test_gripper_standalone()
         
-        if success1 and success2 and success3:
+        # Test fact interning and bitmask states
+        success4 = test_fact_table_and_masks()
+        
+        # Test delta-encoded history
+        success5 = test_delta_history()
+        
+        if success1 and success2 and success3 and success4 and success5:
             print("\n" + "=" * 60)
             print("✓ All tests passed!")
             print("=" * 60)
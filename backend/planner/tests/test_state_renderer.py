@@ -528,6 +528,126 @@ def test_rendered_state_format():
     
     return True
 
+def test_streaming_render():
+    """Test that the streaming pipeline matches the list-based one."""
+    print("\n" + "=" * 60)
+    print("Testing Streaming Render")
+    print("=" * 60)
+    
+    import io
+    from visualizer_api import stream_plan
+    
+    domain_path = PLANNER_DIR / "domains/gripper/domain.pddl"
+    problem_path = PLANNER_DIR / "domains/gripper/p1.pddl"
+    plan = [
+        "(pick ball1 rooma left)",
+        "(pick ball2 rooma right)",
+        "(move rooma roomb)",
+        "(drop ball1 roomb left)",
+        "(drop ball2 roomb right)"
+    ]
+    
+    sg = StateGenerator(str(domain_path), str(problem_path))
+    renderer = RendererFactory.get_renderer(sg.parser.domain_name)
+    expected = [rs.to_dict() for rs in renderer.render_sequence(sg.apply_plan(plan), sg.parser.objects, plan)]
+    
+    streamed = renderer.iter_render(sg.iter_states(plan), sg.parser.objects, plan)
+    assert next(streamed).to_dict() == expected[0]
+    assert [rs.to_dict() for rs in streamed] == expected[1:]
+    print(f"  ✓ iter_render(iter_states(plan)) yields the same {len(expected)} states")
+    
+    # An inapplicable action ends the stream early
+    states = list(sg.iter_states(plan[:2] + ["(pick ball1 rooma left)"]))
+    assert len(states) == 3
+    print("  ✓ Stream stops at the first inapplicable action")
+    
+    # NDJSON mode: header, one line per state, trailer
+    out = io.StringIO()
+    assert stream_plan(str(domain_path), str(problem_path), "gripper", out=out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records[0]["type"] == "header"
+    assert records[-1]["type"] == "trailer" and records[-1]["success"]
+    state_records = records[1:-1]
+    assert all(r["type"] == "state" for r in state_records)
+    assert [r["index"] for r in state_records] == list(range(records[-1]["num_states"]))
+    assert len(state_records) == len(records[-1]["plan"]) + 1
+    stats = records[-1]["stats"]
+    assert stats["plan_length"] == len(records[-1]["plan"])
+    assert stats["bytes_written"] == len(out.getvalue()) - len(out.getvalue().splitlines()[-1]) - 1
+    print(f"  ✓ NDJSON stream has header, {len(state_records)} state lines and trailer")
+    
+    return True
+
+
+def test_serializers():
+    """Test that every serialization mode round-trips the rendered fixtures."""
+    print("\n" + "=" * 60)
+    print("Testing Sequence Serializers")
+    print("=" * 60)
+    
+    from state_renderer import SERIALIZATION_MODES, serialize_sequence, deserialize_sequence
+    from state_renderer.serializers import msgpack_dumps, msgpack_loads
+    
+    for value in [0, 127, 128, -1, -33, 65536, 2 ** 63 - 1, -2 ** 63, 1.5, "x" * 40,
+                  "y" * 70000, list(range(20)), {"k": [None, True, False]}, b"raw"]:
+        assert msgpack_loads(msgpack_dumps(value)) == value, value
+    print("  ✓ MessagePack round-trips scalars, strings and containers")
+    
+    for path in sorted((PLANNER_DIR / "output").glob("*_rendered.json")):
+        with open(path) as f:
+            sequence = json.load(f)
+        sizes = {}
+        for mode in SERIALIZATION_MODES:
+            data = serialize_sequence(sequence, mode)
+            assert deserialize_sequence(data, mode) == sequence, (path.name, mode)
+            sizes[mode] = len(data)
+        assert sizes["table"] < sizes["compact"] < sizes["json"]
+        print(f"  ✓ {path.name}: " + ", ".join(f"{m}={n}" for m, n in sizes.items()))
+    
+    return True
+
+
+def test_delta_encoding():
+    """Test keyframe-plus-patch encoding of rendered sequences."""
+    print("\n" + "=" * 60)
+    print("Testing Delta Encoding")
+    print("=" * 60)
+    
+    import copy
+    from state_renderer import encode_delta_sequence, decode_delta_sequence
+    
+    for path in sorted((PLANNER_DIR / "output").glob("*_rendered.json")):
+        with open(path) as f:
+            sequence = json.load(f)
+        for interval in (1, 2, 32):
+            encoded = encode_delta_sequence(sequence, keyframe_interval=interval)
+            frames = encoded["frames"]
+            assert len(frames) == len(sequence["states"])
+            assert sum("keyframe" in frame for frame in frames) == -(-len(frames) // interval)
+            assert decode_delta_sequence(json.loads(json.dumps(encoded))) == sequence, (path.name, interval)
+        print(f"  ✓ {path.name} round-trips")
+    
+    # Added, removed and reordered objects/relations, dropped fields
+    with open(PLANNER_DIR / "output" / "gripper_rendered.json") as f:
+        first = json.load(f)["states"][0]
+    second = copy.deepcopy(first)
+    second["objects"].pop(1)
+    second["objects"].insert(0, {"id": "new", "type": "ball", "label": "NEW"})
+    second["objects"][2].pop("position")
+    second["objects"][3]["properties"]["color"] = "#000000"
+    second["relations"].reverse()
+    third = copy.deepcopy(second)
+    third["relations"].append({"type": "extra", "source": "new"})
+    sequence = {"domain": first["domain"], "num_states": 3, "states": [first, second, third]}
+    encoded = encode_delta_sequence(sequence)
+    assert "relations" in encoded["frames"][1]
+    assert encoded["frames"][2] == {"metadata": third["metadata"], "relations_added": [[len(third["relations"]) - 1, third["relations"][-1]]]}
+    assert decode_delta_sequence(encoded) == sequence
+    print("  ✓ Structural changes round-trip; unchanged steps carry only the diff")
+    
+    return True
+
+
 def main():
     """Run all tests."""
     print("State Renderer Test Suite")
@@ -536,6 +656,9 @@ def main():
     test_depot_renderer()
     test_hanoi_renderer()
     test_rovers_renderer()
+    test_streaming_render()
+    test_serializers()
+    test_delta_encoding()
 
 # def main():
 #     """Run all tests."""
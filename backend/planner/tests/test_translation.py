@@ -0,0 +1,180 @@
+"""
+Test script for the translate stage and the translation cache.
+
+Uses a stand-in for fast-downward.py that logs every translator and search
+invocation, so Fast Downward is not required.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add planner directory to path
+PLANNER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLANNER_DIR))
+
+import run_planner
+from planner_runner.plan_cache import PlannerFailure, UNSOLVABLE
+from planner_runner.stats import PlannerStats
+from planner_runner.translation import TranslationCache
+from benchmarks.synthetic import DOMAINS_DIR
+from fake_planner import with_fake_planner, write_gripper_problem
+
+DOMAIN_PATH = str(DOMAINS_DIR / "gripper" / "domain.pddl")
+
+FAKE_FAST_DOWNWARD = '''
+import os, re, sys
+args = sys.argv[1:]
+log_dir = os.path.dirname(__file__)
+if "--translate" in args:
+    problem = open(args[-1]).read()
+    name = re.search(r"\\(problem ([^)\\s]+)", problem).group(1)
+    with open(os.path.join(log_dir, "translate.log"), "a") as f:
+        f.write(name + "\\n")
+    if name.startswith("unsolvable"):
+        sys.exit(10)
+    with open("output.sas", "w") as f:
+        f.write("begin_version\\n3\\nend_version\\n" + name)
+    sys.exit(0)
+plan_file = args[args.index("--plan-file") + 1]
+sas = open(args[args.index("--plan-file") + 2]).read()
+with open(os.path.join(log_dir, "search.log"), "a") as f:
+    f.write(sas.splitlines()[-1] + " " + args[-1] + "\\n")
+with open(plan_file, "w") as f:
+    f.write("(solve %s)\\n; cost = 1 (unit cost)\\n" % sas.splitlines()[-1])
+'''
+
+
+def with_translation_cache(test):
+    """Run a test against the stand-in planner with a private translation cache."""
+    def run(tmp):
+        # Restored by with_fake_planner, which sets TRANSLATION_CACHE_DIR itself
+        os.environ['TRANSLATION_CACHE_DIR'] = str(tmp / "translation-cache")
+        return test(tmp)
+
+    return with_fake_planner(FAKE_FAST_DOWNWARD, run)
+
+
+def read_log(tmp: Path, name: str) -> list:
+    path = tmp / name
+    return path.read_text().splitlines() if path.exists() else []
+
+
+def test_translation_reused():
+    """Test that a second search configuration skips the translator."""
+    print("=" * 60)
+    print("Testing translation reuse across searches")
+    print("=" * 60)
+
+    def check(tmp):
+        problem_path = write_gripper_problem(tmp, "reuse")
+
+        stats = PlannerStats()
+        plan = run_planner.run_fast_downward(DOMAIN_PATH, problem_path, timeout=30, stats=stats)
+        assert plan == ["(solve reuse)"]
+        stages = stats.stages()
+        assert stages["translate"]["cached"] is False
+        assert stages["search"]["time"] >= 0
+        print(f"✓ First run translated in {stages['translate']['time']:.3f}s")
+
+        stats = PlannerStats()
+        plan = run_planner.run_fast_downward(DOMAIN_PATH, problem_path, timeout=30,
+                                             search="lazy_greedy([ff()])", stats=stats)
+        assert plan == ["(solve reuse)"]
+        assert stats.translate_cached is True
+        assert read_log(tmp, "translate.log") == ["reuse"]
+        assert read_log(tmp, "search.log") == ["reuse astar(lmcut())", "reuse lazy_greedy([ff()])"]
+        print("✓ Second search ran on the cached translation")
+
+        # Formatting-only edits share the translation
+        reformatted = "; comment\n" + Path(problem_path).read_text().upper()
+        stats = PlannerStats()
+        run_planner.run_fast_downward(DOMAIN_PATH, write_gripper_problem(tmp, "reformatted", reformatted),
+                                      timeout=30, stats=stats)
+        assert stats.translate_cached is True
+        assert read_log(tmp, "translate.log") == ["reuse"]
+        print("✓ Reformatted problem hits the translation cache")
+
+        # use_cache=False bypasses both caches
+        stats = PlannerStats()
+        run_planner.run_fast_downward(DOMAIN_PATH, problem_path, timeout=30, use_cache=False, stats=stats)
+        assert stats.translate_cached is False
+        assert read_log(tmp, "translate.log") == ["reuse", "reuse"]
+        assert list((tmp / "scratch").iterdir()) == []
+        print("✓ use_cache=False runs the translator")
+        return True
+
+    return with_translation_cache(check)
+
+
+def test_portfolio_translates_once():
+    """Test that every portfolio configuration searches one translation."""
+    print("\n" + "=" * 60)
+    print("Testing shared translation in the portfolio")
+    print("=" * 60)
+
+    def check(tmp):
+        problem_path = write_gripper_problem(tmp, "portfolio")
+        stats = PlannerStats()
+        plan = run_planner.run_portfolio_planner(DOMAIN_PATH, problem_path, "best", timeout=30,
+                                                 use_cache=False, stats=stats)
+        assert plan == ["(solve portfolio)"]
+        assert read_log(tmp, "translate.log") == ["portfolio"]
+        assert len(read_log(tmp, "search.log")) == len(run_planner.DEFAULT_PORTFOLIO)
+        assert "config" in stats.stages()["search"]
+        print(f"✓ {len(run_planner.DEFAULT_PORTFOLIO)} configurations, one translator run")
+        return True
+
+    return with_translation_cache(check)
+
+
+def test_translator_failure():
+    """Test that translator failures are reported and not cached."""
+    print("\n" + "=" * 60)
+    print("Testing translator failures")
+    print("=" * 60)
+
+    def check(tmp):
+        problem_path = write_gripper_problem(tmp, "unsolvable")
+        for _ in range(2):
+            try:
+                run_planner.run_fast_downward(DOMAIN_PATH, problem_path, timeout=30)
+                assert False, "expected PlannerFailure"
+            except PlannerFailure as e:
+                assert e.status == UNSOLVABLE and e.exit_code == 10
+        assert read_log(tmp, "translate.log") == ["unsolvable", "unsolvable"]
+        assert read_log(tmp, "search.log") == []
+
+        cache = TranslationCache(tmp / "translation-cache")
+        assert cache.get(cache.key_for_files(DOMAIN_PATH, problem_path)) is None
+        print("✓ Unsolvable verdict raised without running the search or caching output")
+        return True
+
+    return with_translation_cache(check)
+
+
+def main():
+    """Run all tests."""
+    print("Translation Stage Test Suite")
+    print("=" * 60)
+
+    try:
+        success = (
+            test_translation_reused()
+            and test_portfolio_translates_once()
+            and test_translator_failure()
+        )
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n" + "=" * 60)
+    print("✓ All tests passed!" if success else "✗ Some tests failed")
+    print("=" * 60)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -12,8 +12,11 @@ import warnings
 warnings.filterwarnings('ignore')
 os.environ['PYTHONWARNINGS'] = 'ignore'
 
+import argparse
 import json
+import time
 from pathlib import Path
+from typing import Optional, TextIO
 
 # Add modules to path
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -21,7 +24,8 @@ sys.path.insert(0, str(SCRIPT_DIR))
 
 from state_generator import StateGenerator
 from state_renderer import RendererFactory
-from run_planner import solve_problem
+from run_planner import solve_problem, iter_solutions, describe_planner
+from planner_runner.stats import PlannerStats
 
 
 def visualize_plan(domain_path: str, problem_path: str, domain_name: str = None) -> dict:
@@ -34,16 +38,19 @@ def visualize_plan(domain_path: str, problem_path: str, domain_name: str = None)
         domain_name: Optional domain name for fallback plans
         
     Returns:
-        Dictionary with rendered states and metadata
+        Dictionary with rendered states and metadata; "planner_stats" holds
+        the Fast Downward statistics (see planner_runner.stats), also on failure
     """
+    stats = PlannerStats()
     try:
         # Step 1: Solve the problem using Fast Downward (or fallback)
-        plan, used_planner = solve_problem(domain_path, problem_path, domain_name)
+        plan, used_planner = solve_problem(domain_path, problem_path, domain_name, stats=stats)
         
         if not plan:
             return {
                 "success": False,
-                "error": "No solution found for the problem"
+                "error": "No solution found for the problem",
+                "planner_stats": stats.to_dict()
             }
         
         # Step 2: Generate states
@@ -63,7 +70,9 @@ def visualize_plan(domain_path: str, problem_path: str, domain_name: str = None)
             "num_states": len(rendered_states),
             "states": [rs.to_dict() for rs in rendered_states],
             "used_planner": used_planner,
-            "planner_info": "Fast Downward (A* + LM-cut)" if used_planner else "Fallback (predefined plan)"
+            "planner_info": describe_planner(stats) if used_planner else "Fallback (predefined plan)",
+            "stages": stats.stages(),
+            "planner_stats": stats.to_dict()
         }
         
         return result
@@ -73,22 +82,182 @@ def visualize_plan(domain_path: str, problem_path: str, domain_name: str = None)
         return {
             "success": False,
             "error": str(e),
-            "traceback": traceback.format_exc()
+            "traceback": traceback.format_exc(),
+            "planner_stats": stats.to_dict()
+        }
+
+
+def _write_line(out: TextIO, record: dict) -> int:
+    """
+    Write one compact JSON record and flush so the reader sees it immediately.
+    
+    Returns:
+        Number of bytes written, including the newline (output is ASCII)
+    """
+    line = json.dumps(record, separators=(',', ':')) + "\n"
+    out.write(line)
+    out.flush()
+    return len(line)
+
+
+def stream_plan(domain_path: str, problem_path: str, domain_name: str = None,
+                out: Optional[TextIO] = None) -> bool:
+    """
+    Run the visualization pipeline, writing newline-delimited JSON as it goes.
+    
+    Emits a "header" record once the plan is known, one "state" record per
+    rendered state as soon as it is computed, and a closing "trailer" record
+    carrying the plan and run statistics (including the planner's stage
+    timings and search statistics). States flow through StateGenerator.iter_states and
+    BaseStateRenderer.iter_render, so only one state is held at a time.
+    Failures are reported as an "error" record.
+    
+    In anytime planner mode every improved plan is streamed as it arrives:
+    each starts with a new header (with an increasing "revision") followed
+    by its states, replacing the previous revision; the trailer carries the
+    final plan.
+    
+    Args:
+        domain_path: Path to domain PDDL file
+        problem_path: Path to problem PDDL file
+        domain_name: Optional domain name for fallback plans
+        out: Text stream to write to (defaults to stdout)
+        
+    Returns:
+        True if every state of the plan was streamed
+    """
+    if out is None:
+        out = sys.stdout
+    
+    try:
+        start = time.perf_counter()
+        planner_stats = PlannerStats()
+        solutions = iter_solutions(domain_path, problem_path, domain_name, stats=planner_stats)
+        sg = None
+        plan = None
+        revision = 0
+        bytes_written = 0
+        solve_time = 0.0
+        render_time = 0.0
+        first_plan_time = None
+        success = False
+        
+        while True:
+            wait_start = time.perf_counter()
+            try:
+                plan, used_planner = next(solutions)
+            except StopIteration:
+                break
+            solve_time += time.perf_counter() - wait_start
+            if first_plan_time is None:
+                first_plan_time = time.perf_counter() - start
+            
+            if not plan:
+                _write_line(out, {
+                    "type": "error",
+                    "success": False,
+                    "error": "No solution found for the problem"
+                })
+                return False
+            
+            if sg is None:
+                sg = StateGenerator(domain_path, problem_path)
+                renderer = RendererFactory.get_renderer(sg.parser.domain_name)
+            
+            bytes_written += _write_line(out, {
+                "type": "header",
+                "revision": revision,
+                "domain": sg.parser.domain_name,
+                "problem": sg.parser.problem_name,
+                "used_planner": used_planner,
+                "planner_info": describe_planner(planner_stats) if used_planner else "Fallback (predefined plan)"
+            })
+            
+            render_start = time.perf_counter()
+            num_states = 0
+            for rendered in renderer.iter_render(sg.iter_states(plan), sg.parser.objects, plan):
+                bytes_written += _write_line(out, {"type": "state", "index": num_states, "state": rendered.to_dict()})
+                num_states += 1
+            render_time += time.perf_counter() - render_start
+            revision += 1
+            
+            # iter_states stops early if an action cannot be applied
+            success = num_states == len(plan) + 1
+            if not success:
+                # Stops the planner if it is still improving the plan
+                solutions.close()
+                break
+        
+        if plan is None:
+            _write_line(out, {
+                "type": "error",
+                "success": False,
+                "error": "No solution found for the problem"
+            })
+            return False
+        
+        trailer = {
+            "type": "trailer",
+            "success": success,
+            "plan": plan,
+            "num_states": num_states,
+            "revisions": revision,
+            "stats": {
+                "plan_length": len(plan),
+                "num_states": num_states,
+                "first_plan_time": round(first_plan_time, 6),
+                "solve_time": round(solve_time, 6),
+                "render_time": round(render_time, 6),
+                "total_time": round(time.perf_counter() - start, 6),
+                "bytes_written": bytes_written,
+                "stages": planner_stats.stages(),
+                "planner": planner_stats.to_dict()
+            }
         }
+        if not success:
+            trailer["error"] = f"Failed to apply action {num_states - 1}: {plan[num_states - 1]}"
+        _write_line(out, trailer)
+        return success
+        
+    except Exception as e:
+        import traceback
+        _write_line(out, {
+            "type": "error",
+            "success": False,
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        })
+        return False
 
 
 def main():
     """CLI interface for testing."""
-    if len(sys.argv) < 3:
-        print("Usage: visualizer_api.py <domain_path> <problem_path> [domain_name]")
-        sys.exit(1)
+    arg_parser = argparse.ArgumentParser(description="Solve and render a PDDL problem as JSON")
+    arg_parser.add_argument("domain_path", help="Path to domain PDDL file")
+    arg_parser.add_argument("problem_path", help="Path to problem PDDL file")
+    arg_parser.add_argument("domain_name", nargs="?", default=None,
+                            help="Domain name for fallback plans")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="Write newline-delimited JSON records as states are rendered")
+    arg_parser.add_argument("--output", metavar="PATH", default=None,
+                            help="Write the result to this file instead of stdout")
+    args = arg_parser.parse_args()
     
-    domain_path = sys.argv[1]
-    problem_path = sys.argv[2]
-    domain_name = sys.argv[3] if len(sys.argv) > 3 else None
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.stream:
+            success = stream_plan(args.domain_path, args.problem_path, args.domain_name, out)
+        else:
+            result = visualize_plan(args.domain_path, args.problem_path, args.domain_name)
+            success = result["success"]
+            out.write(json.dumps(result, indent=2))
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
     
-    result = visualize_plan(domain_path, problem_path, domain_name)
-    print(json.dumps(result, indent=2))
+    if args.stream:
+        sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":